@@ -0,0 +1,141 @@
+"""
+Benchmark: synchronous fetch versus the asyncio engine ('fetch --async').
+
+Starts a local stand-in for the DigiKey and Mouser APIs that answers after a
+fixed delay, points both engines at it and fetches the same N part numbers.
+Database access is replaced by in-memory category lookups and stores, so only
+the supplier round trips and the shared transformation code are measured.
+
+    python benchmarks/bench_async_fetch.py --parts 200 --latency-ms 80 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from tektrasense_kipipe import config
+from tektrasense_kipipe.async_pipeline import AsyncFetchPipeline, AsyncSupplierClient
+from tektrasense_kipipe.data_processor import ComponentProcessor
+
+def make_handler(latency: float):
+    class SupplierStandIn(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            if self.path.startswith("/token"):
+                payload = {"access_token": "bench", "expires_in": 600}
+            elif self.path.startswith("/digikey"):
+                part_number = json.loads(body)["Keywords"]
+                payload = {"Products": [{
+                    "ManufacturerProductNumber": part_number, "ChildCategories": {"Name": "Chip Resistor"},
+                    "Description": {"ProductDescription": f"RES {part_number}"}, "QuantityAvailable": 1000,
+                    "ProductVariations": [{"DigiKeyProductNumber": f"DK-{part_number}", "StandardPricing": [
+                        {"BreakQuantity": 1, "UnitPrice": 0.1}, {"BreakQuantity": 100, "UnitPrice": 0.02}]}],
+                }]}
+            else:
+                part_number = json.loads(body)["SearchByKeywordRequest"]["keyword"]
+                payload = {"SearchResults": {"Parts": [{"ManufacturerPartNumber": part_number, "Category": "Chip Resistor",
+                                                        "MouserPartNumber": f"MS-{part_number}", "Availability": "500 In Stock"}]}}
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    return SupplierStandIn
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+class MemoryCatalog:
+    """The database calls of both engines, answered from memory."""
+    def __init__(self):
+        self.counters = {}
+        self.stored = 0
+        self.lock = asyncio.Lock()
+
+    def get_category_id(self, supplier, category):
+        return 1
+
+    def get_category_details(self, category_id):
+        return {"parent_id": None, "name": "Resistors", "prefix": "RES"}
+
+    def get_next_internal_part_id(self, prefix):
+        self.counters[prefix] = self.counters.get(prefix, 0) + 1
+        return f"{prefix}-{self.counters[prefix]:04d}"
+
+    def add_unmapped_category(self, supplier, category):
+        pass
+
+class AsyncMemoryCatalog(MemoryCatalog):
+    async def get_category_id(self, supplier, category):
+        return super().get_category_id(supplier, category)
+
+    async def get_category_details(self, category_id):
+        return super().get_category_details(category_id)
+
+    async def get_next_internal_part_id(self, prefix):
+        return super().get_next_internal_part_id(prefix)
+
+    async def add_unmapped_category(self, supplier, category):
+        pass
+
+    def prefix_lock(self, prefix):
+        return self.lock
+
+    async def store_part(self, part_data, offers):
+        self.stored += 1
+        return True
+
+def run_sync(part_numbers):
+    processor = ComponentProcessor(MemoryCatalog())
+    return sum(1 for part_number in part_numbers if processor.fetch_part_data(part_number))
+
+async def run_async(part_numbers, concurrency):
+    store = AsyncMemoryCatalog()
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(limits=limits) as client:
+        succeeded, _ = await AsyncFetchPipeline(AsyncSupplierClient(client), store, concurrency).run(part_numbers)
+    return succeeded
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--parts", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--skip-sync", action="store_true", help="Only time the async engine.")
+    args = parser.parse_args()
+
+    server = StandInServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    config.DIGIKEY_TOKEN_URL, config.DIGIKEY_SEARCH_URL, config.MOUSER_API_URL = f"{base}/token", f"{base}/digikey", f"{base}/mouser"
+    os.environ.update(DIGIKEY_CLIENT_ID="bench", DIGIKEY_CLIENT_SECRET="bench", MOUSER_API_KEY="bench")
+
+    part_numbers = [f"PN-{i:06d}" for i in range(args.parts)]
+    try:
+        if not args.skip_sync:
+            start = time.perf_counter()
+            ok = run_sync(part_numbers)
+            elapsed = time.perf_counter() - start
+            print(f"sync : {ok}/{args.parts} parts in {elapsed:.2f} s ({args.parts / elapsed:.1f} parts/s)")
+        start = time.perf_counter()
+        ok = asyncio.run(run_async(part_numbers, args.concurrency))
+        elapsed = time.perf_counter() - start
+        print(f"async: {ok}/{args.parts} parts in {elapsed:.2f} s ({args.parts / elapsed:.1f} parts/s, concurrency {args.concurrency})")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark: vectorized BOM costing on a synthetic catalog.
+
+Builds a BOM of N lines, each offered by several suppliers with a full set of
+price breaks, and times 'compute_costs' (the in-memory part of 'kipipe cost').
+No database is needed.
+
+    python benchmarks/bench_bom_cost.py --lines 1000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from tektrasense_kipipe.commands.cost import compute_costs, TIER_COLUMNS
+
+BREAKS = [1, 10, 25, 100, 250, 500, 1000, 2500, 5000]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=1000)
+    parser.add_argument("--suppliers", type=int, default=3)
+    parser.add_argument("--boards", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    part_numbers = [f"PN-{i:06d}" for i in range(args.lines)]
+    lines = pd.DataFrame({"manufacturer_part_number": part_numbers,
+                          "quantity": rng.integers(1, 20, args.lines), "references": ""})
+    rows = []
+    for part_number in part_numbers:
+        base = rng.uniform(0.01, 5.0)
+        for s in range(args.suppliers):
+            stock = int(rng.integers(0, 100000))
+            for i, min_quantity in enumerate(BREAKS):
+                rows.append((part_number, f"Supplier{s}", min_quantity, base * (1 - 0.05 * i) * (1 + 0.1 * s), stock))
+    tiers = pd.DataFrame(rows, columns=TIER_COLUMNS)
+
+    compute_costs(lines, tiers, args.boards)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        costed = compute_costs(lines, tiers, args.boards)
+    elapsed = (time.perf_counter() - start) / args.repeat
+    print(f"{args.lines} lines x {len(tiers)} tiers: {elapsed * 1000:.1f} ms per costing, total {costed['extended_cost'].sum():.2f}")
+
+if __name__ == "__main__":
+    main()
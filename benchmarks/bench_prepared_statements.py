@@ -0,0 +1,76 @@
+"""
+Benchmark: per-call latency of the hot per-part queries, plain vs prepared.
+
+Runs each fixed DatabaseManager statement N times on one pooled connection,
+first as a normal client-side parameterized query and then as a server-side
+prepared statement, and prints the mean latency per call. The component upsert
+is exercised inside a transaction that is rolled back, so no data is changed.
+
+Requires the usual DB_* variables (or a .env file) pointing at a populated database.
+
+    python benchmarks/bench_prepared_statements.py --iterations 5000
+"""
+import argparse
+import re
+import sys
+import time
+
+from tektrasense_kipipe.db_manager import DatabaseManager, _upsert_query_for
+
+def _to_pyformat(sql: str) -> str:
+    return re.sub(r'\$\d+', '%s', sql)
+
+def _time_calls(label, iterations, call):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<10} {elapsed / iterations * 1e6:9.1f} us/call")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit("Database connection pool failed to initialize.")
+
+    sample = db_manager.fetch_all(
+        "SELECT m.supplier_name, m.supplier_category, c.manufacturer_part_number, c.category_id "
+        "FROM category_mappings m JOIN components c ON c.category_id = m.category_id LIMIT 1",
+        use_primary=True,
+    )
+    if not sample:
+        sys.exit("Need at least one mapped category with a component to benchmark against.")
+    supplier, supplier_category, part_number, category_id = sample[0]
+
+    cases = {
+        "kipipe_get_category_id": (supplier, supplier_category),
+        "kipipe_get_category_details": (category_id,),
+        "kipipe_get_component_symbol_info": (part_number,),
+    }
+    upsert_row = {"manufacturer_part_number": part_number, "description": "benchmark", "category_id": category_id}
+    upsert_sql = _upsert_query_for("components", tuple(upsert_row), "manufacturer_part_number", positional=True)
+    upsert_params = tuple(upsert_row.values())
+
+    with db_manager.get_connection() as conn:
+        with conn.cursor() as cur:
+            for name, params in cases.items():
+                sql = DatabaseManager.PREPARED_STATEMENTS[name]
+                print(name)
+                plain = _time_calls("plain", args.iterations, lambda: (cur.execute(_to_pyformat(sql), params), cur.fetchall()))
+                prepared = _time_calls("prepared", args.iterations, lambda: (db_manager._execute_prepared(cur, name, sql, params), cur.fetchall()))
+                print(f"  speedup    {plain / prepared:9.2f}x")
+
+            print("component upsert (rolled back)")
+            plain = _time_calls("plain", args.iterations, lambda: cur.execute(_to_pyformat(upsert_sql), upsert_params))
+            prepared = _time_calls("prepared", args.iterations, lambda: db_manager._execute_prepared(cur, "kipipe_bench_upsert", upsert_sql, upsert_params))
+            print(f"  speedup    {plain / prepared:9.2f}x")
+        conn.rollback()
+
+    db_manager.close_all_connections()
+
+if __name__ == "__main__":
+    main()
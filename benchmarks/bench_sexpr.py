@@ -0,0 +1,89 @@
+"""
+Benchmark: streaming S-expression parser versus the old DOTALL regex on .kicad_sym files.
+
+Generates a library of N multi-unit symbols (or uses --file, e.g. a library from
+the official kicad-symbols repository) and reports the throughput of
+'sexpr.iter_symbols' next to the regex extraction 'import-symbols' used before,
+then with symbol_shape() on every symbol too, as 'import-symbols' reads them.
+The symbol counts differ on purpose: the regex also returns every sub-unit
+('Name_0_1', 'Name_1_1') as a symbol. No database is needed.
+
+    python benchmarks/bench_sexpr.py --symbols 5000
+    python benchmarks/bench_sexpr.py --file /path/to/kicad-symbols/MCU_ST_STM32F4.kicad_sym
+"""
+import argparse
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from tektrasense_kipipe.sexpr import iter_symbols, symbol_shape
+
+def make_library(symbols: int, pins: int) -> str:
+    parts = ['(kicad_symbol_lib (version 20231120) (generator "kicad_symbol_editor")\n']
+    for i in range(symbols):
+        name = f"PART_{i:05d}"
+        parts.append(f'  (symbol "{name}" (pin_names (offset 1.016)) (in_bom yes) (on_board yes)\n')
+        for prop, value in (("Reference", "U"), ("Value", name), ("Footprint", "Package_QFP:LQFP-64"),
+                            ("Datasheet", f"https://example.com/{name}.pdf"),
+                            ("Description", f"Microcontroller (ARM, {pins} pins) \\\"family\\\" {i}"),
+                            ("ki_keywords", "ARM Cortex-M4")):
+            parts.append(f'    (property "{prop}" "{value}" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))\n')
+        parts.append(f'    (symbol "{name}_0_1" (rectangle (start -10 10) (end 10 -10) (stroke (width 0.254)) (fill (type background))))\n')
+        parts.append(f'    (symbol "{name}_1_1"\n')
+        for p in range(pins):
+            parts.append(f'      (pin bidirectional line (at -12.7 {p * 2.54:.2f} 0) (length 2.54) '
+                         f'(name "P{p}" (effects (font (size 1.27 1.27)))) (number "{p + 1}" (effects (font (size 1.27 1.27)))))\n')
+        parts.append('    )\n  )\n')
+    parts.append(')\n')
+    return "".join(parts)
+
+def legacy_regex(path: Path) -> int:
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    found = 0
+    for symbol_name, block in re.findall(r'\(symbol\s+"([^"]+)"(.*?\)\s*\)\s*\))', content, re.DOTALL):
+        for prop in ("Description", "Datasheet", "ki_keywords"):
+            re.search(fr'\(property\s+"{prop}"\s+"([^"]*)"', block)
+        found += 1
+    return found
+
+def streaming(path: Path) -> int:
+    found = 0
+    for symbol in iter_symbols(path):
+        symbol.properties.get("Description")
+        found += 1
+    return found
+
+def streaming_shape(path: Path) -> int:
+    found = 0
+    for symbol in iter_symbols(path):
+        symbol.properties.get("Description")
+        symbol_shape(symbol.node)
+        found += 1
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--pins", type=int, default=64)
+    parser.add_argument("--file", help="Benchmark an existing .kicad_sym file instead of a generated one.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.file) if args.file else Path(tmp) / "Bench.kicad_sym"
+        if not args.file:
+            path.write_text(make_library(args.symbols, args.pins), encoding='utf-8')
+        size_mb = path.stat().st_size / 1e6
+        for label, func in (("regex (old)", legacy_regex), ("streaming", streaming),
+                            ("streaming + shape", streaming_shape)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                found = func(path)
+                best = min(best, time.perf_counter() - start)
+            print(f"{label:<18} {found:>6} symbols from {size_mb:.1f} MB in {best:.3f} s ({size_mb / best:.1f} MB/s)")
+
+if __name__ == "__main__":
+    main()
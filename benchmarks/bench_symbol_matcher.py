@@ -0,0 +1,88 @@
+"""
+Benchmark: add-symbol's per-part linear prefix scan versus the sorted SymbolMatcher.
+
+Generates N symbol names shaped like a KiCad catalog ('Category_FAMILY1234x_A')
+and M part numbers derived from them with package and reel suffixes, then
+matches every part number. The linear scan is the loop 'add-symbol' ran for
+each part before (normalize every name, compare character by character); the
+matcher is built once and then bisected. No database is needed.
+
+    python benchmarks/bench_symbol_matcher.py --symbols 50000 --parts 2000
+"""
+import argparse
+import random
+import re
+import time
+
+from tektrasense_kipipe.symbol_matcher import SymbolMatcher
+
+FAMILIES = ["LM", "TPS", "STM32F", "MCP", "AD", "LT", "NCP", "BQ", "TLV", "ATSAM"]
+CATEGORIES = ["Amplifier_Operational", "Regulator_Linear", "MCU_ST", "Interface_UART", "Power_Management"]
+
+def make_rows(symbols: int, rng: random.Random) -> list:
+    rows = set()
+    while len(rows) < symbols:
+        name = f"{rng.choice(FAMILIES)}{rng.randint(1, 99999)}{rng.choice(['', 'x', 'A', 'B'])}"
+        rows.add((rng.choice(CATEGORIES), rng.choice([name, f"IC_{name}", f"{name}_A"]), rng.choice([None, 5, 8, 14, 64])))
+    return sorted(rows, key=lambda row: row[:2])
+
+def make_parts(rows: list, parts: int, rng: random.Random) -> list:
+    suffixes = ["DR", "T-I/OT", "DBVR", "IDR", "-3.3", "QFN32"]
+    return [re.sub(r'^IC_|_A$|x', '', rng.choice(rows)[1]) + rng.choice(suffixes) for _ in range(parts)]
+
+def legacy_scan(part_number: str, rows: list) -> tuple:
+    best_match_len = 0
+    found_symbols = []
+    for nickname, symbol_name, _ in rows:
+        clean_s_name = re.sub(r'^[A-Z]+_', '', symbol_name)
+        clean_s_name = re.sub(r'_[A-Z]$', '', clean_s_name)
+        clean_s_name = clean_s_name.replace('x', '').replace('X', '')
+        common_prefix_len = 0
+        for i in range(min(len(clean_s_name), len(part_number))):
+            if clean_s_name[i] == part_number[i]:
+                common_prefix_len += 1
+            else:
+                break
+        if common_prefix_len < 5:
+            continue
+        if common_prefix_len > best_match_len:
+            best_match_len = common_prefix_len
+            found_symbols = [{"nickname": nickname, "symbol": symbol_name}]
+        elif common_prefix_len == best_match_len:
+            found_symbols.append({"nickname": nickname, "symbol": symbol_name})
+    return found_symbols, best_match_len
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=50000)
+    parser.add_argument("--parts", type=int, default=2000)
+    parser.add_argument("--legacy-parts", type=int, default=50, help="Parts timed with the linear scan (it is slow); the rate is extrapolated.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = make_rows(args.symbols, rng)
+    parts = make_parts(rows, args.parts, rng)
+
+    start = time.perf_counter()
+    matcher = SymbolMatcher.from_rows(rows)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    results = [matcher.best_matches(part_number) for part_number in parts]
+    lookup = time.perf_counter() - start
+
+    sample = parts[:args.legacy_parts]
+    start = time.perf_counter()
+    legacy = [legacy_scan(part_number, rows) for part_number in sample]
+    legacy_time = time.perf_counter() - start
+    key = lambda found: sorted((s["nickname"], s["symbol"]) for s in found[0])
+    mismatches = sum(key(a) != key(b) or a[1] != b[1] for a, b in zip(results, legacy))
+
+    per_part_legacy = legacy_time / len(sample)
+    print(f"{len(rows)} symbols, {len(parts)} part numbers")
+    print(f"linear scan (old) {per_part_legacy * 1e3:9.3f} ms/part  -> {per_part_legacy * len(parts):8.2f} s for the BOM")
+    print(f"matcher           {lookup / len(parts) * 1e3:9.3f} ms/part  -> {build + lookup:8.2f} s for the BOM (build {build:.2f} s)")
+    print(f"results differing from the linear scan: {mismatches} of {len(sample)}")
+
+if __name__ == "__main__":
+    main()
@@ -81,7 +81,8 @@ CREATE TABLE IF NOT EXISTS kicad_library.footprints (
     footprint_id SERIAL PRIMARY KEY,
     library_nickname VARCHAR(255) NOT NULL,
     footprint_name VARCHAR(255) UNIQUE NOT NULL,
-    keywords TEXT
+    keywords TEXT,
+    description TEXT
 );
 
 -- `footprint_mappings` Table
@@ -194,4 +195,286 @@ INSERT INTO kicad_library.categories (category_id, parent_id, category_name, cat
 ON CONFLICT (category_id) DO NOTHING;
 
 -- Reset sequence to avoid issues if IDs were inserted manually before
-SELECT setval('kicad_library.categories_category_id_seq', (SELECT MAX(category_id) FROM kicad_library.categories));
\ No newline at end of file
+SELECT setval('kicad_library.categories_category_id_seq', (SELECT MAX(category_id) FROM kicad_library.categories));
+
+
+-- Step 6: Full-Text Search for Symbols and Footprints
+-- Stored tsvector columns are maintained by Postgres on every insert/update, so
+-- 'import-symbols' keeps them current without any extra work.
+ALTER TABLE kicad_library.footprints ADD COLUMN IF NOT EXISTS description TEXT;
+
+ALTER TABLE kicad_library.symbols ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(symbol_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(keywords, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS symbols_search_vector_idx ON kicad_library.symbols USING GIN (search_vector);
+
+ALTER TABLE kicad_library.footprints ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(footprint_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(keywords, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS footprints_search_vector_idx ON kicad_library.footprints USING GIN (search_vector);
+
+
+-- Step 7: Indexes for KiCad Database Library Reads
+-- KiCad filters components by category; 'kipipe build-dbl' creates one view per
+-- category on top of this index and writes the matching .kicad_dbl file.
+CREATE INDEX IF NOT EXISTS components_category_id_idx ON kicad_library.components (category_id);
+
+
+-- Step 8: Change Feed for Components
+-- Every insert/update stamps the row with the next value of one sequence (its order
+-- in the feed) and the writing transaction id; every delete leaves a tombstone
+-- stamped the same way. 'kipipe changes' selects by transaction id range so that a
+-- change committed late can never fall behind a resume token (requires PostgreSQL 13+).
+CREATE SEQUENCE IF NOT EXISTS kicad_library.component_change_seq;
+
+ALTER TABLE kicad_library.components ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+ALTER TABLE kicad_library.components ADD COLUMN IF NOT EXISTS change_xid xid8;
+ALTER TABLE kicad_library.components ADD COLUMN IF NOT EXISTS created_xid xid8;
+UPDATE kicad_library.components
+SET change_seq = nextval('kicad_library.component_change_seq'),
+    change_xid = pg_current_xact_id(),
+    created_xid = pg_current_xact_id()
+WHERE change_seq IS NULL;
+CREATE INDEX IF NOT EXISTS components_change_xid_idx ON kicad_library.components (change_xid);
+
+CREATE TABLE IF NOT EXISTS kicad_library.component_deletions (
+    change_seq BIGINT PRIMARY KEY,
+    change_xid xid8 NOT NULL DEFAULT pg_current_xact_id(),
+    partid INTEGER NOT NULL,
+    internal_part_id VARCHAR(255),
+    manufacturer_part_number VARCHAR(255) NOT NULL,
+    deleted_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS component_deletions_change_xid_idx ON kicad_library.component_deletions (change_xid);
+
+CREATE OR REPLACE FUNCTION kicad_library.components_stamp_change() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := nextval('kicad_library.component_change_seq');
+    NEW.change_xid := pg_current_xact_id();
+    IF TG_OP = 'INSERT' THEN
+        NEW.created_xid := NEW.change_xid;
+    ELSE
+        NEW.created_xid := OLD.created_xid;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION kicad_library.components_record_deletion() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO kicad_library.component_deletions (change_seq, partid, internal_part_id, manufacturer_part_number)
+    VALUES (nextval('kicad_library.component_change_seq'), OLD.partid, OLD.internal_part_id, OLD.manufacturer_part_number);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS components_stamp_change ON kicad_library.components;
+CREATE TRIGGER components_stamp_change
+    BEFORE INSERT OR UPDATE ON kicad_library.components
+    FOR EACH ROW EXECUTE FUNCTION kicad_library.components_stamp_change();
+
+DROP TRIGGER IF EXISTS components_record_deletion ON kicad_library.components;
+CREATE TRIGGER components_record_deletion
+    AFTER DELETE ON kicad_library.components
+    FOR EACH ROW EXECUTE FUNCTION kicad_library.components_record_deletion();
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON kicad_library.component_deletions TO kicad_app;
+GRANT USAGE, SELECT ON kicad_library.component_change_seq TO kicad_app;
+
+
+-- Step 9: Structured Pricing and Stock per Supplier
+-- 'fetch' writes one row per price tier and one stock row per supplier offer, so
+-- 'kipipe cost' can load every tier of a BOM with a single indexed query instead
+-- of parsing parameters->>'price_breaks_usd' for each part.
+CREATE TABLE IF NOT EXISTS kicad_library.price_breaks (
+    manufacturer_part_number VARCHAR(255) NOT NULL
+        REFERENCES kicad_library.components(manufacturer_part_number) ON UPDATE CASCADE ON DELETE CASCADE,
+    supplier VARCHAR(100) NOT NULL,
+    min_quantity INTEGER NOT NULL CHECK (min_quantity > 0),
+    unit_price NUMERIC(14, 6) NOT NULL,
+    currency CHAR(3) NOT NULL DEFAULT 'USD',
+    lastupdated TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (manufacturer_part_number, supplier, min_quantity)
+);
+
+CREATE TABLE IF NOT EXISTS kicad_library.component_stock (
+    manufacturer_part_number VARCHAR(255) NOT NULL
+        REFERENCES kicad_library.components(manufacturer_part_number) ON UPDATE CASCADE ON DELETE CASCADE,
+    supplier VARCHAR(100) NOT NULL,
+    supplier_part_number VARCHAR(100),
+    quantity_available INTEGER,
+    lastupdated TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (manufacturer_part_number, supplier)
+);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON kicad_library.price_breaks, kicad_library.component_stock TO kicad_app;
+
+-- Backfill from the legacy "qty:price, qty:price" string of parts fetched before this step.
+INSERT INTO kicad_library.price_breaks (manufacturer_part_number, supplier, min_quantity, unit_price)
+SELECT c.manufacturer_part_number, COALESCE(c.supplier_1, 'Unknown'),
+       split_part(tier, ':', 1)::INTEGER, split_part(tier, ':', 2)::NUMERIC
+FROM kicad_library.components c,
+     regexp_split_to_table(c.parameters->>'price_breaks_usd', '\s*,\s*') AS tier
+WHERE tier ~ '^[1-9][0-9]*:[0-9]*\.?[0-9]+$'
+ON CONFLICT DO NOTHING;
+
+INSERT INTO kicad_library.component_stock (manufacturer_part_number, supplier, supplier_part_number, quantity_available)
+SELECT c.manufacturer_part_number, COALESCE(c.supplier_1, 'Unknown'), c.supplier_part_number_1,
+       (regexp_replace(c.parameters->>'availability', '[^0-9]', '', 'g'))::INTEGER
+FROM kicad_library.components c
+WHERE c.parameters->>'availability' ~ '[0-9]'
+ON CONFLICT DO NOTHING;
+
+
+-- Step 10: BOM Registry and Where-Used Index
+-- Every BOM file processed by 'fetch', 'add-symbol' or 'cost' is registered once per
+-- distinct content (file_hash); re-importing the same file only bumps last_used_at.
+-- bom_lines is deliberately not a foreign key to components: a BOM may list parts
+-- that have not been fetched yet, and 'bom-status' reports those.
+CREATE TABLE IF NOT EXISTS kicad_library.boms (
+    bom_id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    file_path TEXT,
+    file_hash CHAR(64) UNIQUE NOT NULL,
+    source VARCHAR(50),
+    line_count INTEGER NOT NULL DEFAULT 0,
+    imported_at TIMESTAMPTZ DEFAULT NOW(),
+    last_used_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS kicad_library.bom_lines (
+    bom_id INTEGER NOT NULL REFERENCES kicad_library.boms(bom_id) ON DELETE CASCADE,
+    manufacturer_part_number VARCHAR(255) NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 1,
+    reference_designators TEXT,
+    PRIMARY KEY (bom_id, manufacturer_part_number)
+);
+CREATE INDEX IF NOT EXISTS bom_lines_manufacturer_part_number_idx ON kicad_library.bom_lines (manufacturer_part_number);
+CREATE INDEX IF NOT EXISTS boms_last_used_at_idx ON kicad_library.boms (last_used_at);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON kicad_library.boms, kicad_library.bom_lines TO kicad_app;
+GRANT USAGE, SELECT ON kicad_library.boms_bom_id_seq TO kicad_app;
+
+
+-- Step 11: Work Queue for Distributed Fetch Workers
+-- 'kipipe enqueue' adds one row per part number; any number of 'kipipe worker'
+-- processes claim rows with FOR UPDATE SKIP LOCKED under a time-limited lease that
+-- they renew while working. A job whose lease expires (crashed worker) is claimed
+-- again; failures are retried with exponential backoff up to max_attempts.
+CREATE TABLE IF NOT EXISTS kicad_library.jobs (
+    job_id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL DEFAULT 'fetch',
+    payload TEXT NOT NULL,
+    bom_id INTEGER REFERENCES kicad_library.boms(bom_id) ON DELETE SET NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    lease_owner VARCHAR(255),
+    lease_expires_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    finished_at TIMESTAMPTZ
+);
+-- At most one open job per part, so enqueuing the same BOM twice does not duplicate work.
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_open_payload_idx ON kicad_library.jobs (kind, payload) WHERE status IN ('pending', 'running');
+CREATE INDEX IF NOT EXISTS jobs_pending_idx ON kicad_library.jobs (kind, run_after) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS jobs_lease_idx ON kicad_library.jobs (kind, lease_expires_at) WHERE status = 'running';
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON kicad_library.jobs TO kicad_app;
+GRANT USAGE, SELECT ON kicad_library.jobs_job_id_seq TO kicad_app;
+
+-- Step 12: Local Datasheet Mirror
+-- 'kipipe mirror-datasheets' downloads every components.datasheet_url into a
+-- content-addressed directory (files named by SHA-256, so shared datasheets are
+-- stored once) and records here where each URL's copy lives. ETag and
+-- Last-Modified drive conditional revalidation on later runs. Rows are keyed by
+-- URL; join on components.datasheet_url to find a part's local copy.
+CREATE TABLE IF NOT EXISTS kicad_library.datasheet_mirror (
+    url VARCHAR(512) PRIMARY KEY,
+    sha256 CHAR(64),
+    local_path TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    content_type VARCHAR(255),
+    size_bytes BIGINT,
+    status VARCHAR(20) NOT NULL DEFAULT 'ok' CHECK (status IN ('ok', 'failed')),
+    http_status INTEGER,
+    last_error TEXT,
+    fetched_at TIMESTAMPTZ,
+    checked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS datasheet_mirror_sha256_idx ON kicad_library.datasheet_mirror (sha256);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON kicad_library.datasheet_mirror TO kicad_app;
+
+-- Step 13: Incremental Symbol Import
+-- 'import-symbols' records every library file it imported. A file whose size and
+-- mtime are unchanged is skipped without being read, and one whose SHA-256 is
+-- unchanged is not parsed. For changed files, symbols.content_hash (a hash of the
+-- stored values) limits the writes to added, changed and removed symbols.
+ALTER TABLE kicad_library.symbols ADD COLUMN IF NOT EXISTS content_hash CHAR(40);
+CREATE INDEX IF NOT EXISTS symbols_library_nickname_idx ON kicad_library.symbols (library_nickname);
+
+CREATE TABLE IF NOT EXISTS kicad_library.symbol_library_files (
+    path TEXT PRIMARY KEY,
+    library_nickname VARCHAR(255) NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    content_sha256 CHAR(64) NOT NULL,
+    symbol_count INTEGER NOT NULL DEFAULT 0,
+    imported_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON kicad_library.symbol_library_files TO kicad_app;
+
+-- Step 14: Symbol Structure for Pre-filtered Matching
+-- 'import-symbols' records each symbol's pin count (distinct pin numbers over all
+-- units), unit count, power flag and 'extends' parent. 'fetch' stores the package
+-- pin count from the supplier parameters, so 'add-symbol' only prefix-compares
+-- symbols with a compatible pin count. Files imported by an older parser version
+-- are re-parsed on the next import to fill the new columns.
+ALTER TABLE kicad_library.symbols ADD COLUMN IF NOT EXISTS pin_count INTEGER;
+ALTER TABLE kicad_library.symbols ADD COLUMN IF NOT EXISTS unit_count INTEGER;
+ALTER TABLE kicad_library.symbols ADD COLUMN IF NOT EXISTS is_power BOOLEAN NOT NULL DEFAULT FALSE;
+ALTER TABLE kicad_library.symbols ADD COLUMN IF NOT EXISTS extends VARCHAR(255);
+CREATE INDEX IF NOT EXISTS symbols_pin_count_idx ON kicad_library.symbols (pin_count);
+
+ALTER TABLE kicad_library.symbol_library_files ADD COLUMN IF NOT EXISTS parser_version INTEGER NOT NULL DEFAULT 1;
+
+ALTER TABLE kicad_library.components ADD COLUMN IF NOT EXISTS pin_count INTEGER;
+-- Backfill from the package name of parts fetched before this step, e.g. '8-SOIC (0.154", 3.90mm Width)'.
+UPDATE kicad_library.components
+SET pin_count = substring(package_case FROM '^([0-9]+)-')::INTEGER
+WHERE pin_count IS NULL AND package_case ~ '^[0-9]+-';
+
+-- Step 15: Footprint Library Import
+-- 'import-footprints' fills 'footprints' from KiCad's <Lib>.pretty/<Name>.kicad_mod
+-- layout. Each row keeps the file it came from and its mtime, so a re-import only
+-- parses files that changed; footprints whose file is gone are deleted. Footprint
+-- names are unique per library only (KiCad links are 'Library:Footprint'), so the
+-- unique key moves from footprint_name to (library_nickname, footprint_name).
+ALTER TABLE kicad_library.footprints ADD COLUMN IF NOT EXISTS pad_count INTEGER;
+ALTER TABLE kicad_library.footprints ADD COLUMN IF NOT EXISTS attribute VARCHAR(20);
+ALTER TABLE kicad_library.footprints ADD COLUMN IF NOT EXISTS courtyard_x_min REAL;
+ALTER TABLE kicad_library.footprints ADD COLUMN IF NOT EXISTS courtyard_y_min REAL;
+ALTER TABLE kicad_library.footprints ADD COLUMN IF NOT EXISTS courtyard_x_max REAL;
+ALTER TABLE kicad_library.footprints ADD COLUMN IF NOT EXISTS courtyard_y_max REAL;
+ALTER TABLE kicad_library.footprints ADD COLUMN IF NOT EXISTS file_path TEXT;
+ALTER TABLE kicad_library.footprints ADD COLUMN IF NOT EXISTS mtime_ns BIGINT;
+ALTER TABLE kicad_library.footprints DROP CONSTRAINT IF EXISTS footprints_footprint_name_key;
+ALTER TABLE kicad_library.footprints DROP CONSTRAINT IF EXISTS footprints_library_nickname_footprint_name_key;
+ALTER TABLE kicad_library.footprints ADD CONSTRAINT footprints_library_nickname_footprint_name_key
+    UNIQUE (library_nickname, footprint_name);
+-- The unique index above leads with library_nickname and serves per-library reads.
+DROP INDEX IF EXISTS kicad_library.footprints_library_nickname_idx;
+CREATE INDEX IF NOT EXISTS footprints_pad_count_attribute_idx ON kicad_library.footprints (pad_count, attribute);
+CREATE INDEX IF NOT EXISTS footprints_courtyard_size_idx ON kicad_library.footprints
+    ((courtyard_x_max - courtyard_x_min), (courtyard_y_max - courtyard_y_min));
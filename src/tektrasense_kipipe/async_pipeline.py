@@ -0,0 +1,279 @@
+"""
+asyncio engine for 'fetch --async'.
+
+The synchronous path spends almost all of its time waiting on supplier APIs, one
+part at a time. This engine keeps many parts in flight on one event loop: an
+httpx.AsyncClient for the supplier calls and an asyncpg pool for the database,
+while the mapping of supplier records onto 'components' rows is the same
+ComponentProcessor code the synchronous path uses.
+
+Requires the optional dependencies: pip install 'TektraSense-KiPipe[async]'
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from . import config
+from .data_processor import ComponentProcessor
+from .db_manager import DatabaseManager, _upsert_query_for
+from .query_stats import query_stats
+
+try:
+    import httpx
+    import asyncpg
+except ImportError:  # pragma: no cover - exercised only without the 'async' extra
+    httpx = asyncpg = None
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 50
+INSTALL_HINT = "The async engine needs httpx and asyncpg: pip install 'TektraSense-KiPipe[async]'"
+
+def require_async_dependencies():
+    if httpx is None or asyncpg is None:
+        raise RuntimeError(INSTALL_HINT)
+
+class AsyncSupplierClient:
+    """Async counterparts of supplier_apis.call_digikey_api / call_mouser_api."""
+
+    def __init__(self, client: "httpx.AsyncClient"):
+        self.client = client
+        self._digikey_token: Optional[str] = None
+        self._digikey_token_expires = 0.0
+        self._token_lock = asyncio.Lock()
+
+    async def _get_digikey_token(self, client_id: str, client_secret: str) -> str:
+        # One token is shared by every in-flight request instead of one per part.
+        async with self._token_lock:
+            if self._digikey_token and time.monotonic() < self._digikey_token_expires:
+                return self._digikey_token
+            resp = await self.client.post(config.DIGIKEY_TOKEN_URL, data={
+                "client_id": client_id, "client_secret": client_secret, "grant_type": "client_credentials"})
+            resp.raise_for_status()
+            body = resp.json()
+            self._digikey_token = body["access_token"]
+            self._digikey_token_expires = time.monotonic() + float(body.get("expires_in", 600)) - 30
+            return self._digikey_token
+
+    async def digikey(self, part_number: str) -> Optional[Dict[str, Any]]:
+        client_id = os.getenv("DIGIKEY_CLIENT_ID")
+        client_secret = os.getenv("DIGIKEY_CLIENT_SECRET")
+        if not all([client_id, client_secret]):
+            log.error("DigiKey API credentials are not set.")
+            return None
+        try:
+            token = await self._get_digikey_token(client_id, client_secret)
+            headers = {"Authorization": f"Bearer {token}", "X-DIGIKEY-Client-Id": client_id, "Content-Type": "application/json",
+                       "X-DIGIKEY-Locale-Site": "US", "X-DIGIKEY-Locale-Language": "en"}
+            resp = await self.client.post(config.DIGIKEY_SEARCH_URL, headers=headers, json={"Keywords": part_number, "RecordCount": 1})
+            if resp.status_code == 404:
+                return None
+            resp.raise_for_status()
+            products = resp.json().get('Products')
+            return products[0] if products else None
+        except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+            log.error(f"DigiKey API call failed: {e}")
+            return None
+
+    async def mouser(self, part_number: str) -> Optional[Dict[str, Any]]:
+        api_key = os.getenv("MOUSER_API_KEY")
+        if not api_key:
+            log.error("Mouser API key is not set.")
+            return None
+        try:
+            resp = await self.client.post(f"{config.MOUSER_API_URL}?apiKey={api_key}", headers={'Content-Type': 'application/json'},
+                                          json={"SearchByKeywordRequest": {"keyword": part_number, "records": 1}})
+            resp.raise_for_status()
+            parts = resp.json().get('SearchResults', {}).get('Parts', [])
+            if parts and parts[0].get("ManufacturerPartNumber", "").upper() == part_number.upper():
+                return parts[0]
+            return None
+        except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+            log.error(f"Mouser API call failed: {e}")
+            return None
+
+class AsyncCatalogStore:
+    """The database side of a fetch, on an asyncpg pool, using DatabaseManager's statement texts."""
+
+    def __init__(self, pool: "asyncpg.Pool"):
+        self.pool = pool
+        self._category_ids: Dict[Tuple[str, str], Optional[int]] = {}
+        self._category_details: Dict[int, Optional[Dict[str, Any]]] = {}
+        self._prefix_locks: Dict[str, asyncio.Lock] = {}
+
+    @classmethod
+    async def create(cls, min_size: int = 2, max_size: int = 10) -> "AsyncCatalogStore":
+        load_dotenv()
+        pool = await asyncpg.create_pool(
+            host=os.getenv('DB_HOST'), port=os.getenv('DB_PORT'), database=os.getenv('DB_NAME'),
+            user=os.getenv('DB_USER'), password=os.getenv('DB_PASSWORD'), min_size=min_size, max_size=max_size,
+        )
+        return cls(pool)
+
+    async def close(self):
+        await self.pool.close()
+
+    async def _timed(self, method, sql: str, *params):
+        start = time.perf_counter()
+        try:
+            return await method(sql, *params)
+        finally:
+            query_stats.record(sql, time.perf_counter() - start)
+
+    async def get_category_id(self, supplier_name: str, supplier_category: str) -> Optional[int]:
+        # Mappings do not change during a run, so each distinct category is looked up once.
+        key = (supplier_name, supplier_category)
+        if key not in self._category_ids:
+            sql = DatabaseManager.PREPARED_STATEMENTS["kipipe_get_category_id"]
+            self._category_ids[key] = await self._timed(self.pool.fetchval, sql, supplier_name, supplier_category)
+        return self._category_ids[key]
+
+    async def get_category_details(self, category_id: int) -> Optional[Dict[str, Any]]:
+        if category_id not in self._category_details:
+            sql = DatabaseManager.PREPARED_STATEMENTS["kipipe_get_category_details"]
+            row = await self._timed(self.pool.fetchrow, sql, category_id)
+            self._category_details[category_id] = {"parent_id": row[0], "name": row[1], "prefix": row[2]} if row else None
+        return self._category_details[category_id]
+
+    async def add_unmapped_category(self, supplier_name: str, supplier_category: str):
+        await self._timed(self.pool.execute, """
+            INSERT INTO unmapped_categories (supplier_name, supplier_category) VALUES ($1, $2)
+            ON CONFLICT (supplier_category) DO NOTHING
+        """, supplier_name, supplier_category)
+
+    def prefix_lock(self, prefix: str) -> asyncio.Lock:
+        """Serializes id allocation and insert per prefix; 'next id' is derived from the stored maximum."""
+        return self._prefix_locks.setdefault(prefix, asyncio.Lock())
+
+    async def get_next_internal_part_id(self, prefix: str) -> str:
+        sql = DatabaseManager.PREPARED_STATEMENTS["kipipe_get_last_internal_part_id"]
+        last_id = await self._timed(self.pool.fetchval, sql, f"{prefix}-%")
+        next_seq = int(last_id.split('-')[-1]) + 1 if last_id else 1
+        return f"{prefix}-{next_seq:04d}"
+
+    async def store_part(self, part_data: Dict[str, Any], offers: Optional[List[Dict[str, Any]]]) -> bool:
+        """Upserts the component and its supplier offers in one transaction."""
+        columns = tuple(part_data.keys())
+        sql = _upsert_query_for("components", columns, "manufacturer_part_number", positional=True)
+        part_number = part_data["manufacturer_part_number"]
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await self._timed(conn.execute, sql, *(part_data[col] for col in columns))
+                    for offer in offers or []:
+                        await self._timed(conn.execute, "DELETE FROM price_breaks WHERE manufacturer_part_number = $1 AND supplier = $2",
+                                          part_number, offer["supplier"])
+                        if offer.get("price_breaks"):
+                            await conn.executemany(
+                                "INSERT INTO price_breaks (manufacturer_part_number, supplier, min_quantity, unit_price) "
+                                "VALUES ($1, $2, $3, $4) ON CONFLICT DO NOTHING",
+                                [(part_number, offer["supplier"], qty, price) for qty, price in offer["price_breaks"]])
+                        await self._timed(conn.execute, """
+                            INSERT INTO component_stock (manufacturer_part_number, supplier, supplier_part_number, quantity_available)
+                            VALUES ($1, $2, $3, $4)
+                            ON CONFLICT (manufacturer_part_number, supplier) DO UPDATE SET
+                                supplier_part_number = EXCLUDED.supplier_part_number,
+                                quantity_available = EXCLUDED.quantity_available,
+                                lastupdated = NOW()
+                        """, part_number, offer["supplier"], offer.get("supplier_part_number"), offer.get("quantity_available"))
+            log.info(f"Successfully upserted record into 'components' with PK: {part_number}")
+            return True
+        except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError, ValueError, TypeError) as error:
+            # InterfaceError covers asyncpg's client-side errors (a closed connection, an argument it cannot encode).
+            log.error(f"Database upsert error for PK '{part_number}' in table 'components': {error}")
+            return False
+
+class AsyncFetchPipeline:
+    """Fetches, transforms and stores parts with at most 'concurrency' parts in flight."""
+
+    def __init__(self, suppliers: AsyncSupplierClient, store: AsyncCatalogStore, concurrency: int = DEFAULT_CONCURRENCY):
+        self.suppliers = suppliers
+        self.store = store
+        self.concurrency = concurrency
+        self.processor = ComponentProcessor(None)
+
+    async def process_part(self, part_number: str) -> bool:
+        part_number = str(part_number).strip()
+        if not part_number or part_number.lower() == "part number":
+            return True
+        digikey_raw, mouser_raw = await asyncio.gather(self.suppliers.digikey(part_number), self.suppliers.mouser(part_number))
+        if not digikey_raw and not mouser_raw:
+            log.warning(f"Orchestrator: Part '{part_number}' not found on any supplier.")
+            return False
+
+        candidates = self.processor.category_candidates(digikey_raw, mouser_raw)
+        category_id = None
+        for supplier, supplier_category in candidates:
+            category_id = await self.store.get_category_id(supplier, supplier_category)
+            if category_id:
+                break
+        if not category_id:
+            log.warning(f"No valid category mapping found for '{part_number}'. Logging for review.")
+            for supplier, supplier_category in candidates:
+                await self.store.add_unmapped_category(supplier, supplier_category)
+            return False
+
+        category_details = await self.store.get_category_details(category_id)
+        if not category_details:
+            log.error(f"Could not find details for category_id {category_id}")
+            return False
+        parent_details = await self.store.get_category_details(category_details['parent_id']) if category_details.get('parent_id') else None
+        prefix = self.processor.internal_id_prefix(category_details, parent_details)
+
+        base_raw_data = digikey_raw if digikey_raw else mouser_raw
+        base_mapper = config.DIGIKEY_MAPPER if digikey_raw else config.MOUSER_MAPPER
+        async with self.store.prefix_lock(prefix):
+            internal_part_id = await self.store.get_next_internal_part_id(prefix)
+            try:
+                final_data = self.processor.format_part(base_raw_data, base_mapper, category_id, internal_part_id)
+                merged = self.processor.merge_suppliers(final_data, digikey_raw, mouser_raw)
+            except (KeyError, IndexError, TypeError, ValueError, AttributeError) as error:
+                log.error(f"Malformed supplier data for '{part_number}': {type(error).__name__}: {error}")
+                return False
+            stored = True
+            for part_data in merged:
+                offers = part_data.pop("supplier_offers", None)
+                stored = await self.store.store_part(part_data, offers) and stored
+        return stored
+
+    async def run(self, part_numbers: Iterable[str]) -> Tuple[int, int]:
+        """
+        Processes every part number with a fixed set of worker coroutines pulling
+        from one iterator, so memory grows with the concurrency, not the BOM size.
+        Returns (succeeded, failed).
+        """
+        iterator = iter(part_numbers)
+        succeeded = failed = 0
+
+        async def worker():
+            nonlocal succeeded, failed
+            for part_number in iterator:
+                try:
+                    ok = await self.process_part(part_number)
+                except Exception:
+                    log.exception(f"Unexpected error while processing '{part_number}'.")
+                    ok = False
+                if ok:
+                    succeeded += 1
+                else:
+                    failed += 1
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return succeeded, failed
+
+async def fetch_parts(part_numbers: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY) -> Tuple[int, int]:
+    """Runs a whole async fetch with its own HTTP client and database pool."""
+    require_async_dependencies()
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    store = await AsyncCatalogStore.create(max_size=max(2, min(concurrency, 20)))
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(30.0)) as client:
+            pipeline = AsyncFetchPipeline(AsyncSupplierClient(client), store, concurrency)
+            return await pipeline.run(part_numbers)
+    finally:
+        await store.close()
+
+def run_async_fetch(part_numbers: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY) -> Tuple[int, int]:
+    return asyncio.run(fetch_parts(part_numbers, concurrency))
@@ -0,0 +1,97 @@
+"""
+BOM file loading shared by the commands that work on a bill of materials.
+
+A BOM is read from CSV, Excel (.xlsx), ODS or plain text (one part number per
+line) into a DataFrame with one row per manufacturer part number:
+'manufacturer_part_number', 'quantity' (per board) and 'references'.
+BOMs are also registered in the 'boms'/'bom_lines' tables, keyed by the
+SHA-256 of the file content, to answer where-used queries.
+"""
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+BOM_COLUMNS = ["manufacturer_part_number", "quantity", "references"]
+
+# Header names recognised when no quantity/reference column is given (compared case-insensitively).
+QUANTITY_HEADERS = ("qty", "quantity", "qty per board", "count")
+REFERENCE_HEADERS = ("reference", "references", "ref", "refs", "designator", "designators", "ref des")
+
+def _detect_column(table: pd.DataFrame, headers) -> Optional[str]:
+    return next((column for column in table.columns if str(column).strip().lower() in headers), None)
+
+def read_bom_table(path: str) -> pd.DataFrame:
+    """Reads the raw BOM table, choosing the reader from the file extension."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    if suffix in (".xlsx", ".xls", ".ods"):
+        return pd.read_excel(path, engine="odf" if suffix == ".ods" else None, dtype=str).fillna("")
+    with open(path, 'r', encoding='utf-8') as f:
+        return pd.DataFrame({"part_number": [line.strip() for line in f]})
+
+def load_bom(path: str, part_column: str = "part_number", quantity_column: Optional[str] = None,
+             reference_column: Optional[str] = None) -> pd.DataFrame:
+    """
+    Loads a BOM and merges repeated part numbers. Quantity and reference columns
+    are detected from common header names when not given; without a quantity
+    column every row counts as one unit. Raises ValueError when a named column is missing.
+    """
+    table = read_bom_table(path)
+    if Path(path).suffix.lower() == ".txt":
+        part_column = "part_number"
+    quantity_column = quantity_column or _detect_column(table, QUANTITY_HEADERS)
+    reference_column = reference_column or _detect_column(table, REFERENCE_HEADERS)
+    for column in (part_column, quantity_column, reference_column):
+        if column and column not in table.columns:
+            raise ValueError(f"BOM file '{path}' has no column '{column}'.")
+
+    lines = pd.DataFrame({"manufacturer_part_number": table[part_column].astype(str).str.strip()})
+    if quantity_column:
+        lines["quantity"] = pd.to_numeric(table[quantity_column], errors="coerce").fillna(0).astype(int)
+    else:
+        lines["quantity"] = 1
+    lines["references"] = table[reference_column].astype(str).str.strip() if reference_column else ""
+
+    lines = lines[(lines["manufacturer_part_number"] != "") &
+                  (lines["manufacturer_part_number"].str.lower() != "part number")]
+    merged = lines.groupby("manufacturer_part_number", sort=False).agg(
+        quantity=("quantity", "sum"),
+        references=("references", lambda refs: ", ".join(ref for ref in refs if ref)),
+    ).reset_index()
+    return merged[BOM_COLUMNS]
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def register_bom_file(db_manager, path: str, part_column: str = "part_number", source: Optional[str] = None,
+                      quantity_column: Optional[str] = None) -> Optional[int]:
+    """
+    Records a BOM file in the where-used index. A file whose content was already
+    registered is not parsed again; its last_used_at is bumped instead. Failures
+    are logged and never interrupt the command that processed the BOM.
+    """
+    try:
+        file_hash = file_sha256(path)
+        bom_id = db_manager.touch_bom(file_hash)
+        if bom_id:
+            log.info(f"BOM '{path}' is already registered (bom_id {bom_id}).")
+            return bom_id
+        bom = load_bom(path, part_column, quantity_column)
+        lines = [(part_number, int(quantity), references or None)
+                 for part_number, quantity, references in bom.itertuples(index=False, name=None)]
+        bom_id = db_manager.insert_bom(Path(path).stem, str(Path(path).resolve()), file_hash, source, lines)
+        if bom_id:
+            log.info(f"Registered BOM '{path}' as bom_id {bom_id} ({len(lines)} lines).")
+        return bom_id
+    except (OSError, ValueError, TypeError) as error:
+        log.warning(f"Could not register BOM '{path}': {error}")
+        return None
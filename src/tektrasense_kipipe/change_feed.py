@@ -0,0 +1,78 @@
+"""
+Change feed of the components table.
+
+Every insert and update stamps the row with the next value of
+'component_change_seq' and with the id of the writing transaction; every delete
+leaves a tombstone in 'component_deletions' (see Step 8 of create_tables.sql).
+A feed read returns the changes made by transactions between the caller's resume
+token and the oldest transaction still running, ordered by change sequence, so
+consumers only touch what changed and never skip a change that commits late.
+"""
+import logging
+import re
+from typing import Any, Dict, Iterator, Optional, Tuple
+from .db_manager import DatabaseManager
+
+log = logging.getLogger(__name__)
+
+TOKEN_PREFIX = "kc1-"
+_TOKEN_RE = re.compile(rf'^{TOKEN_PREFIX}(\d+)$')
+
+# Every transaction below the bound has finished, so its changes are all visible.
+_BOUND_QUERY = "SELECT pg_snapshot_xmin(pg_current_snapshot())::text"
+
+_CHANGES_QUERY = """
+    SELECT change_seq,
+           CASE WHEN created_xid >= %(since)s::xid8 THEN 'insert' ELSE 'update' END,
+           partid, manufacturer_part_number,
+           to_jsonb(c) - 'change_seq' - 'change_xid' - 'created_xid'
+    FROM components c
+    WHERE change_xid >= %(since)s::xid8 AND change_xid < %(until)s::xid8
+"""
+
+_DELETIONS_QUERY = """
+    SELECT change_seq, 'delete', partid, manufacturer_part_number, NULL::jsonb
+    FROM component_deletions
+    WHERE change_xid >= %(since)s::xid8 AND change_xid < %(until)s::xid8
+"""
+
+def encode_token(xid: int) -> str:
+    return f"{TOKEN_PREFIX}{xid}"
+
+def decode_token(token: Optional[str]) -> int:
+    """Returns the transaction id a resume token starts from; no token means the beginning."""
+    if not token:
+        return 0
+    match = _TOKEN_RE.match(token.strip())
+    if not match:
+        raise ValueError(f"Invalid change feed token: '{token}'")
+    return int(match.group(1))
+
+def read_changes(db_manager: DatabaseManager, since: Optional[str] = None,
+                 batch_size: int = 1000) -> Tuple[Iterator[Dict[str, Any]], str]:
+    """
+    Returns (changes, next_token). 'changes' streams one dict per changed part:
+    {"seq", "op" ("insert" | "update" | "delete"), "partid", "manufacturer_part_number", "row"}
+    where 'row' is the current column values (None for deletes). A part changed
+    several times since the token appears once, with its latest state.
+    'next_token' resumes after these changes once the stream has been consumed.
+    Reading without a token returns the whole catalog as inserts and no deletions.
+    """
+    since_xid = decode_token(since)
+    bound = db_manager.fetch_all(_BOUND_QUERY, use_primary=True)
+    if not bound:
+        raise RuntimeError("Could not read the current transaction snapshot.")
+    until_xid = int(bound[0][0])
+
+    query = _CHANGES_QUERY
+    if since_xid:
+        query += " UNION ALL " + _DELETIONS_QUERY
+    query += " ORDER BY 1"
+    params = {"since": str(since_xid), "until": str(until_xid)}
+
+    def changes() -> Iterator[Dict[str, Any]]:
+        for rows in db_manager.stream_query(query, params, batch_size=batch_size, use_primary=True):
+            for seq, op, partid, part_number, row in rows:
+                yield {"seq": seq, "op": op, "partid": partid, "manufacturer_part_number": part_number, "row": row}
+
+    return changes(), encode_token(max(since_xid, until_xid))
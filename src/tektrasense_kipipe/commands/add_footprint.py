@@ -1,10 +1,7 @@
 import logging
 import sys
-import os
-import re
-from pathlib import Path
 from ..db_manager import DatabaseManager
-from .. import config
+from ..library_index import find_footprint, split_link
 
 log = logging.getLogger(__name__)
 
@@ -46,31 +43,13 @@ def run(args):
 
 def _verify_footprint_exists(footprint_link: str) -> (bool, str):
     """
-    Verifies if a footprint exists in the .kicad_mod files.
-    Returns (True, path_to_file) if found, otherwise (False, None).
+    Verifies that a footprint exists as '<LibraryNickname>.pretty/<FootprintName>.kicad_mod',
+    through the library index. Returns (True, path_to_file) if found, otherwise (False, None).
     """
-    try:
-        nickname, fp_name = footprint_link.split(':', 1)
-    except ValueError:
+    parts = split_link(footprint_link)
+    if not parts:
         log.error(f"Invalid footprint link format: '{footprint_link}'. Expected 'LibraryNickname:FootprintName'.")
         return False, None
 
-    # We expect the library nickname to correspond to a .kicad_mod file name
-    # e.g., nickname 'Resistor_SMD' -> file 'Resistor_SMD.kicad_mod'
-    library_filename = f"{nickname}.kicad_mod"
-
-    for base_path in config.FOOTPRINT_SEARCH_PATHS:
-        for root, dirs, files in os.walk(base_path):
-            if library_filename in files:
-                file_path = Path(root) / library_filename
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        # Search for '(footprint "FootprintName"'
-                        if re.search(fr'\(footprint\s+"{re.escape(fp_name)}"', content):
-                            return True, str(file_path)
-                except Exception as e:
-                    log.error(f"Could not read or parse file {file_path}: {e}")
-                    return False, None
-    
-    return False, None
\ No newline at end of file
+    entry = find_footprint(*parts)
+    return (True, entry.path) if entry else (False, None)
@@ -1,12 +1,12 @@
 import logging
 import sys
-import os
-import re
 import csv
 import pandas as pd
-from pathlib import Path
 from ..db_manager import DatabaseManager
-from .. import config
+from ..bom import register_bom_file
+from ..run_journal import RunJournal, parse_deadline, run_parts
+from ..library_index import find_symbol, split_link
+from ..symbol_matcher import SymbolMatcher
 
 log = logging.getLogger(__name__)
 
@@ -20,6 +20,8 @@ def setup_args(parser):
     
     parser.add_argument("--col-part", default="Part Number", help="Column name for part numbers in a file. Default: 'Part Number'")
     parser.add_argument("--force", action="store_true", help="Force overwrite if a symbol already exists.")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Continue a bulk run from its journal: skip parts already linked, retry the rest.")
+    parser.add_argument("--deadline", help="Stop a bulk run cleanly once this much time has passed, e.g. 90s, 45m, 2h.")
 
 def run(args):
     """Main logic for the 'add-symbol' command."""
@@ -27,96 +29,80 @@ def run(args):
     if not db_manager.connection_pool:
         sys.exit(1)
 
-    part_numbers = []
     if args.part_number:
-        part_numbers.append(args.part_number)
+        _find_and_link_symbol(args.part_number, args.force, db_manager, is_interactive=True)
     else: # Bulk modes
+        input_path = args.csv or args.spreadsheet or args.txt
+        try:
+            deadline = parse_deadline(args.deadline) if args.deadline else None
+            journal = RunJournal.resume(args.resume, "add-symbol", input_path) if args.resume else RunJournal.create("add-symbol", input_path)
+        except (OSError, ValueError) as e:
+            log.critical(str(e))
+            sys.exit(1)
         part_numbers = _load_parts_from_file(args.csv, args.spreadsheet, args.txt, args.col_part)
-
-    for pn in part_numbers:
-        is_interactive_mode = bool(args.part_number)
-        _find_and_link_symbol(pn, args.force, db_manager, is_interactive=is_interactive_mode)
+        register_bom_file(db_manager, input_path, args.col_part, source="add-symbol")
+        matcher = SymbolMatcher.load(db_manager)  # once for the whole BOM
+        status = run_parts(part_numbers, lambda pn: _find_and_link_symbol(pn, args.force, db_manager, is_interactive=False, matcher=matcher), journal, deadline)
+        if status == "interrupted":
+            sys.exit(130)
 
     log.info("Add symbol process complete.")
 
 def _verify_symbol_exists(symbol_link: str) -> bool:
     """
-    Verifies if a symbol exists within its corresponding .kicad_sym file.
+    Verifies that a symbol exists in its library file, through the library index.
     """
-    try:
-        nickname, symbol_name = symbol_link.split(':', 1)
-    except ValueError:
+    parts = split_link(symbol_link)
+    if not parts:
         log.error(f"Invalid symbol link format: '{symbol_link}'.")
         return False
 
-    library_filename = f"{nickname}.kicad_sym"
-
-    for base_path in config.SYMBOL_SEARCH_PATHS:
-        for root, dirs, files in os.walk(base_path):
-            if library_filename in files:
-                file_path = Path(root) / library_filename
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        # Search for '(symbol "SymbolName"'
-                        if re.search(fr'\(symbol\s+"{re.escape(symbol_name)}"', content):
-                            log.info(f"Validation PASSED: Found symbol '{symbol_link}' in file '{file_path}'.")
-                            return True
-                except Exception as e:
-                    log.error(f"Could not read or parse file {file_path}: {e}")
-                    return False
-    
-    log.warning(f"Validation FAILED: Library file '{library_filename}' not found for symbol link '{symbol_link}'.")
+    entry = find_symbol(*parts)
+    if entry:
+        log.info(f"Validation PASSED: Found symbol '{symbol_link}' in file '{entry.path}'.")
+        return True
+    log.warning(f"Validation FAILED: Symbol '{symbol_link}' not found in any library under the symbol search paths.")
     return False
 
-def _find_and_link_symbol(part_number: str, force: bool, db_manager: DatabaseManager, is_interactive: bool):
+def _find_and_link_symbol(part_number: str, force: bool, db_manager: DatabaseManager, is_interactive: bool,
+                          matcher: SymbolMatcher = None) -> bool:
+    """
+    Finds and links a symbol for one part. Returns True when the part ends up with a symbol.
+    Bulk runs pass one 'matcher' for all parts; without it the symbols are loaded for this part.
+    """
     part_number = str(part_number).strip()
-    if not part_number: return
+    if not part_number: return True
 
     component_info = db_manager.get_component_symbol_info(part_number)
     if not component_info:
         log.error(f"Part '{part_number}' not found in DB. Please run 'fetch' first.")
-        return
+        return False
 
     description, existing_symbol = component_info
     if existing_symbol and not force:
         log.warning(f"Part '{part_number}' already has symbol '{existing_symbol}'. Use --force to overwrite.")
-        return
+        return True
 
     log.info(f"Searching for best symbol match for '{part_number}'...")
     
-    all_symbols_raw = db_manager.fetch_all("SELECT library_nickname, symbol_name FROM symbols")
-    if not all_symbols_raw:
+    if matcher is None:
+        matcher = SymbolMatcher.load(db_manager)
+    if not len(matcher):
         log.warning("The 'symbols' table is empty. Please import symbols first.")
-        return
+        return False
 
-    best_match_len = 0
     found_symbols = []
-
-    for nickname, symbol_name in all_symbols_raw:
-        clean_s_name = re.sub(r'^[A-Z]+_', '', symbol_name)
-        clean_s_name = re.sub(r'_[A-Z]$', '', clean_s_name)
-        clean_s_name = clean_s_name.replace('x', '').replace('X', '')
-
-        common_prefix_len = 0
-        for i in range(min(len(clean_s_name), len(part_number))):
-            if clean_s_name[i] == part_number[i]:
-                common_prefix_len += 1
-            else:
-                break
-        
-        if common_prefix_len < 5:
-            continue
-
-        if common_prefix_len > best_match_len:
-            best_match_len = common_prefix_len
-            found_symbols = [{"nickname": nickname, "symbol": symbol_name}]
-        elif common_prefix_len == best_match_len:
-            found_symbols.append({"nickname": nickname, "symbol": symbol_name})
+    pin_count = db_manager.get_component_pin_count(part_number)
+    if isinstance(pin_count, int):
+        found_symbols, best_match_len = matcher.for_pin_count(pin_count).best_matches(part_number)
+        if not found_symbols:
+            log.info(f"No symbol with {pin_count} pins matches '{part_number}'; searching all symbols.")
+    if not found_symbols:
+        found_symbols, best_match_len = matcher.best_matches(part_number)
 
     if not found_symbols:
         log.warning(f"No potential symbols found in the database for '{part_number}'.")
-        return
+        return False
 
     chosen_link = None
     if len(found_symbols) == 1 and not is_interactive:
@@ -133,7 +119,7 @@ def _find_and_link_symbol(part_number: str, force: bool, db_manager: DatabaseMan
             try:
                 choice = input(f"  Please choose the correct symbol (1-{len(found_symbols)}), or 'q' to quit: ").strip().lower()
                 if choice == 'q':
-                    print("  Skipping part number."); return
+                    print("  Skipping part number."); return False
                 choice_index = int(choice) - 1
                 if 0 <= choice_index < len(found_symbols):
                     chosen_symbol = found_symbols[choice_index]
@@ -143,20 +129,21 @@ def _find_and_link_symbol(part_number: str, force: bool, db_manager: DatabaseMan
             except ValueError: print("  Invalid input.")
     else:
         log.warning(f"Ambiguous symbol for '{part_number}'. Found {len(found_symbols)} matches. Please resolve manually with '-p {part_number}'.")
-        return
+        return False
 
     if chosen_link:
         # --- Final Validation Step ---
         if _verify_symbol_exists(chosen_link):
-            _update_symbol_in_db(part_number, chosen_link, db_manager)
-        else:
-            log.error(f"Final check failed. The selected symbol '{chosen_link}' does not seem to exist in the library files.")
+            return _update_symbol_in_db(part_number, chosen_link, db_manager)
+        log.error(f"Final check failed. The selected symbol '{chosen_link}' does not seem to exist in the library files.")
+    return False
 
 
 def _update_symbol_in_db(part_number, link_string, db_manager):
-    update_query = "UPDATE components SET kicad_symbol = %s WHERE manufacturer_part_number = %s"
-    if db_manager.execute_query(update_query, (link_string, part_number)):
+    if db_manager.update_component_link(part_number, "kicad_symbol", link_string):
         log.info(f"Successfully linked symbol '{link_string}' to part '{part_number}'.")
+        return True
+    return False
 
 def _load_parts_from_file(csv_path, spreadsheet_path, txt_path, col_part):
     try:
@@ -0,0 +1,80 @@
+import logging
+import sys
+from ..db_manager import DatabaseManager
+from .where_used import ACTIVE_STATUSES
+
+log = logging.getLogger(__name__)
+
+SUMMARY_QUERY = """
+    SELECT b.bom_id, b.name, b.last_used_at, COUNT(*) AS lines,
+           COUNT(*) FILTER (WHERE c.partid IS NULL) AS not_fetched,
+           COUNT(*) FILTER (WHERE c.partid IS NOT NULL AND c.kicad_symbol IS NULL) AS no_symbol,
+           COUNT(*) FILTER (WHERE c.partid IS NOT NULL AND c.kicad_footprint IS NULL) AS no_footprint,
+           COUNT(*) FILTER (WHERE c.product_status <> ALL(%s)) AS not_active
+    FROM boms b
+    JOIN bom_lines l ON l.bom_id = b.bom_id
+    LEFT JOIN components c ON c.manufacturer_part_number = l.manufacturer_part_number
+    GROUP BY b.bom_id
+    ORDER BY b.last_used_at DESC
+"""
+
+LINES_QUERY = """
+    SELECT l.manufacturer_part_number, l.quantity, l.reference_designators,
+           c.partid IS NOT NULL, c.kicad_symbol, c.kicad_footprint, c.product_status
+    FROM bom_lines l
+    LEFT JOIN components c ON c.manufacturer_part_number = l.manufacturer_part_number
+    WHERE l.bom_id = %s
+    ORDER BY l.manufacturer_part_number
+"""
+
+def setup_args(parser):
+    """Sets up arguments for the 'bom-status' command."""
+    parser.add_argument("--bom-id", type=int, help="Show every line of one BOM instead of the per-BOM summary.")
+    parser.add_argument("--problems-only", action="store_true", help="With --bom-id, only list lines that need attention.")
+
+def run(args):
+    """Main logic for the 'bom-status' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    if args.bom_id is not None:
+        _print_lines(db_manager.fetch_all(LINES_QUERY, (args.bom_id,)), args.bom_id, args.problems_only)
+    else:
+        _print_summary(db_manager.fetch_all(SUMMARY_QUERY, (list(ACTIVE_STATUSES),)))
+
+def _line_problems(fetched, symbol, footprint, status):
+    if not fetched:
+        return ["not fetched"]
+    problems = []
+    if not symbol:
+        problems.append("no symbol")
+    if not footprint:
+        problems.append("no footprint")
+    if status and status not in ACTIVE_STATUSES:
+        problems.append(status)
+    return problems
+
+def _print_summary(rows):
+    if not rows:
+        print("\nNo BOMs registered yet. BOM files are registered by 'fetch', 'add-symbol' and 'cost'.")
+        return
+    print(f"\n{'id':>5}  {'name':<30} {'lines':>6} {'unfetched':>9} {'no sym':>7} {'no fp':>6} {'!active':>7}  last used")
+    for bom_id, name, last_used_at, lines, not_fetched, no_symbol, no_footprint, not_active in rows:
+        used = last_used_at.strftime('%Y-%m-%d') if last_used_at else "-"
+        print(f"{bom_id:>5}  {name[:30]:<30} {lines:>6} {not_fetched:>9} {no_symbol:>7} {no_footprint:>6} {not_active:>7}  {used}")
+
+def _print_lines(rows, bom_id, problems_only):
+    if not rows:
+        print(f"\nBOM {bom_id} not found or has no lines.")
+        return
+    print(f"\n--- BOM {bom_id}: {len(rows)} lines ---")
+    ready = 0
+    for part_number, quantity, references, fetched, symbol, footprint, status in rows:
+        problems = _line_problems(fetched, symbol, footprint, status)
+        if not problems:
+            ready += 1
+            if problems_only:
+                continue
+        print(f"  {part_number:<30} x{quantity:<4} {'OK' if not problems else ', '.join(problems):<30} {references or ''}")
+    print(f"\n{ready}/{len(rows)} lines are ready for KiCad.")
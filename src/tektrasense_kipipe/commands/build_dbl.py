@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Any
+from ..db_manager import DatabaseManager
+
+log = logging.getLogger(__name__)
+
+# Component columns exposed as KiCad fields: (column, field name, visible_on_add, visible_in_chooser)
+DBL_FIELDS = [
+    ("component_value", "Value", True, True),
+    ("manufacturer_part_number", "MPN", False, True),
+    ("manufacturer", "Manufacturer", False, True),
+    ("datasheet_url", "Datasheet", False, False),
+    ("package_case", "Package", False, True),
+    ("mounting_type", "Mounting Type", False, False),
+    ("operating_temperature", "Operating Temperature", False, False),
+    ("product_status", "Status", False, True),
+    ("rohs_status", "RoHS", False, False),
+    ("supplier_1", "Supplier 1", False, False),
+    ("supplier_part_number_1", "Supplier 1 PN", False, False),
+    ("supplier_2", "Supplier 2", False, False),
+    ("supplier_part_number_2", "Supplier 2 PN", False, False),
+]
+
+def setup_args(parser):
+    """Sets up arguments for the 'build-dbl' command."""
+    parser.add_argument("-o", "--output", default="TektraSense.kicad_dbl", help="Path of the .kicad_dbl file to write. Default: TektraSense.kicad_dbl")
+    parser.add_argument("--dsn", default=os.getenv("KICAD_ODBC_DSN", "kicad_components"), help="ODBC data source name KiCad connects through. Default: $KICAD_ODBC_DSN or 'kicad_components'")
+    parser.add_argument("--name", default="TektraSense Database Library", help="Library name shown in KiCad.")
+    parser.add_argument("--plain-views", action="store_true", help="Create regular views instead of materialized views.")
+    parser.add_argument("--include-empty", action="store_true", help="Also list categories that have no components yet in the .kicad_dbl.")
+    parser.add_argument("--refresh-only", action="store_true", help="Only refresh the existing materialized views, then exit.")
+
+def run(args):
+    """Main logic for the 'build-dbl' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    if args.refresh_only:
+        db_manager.refresh_category_views()
+        return
+
+    categories = db_manager.fetch_all(
+        """
+        SELECT cat.category_id, cat.category_name, COUNT(comp.partid)
+        FROM categories cat
+        LEFT JOIN components comp ON comp.category_id = cat.category_id
+        GROUP BY cat.category_id, cat.category_name
+        ORDER BY cat.category_name
+        """,
+        use_primary=True,
+    )
+    if not categories:
+        log.error("No categories found. Please run the database setup script first.")
+        return
+
+    materialized = not args.plain_views
+    libraries = []
+    for category_id, category_name, part_count in categories:
+        view_name = category_view_name(category_id, category_name)
+        if not db_manager.create_category_view(view_name, category_id, materialized=materialized):
+            continue
+        if part_count or args.include_empty:
+            libraries.append(_library_entry(category_name, view_name))
+
+    kind = "materialized views" if materialized else "views"
+    log.info(f"Built {len(categories)} category {kind}; {len(libraries)} listed in the database library.")
+
+    dbl = _build_dbl(args.name, args.dsn, libraries)
+    Path(args.output).write_text(json.dumps(dbl, indent=4) + "\n", encoding="utf-8")
+    log.info(f"Wrote KiCad database library file '{args.output}'.")
+
+def category_view_name(category_id: int, category_name: str) -> str:
+    """Builds a stable, identifier-safe view name, e.g. 'dbl_47_resistors'."""
+    slug = re.sub(r'[^a-z0-9]+', '_', category_name.lower()).strip('_')
+    return f"dbl_{category_id}_{slug}"[:63].rstrip('_')
+
+def _library_entry(category_name: str, view_name: str) -> Dict[str, Any]:
+    return {
+        "name": category_name,
+        "table": view_name,
+        "key": "internal_part_id",
+        "symbols": "kicad_symbol",
+        "footprints": "kicad_footprint",
+        "fields": [
+            {
+                "column": column,
+                "name": name,
+                "visible_on_add": on_add,
+                "visible_in_chooser": in_chooser,
+                "show_name": name != "Value",
+                "inherit_properties": True,
+            }
+            for column, name, on_add, in_chooser in DBL_FIELDS
+        ],
+        "properties": {
+            "description": "description",
+            "keywords": "manufacturer_part_number",
+        },
+    }
+
+def _build_dbl(name: str, dsn: str, libraries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "meta": {"version": 0},
+        "name": name,
+        "description": "Generated by 'kipipe build-dbl'. One library per component category.",
+        "source": {
+            "type": "odbc",
+            "dsn": dsn,
+            "username": "",
+            "password": "",
+            "timeout_seconds": 2,
+            "connection_string": "",
+        },
+        "libraries": libraries,
+    }
@@ -0,0 +1,52 @@
+import json
+import logging
+import os
+import sys
+from ..db_manager import DatabaseManager
+from ..change_feed import read_changes
+
+log = logging.getLogger(__name__)
+
+def setup_args(parser):
+    """Sets up arguments for the 'changes' command."""
+    parser.add_argument("--since", help="Resume token from a previous run. Omit to start with the whole catalog.")
+    parser.add_argument("--token-file", help="Read the resume token from this file (unless --since is given) and store the new one there after a successful run.")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file. Default: stdout")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows fetched per batch. Default: 1000")
+
+def run(args):
+    """Main logic for the 'changes' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    since = args.since
+    if since is None and args.token_file and os.path.exists(args.token_file):
+        with open(args.token_file, 'r', encoding='utf-8') as f:
+            since = f.read().strip()
+
+    try:
+        changes, next_token = read_changes(db_manager, since, batch_size=args.batch_size)
+    except ValueError as error:
+        log.error(error)
+        sys.exit(1)
+
+    out = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+    count = 0
+    try:
+        for change in changes:
+            out.write(json.dumps(change, default=str) + "\n")
+            count += 1
+        out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    # The token is only persisted once every change has been written out.
+    if args.token_file:
+        tmp_path = f"{args.token_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(next_token + "\n")
+        os.replace(tmp_path, args.token_file)
+
+    log.info(f"{count} changes written. Resume token: {next_token}")
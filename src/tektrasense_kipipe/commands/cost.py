@@ -0,0 +1,87 @@
+import logging
+import sys
+import time
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from ..db_manager import DatabaseManager
+from ..bom import load_bom, register_bom_file
+
+log = logging.getLogger(__name__)
+
+TIER_COLUMNS = ["manufacturer_part_number", "supplier", "min_quantity", "unit_price", "quantity_available"]
+
+def setup_args(parser):
+    """Sets up arguments for the 'cost' command."""
+    parser.add_argument("--bom", required=True, help="BOM file (CSV, .xlsx, .ods or .txt with one part number per line).")
+    parser.add_argument("--column", default="part_number", help="Part number column. Default: part_number")
+    parser.add_argument("--qty-column", help="Per-board quantity column. Default: a 'Qty'/'Quantity' column if present, else each row counts as one.")
+    parser.add_argument("--qty", type=int, default=1, help="Number of boards to cost. Default: 1")
+    parser.add_argument("--supplier", action="append", help="Only consider these suppliers (repeatable).")
+    parser.add_argument("-o", "--output", help="Also write the per-line costing to this CSV file.")
+
+def run(args):
+    """Main logic for the 'cost' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        lines = load_bom(args.bom, args.column, args.qty_column)
+    except (OSError, ValueError) as error:
+        log.error(f"Could not read BOM: {error}")
+        sys.exit(1)
+
+    register_bom_file(db_manager, args.bom, args.column, source="cost", quantity_column=args.qty_column)
+
+    # A BOM is usually costed right after 'fetch' stored its prices, which a lagging replica may not have yet.
+    with db_manager.read_your_writes():
+        tiers = pd.DataFrame(db_manager.get_price_tiers(lines["manufacturer_part_number"].tolist()), columns=TIER_COLUMNS)
+    costed = compute_costs(lines, tiers, args.qty, args.supplier)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    _print_costing(costed, args.qty)
+    if args.output:
+        costed.to_csv(args.output, index=False)
+        log.info(f"Costing written to '{args.output}'.")
+    log.info(f"Costed {len(costed)} BOM lines in {elapsed_ms:.1f} ms.")
+
+def compute_costs(lines: pd.DataFrame, tiers: pd.DataFrame, boards: int,
+                  suppliers: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Picks the cheapest tier for every BOM line across all suppliers, vectorized over
+    every (line, tier) pair. A tier whose minimum is above the needed quantity is
+    still considered at its minimum order quantity, since buying up to a price
+    break can cost less. Lines without any price get NaN costs.
+    """
+    lines = lines.assign(needed=lines["quantity"] * boards)
+    if suppliers:
+        tiers = tiers[tiers["supplier"].isin(suppliers)]
+
+    candidates = lines[["manufacturer_part_number", "needed"]].merge(tiers, on="manufacturer_part_number")
+    candidates["buy_quantity"] = np.maximum(candidates["needed"].to_numpy(), candidates["min_quantity"].to_numpy())
+    candidates["extended_cost"] = candidates["buy_quantity"] * candidates["unit_price"]
+    best = candidates.loc[candidates.groupby("manufacturer_part_number")["extended_cost"].idxmin()] if len(candidates) else candidates
+
+    costed = lines.merge(
+        best[["manufacturer_part_number", "supplier", "min_quantity", "unit_price", "buy_quantity", "extended_cost", "quantity_available"]],
+        on="manufacturer_part_number", how="left",
+    )
+    costed["in_stock"] = costed["quantity_available"].ge(costed["buy_quantity"]) & costed["buy_quantity"].notna()
+    return costed
+
+def _print_costing(costed: pd.DataFrame, boards: int):
+    print(f"\n--- BOM cost for {boards} board(s) ---")
+    for row in costed.itertuples(index=False):
+        if pd.isna(row.extended_cost):
+            print(f"  {row.manufacturer_part_number:<30} x{row.needed:<7} no price data")
+            continue
+        stock_note = "" if row.in_stock else "  (insufficient stock)"
+        print(f"  {row.manufacturer_part_number:<30} x{row.needed:<7} {row.supplier:<8} "
+              f"buy {int(row.buy_quantity):<7} @ {row.unit_price:.4f} = {row.extended_cost:10.2f}{stock_note}")
+    total = costed["extended_cost"].sum()
+    missing = int(costed["extended_cost"].isna().sum())
+    print(f"\nTotal: {total:.2f} USD ({total / boards:.4f} per board)")
+    if missing:
+        print(f"{missing} line(s) have no price data; run 'kipipe fetch' for them first.")
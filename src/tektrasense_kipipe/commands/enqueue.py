@@ -0,0 +1,38 @@
+import logging
+import sys
+from ..db_manager import DatabaseManager
+from ..bom import load_bom, register_bom_file
+from ..job_queue import JobQueue, DEFAULT_MAX_ATTEMPTS
+
+log = logging.getLogger(__name__)
+
+def setup_args(parser):
+    """Sets up arguments for the 'enqueue' command."""
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("-p", "--part-number", nargs="+", help="One or more manufacturer part numbers to queue.")
+    group.add_argument("--bom", help="BOM file (CSV, .xlsx, .ods or .txt) whose part numbers are queued.")
+    parser.add_argument("--column", default="part_number", help="Part number column of the BOM. Default: part_number")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help=f"Attempts per part before it is marked failed. Default: {DEFAULT_MAX_ATTEMPTS}")
+
+def run(args):
+    """Main logic for the 'enqueue' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    bom_id = None
+    if args.bom:
+        try:
+            part_numbers = load_bom(args.bom, args.column)["manufacturer_part_number"].tolist()
+        except (OSError, ValueError) as error:
+            log.error(f"Could not read BOM: {error}")
+            sys.exit(1)
+        bom_id = register_bom_file(db_manager, args.bom, args.column, source="enqueue")
+    else:
+        part_numbers = args.part_number
+
+    queue = JobQueue(db_manager)
+    added = queue.enqueue(part_numbers, bom_id=bom_id, max_attempts=args.max_attempts)
+    log.info(f"Queued {added} of {len(part_numbers)} part numbers ({len(part_numbers) - added} already queued).")
+    counts = queue.counts()
+    print("Queue: " + ", ".join(f"{status} {counts.get(status, 0)}" for status in ("pending", "running", "done", "failed")))
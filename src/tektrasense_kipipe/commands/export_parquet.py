@@ -0,0 +1,190 @@
+import hashlib
+import json
+import logging
+import re
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+import pyarrow as pa
+import pyarrow.dataset as ds
+from ..db_manager import DatabaseManager
+
+log = logging.getLogger(__name__)
+
+# Tables exchanged as Parquet, in import order (parents before the rows that reference them).
+# 'conflict' is the natural key used to upsert on import; 'serial' ids are not carried over.
+PARQUET_TABLES = {
+    "category_mappings": {"conflict": ("supplier_name", "supplier_category"), "serial": "mapping_id"},
+    "components": {"conflict": ("manufacturer_part_number",), "serial": "partid", "partition": "category_id"},
+    "symbols": {"conflict": ("symbol_name",), "serial": "symbol_id"},
+    "footprints": {"conflict": ("library_nickname", "footprint_name"), "serial": "footprint_id"},
+    "footprint_mappings": {"conflict": ("manufacturer_part_number", "footprint_link"), "serial": "mapping_id"},
+}
+
+# Flattened 'parameters' keys become 'param_<key>' columns. The original key is kept in field
+# metadata, and the column -> key map of the whole table in the schema metadata.
+PARAM_PREFIX = "param_"
+PARAM_KEY_METADATA = b"jsonb_key"
+PARAM_KEYS_METADATA = b"kipipe_param_keys"
+
+_JSONB_TYPES = {"number": pa.float64(), "boolean": pa.bool_(), "string": pa.string()}
+
+def setup_args(parser):
+    """Sets up arguments for the 'export-parquet' command."""
+    parser.add_argument("-o", "--output-dir", default="kipipe_parquet", help="Directory to write one Parquet dataset per table into. Default: kipipe_parquet")
+    parser.add_argument("--tables", nargs="+", choices=list(PARQUET_TABLES), default=list(PARQUET_TABLES), help="Tables to export. Default: all")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Rows per record batch. Default: 50000")
+
+def run(args):
+    """Main logic for the 'export-parquet' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for table_name in args.tables:
+        rows = export_table(db_manager, table_name, output_dir / table_name, args.batch_size)
+        log.info(f"Exported {rows} rows from '{table_name}' to '{output_dir / table_name}'.")
+
+def arrow_type(pg_type: str) -> pa.DataType:
+    """Maps a Postgres information_schema data_type to the Arrow type it is exported as."""
+    if pg_type in ("integer", "smallint"):
+        return pa.int32()
+    if pg_type == "bigint":
+        return pa.int64()
+    if pg_type in ("numeric", "real", "double precision"):
+        return pa.float64()
+    if pg_type == "boolean":
+        return pa.bool_()
+    if pg_type == "timestamp with time zone":
+        return pa.timestamp("us", tz="UTC")
+    if pg_type == "timestamp without time zone":
+        return pa.timestamp("us")
+    if pg_type == "date":
+        return pa.date32()
+    return pa.string()
+
+def _param_column(key: str) -> str:
+    return PARAM_PREFIX + re.sub(r'[^0-9a-z]+', '_', key.lower()).strip('_')
+
+def _param_columns(keys: List[str]) -> Dict[str, str]:
+    """
+    Key -> column name. Keys that normalize to the same name ('Voltage - Rated',
+    'Voltage Rated') keep it for the first key in sorted order; the others get a
+    suffix derived from the key itself, so the name does not depend on which
+    other keys exist.
+    """
+    columns: Dict[str, str] = {}
+    taken = set()
+    for key in sorted(keys):
+        column = _param_column(key)
+        if column in taken:
+            column = f"{column}_{hashlib.sha1(key.encode()).hexdigest()[:8]}"
+            log.warning(f"Parameter '{key}' collides with another key after normalization; exported as '{column}'.")
+        taken.add(column)
+        columns[key] = column
+    return columns
+
+def _parameter_fields(db_manager: DatabaseManager) -> List[pa.Field]:
+    """Derives one typed column per 'parameters' key; keys seen with mixed JSON types become strings."""
+    rows = db_manager.fetch_all("""
+        SELECT kv.key, array_agg(DISTINCT jsonb_typeof(kv.value)),
+               bool_and(jsonb_typeof(kv.value) <> 'number' OR kv.value::text ~ '^-?[0-9]+$')
+        FROM components, jsonb_each(components.parameters) AS kv
+        WHERE jsonb_typeof(components.parameters) = 'object'
+        GROUP BY kv.key
+        ORDER BY kv.key
+    """)
+    fields = []
+    columns = _param_columns([row[0] for row in rows])
+    for key, json_types, all_integral in rows:
+        json_types = set(json_types) - {"null"}
+        data_type = _JSONB_TYPES.get(json_types.pop(), pa.string()) if len(json_types) == 1 else pa.string()
+        if pa.types.is_floating(data_type) and all_integral:
+            data_type = pa.int64()
+        fields.append(pa.field(columns[key], data_type, metadata={PARAM_KEY_METADATA: key.encode()}))
+    return fields
+
+def _coerce(value: Any, data_type: pa.DataType) -> Any:
+    """Converts a psycopg2/JSON value into something Arrow accepts for the target column type."""
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        return float(value)
+    if pa.types.is_string(data_type):
+        if isinstance(value, (dict, list, bool)):
+            return json.dumps(value)
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return str(value)
+    if pa.types.is_floating(data_type) and isinstance(value, (int, float)):
+        return float(value)
+    if pa.types.is_integer(data_type) and isinstance(value, float):
+        return int(value)
+    return value
+
+def _record_batches(db_manager, query, columns, param_fields, schema, batch_size) -> Iterator[pa.RecordBatch]:
+    """Turns each streamed batch of rows into one RecordBatch, flattening 'parameters' on the way."""
+    column_names = [name for name, _ in columns]
+    params_index = column_names.index("parameters") if param_fields else None
+    for rows in db_manager.stream_query(query, batch_size=batch_size):
+        data: Dict[str, List[Any]] = {field.name: [] for field in schema}
+        for row in rows:
+            for name, value in zip(column_names, row):
+                if name in data:
+                    data[name].append(_coerce(value, schema.field(name).type))
+            if params_index is not None:
+                parameters = row[params_index] if isinstance(row[params_index], dict) else {}
+                for field in param_fields:
+                    key = field.metadata[PARAM_KEY_METADATA].decode()
+                    data[field.name].append(_coerce(parameters.get(key), field.type))
+        yield pa.RecordBatch.from_pydict(data, schema=schema)
+
+def export_table(db_manager: DatabaseManager, table_name: str, target_dir: Path, batch_size: int) -> int:
+    """
+    Streams one table into a Parquet dataset directory. Memory is bounded by one
+    record batch; components are partitioned by category_id (hive layout).
+    """
+    spec = PARQUET_TABLES[table_name]
+    columns: List[Tuple[str, str]] = db_manager.get_table_columns(table_name)
+    if not columns:
+        log.error(f"Could not read the layout of table '{table_name}'.")
+        return 0
+
+    param_fields = _parameter_fields(db_manager) if table_name == "components" else []
+    fields = [pa.field(name, arrow_type(pg_type)) for name, pg_type in columns
+              if not (param_fields and name == "parameters")]
+    metadata = None
+    if param_fields:
+        keys = {field.name: field.metadata[PARAM_KEY_METADATA].decode() for field in param_fields}
+        metadata = {PARAM_KEYS_METADATA: json.dumps(keys).encode()}
+    schema = pa.schema(fields + param_fields, metadata=metadata)
+
+    quoted = ", ".join(f'"{name}"' for name, _ in columns)
+    query = f"SELECT {quoted} FROM {table_name} ORDER BY {spec['serial']}"
+
+    row_count = 0
+    def counted(batches):
+        nonlocal row_count
+        for batch in batches:
+            row_count += batch.num_rows
+            yield batch
+
+    partitioning = None
+    if spec.get("partition"):
+        partition_field = schema.field(spec["partition"])
+        partitioning = ds.partitioning(pa.schema([partition_field]), flavor="hive")
+
+    ds.write_dataset(
+        counted(_record_batches(db_manager, query, columns, param_fields, schema, batch_size)),
+        base_dir=str(target_dir),
+        schema=schema,
+        format="parquet",
+        partitioning=partitioning,
+        existing_data_behavior="delete_matching",
+        max_rows_per_group=batch_size,
+    )
+    return row_count
@@ -0,0 +1,143 @@
+import json
+import logging
+import sqlite3
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..db_manager import DatabaseManager
+from ..change_feed import read_changes
+from .build_dbl import category_view_name
+
+log = logging.getLogger(__name__)
+
+TOKEN_KEY = "components_change_token"
+FEED_COLUMNS = ("change_seq", "change_xid", "created_xid")
+
+def setup_args(parser):
+    """Sets up arguments for the 'export-sqlite' command."""
+    parser.add_argument("-o", "--output", default="kipipe_catalog.sqlite", help="Path of the SQLite file to create or sync. Default: kipipe_catalog.sqlite")
+    parser.add_argument("--full", action="store_true", help="Ignore the stored change feed token and re-copy every component.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows fetched from Postgres per batch. Default: 5000")
+
+def run(args):
+    """Main logic for the 'export-sqlite' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    # The change feed's own bookkeeping columns are not part of the exported rows.
+    columns = [column for column in db_manager.get_table_columns("components") or [] if column[0] not in FEED_COLUMNS]
+    if not columns:
+        log.error("Could not read the 'components' table layout from the database.")
+        return
+
+    conn = sqlite3.connect(args.output)
+    try:
+        # WAL lets KiCad keep reading the previous snapshot while a sync is running.
+        conn.execute("PRAGMA journal_mode=WAL")
+        _ensure_schema(conn, columns)
+        _ensure_category_views(conn, db_manager.fetch_all("SELECT category_id, category_name FROM categories", use_primary=True))
+
+        token = None if args.full else _get_token(conn)
+        if token:
+            log.info("Syncing components changed since the last export...")
+        else:
+            log.info("Copying all components...")
+
+        try:
+            changes, next_token = read_changes(db_manager, token, batch_size=args.batch_size)
+        except ValueError as error:
+            log.warning(f"{error}; copying all components instead.")
+            token = None
+            changes, next_token = read_changes(db_manager, None, batch_size=args.batch_size)
+
+        with conn:
+            copied, removed = _apply_changes(conn, changes, [name for name, _ in columns], args.batch_size)
+            if not token:  # a full copy carries no tombstones; prune what is gone upstream
+                removed += _remove_deleted_rows(conn, db_manager, args.batch_size)
+            conn.execute("INSERT OR REPLACE INTO kipipe_sync (key, value) VALUES (?, ?)", (TOKEN_KEY, next_token))
+
+        total = conn.execute("SELECT COUNT(*) FROM components").fetchone()[0]
+        log.info(f"SQLite snapshot '{args.output}' is up to date: {copied} rows copied, {removed} removed, {total} total.")
+    finally:
+        conn.close()
+
+def _sqlite_type(pg_type: str) -> str:
+    """Maps a Postgres data_type to the SQLite type affinity of the same column."""
+    if pg_type in ("integer", "smallint", "bigint", "boolean"):
+        return "INTEGER"
+    if pg_type in ("numeric", "real", "double precision"):
+        return "REAL"
+    return "TEXT"
+
+def _ensure_schema(conn: sqlite3.Connection, columns: List[Tuple[str, str]]):
+    """Creates the components table with the Postgres column layout, adding any columns introduced since the last sync."""
+    column_defs = ", ".join(
+        f'"{name}" {_sqlite_type(pg_type)}' + (" PRIMARY KEY" if name == "partid" else "")
+        for name, pg_type in columns
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS components ({column_defs})")
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(components)")}
+    for name, pg_type in columns:
+        if name not in existing:
+            conn.execute(f'ALTER TABLE components ADD COLUMN "{name}" {_sqlite_type(pg_type)}')
+    conn.execute("CREATE INDEX IF NOT EXISTS components_category_id_idx ON components (category_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS components_internal_part_id_idx ON components (internal_part_id)")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS components_mpn_idx ON components (manufacturer_part_number)")
+    conn.execute("CREATE TABLE IF NOT EXISTS kipipe_sync (key TEXT PRIMARY KEY, value TEXT)")
+    conn.commit()
+
+def _ensure_category_views(conn: sqlite3.Connection, categories: List[tuple]):
+    """Creates the same 'dbl_*' views 'build-dbl' uses, so one .kicad_dbl works against either database."""
+    for category_id, category_name in categories:
+        view_name = category_view_name(category_id, category_name)
+        conn.execute(f"CREATE VIEW IF NOT EXISTS {view_name} AS SELECT * FROM components WHERE category_id = {int(category_id)}")
+    conn.commit()
+
+def _get_token(conn: sqlite3.Connection) -> Optional[str]:
+    row = conn.execute("SELECT value FROM kipipe_sync WHERE key = ?", (TOKEN_KEY,)).fetchone()
+    return row[0] if row else None
+
+def _to_sqlite(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def _apply_changes(conn, changes: Iterable[Dict[str, Any]], names: List[str], batch_size: int) -> Tuple[int, int]:
+    """
+    Applies change feed entries in change order: inserts and updates are upserted,
+    deletes remove the row. The feed is bounded by transaction ids rather than
+    'lastupdated', so a write that committed after the previous export is never
+    skipped. Returns (rows copied, rows removed).
+    """
+    quoted = ", ".join(f'"{name}"' for name in names)
+    insert_sql = f"INSERT OR REPLACE INTO components ({quoted}) VALUES ({', '.join('?' for _ in names)})"
+    copied, removed, batch = 0, 0, []
+    for change in changes:
+        if change["op"] == "delete":
+            conn.executemany(insert_sql, batch)
+            copied += len(batch)
+            batch = []
+            removed += conn.execute("DELETE FROM components WHERE partid = ?", (change["partid"],)).rowcount
+            continue
+        batch.append(tuple(_to_sqlite(change["row"].get(name)) for name in names))
+        if len(batch) >= batch_size:
+            conn.executemany(insert_sql, batch)
+            copied += len(batch)
+            batch = []
+    conn.executemany(insert_sql, batch)
+    return copied + len(batch), removed
+
+def _remove_deleted_rows(conn, db_manager, batch_size) -> int:
+    """Deletes local rows whose partid no longer exists upstream. Only ids are transferred."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS upstream_ids (partid INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM upstream_ids")
+    for batch in db_manager.stream_query("SELECT partid FROM components", batch_size=batch_size * 10, use_primary=True):
+        conn.executemany("INSERT INTO upstream_ids (partid) VALUES (?)", batch)
+    cursor = conn.execute("DELETE FROM components WHERE partid NOT IN (SELECT partid FROM upstream_ids)")
+    return cursor.rowcount
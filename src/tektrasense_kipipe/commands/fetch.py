@@ -6,6 +6,8 @@ import pandas as pd
 # Import changed slightly to reference the parent folder.
 from ..data_processor import ComponentProcessor
 from ..db_manager import DatabaseManager
+from ..bom import load_bom, register_bom_file
+from ..run_journal import RunJournal, parse_deadline, run_parts
 
 log = logging.getLogger(__name__)
 
@@ -17,6 +19,11 @@ def setup_args(parser):
     group.add_argument("--spreadsheet", help="Path to Excel (.xlsx) or ODS (.ods) file containing part numbers.")
     group.add_argument("--txt", help="Path to a plain text file with one part number per line.")
     parser.add_argument("--column", default="part_number", help="Column name for CSV/Spreadsheet. Default: part_number")
+    parser.add_argument("--no-refresh-views", action="store_true", help="Skip refreshing the per-category materialized views after a bulk fetch.")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Continue a bulk run from its journal: skip parts already done, retry failed ones.")
+    parser.add_argument("--deadline", help="Stop a bulk run cleanly once this much time has passed, e.g. 90s, 45m, 2h.")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Use the asyncio engine (needs the 'async' extra: httpx, asyncpg).")
+    parser.add_argument("--concurrency", type=int, default=50, help="Parts in flight at once with --async. Default: 50")
 
 def run(args):
     """Logic การทำงานหลักของคำสั่ง 'fetch'"""
@@ -27,37 +34,87 @@ def run(args):
     
     processor = ComponentProcessor(db_manager)
 
-    if args.part_number:
+    if args.use_async:
+        if args.resume or args.deadline:
+            log.critical("--resume and --deadline are not supported with --async.")
+            sys.exit(1)
+        _run_async(args)
+    elif args.part_number:
         _process_part(args.part_number, processor, db_manager)
-    elif args.csv:
-        _load_from_csv(args.csv, args.column, processor, db_manager)
-    elif args.spreadsheet:
-        _load_from_spreadsheet(args.spreadsheet, args.column, processor, db_manager)
-    elif args.txt:
-        _load_from_txt(args.txt, processor, db_manager)
+    else:
+        if _run_bulk(args, processor, db_manager) == "interrupted":
+            sys.exit(130)
+
+    bom_path = args.csv or args.spreadsheet or args.txt
+    if bom_path:
+        register_bom_file(db_manager, bom_path, args.column, source="fetch")
+
+    # Keep KiCad's per-category views (see 'build-dbl') in step with the bulk changes.
+    if not args.part_number and not args.no_refresh_views:
+        db_manager.refresh_category_views()
 
     log.info("Fetch process complete.")
     # Don't close the connection here, main.py will handle it.
 
 # --- Helper Functions (moved from the original main.py) ---
-def _process_part(part_number: str, processor: ComponentProcessor, db_manager: DatabaseManager):
+def _run_async(args):
+    # Imported here so the synchronous path never needs the optional dependencies.
+    from ..async_pipeline import run_async_fetch
+    if args.part_number:
+        part_numbers = [args.part_number]
+    else:
+        try:
+            part_numbers = load_bom(args.csv or args.spreadsheet or args.txt, args.column)["manufacturer_part_number"].tolist()
+        except (OSError, ValueError) as e:
+            log.critical(f"Failed to read part numbers: {e}")
+            sys.exit(1)
+    try:
+        succeeded, failed = run_async_fetch(part_numbers, args.concurrency)
+    except RuntimeError as e:
+        log.critical(str(e))
+        sys.exit(1)
+    log.info(f"Async fetch stored {succeeded} part(s); {failed} failed.")
+
+def _process_part(part_number: str, processor: ComponentProcessor, db_manager: DatabaseManager) -> bool:
+    """Fetches and stores one part. Returns False when nothing could be retrieved or stored."""
     part_number = str(part_number).strip()
     if not part_number or part_number.lower() == "part number":
-        return
+        return True
 
     result = processor.fetch_part_data(part_number)
-    if result:
-        log.info(f"Successfully processed data for part: {part_number}")
-        for part_data in result:
-            db_manager.upsert_data(
-                table_name="components",
-                pk_column="manufacturer_part_number",
-                data=part_data
-            )
-    else:
+    if not result:
         log.warning(f"No data retrieved for part number: {part_number}")
+        return False
+
+    log.info(f"Successfully processed data for part: {part_number}")
+    stored = True
+    for part_data in result:
+        offers = part_data.pop("supplier_offers", None)
+        if not db_manager.upsert_component(part_data):
+            stored = False
+        elif offers:
+            db_manager.replace_supplier_offers(part_data["manufacturer_part_number"], offers)
+    return stored
+
+def _run_bulk(args, processor: ComponentProcessor, db_manager: DatabaseManager) -> str:
+    """Processes a part number file under a run journal. Returns the journal's end status."""
+    input_path = args.csv or args.spreadsheet or args.txt
+    try:
+        deadline = parse_deadline(args.deadline) if args.deadline else None
+        journal = RunJournal.resume(args.resume, "fetch", input_path) if args.resume else RunJournal.create("fetch", input_path)
+    except (OSError, ValueError) as e:
+        log.critical(str(e))
+        sys.exit(1)
+
+    if args.csv:
+        part_numbers = _load_from_csv(args.csv, args.column)
+    elif args.spreadsheet:
+        part_numbers = _load_from_spreadsheet(args.spreadsheet, args.column)
+    else:
+        part_numbers = _load_from_txt(args.txt)
+    return run_parts(part_numbers, lambda pn: _process_part(pn, processor, db_manager), journal, deadline)
 
-def _load_from_csv(file_path: str, column_name: str, processor: ComponentProcessor, db_manager: DatabaseManager):
+def _load_from_csv(file_path: str, column_name: str):
     try:
         with open(file_path, newline='', encoding='utf-8') as f:
             reader = csv.DictReader(f)
@@ -65,31 +122,29 @@ def _load_from_csv(file_path: str, column_name: str, processor: ComponentProcess
                 log.error(f"CSV file must contain column: '{column_name}'")
                 return
             for row in reader:
-                _process_part(row.get(column_name, ''), processor, db_manager)
+                yield row.get(column_name, '')
     except FileNotFoundError:
         log.critical(f"CSV file not found: {file_path}")
     except Exception as e:
         log.critical(f"Failed to read CSV: {e}")
 
-def _load_from_spreadsheet(file_path: str, column_name: str, processor: ComponentProcessor, db_manager: DatabaseManager):
+def _load_from_spreadsheet(file_path: str, column_name: str):
     try:
         engine = "odf" if file_path.endswith(".ods") else None
         df = pd.read_excel(file_path, engine=engine)
         if column_name not in df.columns:
             log.error(f"Spreadsheet must contain column: '{column_name}'")
             return
-        for value in df[column_name].dropna().unique():
-            _process_part(value, processor, db_manager)
+        yield from df[column_name].dropna().unique()
     except FileNotFoundError:
         log.critical(f"Spreadsheet file not found: {file_path}")
     except Exception as e:
         log.critical(f"Failed to read spreadsheet: {e}")
 
-def _load_from_txt(file_path: str, processor: ComponentProcessor, db_manager: DatabaseManager):
+def _load_from_txt(file_path: str):
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                _process_part(line, processor, db_manager)
+            yield from f
     except FileNotFoundError:
         log.critical(f"Text file not found: {file_path}")
     except Exception as e:
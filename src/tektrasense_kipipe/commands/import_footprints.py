@@ -0,0 +1,165 @@
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+from ..db_manager import DatabaseManager
+from ..sexpr import read_footprint
+from .. import config
+
+log = logging.getLogger(__name__)
+
+# Footprint files are small, so each pool task parses a chunk of them.
+PARSE_CHUNK = 200
+# Rows collected from the parsers before the writer upserts them in one batch.
+WRITE_BATCH = 2000
+
+def setup_args(parser):
+    """Sets up arguments for the 'import-footprints' command."""
+    parser.add_argument("-d", "--directory", help="Directory to scan for .pretty libraries. Default: every path in config.FOOTPRINT_SEARCH_PATHS")
+    parser.add_argument("--force", action="store_true", help="Re-import every footprint, even those whose file is unchanged.")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Parser processes. Default: number of CPUs")
+
+def run(args):
+    """Main logic for the 'import-footprints' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    roots = [args.directory] if args.directory else config.FOOTPRINT_SEARCH_PATHS
+    libraries = _find_pretty_dirs(roots)
+    if not libraries:
+        log.warning("No .pretty footprint libraries found to process.")
+        db_manager.close_all_connections()
+        return
+
+    start = time.perf_counter()
+    summary = _import_libraries(libraries, db_manager, args.jobs, force=args.force)
+
+    log.info(f"--- Import Finished ---")
+    log.info(f"Libraries: {len(libraries)}")
+    log.info(f"Footprints Unchanged (skipped): {summary['skipped']}")
+    log.info(f"Total Added/Updated: {summary['updated']}")
+    log.info(f"Total Removed: {summary['removed']}")
+    log.info(f"Total Failed: {summary['failed']}")
+    log.info(f"Elapsed: {time.perf_counter() - start:.1f} s")
+
+    db_manager.close_all_connections()
+
+def _find_pretty_dirs(roots: List[str]) -> List[Path]:
+    """Recursively finds the <Lib>.pretty directories below each root; a .pretty directory is not searched further."""
+    found = []
+    for root in roots:
+        start_path = Path(root)
+        if not start_path.is_dir():
+            log.error(f"Provided path is not a valid directory: {root}")
+            continue
+        log.info(f"Scanning directory '{start_path}' for .pretty libraries...")
+        for dirpath, dirs, _ in os.walk(start_path):
+            for name in list(dirs):
+                if name.endswith(".pretty"):
+                    found.append(Path(dirpath) / name)
+                    dirs.remove(name)
+    return found
+
+class FootprintFile(NamedTuple):
+    library_nickname: str
+    path: Path
+    mtime_ns: int
+
+def _footprint_files(library: Path) -> List[FootprintFile]:
+    nickname = library.name[:-len(".pretty")]
+    with os.scandir(library) as entries:
+        return [FootprintFile(nickname, Path(entry.path), entry.stat().st_mtime_ns)
+                for entry in entries if entry.name.endswith(".kicad_mod") and entry.is_file()]
+
+def _footprint_row(file: FootprintFile) -> dict:
+    """The 'footprints' row for one .kicad_mod file."""
+    footprint = read_footprint(file.path)
+    x_min, y_min, x_max, y_max = footprint.courtyard or (None, None, None, None)
+    return {
+        "library_nickname": file.library_nickname,
+        "footprint_name": footprint.name,
+        "keywords": footprint.tags,
+        "description": footprint.description,
+        "pad_count": footprint.pad_count,
+        "attribute": footprint.attribute,
+        "courtyard_x_min": x_min,
+        "courtyard_y_min": y_min,
+        "courtyard_x_max": x_max,
+        "courtyard_y_max": y_max,
+        "file_path": str(file.path),
+        "mtime_ns": file.mtime_ns,
+    }
+
+def _parse_chunk(files: List[FootprintFile]) -> Tuple[List[dict], List[Tuple[Path, str]]]:
+    """Pool task: the rows for a chunk of files, plus (path, error) for files that could not be read."""
+    rows, errors = [], []
+    for file in files:
+        try:
+            rows.append(_footprint_row(file))
+        except Exception as e:
+            errors.append((file.path, str(e)))
+    return rows, errors
+
+def _parsed_chunks(files: List[FootprintFile], jobs: int) -> Iterator[Tuple[List[dict], List[Tuple[Path, str]]]]:
+    """Yields parse results chunk by chunk as the pool finishes them."""
+    chunks = [files[i:i + PARSE_CHUNK] for i in range(0, len(files), PARSE_CHUNK)]
+    if jobs <= 1 or len(chunks) <= 1:
+        yield from map(_parse_chunk, chunks)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+        for future in as_completed([pool.submit(_parse_chunk, chunk) for chunk in chunks]):
+            yield future.result()
+
+def _import_libraries(libraries: List[Path], db_manager: DatabaseManager, jobs: int = 1, force: bool = False) -> Dict[str, int]:
+    """
+    Imports the footprints of the given .pretty directories. Files whose mtime
+    matches the one stored with their row are skipped without being read; the
+    rest are parsed in a process pool and upserted by this process in batches
+    of WRITE_BATCH. Footprints whose file has gone from a library are deleted.
+    """
+    summary = {'updated': 0, 'skipped': 0, 'removed': 0, 'failed': 0}
+    files_by_library = {library: _footprint_files(library) for library in libraries}
+    nicknames = sorted({library.name[:-len(".pretty")] for library in libraries})
+    known = {} if force else dict(db_manager.fetch_all(
+        "SELECT file_path, mtime_ns FROM footprints WHERE library_nickname = ANY(%s)", (nicknames,), use_primary=True) or [])
+
+    changed = []
+    for files in files_by_library.values():
+        for file in files:
+            if known.get(str(file.path)) == file.mtime_ns:
+                summary['skipped'] += 1
+            else:
+                changed.append(file)
+    log.info(f"{len(changed)} of {len(changed) + summary['skipped']} footprint file(s) are new or changed.")
+
+    pending: List[dict] = []
+
+    def flush():
+        if not pending:
+            return
+        batch = pending[:]
+        pending.clear()
+        if db_manager.upsert_footprints(batch):
+            summary['updated'] += len(batch)
+        else:
+            summary['failed'] += len(batch)
+
+    for rows, errors in _parsed_chunks(changed, jobs):
+        for path, error in errors:
+            log.error(f"Could not parse {path}: {error}")
+        summary['failed'] += len(errors)
+        pending.extend(rows)
+        if len(pending) >= WRITE_BATCH:
+            flush()
+    flush()
+
+    for library, files in files_by_library.items():
+        removed = db_manager.execute_returning(
+            "DELETE FROM footprints WHERE library_nickname = %s AND NOT (footprint_name = ANY(%s)) RETURNING footprint_name",
+            (library.name[:-len(".pretty")], [file.path.stem for file in files]))
+        summary['removed'] += len(removed or [])
+    return summary
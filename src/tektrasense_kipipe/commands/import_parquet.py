@@ -0,0 +1,64 @@
+import json
+import logging
+import sys
+from pathlib import Path
+import pyarrow.dataset as ds
+from ..db_manager import DatabaseManager
+from .export_parquet import PARQUET_TABLES, PARAM_KEY_METADATA, PARAM_KEYS_METADATA
+
+log = logging.getLogger(__name__)
+
+def setup_args(parser):
+    """Sets up arguments for the 'import-parquet' command."""
+    parser.add_argument("-i", "--input-dir", default="kipipe_parquet", help="Directory written by 'export-parquet'. Default: kipipe_parquet")
+    parser.add_argument("--tables", nargs="+", choices=list(PARQUET_TABLES), default=list(PARQUET_TABLES), help="Tables to import. Default: all")
+    parser.add_argument("--batch-size", type=int, default=20000, help="Rows per record batch and upsert transaction. Default: 20000")
+
+def run(args):
+    """Main logic for the 'import-parquet' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    input_dir = Path(args.input_dir)
+    for table_name in args.tables:
+        table_dir = input_dir / table_name
+        if not table_dir.is_dir():
+            log.warning(f"No Parquet dataset for '{table_name}' in '{input_dir}', skipping.")
+            continue
+        rows = import_table(db_manager, table_name, table_dir, args.batch_size)
+        log.info(f"Imported {rows} rows into '{table_name}'.")
+
+    if "components" in args.tables:
+        db_manager.refresh_category_views()
+
+def import_table(db_manager: DatabaseManager, table_name: str, table_dir: Path, batch_size: int) -> int:
+    """
+    Streams a Parquet dataset back into its table one record batch at a time,
+    re-assembling flattened 'param_*' columns into the 'parameters' JSONB.
+    """
+    spec = PARQUET_TABLES[table_name]
+    dataset = ds.dataset(str(table_dir), format="parquet", partitioning="hive")
+    param_columns = _param_keys(dataset.schema)
+    imported = 0
+    for batch in dataset.to_batches(batch_size=batch_size):
+        rows = []
+        for record in batch.to_pylist():
+            record.pop(spec["serial"], None)
+            if param_columns:
+                parameters = {key: record.pop(column) for column, key in param_columns.items()}
+                record["parameters"] = json.dumps({k: v for k, v in parameters.items() if v is not None})
+            rows.append(record)
+        if rows and db_manager.upsert_many(table_name, rows, spec["conflict"]):
+            imported += len(rows)
+    return imported
+
+def _param_keys(schema) -> dict:
+    """Column -> original 'parameters' key, from the schema metadata or (older exports) the field metadata."""
+    if schema.metadata and PARAM_KEYS_METADATA in schema.metadata:
+        return json.loads(schema.metadata[PARAM_KEYS_METADATA])
+    return {
+        field.name: field.metadata[PARAM_KEY_METADATA].decode()
+        for field in schema
+        if field.metadata and PARAM_KEY_METADATA in field.metadata
+    }
@@ -1,19 +1,30 @@
+import hashlib
 import logging
 import sys
 import os
-import re
+import time
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List # <--- Add this import
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple # <--- Add this import
 from ..db_manager import DatabaseManager
+from ..bom import file_sha256
+from ..sexpr import iter_symbols, symbol_shape
 from .. import config
 
 log = logging.getLogger(__name__)
 
+# Bumped whenever _symbol_rows starts extracting something new, so files the
+# manifest records from an older version are parsed again.
+PARSER_VERSION = 2
+
 def setup_args(parser):
     """Sets up arguments for the 'import-symbols' command."""
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("-f", "--file", help="Filename of a single .kicad_sym library to import.")
     group.add_argument("-d", "--directory", help="Path to a directory to scan for all .kicad_sym files.")
+    parser.add_argument("--force", action="store_true", help="Re-import every file, even those the manifest records as unchanged.")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Parser processes for --directory. Default: number of CPUs")
 
 def run(args):
     """Main logic for the 'import-symbols' command."""
@@ -37,17 +48,21 @@ def run(args):
         return
 
     # --- Process all found files ---
-    total_summary = {'symbols': 0, 'updated': 0, 'failed': 0}
-    for file_path in files_to_process:
-        summary = _parse_and_update_db(file_path, db_manager)
-        total_summary['symbols'] += summary['symbols']
-        total_summary['updated'] += summary['updated']
-        total_summary['failed'] += summary['failed']
+    start = time.perf_counter()
+    if args.file:
+        total_summary = _parse_and_update_db(files_to_process[0], db_manager, force=args.force)
+    else:
+        total_summary = _import_files(files_to_process, db_manager, args.jobs, force=args.force)
 
     log.info(f"--- Import Finished ---")
+    log.info(f"Files Unchanged (skipped): {total_summary['skipped_files']} of {len(files_to_process)}")
     log.info(f"Total Symbols Processed: {total_summary['symbols']}")
-    log.info(f"Total Added/Updated: {total_summary['updated']}")
+    log.info(f"Total Added: {total_summary['inserted']}")
+    log.info(f"Total Updated: {total_summary['updated']}")
+    log.info(f"Total Unchanged: {total_summary['unchanged']}")
+    log.info(f"Total Removed: {total_summary['removed']}")
     log.info(f"Total Failed: {total_summary['failed']}")
+    log.info(f"Elapsed: {time.perf_counter() - start:.1f} s")
     
     db_manager.close_all_connections()
 
@@ -77,47 +92,152 @@ def _find_all_sym_files(directory_path: str) -> List[Path]:
                 found_files.append(Path(root) / file)
     return found_files
 
-def _parse_and_update_db(file_path: Path, db_manager: DatabaseManager) -> dict:
-    """Parses a single .kicad_sym file and updates the database."""
-    log.info(f"Processing file: {file_path.name}")
-    summary = {'symbols': 0, 'updated': 0, 'failed': 0}
+class ParsedFile(NamedTuple):
+    path: Path
+    rows: List[dict]
+    seconds: float
+    sha256: Optional[str] = None
+    size_bytes: int = 0
+    mtime_ns: int = 0
+    unchanged: bool = False
+    error: Optional[str] = None
+
+def _row_hash(row: dict) -> str:
+    """Fingerprint of a symbol row's stored values, for symbol-level diffs."""
+    values = (row["library_nickname"], row["description"], row["datasheet"], row["keywords"],
+              row["pin_count"], row["unit_count"], row["is_power"], row["extends"])
+    return hashlib.sha1("\x1f".join(str(value) for value in values).encode("utf-8")).hexdigest()
+
+def _symbol_rows(file_path: Path) -> List[dict]:
+    """
+    The 'symbols' rows for the top-level symbols of one library file. A derived
+    symbol takes its pin and unit counts from a parent in the same file.
+    """
+    rows = []
+    for symbol in iter_symbols(file_path):
+
+        def get_prop(prop_name, default='~'):
+            value = symbol.properties.get(prop_name)
+            return value.replace('\n', ' ').strip() if value is not None else default
+
+        description = get_prop("Description", "")
+        datasheet = get_prop("Datasheet", "~")
+        keywords = get_prop("ki_keywords", "")
+        full_keywords = f"{symbol.name} {description} {keywords}".strip()
+        shape = symbol_shape(symbol.node)
+
+        rows.append({
+            "library_nickname": file_path.stem,
+            "symbol_name": symbol.name,
+            "description": description,
+            "datasheet": datasheet,
+            "keywords": full_keywords,
+            "pin_count": shape.pin_count,
+            "unit_count": shape.unit_count,
+            "is_power": shape.is_power,
+            "extends": shape.extends,
+        })
+    by_name = {row["symbol_name"]: row for row in rows}
+    for row in rows:
+        parent = by_name.get(row["extends"])
+        if parent and row["pin_count"] is None:
+            row["pin_count"], row["unit_count"] = parent["pin_count"], parent["unit_count"]
+        row["content_hash"] = _row_hash(row)
+    return rows
+
+def _parse_file(file_path: Path, known_sha256: Optional[str] = None) -> ParsedFile:
+    """Pool task: hashes one file and parses it unless its content matches known_sha256."""
+    start = time.perf_counter()
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        symbol_definitions = re.findall(r'\(symbol\s+"([^"]+)"(.*?\)\s*\)\s*\))', content, re.DOTALL)
-
-        if not symbol_definitions:
-            log.warning(f"No symbols found in {file_path.name}.")
-            return summary
-
-        summary['symbols'] = len(symbol_definitions)
-        for symbol_name, properties_block in symbol_definitions:
-            
-            def get_prop(prop_name, default='~'):
-                match = re.search(fr'\(property\s+"{prop_name}"\s+"([^"]*)"', properties_block)
-                return match.group(1).replace('\n', ' ').strip() if match else default
-
-            description = get_prop("Description", "")
-            datasheet = get_prop("Datasheet", "~")
-            keywords = get_prop("ki_keywords", "")
-            full_keywords = f"{symbol_name} {description} {keywords}".strip()
-            
-            symbol_data = {
-                "library_nickname": file_path.stem,
-                "symbol_name": symbol_name,
-                "description": description,
-                "datasheet": datasheet,
-                "keywords": full_keywords
-            }
-            
-            if db_manager.upsert_symbol(symbol_data):
-                summary['updated'] += 1
-            else:
-                summary['failed'] += 1
-        
-        return summary
-
+        stat = file_path.stat()
+        sha256 = file_sha256(file_path)
+        if sha256 == known_sha256:
+            return ParsedFile(file_path, [], time.perf_counter() - start, sha256, stat.st_size, stat.st_mtime_ns, unchanged=True)
+        rows = _symbol_rows(file_path)
+        return ParsedFile(file_path, rows, time.perf_counter() - start, sha256, stat.st_size, stat.st_mtime_ns)
     except Exception as e:
-        log.critical(f"An error occurred with {file_path.name}: {e}")
-        return summary
\ No newline at end of file
+        return ParsedFile(file_path, [], time.perf_counter() - start, error=str(e))
+
+def _parsed_files(tasks: List[Tuple[Path, Optional[str]]], jobs: int) -> Iterator[ParsedFile]:
+    """Yields parse results as files finish, largest files first so no long file is started last."""
+    if jobs <= 1 or len(tasks) == 1:
+        for file_path, known_sha256 in tasks:
+            yield _parse_file(file_path, known_sha256)
+        return
+    tasks = sorted(tasks, key=lambda task: task[0].stat().st_size, reverse=True)
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        futures = [pool.submit(_parse_file, file_path, known_sha256) for file_path, known_sha256 in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+def _manifest_key(file_path: Path) -> str:
+    return str(file_path.resolve())
+
+def _load_manifest(db_manager: DatabaseManager, files: List[Path]) -> Dict[str, tuple]:
+    """
+    path -> (size_bytes, mtime_ns, content_sha256, symbol_count) as recorded by the
+    last import. Entries written by an older PARSER_VERSION are left out.
+    """
+    rows = db_manager.fetch_all(
+        "SELECT path, size_bytes, mtime_ns, content_sha256, symbol_count FROM symbol_library_files "
+        "WHERE path = ANY(%s) AND parser_version = %s",
+        ([_manifest_key(path) for path in files], PARSER_VERSION), use_primary=True)
+    return {row[0]: tuple(row[1:]) for row in rows or []}
+
+def _manifest_row(parsed: ParsedFile, symbol_count: int) -> dict:
+    return {"path": _manifest_key(parsed.path), "library_nickname": parsed.path.stem, "size_bytes": parsed.size_bytes,
+            "mtime_ns": parsed.mtime_ns, "content_sha256": parsed.sha256, "symbol_count": symbol_count,
+            "parser_version": PARSER_VERSION, "imported_at": datetime.now(timezone.utc)}
+
+def _import_files(files: List[Path], db_manager: DatabaseManager, jobs: int = 1, force: bool = False) -> Dict[str, int]:
+    """
+    Imports the library files that changed since the last run. A file whose size
+    and mtime match the manifest is skipped without being read; a file whose
+    content hash still matches only has its manifest entry refreshed. Every other
+    file is synced in its own transaction (DatabaseManager.sync_library_symbols),
+    which writes only new and changed symbols and deletes the removed ones.
+    Parsing runs in a process pool when jobs > 1; this process alone writes to
+    the database, and records a file in the manifest once its symbols are stored.
+    """
+    summary = {'symbols': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'failed': 0, 'skipped_files': 0}
+    manifest = {} if force else _load_manifest(db_manager, files)
+    tasks = []
+    for file_path in files:
+        known = manifest.get(_manifest_key(file_path))
+        stat = file_path.stat()
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            summary['skipped_files'] += 1
+            continue
+        tasks.append((file_path, known[2] if known else None))
+    if summary['skipped_files']:
+        log.info(f"{summary['skipped_files']} of {len(files)} library file(s) unchanged since the last import.")
+
+    touched: List[dict] = []
+    for done, parsed in enumerate(_parsed_files(tasks, jobs), 1):
+        if parsed.error:
+            log.critical(f"An error occurred with {parsed.path.name}: {parsed.error}")
+            continue
+        if parsed.unchanged:
+            touched.append(_manifest_row(parsed, manifest[_manifest_key(parsed.path)][3]))
+            continue
+        if not parsed.rows:
+            log.warning(f"No symbols found in {parsed.path.name}.")
+        summary['symbols'] += len(parsed.rows)
+        start = time.perf_counter()
+        counts = db_manager.sync_library_symbols(parsed.path.stem, parsed.rows)
+        if counts is None:
+            summary['failed'] += len(parsed.rows)
+            continue  # the file stays out of the manifest and is imported again next run
+        for key in ('inserted', 'updated', 'unchanged', 'removed'):
+            summary[key] += counts[key]
+        db_manager.upsert_many("symbol_library_files", [_manifest_row(parsed, len(parsed.rows))], ("path",))
+        log.info(f"[{done}/{len(tasks)}] {parsed.path.name}: {len(parsed.rows)} symbols parsed in {parsed.seconds * 1000:.0f} ms, "
+                 f"synced in {(time.perf_counter() - start) * 1000:.0f} ms ({counts['inserted']} new, {counts['updated']} changed, "
+                 f"{counts['removed']} removed)")
+    db_manager.upsert_many("symbol_library_files", touched, ("path",))
+    return summary
+
+def _parse_and_update_db(file_path: Path, db_manager: DatabaseManager, force: bool = False) -> dict:
+    """Parses a single .kicad_sym file and updates the database."""
+    log.info(f"Processing file: {file_path.name}")
+    return _import_files([file_path], db_manager, force=force)
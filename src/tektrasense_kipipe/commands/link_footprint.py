@@ -12,9 +12,10 @@ def run(args):
     log.info(f"Linking footprint for part '{args.part_number}'...")
     db_manager = DatabaseManager()
 
-    # 1. Get all approved footprints for this part number
+    # 1. Get all approved footprints for this part number.
+    # Read from the primary: the mapping was usually taught by 'add-footprint' moments ago.
     query = "SELECT footprint_link FROM footprint_mappings WHERE manufacturer_part_number = %s"
-    results = db_manager.fetch_all(query, (args.part_number,))
+    results = db_manager.fetch_all(query, (args.part_number,), use_primary=True)
     
     if not results:
         log.warning(f"No approved footprints found for '{args.part_number}'. Use the 'add-footprint' command to teach the system first.")
@@ -44,6 +45,5 @@ def run(args):
             except ValueError: print("  Invalid input.")
     
     if chosen_link:
-        update_query = "UPDATE components SET kicad_footprint = %s WHERE manufacturer_part_number = %s"
-        if db_manager.execute_query(update_query, (chosen_link, args.part_number)):
+        if db_manager.update_component_link(args.part_number, "kicad_footprint", chosen_link):
             log.info(f"Successfully linked footprint '{chosen_link}' to component.")
\ No newline at end of file
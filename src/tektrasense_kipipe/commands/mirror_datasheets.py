@@ -0,0 +1,62 @@
+import logging
+import sys
+import time
+from ..db_manager import DatabaseManager
+from ..datasheet_mirror import DatasheetMirror, KnownDatasheet, DEFAULT_WORKERS, DEFAULT_PER_HOST, mirror_directory
+
+log = logging.getLogger(__name__)
+
+# Distinct datasheet URLs that were never mirrored, failed last time, or were last checked too long ago.
+CANDIDATES_QUERY = """
+    SELECT DISTINCT c.datasheet_url, m.etag, m.last_modified, m.sha256, m.local_path, m.content_type, m.size_bytes, m.fetched_at
+    FROM components c
+    LEFT JOIN datasheet_mirror m ON m.url = c.datasheet_url
+    WHERE (c.datasheet_url LIKE 'http%%' OR c.datasheet_url LIKE '//%%')
+      AND (m.url IS NULL OR m.status = 'failed' OR m.checked_at < NOW() - make_interval(days => %s))
+"""
+
+# Results are written in batches so an interrupted run keeps what it finished.
+RECORD_BATCH = 100
+
+def setup_args(parser):
+    """Sets up arguments for the 'mirror-datasheets' command."""
+    parser.add_argument("--dir", help=f"Mirror directory. Default: $KIPIPE_DATASHEET_DIR or {mirror_directory()}")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Concurrent downloads. Default: {DEFAULT_WORKERS}")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help=f"Concurrent downloads per host. Default: {DEFAULT_PER_HOST}")
+    parser.add_argument("--max-age", type=int, default=30, help="Revalidate mirrored datasheets last checked more than this many days ago (0 = all). Default: 30")
+    parser.add_argument("--limit", type=int, help="Process at most this many URLs.")
+
+def run(args):
+    """Main logic for the 'mirror-datasheets' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    rows = db_manager.fetch_all(CANDIDATES_QUERY, (args.max_age,), use_primary=True)
+    if args.limit:
+        rows = rows[:args.limit]
+    if not rows:
+        log.info("All datasheets are mirrored and fresh.")
+        return
+
+    # Results that keep the stored copy (304s, failed refreshes) carry its details back into their row.
+    known = {row[0]: KnownDatasheet(*row[1:]) for row in rows if row[3]}
+    mirror = DatasheetMirror(args.dir, workers=args.workers, per_host=args.per_host)
+    log.info(f"Mirroring {len(rows)} datasheet URL(s) into '{mirror.root}' ({len(known)} to revalidate).")
+
+    counts = {"downloaded": 0, "not_modified": 0, "failed": 0}
+    downloaded_bytes = 0
+    pending = []
+    start = time.perf_counter()
+    for result in mirror.mirror([row[0] for row in rows], known):
+        counts[result.status] += 1
+        if result.status == "downloaded":
+            downloaded_bytes += result.size_bytes or 0
+        pending.append(result.as_row())
+        if len(pending) >= RECORD_BATCH:
+            db_manager.upsert_many("datasheet_mirror", pending, ("url",))
+            pending = []
+    db_manager.upsert_many("datasheet_mirror", pending, ("url",))
+
+    log.info(f"Datasheets: {counts['downloaded']} downloaded ({downloaded_bytes / 1e6:.1f} MB), "
+             f"{counts['not_modified']} unchanged, {counts['failed']} failed in {time.perf_counter() - start:.1f} s.")
@@ -0,0 +1,32 @@
+import logging
+import sys
+import time
+from ..db_manager import DatabaseManager
+
+log = logging.getLogger(__name__)
+
+def setup_args(parser):
+    """Sets up arguments for the 'search-symbol' command."""
+    parser.add_argument("terms", nargs="+", help="Search terms, prefix-matched against symbol name, keywords and description.")
+    parser.add_argument("-n", "--limit", type=int, default=20, help="Maximum number of results to show. Default: 20")
+    parser.add_argument("--any", action="store_true", help="Match symbols containing any of the terms instead of all of them.")
+
+def run(args):
+    """Main logic for the 'search-symbol' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    start = time.perf_counter()
+    results = db_manager.search_symbols(args.terms, limit=args.limit, match_all=not args.any)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    query_text = " ".join(args.terms)
+    if not results:
+        print(f"\nNo symbols found matching '{query_text}'.")
+    else:
+        print(f"\nTop {len(results)} symbols matching '{query_text}':")
+        for nickname, symbol_name, description, rank in results:
+            print(f"  {rank:7.4f}  {nickname}:{symbol_name}  {description or ''}")
+
+    log.info(f"Symbol search finished in {elapsed_ms:.1f} ms.")
@@ -0,0 +1,37 @@
+import logging
+import sys
+import time
+from pathlib import Path
+import psycopg2
+from ..db_manager import DatabaseManager
+from ..snapshot import save_snapshot, load_snapshot, SNAPSHOT_SCHEMA
+
+log = logging.getLogger(__name__)
+
+def setup_args(parser):
+    """Sets up arguments for the 'snapshot' command."""
+    parser.add_argument("action", choices=["save", "load"], help="'save' dumps the catalog tables, 'load' replaces their contents with a saved snapshot.")
+    parser.add_argument("directory", help="Snapshot directory (manifest.json plus one compressed file per table).")
+    parser.add_argument("--schema", default=SNAPSHOT_SCHEMA, help=f"Schema to save. Default: {SNAPSHOT_SCHEMA}")
+    parser.add_argument("--compress-level", type=int, default=3, choices=range(1, 10), metavar="1-9", help="gzip level used by 'save'. Default: 3")
+
+def run(args):
+    """Main logic for the 'snapshot' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    directory = Path(args.directory)
+    start = time.perf_counter()
+    try:
+        if args.action == "save":
+            manifest = save_snapshot(db_manager, directory, schema=args.schema, compress_level=args.compress_level)
+            rows = sum(table["rows"] for table in manifest["tables"])
+            log.info(f"Snapshot of {len(manifest['tables'])} tables ({rows} rows) saved to '{directory}' in {time.perf_counter() - start:.1f} s.")
+        else:
+            rows = load_snapshot(db_manager, directory)
+            log.info(f"Snapshot '{directory}' loaded ({rows} rows) in {time.perf_counter() - start:.1f} s.")
+            db_manager.refresh_category_views()
+    except (OSError, ValueError, psycopg2.DatabaseError) as error:
+        log.error(f"Snapshot {args.action} failed: {error}")
+        sys.exit(1)
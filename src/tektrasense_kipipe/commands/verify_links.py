@@ -0,0 +1,110 @@
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+from ..db_manager import DatabaseManager
+from ..library_index import LibraryIndex, split_link
+
+log = logging.getLogger(__name__)
+
+# Every distinct link with the number of components using it, for both columns in one query.
+LINKS_QUERY = """
+    SELECT 'symbol', kicad_symbol, COUNT(*) FROM components WHERE kicad_symbol <> '' GROUP BY kicad_symbol
+    UNION ALL
+    SELECT 'footprint', kicad_footprint, COUNT(*) FROM components WHERE kicad_footprint <> '' GROUP BY kicad_footprint
+"""
+
+COLUMNS = {"symbol": "kicad_symbol", "footprint": "kicad_footprint"}
+REASON_LABELS = {"malformed": "not 'Library:Name'", "missing library": "library not found", "missing name": "not in the library"}
+
+def setup_args(parser):
+    """Sets up arguments for the 'verify-links' command."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--symbol", action="store_true", help="Only verify symbol links.")
+    group.add_argument("--footprint", action="store_true", help="Only verify footprint links.")
+    parser.add_argument("--fix", action="store_true", help="Set every dangling link to NULL, so 'scan-missing' and 'add-symbol' pick the parts up again.")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Processes for re-indexing changed libraries. Default: number of CPUs")
+
+class DanglingLink(NamedTuple):
+    kind: str
+    link: str
+    components: int
+    reason: str  # 'malformed', 'missing library' or 'missing name'
+
+def run(args):
+    """Main logic for the 'verify-links' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    kinds = ["symbol"] if args.symbol else ["footprint"] if args.footprint else ["symbol", "footprint"]
+    start = time.perf_counter()
+    links = [row for row in db_manager.fetch_all(LINKS_QUERY) or [] if row[0] in kinds]
+    dangling = find_dangling(links, args.jobs)
+    log.info(f"Checked {len(links)} distinct links in {time.perf_counter() - start:.1f} s.")
+
+    _report(dangling)
+    if dangling and args.fix:
+        for kind in kinds:
+            nulled = _null_links(db_manager, kind, [d.link for d in dangling if d.kind == kind])
+            if nulled is not None:
+                log.info(f"Cleared {nulled} dangling {kind} link(s).")
+    db_manager.close_all_connections()
+    if dangling and not args.fix:
+        sys.exit(1)
+
+def find_dangling(links: List[tuple], jobs: int = 1) -> List[DanglingLink]:
+    """
+    Checks (kind, link, component count) rows against the library indexes. Each
+    referenced library is brought up to date once, the stale ones in parallel,
+    after which every link is a dictionary lookup.
+    """
+    by_kind: Dict[str, List[tuple]] = defaultdict(list)
+    for kind, link, count in links:
+        by_kind[kind].append((link, count))
+
+    dangling = []
+    for kind, rows in by_kind.items():
+        index = LibraryIndex.open(kind)
+        parts = {link: split_link(link) for link, _ in rows}
+        index.refresh({p[0] for p in parts.values() if p}, jobs)
+        for link, count in rows:
+            reason = _dangling_reason(index, parts[link])
+            if reason:
+                dangling.append(DanglingLink(kind, link, count, reason))
+    return dangling
+
+def _dangling_reason(index: LibraryIndex, parts: Optional[tuple]) -> Optional[str]:
+    if not parts:
+        return "malformed"
+    names = index.names(parts[0])
+    if names is None:
+        return "missing library"
+    return None if parts[1] in names else "missing name"
+
+def _report(dangling: List[DanglingLink]):
+    """Prints the dangling links grouped by kind and library, most affected components first."""
+    if not dangling:
+        print("\n✅ Every symbol and footprint link resolves.")
+        return
+    groups: Dict[tuple, List[DanglingLink]] = defaultdict(list)
+    for d in dangling:
+        groups[(d.kind, (split_link(d.link) or ("(malformed)",))[0])].append(d)
+    total = sum(d.components for d in dangling)
+    print(f"\nFound {len(dangling)} dangling links used by {total} components:")
+    for (kind, library), items in sorted(groups.items(), key=lambda g: (g[0][0], -sum(d.components for d in g[1]))):
+        reason = REASON_LABELS[items[0].reason]  # one library's links all fail for the same reason
+        print(f"\n  {kind} library '{library}': {len(items)} link(s), {sum(d.components for d in items)} component(s) ({reason})")
+        for d in sorted(items, key=lambda d: (-d.components, d.link)):
+            print(f"    - {d.link} ({d.components})")
+
+def _null_links(db_manager: DatabaseManager, kind: str, links: List[str]) -> Optional[int]:
+    """Sets the given links to NULL in one statement; returns the number of components changed."""
+    if not links:
+        return 0
+    column = COLUMNS[kind]  # only our own column names are interpolated
+    rows = db_manager.execute_returning(
+        f"UPDATE components SET {column} = NULL, lastupdated = NOW() WHERE {column} = ANY(%s) RETURNING partid", (links,))
+    return None if rows is None else len(rows)
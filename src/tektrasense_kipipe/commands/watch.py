@@ -0,0 +1,136 @@
+import logging
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, List, Set
+from ..db_manager import DatabaseManager
+from ..library_watcher import collect_changes, open_watcher
+from .import_symbols import _find_all_sym_files, _import_files, _manifest_key
+from .import_footprints import _find_pretty_dirs, _import_libraries
+from .. import config
+
+log = logging.getLogger(__name__)
+
+def setup_args(parser):
+    """Sets up arguments for the 'watch' command."""
+    parser.add_argument("--poll", action="store_true", help="Poll the library trees instead of using inotify.")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --poll (or without inotify). Default: 5")
+    parser.add_argument("--debounce", type=float, default=2.0, help="Import once no file has changed for this many seconds. Default: 2")
+    parser.add_argument("--no-initial-sync", action="store_true", help="Skip the incremental import of everything at startup.")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Parser processes per import. Default: 1")
+
+class _Shutdown:
+    """SIGTERM/SIGINT handler that never interrupts an import: it stops at once when idle, otherwise after the import."""
+
+    def __init__(self):
+        self.requested = False
+        self.busy = False
+
+    def __call__(self, signum, frame):
+        self.requested = True
+        if not self.busy:
+            raise KeyboardInterrupt
+
+def run(args):
+    """Main logic for the 'watch' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    roots = [root for root in [*config.SYMBOL_SEARCH_PATHS, *config.FOOTPRINT_SEARCH_PATHS] if Path(root).is_dir()]
+    if not roots:
+        log.error("None of the configured symbol or footprint paths exists; nothing to watch.")
+        db_manager.close_all_connections()
+        sys.exit(1)
+
+    shutdown = _Shutdown()
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    watcher = None
+    try:
+        shutdown.busy = True
+        # Start watching before the initial sync, so nothing changed during it is missed.
+        watcher = open_watcher(roots, poll=args.poll, interval=args.interval)
+        if not args.no_initial_sync:
+            _sync_all(db_manager, args.jobs)
+        shutdown.busy = False
+        log.info(f"Watching {len(roots)} library path(s) for changes.")
+        while not shutdown.requested:
+            changed = collect_changes(watcher, debounce=args.debounce, stopped=lambda: shutdown.requested)
+            if not changed:
+                continue
+            shutdown.busy = True
+            start = time.perf_counter()
+            _sync_changes(changed, db_manager, args.jobs)
+            log.info(f"Synced {len(changed)} changed path(s) in {time.perf_counter() - start:.1f} s.")
+            shutdown.busy = False
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher:
+            watcher.close()
+        log.info("Stopped watching.")
+        db_manager.close_all_connections()
+
+def _sync_all(db_manager: DatabaseManager, jobs: int):
+    """Incremental import of every configured library, catching up on changes made while not watching."""
+    symbol_files = [path for root in config.SYMBOL_SEARCH_PATHS if Path(root).is_dir() for path in _find_all_sym_files(root)]
+    if symbol_files:
+        _import_files(symbol_files, db_manager, jobs)
+    libraries = _find_pretty_dirs([root for root in config.FOOTPRINT_SEARCH_PATHS if Path(root).is_dir()])
+    if libraries:
+        _import_libraries(libraries, db_manager, jobs)
+
+def _sync_changes(changed: Iterable[Path], db_manager: DatabaseManager, jobs: int = 1):
+    """
+    Re-imports what the changed paths affect: changed .kicad_sym files, and the
+    .pretty libraries holding changed footprints (both imports are incremental,
+    so unchanged content costs a stat). Removed libraries are deleted from the
+    catalog; a new or changed directory is searched for libraries.
+    """
+    symbol_files: Set[Path] = set()
+    removed_symbol_files: Set[Path] = set()
+    libraries: Set[Path] = set()
+    for path in changed:
+        if path.suffix == ".kicad_sym":
+            (symbol_files if path.is_file() else removed_symbol_files).add(path)
+            continue
+        if path.suffix == ".kicad_mod":
+            if path.parent.suffix != ".pretty":
+                continue
+            path = path.parent
+        if path.suffix == ".pretty":
+            if path.is_dir():
+                libraries.add(path)
+            elif db_manager.execute_query("DELETE FROM footprints WHERE library_nickname = %s", (path.stem,)):
+                log.info(f"Footprint library '{path.stem}' was removed; deleted its footprints.")
+        elif path.is_dir():
+            symbol_files.update(_find_all_sym_files(str(path)))
+            libraries.update(_find_pretty_dirs([str(path)]))
+        elif not path.exists():
+            removed_symbol_files.update(_forget_directory(path, db_manager))
+
+    for path in sorted(removed_symbol_files):
+        counts = db_manager.sync_library_symbols(path.stem, [])
+        if counts is not None:
+            db_manager.execute_query("DELETE FROM symbol_library_files WHERE path = %s", (_manifest_key(path),))
+            log.info(f"Symbol library '{path.stem}' was removed; deleted its {counts['removed']} symbols.")
+    if symbol_files:
+        summary = _import_files(sorted(symbol_files), db_manager, jobs)
+        log.info(f"Symbols: {summary['inserted']} added, {summary['updated']} updated, {summary['removed']} removed.")
+    if libraries:
+        summary = _import_libraries(sorted(libraries), db_manager, jobs)
+        log.info(f"Footprints: {summary['updated']} added or updated, {summary['removed']} removed.")
+
+def _like_children(directory: str) -> str:
+    """A LIKE pattern (for ESCAPE '\\') matching the paths under 'directory' and nothing else."""
+    escaped = directory.rstrip("/").replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "/%"
+
+def _forget_directory(path: Path, db_manager: DatabaseManager) -> List[Path]:
+    """A directory moved or deleted as a whole: deletes its footprints and returns the symbol files it held."""
+    db_manager.execute_query("DELETE FROM footprints WHERE file_path LIKE %s ESCAPE '\\'", (_like_children(str(path)),))
+    rows = db_manager.fetch_all("SELECT path FROM symbol_library_files WHERE path LIKE %s ESCAPE '\\'",
+                                (_like_children(_manifest_key(path)),), use_primary=True)
+    return [Path(row[0]) for row in rows or []]
@@ -0,0 +1,60 @@
+import logging
+import sys
+from ..db_manager import DatabaseManager
+
+log = logging.getLogger(__name__)
+
+# Lifecycle states (DigiKey / Mouser wording) that do not call for a replacement part.
+ACTIVE_STATUSES = ("Active", "New Product")
+
+WHERE_USED_QUERY = """
+    SELECT l.manufacturer_part_number, b.bom_id, b.name, l.quantity, l.reference_designators, b.last_used_at
+    FROM bom_lines l
+    JOIN boms b ON b.bom_id = l.bom_id
+    WHERE l.manufacturer_part_number = ANY(%s)
+    ORDER BY l.manufacturer_part_number, b.last_used_at DESC
+"""
+
+NOT_ACTIVE_QUERY = """
+    SELECT l.manufacturer_part_number, b.bom_id, b.name, l.quantity, l.reference_designators, b.last_used_at, c.product_status
+    FROM components c
+    JOIN bom_lines l ON l.manufacturer_part_number = c.manufacturer_part_number
+    JOIN boms b ON b.bom_id = l.bom_id
+    WHERE c.product_status IS NOT NULL AND c.product_status <> ALL(%s)
+    ORDER BY l.manufacturer_part_number, b.last_used_at DESC
+"""
+
+def setup_args(parser):
+    """Sets up arguments for the 'where-used' command."""
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("part_numbers", nargs="*", default=[], help="Manufacturer part numbers to look up.")
+    group.add_argument("--not-active", action="store_true", help="List every registered BOM that uses a part whose lifecycle status is not active (obsolete, EOL, NRND, ...).")
+
+def run(args):
+    """Main logic for the 'where-used' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    if args.not_active:
+        rows = db_manager.fetch_all(NOT_ACTIVE_QUERY, (list(ACTIVE_STATUSES),))
+    elif args.part_numbers:
+        rows = db_manager.fetch_all(WHERE_USED_QUERY, ([pn.strip() for pn in args.part_numbers],))
+    else:
+        log.error("Give at least one part number, or --not-active.")
+        sys.exit(1)
+
+    if not rows:
+        print("\nNo registered BOM uses these parts.")
+        return
+
+    current = None
+    for row in rows:
+        part_number, bom_id, name, quantity, references, last_used_at = row[:6]
+        if part_number != current:
+            current = part_number
+            status = f"  [{row[6]}]" if args.not_active else ""
+            print(f"\n{part_number}{status}")
+        used = last_used_at.strftime('%Y-%m-%d') if last_used_at else "-"
+        print(f"  BOM {bom_id:<5} {name:<30} qty {quantity:<4} last used {used}  {references or ''}")
+    print(f"\n{len(rows)} BOM line(s) in {len({row[1] for row in rows})} BOM(s).")
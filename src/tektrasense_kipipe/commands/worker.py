@@ -0,0 +1,111 @@
+import logging
+import signal
+import sys
+import threading
+import time
+from ..data_processor import ComponentProcessor
+from ..db_manager import DatabaseManager
+from ..job_queue import JobQueue, DEFAULT_LEASE_SECONDS
+from .fetch import _process_part
+
+log = logging.getLogger(__name__)
+
+def setup_args(parser):
+    """Sets up arguments for the 'worker' command."""
+    parser.add_argument("--worker-id", help="Name recorded as lease owner. Default: <hostname>:<pid>")
+    parser.add_argument("--batch-size", type=int, default=5, help="Jobs claimed per round trip. Default: 5")
+    parser.add_argument("--lease-seconds", type=int, default=DEFAULT_LEASE_SECONDS, help=f"Lease length; renewed every third of it while working. Default: {DEFAULT_LEASE_SECONDS}")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds to wait when the queue is empty. Default: 5")
+    parser.add_argument("--exit-when-empty", action="store_true", help="Stop once no job is runnable instead of polling.")
+    parser.add_argument("--max-jobs", type=int, help="Stop after processing this many jobs.")
+    parser.add_argument("--no-refresh-views", action="store_true", help="Skip refreshing the per-category materialized views on exit.")
+
+class _Heartbeat(threading.Thread):
+    """Renews the leases of the jobs this worker currently holds."""
+
+    def __init__(self, queue: JobQueue, interval: float):
+        super().__init__(name="kipipe-heartbeat", daemon=True)
+        self.queue = queue
+        self.interval = interval
+        self.held = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            with self.lock:
+                job_ids = list(self.held)
+            for job_id in self.queue.heartbeat(job_ids):
+                log.warning(f"Lost the lease on job {job_id}; another worker may pick it up.")
+
+    def hold(self, jobs):
+        with self.lock:
+            self.held.update(job.job_id for job in jobs)
+
+    def drop(self, job):
+        with self.lock:
+            self.held.discard(job.job_id)
+
+def run(args):
+    """Main logic for the 'worker' command."""
+    db_manager = DatabaseManager()
+    if not db_manager.connection_pool:
+        sys.exit(1)
+
+    queue = JobQueue(db_manager, worker_id=args.worker_id, lease_seconds=args.lease_seconds)
+    processor = ComponentProcessor(db_manager)
+    heartbeat = _Heartbeat(queue, max(args.lease_seconds / 3, 1))
+    heartbeat.start()
+
+    stopping = threading.Event()
+    def request_stop(signum, frame):
+        log.info("Stop requested; finishing the current job.")
+        stopping.set()
+    previous_handlers = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+
+    processed = succeeded = 0
+    log.info(f"Worker '{queue.worker_id}' started.")
+    try:
+        while not stopping.is_set():
+            limit = args.batch_size if args.max_jobs is None else min(args.batch_size, args.max_jobs - processed)
+            if limit <= 0:
+                break
+            jobs = queue.claim(limit)
+            if not jobs:
+                if args.exit_when_empty:
+                    break
+                stopping.wait(args.poll_interval)
+                continue
+
+            heartbeat.hold(jobs)
+            for index, job in enumerate(jobs):
+                if stopping.is_set():
+                    queue.release(jobs[index:])
+                    break
+                if _run_job(job, queue, processor, db_manager):
+                    succeeded += 1
+                processed += 1
+                heartbeat.drop(job)
+    finally:
+        heartbeat.stopped.set()
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+
+    log.info(f"Worker '{queue.worker_id}' finished: {processed} jobs, {succeeded} succeeded.")
+    if succeeded and not args.no_refresh_views:
+        db_manager.refresh_category_views()
+
+def _run_job(job, queue: JobQueue, processor: ComponentProcessor, db_manager: DatabaseManager) -> bool:
+    start = time.perf_counter()
+    try:
+        ok = _process_part(job.payload, processor, db_manager)
+    except Exception as error:
+        log.exception(f"Job {job.job_id} ('{job.payload}') raised an error.")
+        queue.fail(job, f"{type(error).__name__}: {error}")
+        return False
+    if ok:
+        queue.complete(job)
+        log.info(f"Job {job.job_id} ('{job.payload}') done in {time.perf_counter() - start:.1f} s.")
+    else:
+        queue.fail(job, "No data retrieved or stored.")
+    return ok
@@ -27,9 +27,47 @@ class ComponentProcessor:
         if not parameters: return None
         return next((p.get('ValueText') or p.get('AttributeValue') for p in parameters if (p.get('ParameterText') or p.get('AttributeName')) in param_names and (p.get('ValueText') or p.get('AttributeValue')) != '-'), None)
 
+    def _parse_pin_count(self, parameters: Optional[List[Dict[str, str]]], package_case: Optional[str]) -> Optional[int]:
+        """
+        Package pin count from 'Number of Pins' (Mouser) or the package name:
+        '8-SOIC (0.154", 3.90mm Width)' and 'TO-220-3' both name it, 'SOT-23' does not.
+        """
+        count = self._find_param_in_list(parameters, "Number of Pins", "Number of Terminations")
+        match = re.match(r'\s*(\d+)\b', str(count or ''))
+        if not match and isinstance(package_case, str):
+            match = re.match(r'(\d+)-', package_case) or re.match(r'[A-Za-z]+-\d+[A-Za-z]*-(\d+)\b', package_case)
+        return int(match.group(1)) if match else None
+
     def _normalize_rohs_status(self, status: Optional[str]) -> str:
         return "Yes" if status and "rohs" in status.lower() else "No"
 
+    def _parse_price_breaks(self, pricing_list: Optional[List[Dict[str, Any]]]) -> List[tuple]:
+        """Returns (min_quantity, unit_price) tiers from a DigiKey or Mouser pricing list, skipping unparsable ones."""
+        tiers = []
+        for price in pricing_list or []:
+            quantity = price.get('BreakQuantity') or price.get('Quantity')
+            unit_price = re.sub(r'[^0-9.]', '', str(price.get('UnitPrice') or price.get('Price') or ''))
+            try:
+                tiers.append((int(quantity), float(unit_price)))
+            except (TypeError, ValueError):
+                continue
+        return tiers
+
+    def _parse_stock(self, quantity_available: Any) -> Optional[int]:
+        """DigiKey reports stock as a number, Mouser as text such as '1,234 In Stock'."""
+        if isinstance(quantity_available, int):
+            return quantity_available
+        digits = re.sub(r'[^0-9]', '', str(quantity_available or ''))
+        return int(digits) if digits else None
+
+    def _build_supplier_offer(self, supplier: str, raw_part: Dict[str, Any], mapper: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "supplier": supplier,
+            "supplier_part_number": self._get_nested_value(raw_part, mapper['supplier_part_number']),
+            "quantity_available": self._parse_stock(self._get_nested_value(raw_part, mapper['quantity_available'])),
+            "price_breaks": self._parse_price_breaks(self._get_nested_value(raw_part, mapper['pricing_list'])),
+        }
+
     def _get_category_path_from_object(self, category_obj: Optional[Dict[str, Any]]) -> List[str]:
         if not isinstance(category_obj, dict): return []
         name = category_obj.get("Name", "")
@@ -37,7 +75,7 @@ class ComponentProcessor:
         if not children: return [name]
         return [name] + self._get_category_path_from_object(children[0])
 
-    def _apply_formatting_recipes(self, part_data: Dict[str, Any], category_details: Dict[str, Any], category_path: List[str]) -> Dict[str, Any]:
+    def _apply_formatting_recipes(self, part_data: Dict[str, Any], category_details: Optional[Dict[str, Any]], category_path: List[str]) -> Dict[str, Any]:
         params = part_data.get("parameters_list", [])
         def find_param(*param_names):
             return self._find_param_in_list(params, *param_names)
@@ -61,23 +99,34 @@ class ComponentProcessor:
             part_data["component_value"] = part_data.get("manufacturer_part_number")
         return part_data
 
-    def _process_and_format_data(self, raw_part: Dict[str, Any], mapper: Dict[str, Any], category_id: int) -> Optional[Dict[str, Any]]:
-        part_data = {std_field: self._get_nested_value(raw_part, sup_field) for std_field, sup_field in mapper.items()}
-        part_data['category_id'] = category_id
-        
-        category_details = self.db_manager.get_category_details(category_id)
-        if not category_details:
-            log.error(f"Could not find details for category_id {category_id}")
-            return None
+    # --- Transformation steps without database access, shared with the async engine (async_pipeline.py) ---
+    def category_candidates(self, digikey_raw: Optional[Dict[str, Any]], mouser_raw: Optional[Dict[str, Any]]) -> List[tuple]:
+        """(supplier, supplier category) pairs to resolve through category_mappings, DigiKey first."""
+        candidates = []
+        if digikey_raw:
+            dk_cat_obj = self._get_nested_value(digikey_raw, "ChildCategories")
+            dk_cat_name = self._get_nested_value(dk_cat_obj, "Name")
+            if dk_cat_name:
+                candidates.append(("DigiKey", dk_cat_name))
+        if mouser_raw:
+            mouser_cat_name = self._get_nested_value(mouser_raw, config.MOUSER_MAPPER['supplier_category'])
+            if mouser_cat_name:
+                candidates.append(("Mouser", mouser_cat_name))
+        return candidates
 
-        parent_details = self.db_manager.get_category_details(category_details['parent_id']) if category_details.get('parent_id') else None
-        full_prefix = category_details['prefix']
+    def internal_id_prefix(self, category_details: Dict[str, Any], parent_details: Optional[Dict[str, Any]]) -> str:
         if parent_details:
-            full_prefix = f"{parent_details['prefix']}-{full_prefix}"
-        part_data['internal_part_id'] = self.db_manager.get_next_internal_part_id(full_prefix)
+            return f"{parent_details['prefix']}-{category_details['prefix']}"
+        return category_details['prefix']
+
+    def format_part(self, raw_part: Dict[str, Any], mapper: Dict[str, Any], category_id: int, internal_part_id: str) -> Dict[str, Any]:
+        """Maps one supplier record onto the components columns."""
+        part_data = {std_field: self._get_nested_value(raw_part, sup_field) for std_field, sup_field in mapper.items()}
+        part_data['category_id'] = category_id
+        part_data['internal_part_id'] = internal_part_id
 
         category_path = self._get_category_path_from_object(part_data.get("supplier_category_object"))
-        part_data = self._apply_formatting_recipes(part_data, category_details, category_path)
+        part_data = self._apply_formatting_recipes(part_data, None, category_path)
 
         part_data["rohs_status"] = self._normalize_rohs_status(part_data.get("rohs_status"))
         price_breaks = []
@@ -91,6 +140,7 @@ class ComponentProcessor:
         
         params_list = part_data.get("parameters_list", [])
         part_data["package_case"] = self._find_param_in_list(params_list, "Package / Case")
+        part_data["pin_count"] = self._parse_pin_count(params_list, part_data["package_case"])
         
         mount_type = self._find_param_in_list(params_list, "Mounting Type")
         part_data["mounting_type"] = None
@@ -116,6 +166,36 @@ class ComponentProcessor:
         
         return part_data
 
+    def merge_suppliers(self, final_data: Dict[str, Any], digikey_raw: Optional[Dict[str, Any]], mouser_raw: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Renames the generic supplier keys and merges the secondary supplier's references and offer."""
+        base_raw_data = digikey_raw if digikey_raw else mouser_raw
+        base_mapper = config.DIGIKEY_MAPPER if digikey_raw else config.MOUSER_MAPPER
+        final_data['supplier_1'] = "DigiKey" if digikey_raw else "Mouser"
+        # Per-supplier stock and price tiers; 'fetch' stores them in 'component_stock' and 'price_breaks'.
+        final_data['supplier_offers'] = [self._build_supplier_offer(final_data['supplier_1'], base_raw_data, base_mapper)]
+        final_data['supplier_part_number_1'] = final_data.pop('supplier_part_number', None)
+        final_data['supplier_product_url_1'] = final_data.pop('supplier_product_url', None)
+        
+        secondary_raw = mouser_raw if digikey_raw and mouser_raw else None
+        if secondary_raw:
+            final_data['supplier_2'] = "Mouser"
+            final_data['supplier_part_number_2'] = self._get_nested_value(secondary_raw, config.MOUSER_MAPPER['supplier_part_number'])
+            final_data['supplier_product_url_2'] = self._get_nested_value(secondary_raw, config.MOUSER_MAPPER['supplier_product_url'])
+            final_data['supplier_offers'].append(self._build_supplier_offer("Mouser", secondary_raw, config.MOUSER_MAPPER))
+
+        return [final_data]
+
+    # --- Synchronous orchestration ---
+    def _process_and_format_data(self, raw_part: Dict[str, Any], mapper: Dict[str, Any], category_id: int) -> Optional[Dict[str, Any]]:
+        category_details = self.db_manager.get_category_details(category_id)
+        if not category_details:
+            log.error(f"Could not find details for category_id {category_id}")
+            return None
+
+        parent_details = self.db_manager.get_category_details(category_details['parent_id']) if category_details.get('parent_id') else None
+        internal_part_id = self.db_manager.get_next_internal_part_id(self.internal_id_prefix(category_details, parent_details))
+        return self.format_part(raw_part, mapper, category_id, internal_part_id)
+
     def fetch_part_data(self, part_number: str) -> Optional[List[Dict[str, Any]]]:
         log.info(f"Orchestrator: Starting search for '{part_number}'...")
 
@@ -127,25 +207,19 @@ class ComponentProcessor:
             return None
 
         # Step 1: Find a valid Category ID, prioritizing DigiKey
+        candidates = self.category_candidates(digikey_raw, mouser_raw)
         category_id = None
-        dk_cat_name, mouser_cat_name = None, None
-
-        if digikey_raw:
-            dk_cat_obj = self._get_nested_value(digikey_raw, "ChildCategories")
-            dk_cat_name = self._get_nested_value(dk_cat_obj, "Name")
-            if dk_cat_name:
-                category_id = self.db_manager.get_category_id("DigiKey", dk_cat_name)
-
-        if not category_id and mouser_raw:
-            mouser_cat_name = self._get_nested_value(mouser_raw, config.MOUSER_MAPPER['supplier_category'])
-            if mouser_cat_name:
+        for supplier, supplier_category in candidates:
+            if supplier == "Mouser":
                 log.info("Borrowing category from Mouser...")
-                category_id = self.db_manager.get_category_id("Mouser", mouser_cat_name)
+            category_id = self.db_manager.get_category_id(supplier, supplier_category)
+            if category_id:
+                break
 
         if not category_id:
             log.warning(f"No valid category mapping found for '{part_number}'. Logging for review.")
-            if dk_cat_name: self.db_manager.add_unmapped_category("DigiKey", dk_cat_name)
-            if mouser_cat_name: self.db_manager.add_unmapped_category("Mouser", mouser_cat_name)
+            for supplier, supplier_category in candidates:
+                self.db_manager.add_unmapped_category(supplier, supplier_category)
             return None
 
         # Step 2: Process the data, ALWAYS prioritizing DigiKey's raw data if it exists
@@ -159,14 +233,4 @@ class ComponentProcessor:
             return None
 
         # Step 3: Rename generic keys and merge supplier-specific info
-        final_data['supplier_1'] = "DigiKey" if digikey_raw else "Mouser"
-        final_data['supplier_part_number_1'] = final_data.pop('supplier_part_number', None)
-        final_data['supplier_product_url_1'] = final_data.pop('supplier_product_url', None)
-        
-        secondary_raw = mouser_raw if digikey_raw and mouser_raw else None
-        if secondary_raw:
-            final_data['supplier_2'] = "Mouser"
-            final_data['supplier_part_number_2'] = self._get_nested_value(secondary_raw, config.MOUSER_MAPPER['supplier_part_number'])
-            final_data['supplier_product_url_2'] = self._get_nested_value(secondary_raw, config.MOUSER_MAPPER['supplier_product_url'])
-
-        return [final_data]
\ No newline at end of file
+        return self.merge_suppliers(final_data, digikey_raw, mouser_raw)
@@ -0,0 +1,184 @@
+"""
+Local, content-addressed mirror of component datasheets.
+
+Datasheets are downloaded by a bounded thread pool, with a separate limit on the
+requests in flight per host so one vendor site is never hammered. Files are
+stored under their SHA-256 (<root>/ab/cd/<sha256>.pdf), so a datasheet shared by
+a whole part family is kept once however many URLs point at it. The ETag and
+Last-Modified of every download are kept so later runs revalidate with
+conditional requests and only transfer datasheets that changed.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+import requests
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MIRROR_DIR = Path.home() / ".kipipe" / "datasheets"
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 2
+USER_AGENT = "kipipe-datasheet-mirror"
+CHUNK_SIZE = 1 << 16
+
+class KnownDatasheet(NamedTuple):
+    """What a previous run recorded for a URL."""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    sha256: Optional[str]
+    local_path: Optional[str]
+    content_type: Optional[str] = None
+    size_bytes: Optional[int] = None
+    fetched_at: Optional[datetime] = None
+
+class MirrorResult(NamedTuple):
+    url: str
+    status: str  # 'downloaded', 'not_modified' or 'failed'
+    sha256: Optional[str] = None
+    local_path: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_type: Optional[str] = None
+    size_bytes: Optional[int] = None
+    http_status: Optional[int] = None
+    error: Optional[str] = None
+    fetched_at: Optional[datetime] = None  # when the stored copy was downloaded, for results that keep one
+
+    def as_row(self) -> Dict[str, object]:
+        """The 'datasheet_mirror' row for this result."""
+        now = datetime.now(timezone.utc)
+        return {
+            "url": self.url, "sha256": self.sha256, "local_path": self.local_path, "etag": self.etag,
+            "last_modified": self.last_modified, "content_type": self.content_type, "size_bytes": self.size_bytes,
+            "status": "failed" if self.status == "failed" else "ok", "http_status": self.http_status,
+            "last_error": self.error, "checked_at": now, "fetched_at": now if self.status == "downloaded" else self.fetched_at,
+        }
+
+def mirror_directory() -> Path:
+    return Path(os.getenv("KIPIPE_DATASHEET_DIR", DEFAULT_MIRROR_DIR))
+
+def normalize_url(url: str) -> str:
+    """Supplier APIs sometimes return protocol-relative URLs ('//www.ti.com/...')."""
+    url = url.strip()
+    return "https:" + url if url.startswith("//") else url
+
+def content_path(root: Path, sha256: str, suffix: str) -> Path:
+    return root / sha256[:2] / sha256[2:4] / f"{sha256}{suffix}"
+
+def _suffix_for(head: bytes, content_type: Optional[str], url: str) -> str:
+    if head.startswith(b"%PDF"):
+        return ".pdf"
+    if content_type and "html" in content_type:
+        return ".html"
+    return Path(urlsplit(url).path).suffix.lower()[:8] or ".bin"
+
+def interleave_by_host(urls: Iterable[str]) -> List[str]:
+    """Orders URLs round-robin over their hosts, so workers are not all queued behind one host's limit."""
+    queues = defaultdict(deque)
+    for url in urls:
+        queues[urlsplit(normalize_url(url)).netloc].append(url)
+    ordered = []
+    while queues:
+        for host in list(queues):
+            ordered.append(queues[host].popleft())
+            if not queues[host]:
+                del queues[host]
+    return ordered
+
+class DatasheetMirror:
+    """Downloads datasheets into a content-addressed directory."""
+
+    def __init__(self, root: Optional[Path] = None, workers: int = DEFAULT_WORKERS, per_host: int = DEFAULT_PER_HOST,
+                 timeout: float = 60.0):
+        self.root = Path(root or mirror_directory())
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # Sessions are not safe to share between threads; each worker keeps its own connection pool.
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+            self._local.session.headers["User-Agent"] = USER_AGENT
+        return self._local.session
+
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def mirror(self, urls: Iterable[str], known: Optional[Dict[str, KnownDatasheet]] = None) -> Iterator[MirrorResult]:
+        """Fetches every URL, yielding results as they complete."""
+        known = known or {}
+        (self.root / "tmp").mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="datasheet") as pool:
+            futures = [pool.submit(self.fetch, url, known.get(url)) for url in interleave_by_host(urls)]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def fetch(self, url: str, known: Optional[KnownDatasheet] = None) -> MirrorResult:
+        target = normalize_url(url)
+        headers = {}
+        # Only revalidate while the local copy still exists; otherwise download it again.
+        if known and known.local_path and Path(known.local_path).is_file():
+            if known.etag:
+                headers["If-None-Match"] = known.etag
+            if known.last_modified:
+                headers["If-Modified-Since"] = known.last_modified
+        try:
+            with self._host_limit(urlsplit(target).netloc):
+                with self._session().get(target, headers=headers, timeout=self.timeout, stream=True) as resp:
+                    if resp.status_code == 304:
+                        return MirrorResult(url, "not_modified", known.sha256, known.local_path, known.etag,
+                                            known.last_modified, known.content_type, known.size_bytes, 304,
+                                            fetched_at=known.fetched_at)
+                    resp.raise_for_status()
+                    return self._store(url, resp)
+        except (requests.RequestException, OSError) as error:
+            log.warning(f"Could not mirror '{url}': {error}")
+            status = getattr(getattr(error, "response", None), "status_code", None)
+            if known:
+                # Keep pointing at the copy we have; that is what the mirror is for.
+                return MirrorResult(url, "failed", known.sha256, known.local_path, known.etag, known.last_modified,
+                                    known.content_type, known.size_bytes, status, str(error), known.fetched_at)
+            return MirrorResult(url, "failed", http_status=status, error=str(error))
+
+    def _store(self, url: str, resp: requests.Response) -> MirrorResult:
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        fd, tmp_name = tempfile.mkstemp(dir=self.root / "tmp", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    if not head:
+                        head = chunk[:8]
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            sha256 = digest.hexdigest()
+            content_type = resp.headers.get("Content-Type")
+            path = content_path(self.root, sha256, _suffix_for(head, content_type, url))
+            if path.exists():
+                os.unlink(tmp_name)  # the same document is already mirrored under another URL
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return MirrorResult(url, "downloaded", sha256, str(path), resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                            content_type, size, resp.status_code)
@@ -1,62 +1,218 @@
 import os
+import re
+import time
+import hashlib
+import uuid
 import logging
+import threading
 import psycopg2
 from contextlib import contextmanager
+from functools import lru_cache
 from psycopg2 import pool
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
-from typing import Dict, Any, Iterator, Optional, Tuple, List
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple, List
+from .query_stats import query_stats
 
 log = logging.getLogger(__name__)
 
+class _PreparingConnection(psycopg2.extensions.connection):
+    """A pooled connection that remembers which server-side prepared statements it holds."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+@lru_cache(maxsize=64)
+def _upsert_query_for(table_name: str, columns: Tuple[str, ...], pk_column: str, positional: bool = False) -> str:
+    """
+    Builds (once per table and column set) the upsert text. Named %(col)s placeholders
+    are used for client-side execution, $n placeholders for PREPARE.
+    """
+    quoted_columns = ", ".join(f'"{col}"' for col in columns)
+    if positional:
+        placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+    else:
+        placeholders = ", ".join(f"%({col})s" for col in columns)
+    update_columns = [col for col in columns if col != pk_column]
+    update_assignments = ", ".join([f'"{col}" = EXCLUDED."{col}"' for col in update_columns])
+
+    return f"""
+        INSERT INTO {table_name} ({quoted_columns})
+        VALUES ({placeholders})
+        ON CONFLICT ({pk_column}) DO UPDATE SET
+            {update_assignments},
+            lastupdated = NOW();
+    """
+
 class DatabaseManager:
-    def __init__(self):
+    # Optional streaming-replica pool for read-only calls; see get_connection().
+    replica_pool = None
+
+    # Fixed per-part queries, run as server-side prepared statements (see _execute_prepared).
+    PREPARED_STATEMENTS = {
+        "kipipe_get_category_id":
+            "SELECT category_id FROM category_mappings WHERE supplier_name = $1 AND supplier_category = $2",
+        "kipipe_get_category_details":
+            "SELECT parent_id, category_name, category_prefix FROM categories WHERE category_id = $1",
+        "kipipe_get_last_internal_part_id":
+            "SELECT internal_part_id FROM components WHERE internal_part_id LIKE $1 ORDER BY internal_part_id DESC LIMIT 1",
+        "kipipe_get_component_symbol_info":
+            "SELECT description, kicad_symbol FROM components WHERE manufacturer_part_number = $1",
+        "kipipe_get_component_pin_count":
+            "SELECT pin_count FROM components WHERE manufacturer_part_number = $1",
+        "kipipe_get_component_footprint_info":
+            "SELECT description, kicad_footprint FROM components WHERE manufacturer_part_number = $1",
+        "kipipe_link_kicad_symbol":
+            "UPDATE components SET kicad_symbol = $1, lastupdated = NOW() WHERE manufacturer_part_number = $2",
+        "kipipe_link_kicad_footprint":
+            "UPDATE components SET kicad_footprint = $1, lastupdated = NOW() WHERE manufacturer_part_number = $2",
+    }
+
+    def __init__(self, replica_dsn: Optional[str] = None):
         load_dotenv()
         self.connection_pool = None
+        # Per-thread state: read_your_writes() pins only the calling thread's reads,
+        # not those of the background threads sharing the manager.
+        self._thread_state = threading.local()
+        # Threaded pools: background threads (the worker's lease heartbeat) share the manager.
         try:
-            self.connection_pool = pool.SimpleConnectionPool(
+            self.connection_pool = pool.ThreadedConnectionPool(
                 minconn=1, maxconn=5,
                 host=os.getenv('DB_HOST'),
                 port=os.getenv('DB_PORT'),
                 dbname=os.getenv('DB_NAME'),
                 user=os.getenv('DB_USER'),
-                password=os.getenv('DB_PASSWORD')
+                password=os.getenv('DB_PASSWORD'),
+                connection_factory=_PreparingConnection
             )
             log.info("Database connection pool created successfully.")
         except (Exception, psycopg2.DatabaseError) as error:
             log.critical(f"Fatal error: Could not create connection pool: {error}")
 
+        replica_dsn = replica_dsn or os.getenv('DB_REPLICA_DSN')
+        if replica_dsn and self.connection_pool:
+            try:
+                self.replica_pool = pool.ThreadedConnectionPool(
+                    minconn=1, maxconn=5, dsn=replica_dsn, connection_factory=_PreparingConnection
+                )
+                log.info("Read-replica connection pool created successfully.")
+            except (Exception, psycopg2.DatabaseError) as error:
+                log.warning(f"Could not create read-replica pool, all reads will use the primary: {error}")
+
     @contextmanager
-    def get_connection(self) -> Iterator[psycopg2.extensions.connection]:
+    def get_connection(self, readonly: bool = False) -> Iterator[psycopg2.extensions.connection]:
+        """
+        Borrows a pooled connection. Read-only callers are given a replica connection
+        when a replica is configured and reads are not pinned to the primary; if the
+        replica pool cannot hand one out, the primary is used instead.
+        """
         if not self.connection_pool:
             raise IOError("Connection pool is not available.")
-        conn = self.connection_pool.getconn()
+        source_pool, conn = self.connection_pool, None
+        if readonly and self.replica_pool and not self._primary_pinned:
+            try:
+                conn = self.replica_pool.getconn()
+                source_pool = self.replica_pool
+            except (Exception, psycopg2.DatabaseError) as error:
+                log.warning(f"Read replica unavailable, falling back to primary: {error}")
+        if conn is None:
+            conn = self.connection_pool.getconn()
         try:
             yield conn
         finally:
             if conn:
-                self.connection_pool.putconn(conn)
+                source_pool.putconn(conn, close=bool(conn.closed))
 
-    def _build_upsert_query(self, table_name: str, data: Dict[str, Any], pk_column: str) -> str:
-        columns = data.keys()
-        quoted_columns = ", ".join(f'"{col}"' for col in columns)
-        placeholders = ", ".join(f"%({col})s" for col in columns)
-        update_columns = [col for col in columns if col != pk_column]
-        update_assignments = ", ".join([f'"{col}" = EXCLUDED."{col}"' for col in update_columns])
-        
-        return f"""
-            INSERT INTO {table_name} ({quoted_columns})
-            VALUES ({placeholders})
-            ON CONFLICT ({pk_column}) DO UPDATE SET
-                {update_assignments},
-                lastupdated = NOW();
+    @property
+    def _primary_pinned(self) -> bool:
+        return getattr(self._thread_state, "primary_pinned", False)
+
+    @contextmanager
+    def read_your_writes(self):
+        """
+        Pins every read the calling thread makes inside the block to the primary, so
+        it observes writes made just before. Other threads keep reading from the replica.
+        """
+        previous = self._primary_pinned
+        self._thread_state.primary_pinned = True
+        try:
+            yield self
+        finally:
+            self._thread_state.primary_pinned = previous
+
+    def _run_read(self, sql: str, params=None, fetch_one: bool = False, use_primary: bool = False):
+        """
+        Runs a read-only query, preferring the replica. A connection-level failure on
+        the replica is retried once on the primary; other errors propagate to the caller.
         """
+        use_replica = bool(self.replica_pool) and not self._primary_pinned and not use_primary
+        for readonly in ((True, False) if use_replica else (False,)):
+            try:
+                with self.get_connection(readonly=readonly) as conn:
+                    with conn.cursor() as cur:
+                        self._execute(cur, sql, params)
+                        return cur.fetchone() if fetch_one else cur.fetchall()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as error:
+                if not readonly:
+                    raise
+                log.warning(f"Read on replica failed, retrying on primary: {error}")
+
+    def _execute(self, cur, sql: str, params=None, label: Optional[str] = None):
+        """
+        The single execution path for every statement. Times the call and records
+        it, with the rows it returned or affected, in the shared query statistics
+        (under `label` when given, e.g. the original text of a prepared statement).
+        """
+        start = time.perf_counter()
+        try:
+            cur.execute(sql, params)
+        finally:
+            rows = cur.rowcount if isinstance(cur.rowcount, int) and cur.rowcount > 0 else 0
+            query_stats.record(label or sql, time.perf_counter() - start, rows)
+
+    def _execute_values(self, cur, sql: str, values: List[tuple], page_size: int = 1000):
+        """Multi-row variant of _execute(): runs execute_values and records it as one statement."""
+        start = time.perf_counter()
+        try:
+            execute_values(cur, sql, values, page_size=page_size)
+        finally:
+            query_stats.record(sql, time.perf_counter() - start, len(values))
+
+    def _execute_prepared(self, cur, name: str, sql: str, params: tuple):
+        """
+        Executes a fixed statement as a named server-side prepared statement. Each pooled
+        connection PREPAREs it on first use, so later calls skip parsing and planning.
+        """
+        prepared = cur.connection.prepared_statements
+        if name not in prepared:
+            # The statement may survive from an earlier transaction we lost track of.
+            self._execute(cur, "SELECT 1 FROM pg_prepared_statements WHERE name = %s", (name,))
+            if not cur.fetchone():
+                self._execute(cur, f"PREPARE {name} AS {sql}")
+            prepared.add(name)
+        placeholders = ", ".join(["%s"] * len(params))
+        try:
+            self._execute(cur, f"EXECUTE {name} ({placeholders})" if params else f"EXECUTE {name}", params, label=sql)
+        except Exception:
+            prepared.discard(name)
+            raise
+
+    def _run_prepared(self, name: str, params: tuple, fetch_one: bool = True):
+        """Runs one of PREPARED_STATEMENTS on the primary and returns its first row (or all rows)."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                self._execute_prepared(cur, name, self.PREPARED_STATEMENTS[name], params)
+                return cur.fetchone() if fetch_one else cur.fetchall()
+
+    def _build_upsert_query(self, table_name: str, data: Dict[str, Any], pk_column: str) -> str:
+        return _upsert_query_for(table_name, tuple(data.keys()), pk_column)
 
     def upsert_data(self, table_name: str, pk_column: str, data: Dict[str, Any]):
         sql = self._build_upsert_query(table_name, data, pk_column)
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(sql, data)
+                    self._execute(cur, sql, data)
                 conn.commit()
             log.info(f"Successfully upserted record into '{table_name}' with PK: {data.get(pk_column)}")
         except (Exception, psycopg2.DatabaseError) as error:
@@ -64,49 +220,197 @@ class DatabaseManager:
             if 'conn' in locals() and conn:
                 conn.rollback()
 
-    def get_category_id(self, supplier_name: str, supplier_category: str) -> Optional[int]:
-        """Finds the internal category_id from the mappings table."""
-        sql = "SELECT category_id FROM category_mappings WHERE supplier_name = %s AND supplier_category = %s"
+    def upsert_many(self, table_name: str, rows: List[Dict[str, Any]], conflict_columns: Tuple[str, ...],
+                    page_size: int = 1000) -> bool:
+        """
+        Upserts many rows (dicts sharing the same keys) with multi-row INSERTs in a
+        single transaction. Rows that hit the conflict key update every other column.
+        """
+        if not rows:
+            return True
+        columns = list(rows[0].keys())
+        quoted_columns = ", ".join(f'"{col}"' for col in columns)
+        update_columns = [col for col in columns if col not in conflict_columns]
+        if update_columns:
+            action = "DO UPDATE SET " + ", ".join(f'"{col}" = EXCLUDED."{col}"' for col in update_columns)
+        else:
+            action = "DO NOTHING"
+        sql = f"INSERT INTO {table_name} ({quoted_columns}) VALUES %s ON CONFLICT ({', '.join(conflict_columns)}) {action}"
+        values = [tuple(row.get(col) for col in columns) for row in rows]
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    self._execute_values(cur, sql, values, page_size=page_size)
+                conn.commit()
+            return True
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Database bulk upsert error in table '{table_name}': {error}")
+            if 'conn' in locals() and conn:
+                conn.rollback()
+            return False
+
+    def upsert_component(self, data: Dict[str, Any]) -> bool:
+        """
+        Upserts one row into 'components' through a prepared statement. The statement
+        text and name are derived once per column set, so a bulk fetch plans it once.
+        """
+        columns = tuple(data.keys())
+        sql = _upsert_query_for("components", columns, "manufacturer_part_number", positional=True)
+        name = "kipipe_upsert_components_" + hashlib.sha1(",".join(columns).encode()).hexdigest()[:12]
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    self._execute_prepared(cur, name, sql, tuple(data[col] for col in columns))
+                conn.commit()
+            log.info(f"Successfully upserted record into 'components' with PK: {data.get('manufacturer_part_number')}")
+            return True
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Database upsert error for PK '{data.get('manufacturer_part_number')}' in table 'components': {error}")
+            if 'conn' in locals() and conn:
+                conn.rollback()
+            return False
+
+    def replace_supplier_offers(self, part_number: str, offers: List[Dict[str, Any]]) -> bool:
+        """
+        Replaces the price tiers and stock of each supplier in 'offers' for one part,
+        in a single transaction. Each offer is a dict with 'supplier',
+        'supplier_part_number', 'quantity_available' and 'price_breaks' [(min_qty, unit_price)].
+        """
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(sql, (supplier_name, supplier_category))
-                    result = cur.fetchone()
-                    return result[0] if result else None
+                    for offer in offers:
+                        supplier = offer["supplier"]
+                        self._execute(cur, "DELETE FROM price_breaks WHERE manufacturer_part_number = %s AND supplier = %s",
+                                      (part_number, supplier))
+                        tiers = [(part_number, supplier, qty, price) for qty, price in offer.get("price_breaks") or []]
+                        if tiers:
+                            self._execute_values(cur, "INSERT INTO price_breaks (manufacturer_part_number, supplier, min_quantity, unit_price) "
+                                                      "VALUES %s ON CONFLICT DO NOTHING", tiers)
+                        self._execute(cur, """
+                            INSERT INTO component_stock (manufacturer_part_number, supplier, supplier_part_number, quantity_available)
+                            VALUES (%s, %s, %s, %s)
+                            ON CONFLICT (manufacturer_part_number, supplier) DO UPDATE SET
+                                supplier_part_number = EXCLUDED.supplier_part_number,
+                                quantity_available = EXCLUDED.quantity_available,
+                                lastupdated = NOW()
+                        """, (part_number, supplier, offer.get("supplier_part_number"), offer.get("quantity_available")))
+                conn.commit()
+            return True
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Error storing supplier offers for {part_number}: {error}")
+            if 'conn' in locals() and conn:
+                conn.rollback()
+            return False
+
+    def get_price_tiers(self, part_numbers: List[str]) -> List[tuple]:
+        """
+        Returns (manufacturer_part_number, supplier, min_quantity, unit_price, quantity_available)
+        for every price tier of the given parts, in one query.
+        """
+        sql = """
+            SELECT pb.manufacturer_part_number, pb.supplier, pb.min_quantity, pb.unit_price::float8, cs.quantity_available
+            FROM price_breaks pb
+            LEFT JOIN component_stock cs
+              ON cs.manufacturer_part_number = pb.manufacturer_part_number AND cs.supplier = pb.supplier
+            WHERE pb.manufacturer_part_number = ANY(%s)
+        """
+        return self.fetch_all(sql, (list(part_numbers),))
+
+    def touch_bom(self, file_hash: str) -> Optional[int]:
+        """Marks an already registered BOM as used again. Returns its bom_id, or None if the content is new."""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    self._execute(cur, "UPDATE boms SET last_used_at = NOW() WHERE file_hash = %s RETURNING bom_id", (file_hash,))
+                    row = cur.fetchone()
+                conn.commit()
+            return row[0] if row else None
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Error looking up BOM {file_hash[:12]}: {error}")
+            if 'conn' in locals() and conn:
+                conn.rollback()
+            return None
+
+    def insert_bom(self, name: str, file_path: str, file_hash: str, source: str, lines: List[tuple]) -> Optional[int]:
+        """
+        Registers a BOM and its lines [(manufacturer_part_number, quantity, reference_designators)]
+        in one transaction. If the same content was registered concurrently, that bom_id is returned.
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    self._execute(cur, """
+                        INSERT INTO boms (name, file_path, file_hash, source, line_count)
+                        VALUES (%s, %s, %s, %s, %s)
+                        ON CONFLICT (file_hash) DO NOTHING
+                        RETURNING bom_id
+                    """, (name, file_path, file_hash, source, len(lines)))
+                    row = cur.fetchone()
+                    if row:
+                        bom_id = row[0]
+                        if lines:
+                            self._execute_values(cur, "INSERT INTO bom_lines (bom_id, manufacturer_part_number, quantity, reference_designators) VALUES %s",
+                                                 [(bom_id, *line) for line in lines])
+                    else:
+                        self._execute(cur, "SELECT bom_id FROM boms WHERE file_hash = %s", (file_hash,))
+                        bom_id = cur.fetchone()[0]
+                conn.commit()
+            return bom_id
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Error registering BOM '{name}': {error}")
+            if 'conn' in locals() and conn:
+                conn.rollback()
+            return None
+
+    def update_component_link(self, part_number: str, link_column: str, link: Optional[str]) -> bool:
+        """Sets 'kicad_symbol' or 'kicad_footprint' on a component via a prepared statement."""
+        name = f"kipipe_link_{link_column}"
+        if name not in self.PREPARED_STATEMENTS:
+            raise ValueError(f"Unsupported link column: '{link_column}'")
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    self._execute_prepared(cur, name, self.PREPARED_STATEMENTS[name], (link, part_number))
+                conn.commit()
+            return True
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Error updating {link_column} for {part_number}: {error}")
+            if 'conn' in locals() and conn:
+                conn.rollback()
+            return False
+
+    def get_category_id(self, supplier_name: str, supplier_category: str) -> Optional[int]:
+        """Finds the internal category_id from the mappings table."""
+        try:
+            result = self._run_prepared("kipipe_get_category_id", (supplier_name, supplier_category))
+            return result[0] if result else None
         except (Exception, psycopg2.DatabaseError) as error:
             log.error(f"Error fetching category_id: {error}")
             return None
 
     def get_category_details(self, category_id: int) -> Optional[Dict[str, Any]]:
         """Gets category details (parent_id, name, prefix) from the master categories table."""
-        sql = "SELECT parent_id, category_name, category_prefix FROM categories WHERE category_id = %s"
         try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(sql, (category_id,))
-                    result = cur.fetchone()
-                    if result:
-                        return {"parent_id": result[0], "name": result[1], "prefix": result[2]}
-                    return None
+            result = self._run_prepared("kipipe_get_category_details", (category_id,))
+            if result:
+                return {"parent_id": result[0], "name": result[1], "prefix": result[2]}
+            return None
         except (Exception, psycopg2.DatabaseError) as error:
             log.error(f"Error fetching category details for id {category_id}: {error}")
             return None
 
     def get_next_internal_part_id(self, prefix: str) -> str:
         """Generates the next sequential internal_part_id for a given prefix."""
-        sql = "SELECT internal_part_id FROM components WHERE internal_part_id LIKE %s ORDER BY internal_part_id DESC LIMIT 1"
         like_pattern = f"{prefix}-%"
         try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(sql, (like_pattern,))
-                    last_id = cur.fetchone()
-                    if last_id:
-                        last_seq = int(last_id[0].split('-')[-1])
-                        next_seq = last_seq + 1
-                    else:
-                        next_seq = 1
-                    return f"{prefix}-{next_seq:04d}" # Formats to 4 digits, e.g., 0001
+            last_id = self._run_prepared("kipipe_get_last_internal_part_id", (like_pattern,))
+            if last_id:
+                last_seq = int(last_id[0].split('-')[-1])
+                next_seq = last_seq + 1
+            else:
+                next_seq = 1
+            return f"{prefix}-{next_seq:04d}" # Formats to 4 digits, e.g., 0001
         except (Exception, psycopg2.DatabaseError) as error:
             log.error(f"Error generating next internal_part_id for prefix {prefix}: {error}")
             return f"{prefix}-0001" # Fallback
@@ -115,6 +419,9 @@ class DatabaseManager:
         if self.connection_pool:
             self.connection_pool.closeall()
             log.info("Database connection pool closed.")
+        if self.replica_pool:
+            self.replica_pool.closeall()
+            log.info("Read-replica connection pool closed.")
 
     def add_unmapped_category(self, supplier_name: str, supplier_category: str):
         """Adds a new, unknown category to the unmapped_categories table for review."""
@@ -127,7 +434,7 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(sql, (supplier_name, supplier_category))
+                    self._execute(cur, sql, (supplier_name, supplier_category))
                 conn.commit()
             log.info(f"Logged new unmapped category for review: '{supplier_category}' from {supplier_name}")
         except (Exception, psycopg2.DatabaseError) as error:
@@ -135,23 +442,53 @@ class DatabaseManager:
             if 'conn' in locals() and conn:
                 conn.rollback()
     
-    def fetch_all(self, query: str, params: Optional[tuple] = None) -> List[tuple]:
-        """Fetches all rows from a custom query."""
+    def fetch_all(self, query: str, params: Optional[tuple] = None, use_primary: bool = False) -> List[tuple]:
+        """
+        Fetches all rows from a custom read-only query. Runs on the read replica when
+        one is configured; pass use_primary=True to read your own recent writes.
+        """
         try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(query, params)
-                    return cur.fetchall()
+            return self._run_read(query, params, use_primary=use_primary)
         except (Exception, psycopg2.DatabaseError) as error:
             log.error(f"Error fetching all rows: {error}")
             return []
 
+    def stream_query(self, query: str, params: Optional[tuple] = None, batch_size: int = 5000,
+                     use_primary: bool = False) -> Iterator[List[tuple]]:
+        """
+        Streams the result of a large read-only query in batches through a server-side
+        cursor, so memory stays bounded by batch_size however many rows match.
+        Errors propagate to the caller, since a half-read stream cannot be retried.
+        """
+        with self.get_connection(readonly=not use_primary) as conn:
+            try:
+                with conn.cursor(name=f"kipipe_stream_{uuid.uuid4().hex[:12]}") as cur:
+                    cur.itersize = batch_size
+                    self._execute(cur, query, params)
+                    while True:
+                        rows = cur.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        yield rows
+            finally:
+                conn.rollback()
+
+    def get_table_columns(self, table_name: str) -> List[Tuple[str, str]]:
+        """Returns (column_name, data_type) for a table's stored (non-generated) columns, in table order."""
+        sql = """
+            SELECT column_name, data_type
+            FROM information_schema.columns
+            WHERE table_name = %s AND table_schema = ANY(current_schemas(false)) AND is_generated = 'NEVER'
+            ORDER BY ordinal_position;
+        """
+        return self.fetch_all(sql, (table_name,), use_primary=True)
+
     def execute_query(self, query: str, params: Optional[tuple] = None):
         """Executes a query that does not return data (INSERT, UPDATE, DELETE)."""
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(query, params)
+                    self._execute(cur, query, params)
                 conn.commit()
             return True
         except (Exception, psycopg2.DatabaseError) as error:
@@ -160,14 +497,25 @@ class DatabaseManager:
                 conn.rollback()
             return False
         
-    def get_component_symbol_info(self, part_number: str) -> Optional[tuple]:
-        """Fetches the description and current symbol path for a given part number."""
-        sql = "SELECT description, kicad_symbol FROM components WHERE manufacturer_part_number = %s"
+    def execute_returning(self, query: str, params=None) -> Optional[List[tuple]]:
+        """Executes a data-modifying query with a RETURNING clause and commits. Returns None on error."""
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(sql, (part_number,))
-                    return cur.fetchone()
+                    self._execute(cur, query, params)
+                    rows = cur.fetchall()
+                conn.commit()
+            return rows
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Error executing query: {error}")
+            if 'conn' in locals() and conn:
+                conn.rollback()
+            return None
+
+    def get_component_symbol_info(self, part_number: str) -> Optional[tuple]:
+        """Fetches the description and current symbol path for a given part number."""
+        try:
+            return self._run_prepared("kipipe_get_component_symbol_info", (part_number,))
         except (Exception, psycopg2.DatabaseError) as error:
             log.error(f"Error fetching component info for {part_number}: {error}")
             return None
@@ -182,30 +530,53 @@ class DatabaseManager:
             WHERE comp.manufacturer_part_number = %s;
         """
         try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(sql, (part_number,))
-                    res = cur.fetchone()
-                    if res:
-                        return {"parent_name": res[0], "child_name": res[1], "package_case": res[2]}
+            res = self._run_read(sql, (part_number,), fetch_one=True)
+            if res:
+                return {"parent_name": res[0], "child_name": res[1], "package_case": res[2]}
             return None
         except (Exception, psycopg2.DatabaseError) as error:
             log.error(f"Error fetching component search details for {part_number}: {error}")
             return None
 
+    @staticmethod
+    def _build_prefix_tsquery(terms: Iterable[str], match_all: bool = True) -> Optional[str]:
+        """
+        Builds a to_tsquery() expression that prefix-matches every word of the given terms.
+        Punctuation is split out the same way Postgres tokenizes the indexed text,
+        so 'SOT-23' becomes '(sot:* & 23:*)'. Returns None if no usable words remain.
+        """
+        clauses = []
+        for term in terms:
+            words = re.findall(r'[0-9A-Za-z]+', str(term).lower())
+            if words:
+                clauses.append("(" + " & ".join(f"{w}:*" for w in words) + ")")
+        if not clauses:
+            return None
+        return (" & " if match_all else " | ").join(clauses)
+
+    def search_symbols(self, terms: Iterable[str], limit: Optional[int] = 20, match_all: bool = True) -> List[tuple]:
+        """
+        Ranked full-text search over symbol name, keywords and description.
+        Returns (library_nickname, symbol_name, description, rank) tuples, best match first.
+        """
+        tsquery = self._build_prefix_tsquery(terms, match_all)
+        if not tsquery:
+            return []
+        sql = """
+            SELECT library_nickname, symbol_name, description, ts_rank_cd(search_vector, q) AS rank
+            FROM symbols, to_tsquery('simple', %s) AS q
+            WHERE search_vector @@ q
+            ORDER BY rank DESC, symbol_name
+            LIMIT %s;
+        """
+        return self.fetch_all(sql, (tsquery, limit))
+
     def search_generic_symbols(self, keywords: set) -> List[tuple]:
-        """Searches the symbols table based on a set of keywords."""
+        """Searches the symbols table for any of the given keywords."""
         if not keywords:
             return []
-        try:
-            search_conditions = " OR ".join([f"keywords ILIKE %s" for _ in keywords])
-            query = f"SELECT library_nickname, symbol_name FROM symbols WHERE {search_conditions}"
-            search_terms = [f"%{kw.strip()}%" for kw in keywords]
-            
-            return self.fetch_all(query, tuple(search_terms))
-        except Exception as e:
-            log.error(f"Error during symbol search: {e}")
-            return []
+        results = self.search_symbols(keywords, limit=None, match_all=False)
+        return [(nickname, name) for nickname, name, _, _ in results]
     
     def upsert_symbol(self, symbol_data: dict):
         """Inserts a new symbol or updates an existing one based on symbol_name."""
@@ -221,7 +592,7 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(sql, symbol_data)
+                    self._execute(cur, sql, symbol_data)
                 conn.commit()
             return True
         except (Exception, psycopg2.DatabaseError) as error:
@@ -230,6 +601,95 @@ class DatabaseManager:
                 conn.rollback()
             return False
     
+    def upsert_symbols(self, rows: List[Dict[str, Any]], page_size: int = 1000) -> bool:
+        """
+        Batch form of upsert_symbol through upsert_many. When a symbol name repeats,
+        the last row wins, as it would with one upsert per row.
+        """
+        latest = {row["symbol_name"]: row for row in rows}
+        return self.upsert_many("symbols", list(latest.values()), ("symbol_name",), page_size=page_size)
+
+    def upsert_footprints(self, rows: List[Dict[str, Any]], page_size: int = 1000) -> bool:
+        """
+        Batch upsert of 'footprints' rows keyed by (library_nickname, footprint_name),
+        so libraries can hold footprints of the same name. When a footprint repeats
+        within a library, the last row wins.
+        """
+        latest = {(row["library_nickname"], row["footprint_name"]): row for row in rows}
+        return self.upsert_many("footprints", list(latest.values()), ("library_nickname", "footprint_name"),
+                                page_size=page_size)
+
+    # One statement per library file: the incoming symbols arrive as parallel arrays,
+    # rows are only rewritten when their content hash differs, and the library's
+    # symbols that are not in the file any more are deleted. (xmax = 0) is true for
+    # freshly inserted rows.
+    SYNC_LIBRARY_SYMBOLS = """
+        WITH incoming AS (
+            SELECT * FROM unnest(%(names)s::text[], %(descriptions)s::text[], %(datasheets)s::text[],
+                                 %(keywords)s::text[], %(pin_counts)s::int[], %(unit_counts)s::int[],
+                                 %(is_power)s::boolean[], %(extends)s::text[], %(hashes)s::text[])
+                AS t(symbol_name, description, datasheet, keywords, pin_count, unit_count, is_power, extends, content_hash)
+        ), written AS (
+            INSERT INTO symbols (library_nickname, symbol_name, description, datasheet, keywords,
+                                 pin_count, unit_count, is_power, extends, content_hash)
+            SELECT %(nickname)s, symbol_name, description, datasheet, keywords,
+                   pin_count, unit_count, is_power, extends, content_hash FROM incoming
+            ON CONFLICT (symbol_name) DO UPDATE SET
+                library_nickname = EXCLUDED.library_nickname,
+                description = EXCLUDED.description,
+                datasheet = EXCLUDED.datasheet,
+                keywords = EXCLUDED.keywords,
+                pin_count = EXCLUDED.pin_count,
+                unit_count = EXCLUDED.unit_count,
+                is_power = EXCLUDED.is_power,
+                extends = EXCLUDED.extends,
+                content_hash = EXCLUDED.content_hash
+            WHERE symbols.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+            RETURNING (xmax = 0) AS inserted
+        ), removed AS (
+            DELETE FROM symbols
+            WHERE library_nickname = %(nickname)s AND symbol_name <> ALL(%(names)s::text[])
+            RETURNING 1
+        )
+        SELECT (SELECT COUNT(*) FROM written WHERE inserted),
+               (SELECT COUNT(*) FROM written WHERE NOT inserted),
+               (SELECT COUNT(*) FROM removed)
+    """
+
+    def sync_library_symbols(self, library_nickname: str, rows: List[Dict[str, Any]]) -> Optional[Dict[str, int]]:
+        """
+        Makes the symbols of one library match 'rows' in a single transaction: new
+        symbols are inserted, those whose content_hash changed are updated, and the
+        library's symbols missing from 'rows' are deleted. Returns the inserted,
+        updated, unchanged and removed counts, or None when nothing was written.
+        """
+        latest = list({row["symbol_name"]: row for row in rows}.values())
+        params = {
+            "nickname": library_nickname,
+            "names": [row["symbol_name"] for row in latest],
+            "descriptions": [row["description"] for row in latest],
+            "datasheets": [row["datasheet"] for row in latest],
+            "keywords": [row["keywords"] for row in latest],
+            "pin_counts": [row.get("pin_count") for row in latest],
+            "unit_counts": [row.get("unit_count") for row in latest],
+            "is_power": [bool(row.get("is_power")) for row in latest],
+            "extends": [row.get("extends") for row in latest],
+            "hashes": [row["content_hash"] for row in latest],
+        }
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    self._execute(cur, self.SYNC_LIBRARY_SYMBOLS, params)
+                    inserted, updated, removed = cur.fetchone()
+                conn.commit()
+            return {"inserted": inserted, "updated": updated, "unchanged": len(latest) - inserted - updated,
+                    "removed": removed}
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Database sync error for symbol library '{library_nickname}': {error}")
+            if 'conn' in locals() and conn:
+                conn.rollback()
+            return None
+
     def search_specific_symbol(self, part_number: str) -> List[tuple]:
         """
         Searches the symbols table for names that are a prefix of the given part number,
@@ -248,28 +708,102 @@ class DatabaseManager:
             log.error(f"Error during specific symbol search: {e}")
             return []
 
+    def get_component_pin_count(self, part_number: str) -> Optional[int]:
+        """The package pin count 'fetch' derived from the supplier parameters, or None when unknown."""
+        try:
+            row = self._run_prepared("kipipe_get_component_pin_count", (part_number,))
+            return row[0] if row else None
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Error fetching pin count for {part_number}: {error}")
+            return None
+
     def get_component_footprint_info(self, part_number: str) -> Optional[tuple]:
         """Fetches the description and current footprint path for a given part number."""
-        sql = "SELECT description, kicad_footprint FROM components WHERE manufacturer_part_number = %s"
         try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(sql, (part_number,))
-                    return cur.fetchone()
+            return self._run_prepared("kipipe_get_component_footprint_info", (part_number,))
         except (Exception, psycopg2.DatabaseError) as error:
             log.error(f"Error fetching component footprint info for {part_number}: {error}")
             return None
 
+    def search_footprints(self, terms: Iterable[str], limit: Optional[int] = 20, match_all: bool = True) -> List[tuple]:
+        """
+        Ranked full-text search over footprint name, keywords and description.
+        Returns (library_nickname, footprint_name, description, rank) tuples, best match first.
+        """
+        tsquery = self._build_prefix_tsquery(terms, match_all)
+        if not tsquery:
+            return []
+        sql = """
+            SELECT library_nickname, footprint_name, description, ts_rank_cd(search_vector, q) AS rank
+            FROM footprints, to_tsquery('simple', %s) AS q
+            WHERE search_vector @@ q
+            ORDER BY rank DESC, footprint_name
+            LIMIT %s;
+        """
+        return self.fetch_all(sql, (tsquery, limit))
+
     def search_generic_footprints(self, keywords: set) -> List[tuple]:
-        """Searches the footprints table based on a set of keywords."""
+        """Searches the footprints table for footprints matching all of the given keywords."""
         if not keywords:
             return []
+        results = self.search_footprints(keywords, limit=None, match_all=True)
+        return [(nickname, name) for nickname, name, _, _ in results]
+
+    def create_category_view(self, view_name: str, category_id: int, materialized: bool = True) -> bool:
+        """
+        (Re)creates the read view KiCad's database library queries for one category.
+        Materialized views get a unique index on partid (required for concurrent
+        refresh) plus indexes on the columns KiCad looks parts up by.
+        """
+        # View names are interpolated as identifiers, so only our own generated names are accepted.
+        if not re.fullmatch(r'dbl_[a-z0-9_]+', view_name):
+            raise ValueError(f"Invalid category view name: '{view_name}'")
         try:
-            search_conditions = " AND ".join([f"keywords ILIKE %s" for _ in keywords])
-            query = f"SELECT library_nickname, footprint_name FROM footprints WHERE {search_conditions}"
-            search_terms = [f"%{kw.strip()}%" for kw in keywords]
-            
-            return self.fetch_all(query, tuple(search_terms))
-        except Exception as e:
-            log.error(f"Error during generic footprint search: {e}")
-            return []
\ No newline at end of file
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    self._execute(cur, "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (view_name,))
+                    existing = cur.fetchone()
+                    if existing:
+                        kind = "MATERIALIZED VIEW" if existing[0] == 'm' else "VIEW"
+                        self._execute(cur, f"DROP {kind} {view_name}")
+
+                    kind = "MATERIALIZED VIEW" if materialized else "VIEW"
+                    self._execute(cur, f"CREATE {kind} {view_name} AS SELECT * FROM components WHERE category_id = %s", (category_id,))
+                    if materialized:
+                        self._execute(cur, f"CREATE UNIQUE INDEX {view_name}_partid_idx ON {view_name} (partid)")
+                        self._execute(cur, f"CREATE INDEX {view_name}_ipid_idx ON {view_name} (internal_part_id)")
+                        self._execute(cur, f"CREATE INDEX {view_name}_mpn_idx ON {view_name} (manufacturer_part_number)")
+                conn.commit()
+            return True
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Error creating view '{view_name}' for category {category_id}: {error}")
+            if 'conn' in locals() and conn:
+                conn.rollback()
+            return False
+
+    def refresh_category_views(self, concurrently: bool = True) -> int:
+        """
+        Refreshes every per-category materialized view ('dbl_*'). With concurrently=True
+        KiCad keeps reading the old contents while each view is rebuilt.
+        Returns the number of views refreshed.
+        """
+        list_sql = r"SELECT matviewname FROM pg_matviews WHERE schemaname = ANY(current_schemas(false)) AND matviewname LIKE 'dbl\_%' ORDER BY 1"
+        option = "CONCURRENTLY " if concurrently else ""
+        refreshed = 0
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    self._execute(cur, list_sql)
+                    view_names = [row[0] for row in cur.fetchall()]
+                    for view_name in view_names:
+                        self._execute(cur, f'REFRESH MATERIALIZED VIEW {option}"{view_name}"')
+                        conn.commit()
+                        refreshed += 1
+            if refreshed:
+                log.info(f"Refreshed {refreshed} category views.")
+            return refreshed
+        except (Exception, psycopg2.DatabaseError) as error:
+            log.error(f"Error refreshing category views: {error}")
+            if 'conn' in locals() and conn:
+                conn.rollback()
+            return refreshed
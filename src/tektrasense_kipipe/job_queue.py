@@ -0,0 +1,148 @@
+"""
+Postgres-backed work queue for distributing fetch work across hosts.
+
+Jobs live in the 'jobs' table (Step 11 of create_tables.sql). Workers claim them
+with FOR UPDATE SKIP LOCKED, so concurrent workers never block on or receive the
+same row, and hold each claim under a lease they renew with heartbeats. Every
+state change after the claim is fenced by the lease owner, so a worker that lost
+its lease cannot overwrite the outcome recorded by the worker that took over.
+"""
+import logging
+import os
+import socket
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from .db_manager import DatabaseManager
+
+log = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+ENQUEUE_CHUNK = 1000
+
+class Job(NamedTuple):
+    job_id: int
+    payload: str
+    attempts: int
+    max_attempts: int
+
+_CLAIM_SQL = """
+    UPDATE jobs
+    SET status = 'running', attempts = attempts + 1, lease_owner = %(owner)s,
+        lease_expires_at = NOW() + make_interval(secs => %(lease)s), updated_at = NOW()
+    WHERE job_id IN (
+        SELECT job_id FROM jobs
+        WHERE kind = %(kind)s
+          AND ((status = 'pending' AND run_after <= NOW())
+               OR (status = 'running' AND lease_expires_at < NOW()))
+        ORDER BY run_after, job_id
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING job_id, payload, attempts, max_attempts
+"""
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class JobQueue:
+    """Enqueue, claim, heartbeat and settle jobs of one kind."""
+
+    def __init__(self, db_manager: DatabaseManager, kind: str = "fetch", worker_id: Optional[str] = None,
+                 lease_seconds: int = DEFAULT_LEASE_SECONDS):
+        self.db_manager = db_manager
+        self.kind = kind
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+
+    def enqueue(self, payloads: Iterable[str], bom_id: Optional[int] = None,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """Adds one pending job per payload, skipping payloads that already have an open job. Returns the number added."""
+        payloads = list(dict.fromkeys(p.strip() for p in payloads if p and p.strip()))
+        added = 0
+        for start in range(0, len(payloads), ENQUEUE_CHUNK):
+            chunk = payloads[start:start + ENQUEUE_CHUNK]
+            values = ", ".join(["(%s, %s, %s, %s)"] * len(chunk))
+            params = [value for payload in chunk for value in (self.kind, payload, bom_id, max_attempts)]
+            rows = self.db_manager.execute_returning(f"""
+                INSERT INTO jobs (kind, payload, bom_id, max_attempts) VALUES {values}
+                ON CONFLICT (kind, payload) WHERE status IN ('pending', 'running') DO NOTHING
+                RETURNING job_id
+            """, params)
+            added += len(rows or [])
+        return added
+
+    def claim(self, limit: int = 1) -> List[Job]:
+        """
+        Leases up to 'limit' runnable jobs: pending ones that are due, and running
+        ones whose lease expired. Jobs that already used up their attempts are
+        marked failed instead of being handed out.
+        """
+        rows = self.db_manager.execute_returning(_CLAIM_SQL, {
+            "owner": self.worker_id, "lease": self.lease_seconds, "kind": self.kind, "limit": limit,
+        }) or []
+        jobs = [Job(*row) for row in rows]
+        exhausted = [job for job in jobs if job.attempts > job.max_attempts]
+        for job in exhausted:
+            self._settle(job.job_id, "failed", "Lease expired on the final attempt.")
+        return [job for job in jobs if job.attempts <= job.max_attempts]
+
+    def heartbeat(self, job_ids: List[int]) -> List[int]:
+        """Extends the lease of jobs this worker still owns. Returns the ids whose lease was lost."""
+        if not job_ids:
+            return []
+        rows = self.db_manager.execute_returning("""
+            UPDATE jobs SET lease_expires_at = NOW() + make_interval(secs => %s), updated_at = NOW()
+            WHERE job_id = ANY(%s) AND lease_owner = %s AND status = 'running'
+            RETURNING job_id
+        """, (self.lease_seconds, list(job_ids), self.worker_id))
+        if rows is None:
+            return []
+        kept = {row[0] for row in rows}
+        return [job_id for job_id in job_ids if job_id not in kept]
+
+    def complete(self, job: Job) -> bool:
+        return self._settle(job.job_id, "done")
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Schedules a retry with exponential backoff, or marks the job failed after its last attempt."""
+        if job.attempts >= job.max_attempts:
+            return self._settle(job.job_id, "failed", error)
+        delay = min(RETRY_BASE_SECONDS * 2 ** (job.attempts - 1), RETRY_MAX_SECONDS)
+        rows = self.db_manager.execute_returning("""
+            UPDATE jobs SET status = 'pending', run_after = NOW() + make_interval(secs => %s),
+                            last_error = %s, lease_owner = NULL, lease_expires_at = NULL, updated_at = NOW()
+            WHERE job_id = %s AND lease_owner = %s
+            RETURNING job_id
+        """, (delay, error, job.job_id, self.worker_id))
+        return bool(rows)
+
+    def release(self, jobs: List[Job]) -> int:
+        """Hands claimed but unstarted jobs back to the queue without counting the attempt."""
+        if not jobs:
+            return 0
+        rows = self.db_manager.execute_returning("""
+            UPDATE jobs SET status = 'pending', attempts = attempts - 1, lease_owner = NULL,
+                            lease_expires_at = NULL, updated_at = NOW()
+            WHERE job_id = ANY(%s) AND lease_owner = %s AND status = 'running'
+            RETURNING job_id
+        """, ([job.job_id for job in jobs], self.worker_id))
+        return len(rows or [])
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of jobs per status."""
+        rows = self.db_manager.fetch_all("SELECT status, COUNT(*) FROM jobs WHERE kind = %s GROUP BY status",
+                                         (self.kind,), use_primary=True)
+        return {status: count for status, count in rows}
+
+    def _settle(self, job_id: int, status: str, error: Optional[str] = None) -> bool:
+        rows = self.db_manager.execute_returning("""
+            UPDATE jobs SET status = %s, last_error = COALESCE(%s, last_error), finished_at = NOW(),
+                            lease_owner = NULL, lease_expires_at = NULL, updated_at = NOW()
+            WHERE job_id = %s AND lease_owner = %s
+            RETURNING job_id
+        """, (status, error, job_id, self.worker_id))
+        if not rows:
+            log.warning(f"Job {job_id} was not marked {status}: its lease now belongs to another worker.")
+        return bool(rows)
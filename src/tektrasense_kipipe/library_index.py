@@ -0,0 +1,239 @@
+"""
+On-disk index of the KiCad symbol and footprint libraries below the configured
+search paths, so 'add-symbol' and 'add-footprint' validate a link without
+walking the library trees or reading whole library files.
+
+There is one JSON file per kind in the index directory ($KIPIPE_INDEX_DIR,
+default ~/.kipipe/index). It maps each library nickname to its file (a
+'<Lib>.kicad_sym' file, or a '<Lib>.pretty' directory for footprints), that
+file's mtime, and the names it contains with their byte offsets. A lookup
+stats the one library it needs and re-indexes it only when its mtime has
+changed. An unknown nickname re-scans the search paths, at most once per
+process, and the index is rebuilt when the search paths change.
+"""
+import json
+import logging
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from . import config
+from .sexpr import iter_symbols
+
+log = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = Path.home() / ".kipipe" / "index"
+INDEX_VERSION = 1
+
+def index_directory() -> Path:
+    return Path(os.getenv("KIPIPE_INDEX_DIR", DEFAULT_INDEX_DIR))
+
+class IndexEntry(NamedTuple):
+    path: str  # the .kicad_sym file, or the footprint's own .kicad_mod file
+    offset: int  # byte offset of the '(symbol "Name"' list; 0 for footprints
+    mtime_ns: int  # mtime of the library when it was indexed
+
+def _symbol_offsets(path: Path) -> Dict[str, int]:
+    """Name -> byte offset of each top-level symbol. Sub-unit names ('Name_1_1') never match a top-level name exactly."""
+    names = [symbol.name for symbol in iter_symbols(path)]
+    offsets = {}
+    with open(path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return offsets
+        with buffer:
+            pos = 0
+            for name in names:
+                found = buffer.find(b'(symbol "' + name.encode('utf-8') + b'"', pos)
+                if found < 0:  # written with escapes or unusual spacing; keep the name, offset unknown
+                    offsets[name] = -1
+                    continue
+                offsets[name] = found
+                pos = found + 1
+    return offsets
+
+def _read_names_safely(read_names, path: Path) -> Optional[Dict[str, int]]:
+    """Pool task for LibraryIndex.refresh(): one unreadable library must not fail the others."""
+    try:
+        return read_names(path)
+    except Exception:
+        return None
+
+def _footprint_names(path: Path) -> Dict[str, int]:
+    with os.scandir(path) as entries:
+        return {entry.name[:-len(".kicad_mod")]: 0 for entry in entries if entry.name.endswith(".kicad_mod")}
+
+# kind -> (library suffix, libraries are directories, names in a library, config attribute with the search paths)
+KINDS = {
+    "symbol": (".kicad_sym", False, _symbol_offsets, "SYMBOL_SEARCH_PATHS"),
+    "footprint": (".pretty", True, _footprint_names, "FOOTPRINT_SEARCH_PATHS"),
+}
+
+class LibraryIndex:
+    """The index of one kind of library ('symbol' or 'footprint')."""
+
+    def __init__(self, kind: str, roots: List[str], path: Path):
+        self.kind = kind
+        self.roots = list(roots)
+        self.path = path
+        self._suffix, self._is_dir, self._read_names, _ = KINDS[kind]
+        self.libraries: Dict[str, dict] = {}
+        self._scanned = False
+        self._dirty = False
+        self._load()
+
+    @classmethod
+    def open(cls, kind: str) -> "LibraryIndex":
+        """The shared index for 'kind' over the current search paths, loaded once per process."""
+        roots = tuple(getattr(config, KINDS[kind][3]))
+        path = index_directory() / f"{kind}s.json"
+        key = (kind, roots, str(path))
+        if key not in _open_indexes:
+            _open_indexes[key] = cls(kind, list(roots), path)
+        return _open_indexes[key]
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable library index '{self.path}': {e}")
+            return
+        if data.get("version") == INDEX_VERSION and data.get("roots") == self.roots:
+            self.libraries = data.get("libraries", {})
+        else:
+            log.info(f"The {self.kind} search paths changed; rebuilding the library index.")
+
+    def save(self):
+        """
+        Writes the index if anything changed, through a temporary file of its own so
+        readers never see half of it and concurrent processes never write into each other's.
+        """
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.stem, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": INDEX_VERSION, "roots": self.roots, "libraries": self.libraries}, f)
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        self._dirty = False
+
+    def _discover(self) -> Dict[str, Path]:
+        """Nickname -> library path below the search paths; the first one found wins, as in KiCad's library table."""
+        found: Dict[str, Path] = {}
+        for root in self.roots:
+            for dirpath, dirs, files in os.walk(root):
+                dirs.sort()
+                names = dirs if self._is_dir else sorted(files)
+                for name in list(names):
+                    if name.endswith(self._suffix):
+                        found.setdefault(name[:-len(self._suffix)], Path(dirpath) / name)
+                        if self._is_dir:
+                            dirs.remove(name)
+        return found
+
+    def _scan(self):
+        """Re-discovers the libraries; those still at the same path keep their entries until their mtime changes."""
+        discovered = self._discover()
+        for nickname in set(self.libraries) - set(discovered):
+            del self.libraries[nickname]
+        for nickname, path in discovered.items():
+            known = self.libraries.get(nickname)
+            if not known or known["path"] != str(path):
+                self.libraries[nickname] = {"path": str(path), "mtime_ns": None, "names": {}}
+        self._scanned = True
+        self._dirty = True
+        log.info(f"Indexed {len(self.libraries)} {self.kind} libraries.")
+
+    def _library(self, nickname: str) -> Optional[dict]:
+        """The library's entry, re-read first if its mtime changed. Re-scans once when it is unknown or gone."""
+        library = self.libraries.get(nickname)
+        try:
+            mtime_ns = os.stat(library["path"]).st_mtime_ns if library else None
+        except FileNotFoundError:
+            mtime_ns = None
+        if mtime_ns is None:
+            if self._scanned:
+                return None
+            self._scan()
+            return self._library(nickname)
+        if library["mtime_ns"] != mtime_ns:
+            try:
+                library["names"] = self._read_names(Path(library["path"]))
+            except Exception as e:
+                log.error(f"Could not index library '{library['path']}': {e}")
+                return None
+            library["mtime_ns"] = mtime_ns
+            self._dirty = True
+        return library
+
+    def refresh(self, nicknames: Iterable[str], jobs: int = 1):
+        """
+        Brings the given libraries up to date in one pass, re-reading the stale ones
+        in a process pool, so that names() can answer without touching the disk.
+        """
+        nicknames = set(nicknames)
+        if nicknames - set(self.libraries) and not self._scanned:
+            self._scan()
+        stale = []
+        for nickname in sorted(nicknames & set(self.libraries)):
+            library = self.libraries[nickname]
+            try:
+                mtime_ns = os.stat(library["path"]).st_mtime_ns
+            except FileNotFoundError:
+                del self.libraries[nickname]
+                self._dirty = True
+                continue
+            if library["mtime_ns"] != mtime_ns:
+                stale.append((library, mtime_ns))
+        if stale:
+            paths = [Path(library["path"]) for library, _ in stale]
+            if jobs <= 1 or len(paths) == 1:
+                results = [_read_names_safely(self._read_names, path) for path in paths]
+            else:
+                with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+                    results = list(pool.map(_read_names_safely, [self._read_names] * len(paths), paths))
+            for (library, mtime_ns), names in zip(stale, results):
+                if names is None:
+                    log.error(f"Could not index library '{library['path']}'.")
+                    continue
+                library["names"], library["mtime_ns"] = names, mtime_ns
+            self._dirty = True
+            log.info(f"Re-indexed {len(stale)} {self.kind} libraries.")
+        self.save()
+
+    def names(self, nickname: str) -> Optional[Dict[str, int]]:
+        """The names indexed for a library (see refresh()), or None when no such library exists."""
+        library = self.libraries.get(nickname)
+        return library["names"] if library and library["mtime_ns"] is not None else None
+
+    def lookup(self, nickname: str, name: str) -> Optional[IndexEntry]:
+        library = self._library(nickname)
+        self.save()
+        if library is None or name not in library["names"]:
+            return None
+        path = Path(library["path"]) / f"{name}.kicad_mod" if self._is_dir else Path(library["path"])
+        return IndexEntry(str(path), library["names"][name], library["mtime_ns"])
+
+_open_indexes: Dict[Tuple[str, Tuple[str, ...], str], LibraryIndex] = {}
+
+def split_link(link: str) -> Optional[Tuple[str, str]]:
+    """'Nickname:Name' -> (nickname, name), or None when the link is malformed."""
+    nickname, sep, name = link.partition(':')
+    return (nickname, name) if sep and nickname and name else None
+
+def find_symbol(nickname: str, name: str) -> Optional[IndexEntry]:
+    return LibraryIndex.open("symbol").lookup(nickname, name)
+
+def find_footprint(nickname: str, name: str) -> Optional[IndexEntry]:
+    return LibraryIndex.open("footprint").lookup(nickname, name)
@@ -0,0 +1,186 @@
+"""
+Change notification for the KiCad library trees, used by 'kipipe watch'.
+
+On Linux the trees are watched with inotify (through ctypes, so nothing extra
+is installed): one watch per directory, woken only when a file is written,
+moved or deleted. Elsewhere, or when the inotify watch limit is reached, the
+trees are polled instead: every 'interval' seconds the library files are
+stat()ed and compared with the previous pass. Either way the watcher reports
+the set of paths that changed; collect_changes() debounces a burst (a git
+pull, a library regeneration) into one set.
+"""
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+LIBRARY_SUFFIXES = (".kicad_sym", ".kicad_mod")
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+_EVENT = struct.Struct("iIII")
+
+def is_library_file(path: Path) -> bool:
+    return path.name.endswith(LIBRARY_SUFFIXES)
+
+class PollingWatcher:
+    """Finds changes by comparing (mtime, size) of every library file between passes."""
+
+    def __init__(self, roots: Iterable[str], interval: float = 5.0):
+        self.roots = [Path(root) for root in roots]
+        self.interval = interval
+        self._state = self._snapshot()
+        self._next_poll = time.monotonic() + interval
+
+    def _snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        state = {}
+        stack = [root for root in self.roots if root.is_dir()]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(Path(entry.path))
+                        elif entry.name.endswith(LIBRARY_SUFFIXES):
+                            stat = entry.stat()
+                            state[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:  # removed while we were scanning; the next pass sees it gone
+                continue
+        return state
+
+    def changes(self, timeout: float) -> Set[Path]:
+        """Paths added, modified or removed since the last call, waiting at most 'timeout' seconds for a pass."""
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._next_poll - time.monotonic()
+            if wait > 0:
+                if time.monotonic() + wait > deadline:
+                    time.sleep(max(0.0, deadline - time.monotonic()))
+                    return set()
+                time.sleep(wait)
+            self._next_poll = time.monotonic() + self.interval
+            state = self._snapshot()
+            changed = {path for path in state.keys() | self._state.keys() if state.get(path) != self._state.get(path)}
+            self._state = state
+            if changed or time.monotonic() >= deadline:
+                return changed
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """inotify watches on every directory below the roots; new directories are watched as they appear."""
+
+    def __init__(self, roots: Iterable[str]):
+        self.roots = [Path(root) for root in roots]
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        try:
+            for root in self.roots:
+                if root.is_dir():
+                    self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, top: Path):
+        for dirpath, dirs, _ in os.walk(top):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue  # vanished or unreadable directory
+            self._dirs[wd] = Path(dirpath)
+
+    def _read_events(self) -> Set[Path]:
+        changed: Set[Path] = set()
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset + _EVENT.size <= len(buffer):
+                wd, mask, _cookie, length = _EVENT.unpack_from(buffer, offset)
+                name = buffer[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    log.warning("inotify queue overflowed; re-checking the whole library trees.")
+                    changed.update(self.roots)
+                    continue
+                directory = self._dirs.get(wd)
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                if directory is None:
+                    continue
+                path = directory / os.fsdecode(name) if name else directory
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self._watch_tree(path)
+                    changed.add(path)  # a whole .pretty library copied or moved in or out
+                elif is_library_file(path) or mask & IN_DELETE_SELF:
+                    changed.add(path)
+
+    def changes(self, timeout: float) -> Set[Path]:
+        """Paths written, moved or deleted, waiting at most 'timeout' seconds for the first event."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        return self._read_events() if readable else set()
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+def open_watcher(roots: List[str], poll: bool = False, interval: float = 5.0):
+    """An InotifyWatcher where the platform supports it, else (or with poll=True) a PollingWatcher."""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher(roots)
+            log.info(f"Watching {len(watcher._dirs)} directories with inotify.")
+            return watcher
+        except (OSError, AttributeError) as e:
+            log.warning(f"inotify unavailable ({e}); polling every {interval:g} s instead.")
+    return PollingWatcher(roots, interval)
+
+def collect_changes(watcher, debounce: float = 2.0, max_wait: float = 30.0,
+                    stopped: Callable[[], bool] = lambda: False) -> Set[Path]:
+    """
+    Blocks until something changes, then keeps collecting until nothing has
+    changed for 'debounce' seconds (or 'max_wait' seconds have passed, so a
+    steady trickle of writes cannot postpone the import forever).
+    """
+    changed: Set[Path] = set()
+    while not changed:
+        if stopped():
+            return changed
+        changed = watcher.changes(1.0)
+    first = time.monotonic()
+    while not stopped() and time.monotonic() - first < max_wait:
+        more = watcher.changes(debounce)
+        if not more:
+            break
+        changed |= more
+    return changed
@@ -1,9 +1,12 @@
 # scripts/main.py
 import argparse
+import atexit
+import os
 import sys
 import logging
 from .db_manager import DatabaseManager
-from .commands import fetch, map_categories, add_symbol, scan_missing, import_symbols, add_footprint, link_footprint
+from .query_stats import query_stats, DEFAULT_SLOW_QUERY_MS
+from .commands import fetch, map_categories, add_symbol, scan_missing, import_symbols, add_footprint, link_footprint, search_symbol, search_footprint, build_dbl, export_sqlite, export_parquet, import_parquet, changes, snapshot, cost, where_used, bom_status, enqueue, worker, mirror_datasheets, import_footprints, watch, verify_links
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
@@ -18,6 +21,9 @@ def main():
         sys.exit(1)
 
     parser = argparse.ArgumentParser(description="KiCad Component Pipeline CLI.")
+    parser.add_argument("--query-stats", action="store_true", help="Print a per-statement database timing summary at exit.")
+    parser.add_argument("--query-stats-json", metavar="PATH", help="Also write the per-statement timing summary to a JSON file.")
+    parser.add_argument("--slow-query-ms", type=float, help="Log statements slower than this many milliseconds (overrides DB_SLOW_QUERY_MS).")
     subparsers = parser.add_subparsers(dest="command", required=True, help="Available commands")
 
     # --- Setup for 'fetch' command ---
@@ -47,8 +53,84 @@ def main():
     parser_link_fp = subparsers.add_parser("link-footprint", help="Choose from approved footprints to link to a component.")
     link_footprint.setup_args(parser_link_fp)
 
+    # --- Setup for 'search-symbol' command ---
+    parser_search_sym = subparsers.add_parser("search-symbol", help="Ranked full-text search of the symbol catalog.")
+    search_symbol.setup_args(parser_search_sym)
+
+    # --- Setup for 'search-footprint' command ---
+    parser_search_fp = subparsers.add_parser("search-footprint", help="Ranked full-text search of the footprint catalog.")
+    search_footprint.setup_args(parser_search_fp)
+
+    # --- Setup for 'build-dbl' command ---
+    parser_build_dbl = subparsers.add_parser("build-dbl", help="Build per-category views and write the matching .kicad_dbl file.")
+    build_dbl.setup_args(parser_build_dbl)
+
+    # --- Setup for 'export-sqlite' command ---
+    parser_export_sqlite = subparsers.add_parser("export-sqlite", help="Export or incrementally sync a local SQLite copy of the catalog.")
+    export_sqlite.setup_args(parser_export_sqlite)
+
+    # --- Setup for 'export-parquet' command ---
+    parser_export_parquet = subparsers.add_parser("export-parquet", help="Export catalog tables as Parquet datasets.")
+    export_parquet.setup_args(parser_export_parquet)
+
+    # --- Setup for 'import-parquet' command ---
+    parser_import_parquet = subparsers.add_parser("import-parquet", help="Load Parquet datasets written by 'export-parquet' back into the database.")
+    import_parquet.setup_args(parser_import_parquet)
+
+    # --- Setup for 'changes' command ---
+    parser_changes = subparsers.add_parser("changes", help="Stream component inserts, updates and deletions since a resume token as NDJSON.")
+    changes.setup_args(parser_changes)
+
+    # --- Setup for 'snapshot' command ---
+    parser_snapshot = subparsers.add_parser("snapshot", help="Save or load a compressed binary snapshot of the catalog tables.")
+    snapshot.setup_args(parser_snapshot)
+
+    # --- Setup for 'cost' command ---
+    parser_cost = subparsers.add_parser("cost", help="Cost a BOM at a build quantity from the stored supplier price breaks.")
+    cost.setup_args(parser_cost)
+
+    # --- Setup for 'where-used' command ---
+    parser_where_used = subparsers.add_parser("where-used", help="List the registered BOMs that use a part.")
+    where_used.setup_args(parser_where_used)
+
+    # --- Setup for 'bom-status' command ---
+    parser_bom_status = subparsers.add_parser("bom-status", help="Show how ready each registered BOM is (fetched, linked, lifecycle).")
+    bom_status.setup_args(parser_bom_status)
+
+    # --- Setup for 'enqueue' command ---
+    parser_enqueue = subparsers.add_parser("enqueue", help="Queue part numbers for 'worker' processes to fetch.")
+    enqueue.setup_args(parser_enqueue)
+
+    # --- Setup for 'worker' command ---
+    parser_worker = subparsers.add_parser("worker", help="Claim queued part numbers and fetch them; run one per host or API key.")
+    worker.setup_args(parser_worker)
+
+    # --- Setup for 'mirror-datasheets' command ---
+    parser_mirror = subparsers.add_parser("mirror-datasheets", help="Download datasheets into a local, content-addressed mirror.")
+    mirror_datasheets.setup_args(parser_mirror)
+
+    # --- Setup for 'import-footprints' command ---
+    parser_import_fp = subparsers.add_parser("import-footprints", help="Scan .pretty footprint libraries and import/update footprints in the database.")
+    import_footprints.setup_args(parser_import_fp)
+
+    # --- Setup for 'watch' command ---
+    parser_watch = subparsers.add_parser("watch", help="Keep the symbol and footprint catalog in sync as library files change.")
+    watch.setup_args(parser_watch)
+
+    # --- Setup for 'verify-links' command ---
+    parser_verify = subparsers.add_parser("verify-links", help="Check that every linked symbol and footprint still exists in the libraries.")
+    verify_links.setup_args(parser_verify)
+
     args = parser.parse_args()
 
+    # Resolved once, here: the flag wins over DB_SLOW_QUERY_MS (read after the manager above loaded .env).
+    if args.slow_query_ms is not None:
+        query_stats.slow_query_ms = args.slow_query_ms
+    else:
+        query_stats.slow_query_ms = float(os.getenv('DB_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS))
+    if args.query_stats or args.query_stats_json:
+        atexit.register(_report_query_stats, args.query_stats, args.query_stats_json)
+
     # --- Call the appropriate run function based on the command ---
     if args.command == "fetch":
         fetch.run(args)
@@ -64,10 +146,51 @@ def main():
         add_footprint.run(args)
     elif args.command == "link-footprint":
         link_footprint.run(args)
+    elif args.command == "search-symbol":
+        search_symbol.run(args)
+    elif args.command == "search-footprint":
+        search_footprint.run(args)
+    elif args.command == "build-dbl":
+        build_dbl.run(args)
+    elif args.command == "export-sqlite":
+        export_sqlite.run(args)
+    elif args.command == "export-parquet":
+        export_parquet.run(args)
+    elif args.command == "import-parquet":
+        import_parquet.run(args)
+    elif args.command == "changes":
+        changes.run(args)
+    elif args.command == "snapshot":
+        snapshot.run(args)
+    elif args.command == "cost":
+        cost.run(args)
+    elif args.command == "where-used":
+        where_used.run(args)
+    elif args.command == "bom-status":
+        bom_status.run(args)
+    elif args.command == "enqueue":
+        enqueue.run(args)
+    elif args.command == "worker":
+        worker.run(args)
+    elif args.command == "mirror-datasheets":
+        mirror_datasheets.run(args)
+    elif args.command == "import-footprints":
+        import_footprints.run(args)
+    elif args.command == "watch":
+        watch.run(args)
+    elif args.command == "verify-links":
+        verify_links.run(args)
     
 
     log.info("Process complete. Closing connections.")
     db_manager.close_all_connections()
 
+def _report_query_stats(print_summary: bool, json_path: str):
+    """Runs at interpreter exit so the summary is produced even if a command calls sys.exit()."""
+    if print_summary:
+        print("\n" + query_stats.format_summary())
+    if json_path:
+        query_stats.dump_json(json_path)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
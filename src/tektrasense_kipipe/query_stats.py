@@ -0,0 +1,101 @@
+"""
+Query instrumentation for the DatabaseManager.
+
+Every statement executed through the DatabaseManager is timed and aggregated
+here by its normalized text, so a bulk run can report where database time went
+and log the statements that exceed the slow-query threshold.
+"""
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_MS = 500.0
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w$])-?\d+(?:\.\d+)?\b')
+_KEYWORD_LITERAL_RE = re.compile(r'\b(?:NULL|TRUE|FALSE)\b', re.IGNORECASE)
+_PLACEHOLDER = r'(?:\?|%(?:\(\w+\))?s)'
+_ROW_RE = rf'\({_PLACEHOLDER}(?:, {_PLACEHOLDER})*\)'
+_ROW_LIST_RE = re.compile(rf'{_ROW_RE}(?:, {_ROW_RE})+')
+
+def normalize_statement(sql: str) -> str:
+    """
+    Reduces a statement to its shape: whitespace is collapsed, literals become '?'
+    and multi-row VALUES lists are folded, so the same query groups together
+    regardless of its parameters or batch size.
+    """
+    text = _WHITESPACE_RE.sub(' ', sql).strip().rstrip(';').strip()
+    text = _STRING_LITERAL_RE.sub('?', text)
+    text = _NUMBER_RE.sub('?', text)
+    text = _KEYWORD_LITERAL_RE.sub('?', text)
+    return _ROW_LIST_RE.sub('(...), ...', text)
+
+class QueryStats:
+    """Thread-safe per-statement latency and row counters."""
+
+    def __init__(self, slow_query_ms: Optional[float] = DEFAULT_SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, sql: str, elapsed_seconds: float, rows: int = 0):
+        """Adds one execution of a statement to its group and logs it if it was slow."""
+        statement = normalize_statement(sql)
+        elapsed_ms = elapsed_seconds * 1000
+        with self._lock:
+            entry = self._stats.setdefault(statement, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0})
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["rows"] += rows
+        if self.slow_query_ms is not None and elapsed_ms >= self.slow_query_ms:
+            log.warning(f"Slow query ({elapsed_ms:.1f} ms, {rows} rows): {statement}")
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Returns one record per statement, ordered by total time spent (highest first)."""
+        with self._lock:
+            items = [dict(entry, statement=statement) for statement, entry in self._stats.items()]
+        for item in items:
+            item["mean_ms"] = item["total_ms"] / item["count"] if item["count"] else 0.0
+        return sorted(items, key=lambda item: item["total_ms"], reverse=True)
+
+    def format_summary(self, limit: int = 20) -> str:
+        """Renders the heaviest statements as a plain-text table."""
+        items = self.snapshot()
+        if not items:
+            return "No queries were executed."
+        total_ms = sum(item["total_ms"] for item in items)
+        total_count = sum(item["count"] for item in items)
+        lines = [
+            f"--- Query Summary: {total_count} queries, {total_ms:.1f} ms total ---",
+            f"{'count':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'rows':>9}  statement",
+        ]
+        for item in items[:limit]:
+            statement = item["statement"]
+            if len(statement) > 100:
+                statement = statement[:97] + "..."
+            lines.append(
+                f"{item['count']:>7} {item['total_ms']:>10.1f} {item['mean_ms']:>9.2f} "
+                f"{item['max_ms']:>9.2f} {item['rows']:>9}  {statement}"
+            )
+        if len(items) > limit:
+            lines.append(f"... and {len(items) - limit} more statements.")
+        return "\n".join(lines)
+
+    def dump_json(self, path: str):
+        """Writes the full per-statement statistics to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"slow_query_ms": self.slow_query_ms, "statements": self.snapshot()}, f, indent=2)
+        log.info(f"Query statistics written to '{path}'.")
+
+# Shared by every DatabaseManager in the process, since commands create their own instances.
+query_stats = QueryStats()
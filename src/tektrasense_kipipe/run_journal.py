@@ -0,0 +1,161 @@
+"""
+Run journals that make bulk 'fetch' and 'add-symbol' runs resumable.
+
+Every bulk run appends to a JSON Lines file named after its run id in the run
+directory ($KIPIPE_RUN_DIR, default ~/.kipipe/runs). The first record describes
+the run: command, input file and the input file's SHA-256. Each part then gets
+a record with its outcome, written and fsynced before the next part starts, so
+a crash loses at most the part in progress. A run that is resumed with the same
+input skips the parts recorded as done and retries the ones that failed.
+"""
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+from .bom import file_sha256
+
+log = logging.getLogger(__name__)
+
+DEFAULT_RUN_DIR = Path.home() / ".kipipe" / "runs"
+
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*$", re.IGNORECASE)
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "": 60}
+
+def run_directory() -> Path:
+    return Path(os.getenv("KIPIPE_RUN_DIR", DEFAULT_RUN_DIR))
+
+def parse_deadline(value: str) -> float:
+    """Turns a duration such as '90s', '45m', '2h' or '30' (minutes) into an absolute time.time() deadline."""
+    match = _DURATION.match(value or "")
+    if not match:
+        raise ValueError(f"Invalid deadline '{value}'. Use a duration such as 90s, 45m or 2h.")
+    return time.time() + float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()]
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def _input_hash(input_path: str) -> Optional[str]:
+    try:
+        return file_sha256(input_path)
+    except (OSError, TypeError) as error:
+        log.warning(f"Could not hash input file '{input_path}'; resuming will not verify it: {error}")
+        return None
+
+class RunJournal:
+    """One run's journal file: the run header plus the latest outcome of every part."""
+
+    def __init__(self, path: Path, header: Dict[str, object], outcomes: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.header = header
+        self.outcomes = outcomes or {}
+
+    @property
+    def run_id(self) -> str:
+        return self.header["run_id"]
+
+    @classmethod
+    def create(cls, command: str, input_path: str, directory: Optional[Path] = None) -> "RunJournal":
+        directory = Path(directory or run_directory())
+        directory.mkdir(parents=True, exist_ok=True)
+        run_id = f"{command}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        header = {"type": "run", "run_id": run_id, "command": command, "input": str(input_path),
+                  "input_sha256": _input_hash(input_path), "started_at": _now()}
+        journal = cls(directory / f"{run_id}.jsonl", header)
+        journal._append(header)
+        log.info(f"Run journal: {journal.path} (resume with --resume {run_id})")
+        return journal
+
+    @classmethod
+    def resume(cls, run_id: str, command: str, input_path: str, directory: Optional[Path] = None) -> "RunJournal":
+        """Reopens a journal. Raises ValueError if it belongs to another command or the input file changed."""
+        path = Path(directory or run_directory()) / f"{run_id}.jsonl"
+        if not path.is_file():
+            raise ValueError(f"No run journal '{path}'.")
+        header, outcomes = None, {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a record cut short by a crash; that part simply runs again
+                if record.get("type") == "run":
+                    header = record
+                elif record.get("type") == "part":
+                    outcomes[record["part_number"]] = record["status"]
+        if not header or header.get("command") != command:
+            raise ValueError(f"Run '{run_id}' is not a '{command}' run.")
+        current_hash = _input_hash(input_path)
+        if header.get("input_sha256") and current_hash and header["input_sha256"] != current_hash:
+            raise ValueError(f"Input file '{input_path}' differs from the one run '{run_id}' started with.")
+        journal = cls(path, header, outcomes)
+        journal._append({"type": "resume", "at": _now()})
+        done = sum(1 for status in outcomes.values() if status == "done")
+        log.info(f"Resuming run '{run_id}': {done} part(s) done, {len(outcomes) - done} to retry.")
+        return journal
+
+    def is_done(self, part_number: str) -> bool:
+        return self.outcomes.get(part_number) == "done"
+
+    def record(self, part_number: str, ok: bool, detail: Optional[str] = None):
+        status = "done" if ok else "failed"
+        self.outcomes[part_number] = status
+        entry = {"type": "part", "part_number": part_number, "status": status, "at": _now()}
+        if detail:
+            entry["detail"] = detail
+        self._append(entry)
+
+    def finish(self, status: str = "completed"):
+        """Closes the run with 'completed', 'deadline', 'interrupted' or 'failed' and logs how to continue."""
+        counts = self.counts()
+        self._append({"type": "end", "status": status, "at": _now(), **counts})
+        log.info(f"Run '{self.run_id}' {status}: {counts['done']} done, {counts['failed']} failed.")
+        if status != "completed" or counts["failed"]:
+            log.info(f"Continue with --resume {self.run_id}")
+
+    def counts(self) -> Dict[str, int]:
+        done = sum(1 for status in self.outcomes.values() if status == "done")
+        return {"done": done, "failed": len(self.outcomes) - done}
+
+    def _append(self, record: Dict[str, object]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+def run_parts(part_numbers, handle, journal: RunJournal, deadline: Optional[float] = None) -> str:
+    """
+    Calls handle(part_number) for every part the journal has not recorded as done,
+    journaling each outcome. A part whose handler raises is recorded as failed and
+    the run moves on. Stops before starting a part once the deadline has passed,
+    and on Ctrl+C. The end status is written to the journal however the loop
+    exits ('failed' if something escaped it) and returned.
+    """
+    status = "failed"
+    try:
+        for part_number in part_numbers:
+            part_number = str(part_number).strip()
+            if not part_number or part_number.lower() == "part number" or journal.is_done(part_number):
+                continue
+            if deadline is not None and time.time() >= deadline:
+                log.warning("Deadline reached; stopping before the next part.")
+                status = "deadline"
+                break
+            try:
+                ok, detail = bool(handle(part_number)), None
+            except Exception as error:
+                log.exception(f"Unexpected error processing part '{part_number}'; moving on to the next part.")
+                ok, detail = False, f"{type(error).__name__}: {error}"
+            journal.record(part_number, ok, detail)
+        else:
+            status = "completed"
+    except KeyboardInterrupt:
+        log.warning("Interrupted; the journal holds every part finished so far.")
+        status = "interrupted"
+    finally:
+        journal.finish(status)
+    return status
@@ -0,0 +1,445 @@
+"""
+Streaming reader for KiCad S-expression files (.kicad_sym, .kicad_mod, ...).
+
+A file is tokenized in one linear pass over a memory-mapped buffer, about a
+megabyte at a time, and only the top-level children of the root list are built
+into Python lists, one at a time, so a multi-megabyte library never exists as
+one parsed tree or one decoded string. Nested blocks are kept inside their parent: the sub-unit
+symbols of a .kicad_sym ('Name_0_1') are part of their top-level symbol, not
+symbols of their own. With 'keep', nested lists with other heads are skipped
+at the token level instead of being built.
+
+Symbol libraries, where import time goes, are read without a token loop: the
+'(symbol' lists are found with mmap.find, a symbol's properties are matched in
+its header (what comes before its first unit) as the library is scanned, and its
+units and pin numbers are read from its bytes when symbol_shape() first asks for
+them. A symbol that does not check out there, say one whose parentheses do not
+balance, goes through the token reader.
+
+Parsed nodes are plain lists whose items are strings (atoms and quoted strings
+alike, quotes removed) or nested lists.
+"""
+import math
+import mmap
+import re
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+Node = List[Union[str, "Node"]]
+
+# Parentheses, atoms and quoted strings; a lone '"' means a string is not terminated.
+_TOKEN = re.compile(r'\(|\)|[^\s()"]+|"[^"\\]*(?:\\.[^"\\]*)*"|"', re.DOTALL)
+_ESCAPES = {'\\"': '"', '\\\\': '\\', '\\n': '\n', '\\t': '\t'}
+_ESCAPE = re.compile(r'\\.', re.DOTALL)
+WINDOW = 1 << 20
+
+class SExprError(ValueError):
+    """Raised for unbalanced parentheses, unterminated strings or tokens outside the root list."""
+
+def _unescape(raw: str) -> str:
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(), m.group()[1:]), raw)
+
+def _token_windows(buffer, window: Optional[int] = None) -> Iterator[List[str]]:
+    """
+    Tokenizes the buffer about 'window' bytes at a time, each window ending at a
+    line break so no token (and no UTF-8 sequence) is split. A window that cuts a
+    multi-line string in two is retried with twice the size.
+    """
+    window = window or WINDOW
+    size = len(buffer)
+    pos = 0
+    step = window
+    while pos < size:
+        end = min(pos + step, size)
+        if end < size:
+            newline = buffer.find(b'\n', end)
+            end = size if newline < 0 else newline + 1
+        tokens = _TOKEN.findall(buffer[pos:end].decode('utf-8', errors='replace'))
+        if '"' in tokens:
+            if end == size:
+                raise SExprError("Unterminated string.")
+            step *= 2
+            continue
+        yield tokens
+        pos = end
+        step = window
+
+def iter_top_level(buffer, head: Optional[str] = None, keep: Optional[FrozenSet[str]] = None) -> Iterator[Node]:
+    """
+    Yields each child list of the root list. With 'head', only children whose
+    first item equals it are built; the others are skipped without allocating.
+    With 'keep', so are nested lists whose first item is not in it.
+    """
+    stack: List[Node] = []
+    current: Node = []
+    depth = 0
+    skip_to = 0  # while set, tokens are skipped until the list opened at this depth closes
+    head_pending = False
+    nested_pending = False  # a nested list was opened and 'keep' has not seen its head yet
+    for tokens in _token_windows(buffer):
+        for tok in tokens:
+            if tok == '(':
+                depth += 1
+                if skip_to:
+                    continue
+                if depth == 2:
+                    current, stack = [], []
+                    head_pending = head is not None
+                elif depth > 2:
+                    if head_pending:  # a child that starts with a list cannot match 'head'
+                        skip_to = 2
+                        continue
+                    if nested_pending:  # neither can a nested list that starts with one
+                        nested_pending = False
+                        current = stack.pop()
+                        skip_to = depth - 1
+                        continue
+                    stack.append(current)
+                    current = []
+                    nested_pending = keep is not None
+            elif tok == ')':
+                if depth == 0:
+                    raise SExprError("Unbalanced ')'.")
+                if skip_to:
+                    if depth == skip_to:
+                        skip_to = 0
+                elif depth == 2:
+                    if not head_pending:
+                        yield current
+                elif depth > 2:
+                    child = current
+                    current = stack.pop()
+                    if nested_pending:  # '()'
+                        nested_pending = False
+                    else:
+                        current.append(child)
+                depth -= 1
+            else:
+                if depth < 1:
+                    raise SExprError(f"Token '{tok[:20]}' outside the root list.")
+                if skip_to or depth == 1:
+                    continue
+                if tok[0] == '"':
+                    tok = tok[1:-1]
+                    if '\\' in tok:
+                        tok = _unescape(tok)
+                if head_pending:
+                    head_pending = False
+                    if tok != head:
+                        skip_to = 2
+                        continue
+                if nested_pending:
+                    nested_pending = False
+                    if tok not in keep:
+                        current = stack.pop()
+                        skip_to = depth
+                        continue
+                current.append(tok)
+    if depth != 0:
+        raise SExprError(f"Unbalanced '(': {depth} list(s) still open at end of input.")
+
+def iter_file(path: Union[str, Path], head: Optional[str] = None) -> Iterator[Node]:
+    """iter_top_level over a memory-mapped file."""
+    with open(path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file; nothing to map
+            return
+        with buffer:
+            yield from iter_top_level(buffer, head)
+
+def children(node: Node, head: str) -> Iterator[Node]:
+    """The direct child lists of 'node' whose first item is 'head'."""
+    for item in node:
+        if isinstance(item, list) and item and item[0] == head:
+            yield item
+
+def properties(node: Node) -> Dict[str, str]:
+    """The (property "Name" "Value" ...) entries of a symbol or footprint."""
+    return {item[1]: item[2] for item in children(node, "property") if len(item) >= 3
+            and isinstance(item[1], str) and isinstance(item[2], str)}
+
+class SymbolShape(NamedTuple):
+    pin_count: Optional[int]
+    unit_count: int
+    is_power: bool
+    extends: Optional[str]
+
+def symbol_shape(node: Node) -> SymbolShape:
+    """
+    Pins, units and derivation of a top-level .kicad_sym symbol. Pins are counted
+    once per pin number, so a De Morgan body that repeats a unit's pins, or a
+    pin stacked under another, does not count twice. Units come from the
+    'Name_<unit>_<style>' sub-symbols; unit 0 holds the graphics common to all
+    units. A symbol that 'extends' another has no pins of its own: its
+    pin_count is None until the parent is known.
+    """
+    name = node[1]
+    extends = next((item[1] for item in children(node, "extends") if len(item) > 1 and isinstance(item[1], str)), None)
+    numbers = set()
+    units = set()
+    for sub in children(node, "symbol"):
+        suffix = sub[1][len(name) + 1:] if isinstance(sub[1], str) and sub[1].startswith(name + "_") else ""
+        unit = suffix.split("_")[0]
+        if unit.isdigit() and int(unit) > 0:
+            units.add(int(unit))
+        for pin in children(sub, "pin"):
+            number = next((item[1] for item in pin if isinstance(item, list) and len(item) > 1 and item[0] == "number"),
+                          None)
+            numbers.add(number if number is not None else id(pin))
+    is_power = any(True for _ in children(node, "power"))
+    pin_count = None if extends and not numbers else len(numbers)
+    return SymbolShape(pin_count, max(len(units), 1), is_power, extends)
+
+# The lists symbol_shape() and properties() read; the rest of a symbol (graphics, pin geometry, effects) is skipped.
+SYMBOL_HEADS = frozenset({"symbol", "property", "extends", "power", "pin", "number"})
+
+# Strings that can hide a '(pin' or '(number' from a byte-level scan: those holding
+# parentheses or escapes. Plain strings are consumed inside each match, so matches end
+# only at one of these (group 1), at an unterminated '"' (group 1 is just the quote) or at the end.
+_AWKWARD_STRING = re.compile(rb'[^"]*+(?:"[^"()\\]*+"[^"]*+)*+("[^"\\]*+(?:\\.[^"\\]*+)*+"|")?')
+_TOKEN_AT = re.compile(rb'\s*+("[^"\\]*+(?:\\.[^"\\]*+)*+"|[^\s()"]++)')
+_ROOT_START = re.compile(rb'\s*+\(')
+_QUOTED_UNIT = re.compile(rb'\d+_\d+"')  # the rest of a '(symbol "Name_1_1"' unit
+_ATOM_UNIT = re.compile(rb'\d+_\d+(?![^\s()"])')
+_SYMBOL = b'(symbol'
+_ATOM_ENDS = b' \t\r\n\f\v()"'
+# Symbol headers are matched decoded; _PROPERTY captures a quoted string's content or an atom, for name and value.
+_HEADER_HEAD = re.compile(r'\((?:property|extends|power)(?![^\s()"])')
+_PROPERTY = re.compile(r'\(property(?![^\s()"])\s*+(?:"([^"\\]*+(?:\\.[^"\\]*+)*+)"|([^\s()"]++))'
+                       r'\s*+(?:"([^"\\]*+(?:\\.[^"\\]*+)*+)"|([^\s()"]++))')
+_HEADER_ITEM = re.compile(r'\((property|extends|power)(?![^\s()"])(?:\s*+("[^"\\]*+(?:\\.[^"\\]*+)*+"|[^\s()"]++)'
+                          r'(?:\s*+("[^"\\]*+(?:\\.[^"\\]*+)*+"|[^\s()"]++))?)?')
+_PIN = re.compile(r'\(pin(?![^\s()"])')
+_PIN_NUMBER = re.compile(r'\(number(?![^\s()"])\s*+(?:"([^"\\]*+(?:\\.[^"\\]*+)*+)"|([^\s()"]++))')
+
+def _token(raw: str) -> str:
+    if raw[:1] != '"':
+        return raw
+    raw = raw[1:-1]
+    return _unescape(raw) if '\\' in raw else raw
+
+def _atom(raw: bytes) -> str:
+    return _token(raw.decode('utf-8', errors='replace'))
+
+def _awkward(buffer: bytes, start: int, end: int) -> Optional[List[Tuple[int, int]]]:
+    """Spans of the awkward strings in buffer[start:end]; None if one is not terminated there."""
+    spans = []
+    for match in _AWKWARD_STRING.finditer(buffer, start, end):
+        begin, stop = match.span(1)
+        if begin >= 0:
+            if stop - begin == 1:
+                return None
+            spans.append((begin, stop))
+    return spans
+
+def _exact(text: bytes) -> Node:
+    """A symbol's list, read by the token reader."""
+    for node in iter_top_level(b"(" + text + b")", keep=SYMBOL_HEADS):
+        return node
+    raise SExprError("Symbol list not found")
+
+class _SymbolSource(NamedTuple):
+    buffer: mmap.mmap  # the library
+    start: int  # offset of the symbol's '(symbol'
+    end: int  # and of its ')'
+    units: List[int]  # offsets of its '(symbol' units
+
+def _outline(buffer) -> Optional[List[_SymbolSource]]:
+    """
+    Every top-level symbol with its units. A '(symbol' written '(symbol "Name_1_1"'
+    after symbol "Name" is taken for one of its units; any other starts the next
+    symbol, unless its line so far (or the text since the last '(symbol') has an odd
+    number of quotes: then it is inside a string, as KiCad writes a line break in a
+    string as '\\n'. Whether each is where it should be is checked when the symbol's
+    node is read. None if the buffer is not one root list; the token reader takes over.
+    """
+    root_end = buffer.rfind(b')')
+    if not _ROOT_START.match(buffer) or root_end < 0 or buffer[root_end + 1:].strip():
+        return None
+    found = []  # [start, units] of each symbol
+    unit_head, unit_rest = None, _ATOM_UNIT  # how the current symbol's units begin
+    prev = 0
+    pos = buffer.find(_SYMBOL)
+    while pos >= 0:
+        if buffer[pos + 7:pos + 8] in _ATOM_ENDS:
+            if (unit_head is not None and buffer[pos:pos + len(unit_head)] == unit_head
+                    and unit_rest.match(buffer, pos + len(unit_head))):
+                found[-1][1].append(pos)
+                prev = pos
+            else:
+                line = buffer[max(buffer.rfind(b'\n', prev, pos) + 1, prev):pos]
+                if b'\\' in line:
+                    line = line.replace(b'\\\\', b'  ').replace(b'\\"', b'  ')
+                name = _TOKEN_AT.match(buffer, pos + 7)
+                if name and not line.count(b'"') % 2:
+                    found.append([pos, []])
+                    prev = pos
+                    quoted = name.group(1)[:1] == b'"'
+                    unit_head = b'(symbol ' + name.group(1)[:-1 if quoted else None] + b'_'
+                    unit_rest = _QUOTED_UNIT if quoted else _ATOM_UNIT
+        pos = buffer.find(_SYMBOL, pos + 7)
+    symbols = []
+    for (start, units), stop in zip(found, [start for start, _ in found[1:]] + [root_end]):
+        end = buffer.rfind(b')', start, stop)
+        symbols.append(_SymbolSource(buffer, start, end if end >= 0 else stop - 1, units))
+    return symbols
+
+def _read_header(text: str, pattern: re.Pattern) -> Optional[list]:
+    """
+    findall() of pattern over a symbol's text up to its first unit, leaving out
+    matches inside strings. None if a string there is not terminated.
+    """
+    masked = text.replace('\\\\', '  ').replace('\\"', '  ') if '\\' in text else text
+    parts = masked.split('"')  # strings are the odd parts
+    if len(parts) % 2 == 0:
+        return None
+    if not _HEADER_HEAD.search('"'.join(parts[1::2])):
+        return pattern.findall(text)
+    strings, pos = [], 0
+    for i, part in enumerate(parts):
+        if i % 2:
+            strings.append((pos - 1, pos + len(part)))
+        pos += len(part) + 1
+    return [match.groups('') for match in pattern.finditer(text)
+            if not any(a < match.start() < b for a, b in strings)]
+
+def _symbol_node(name: str, source: _SymbolSource) -> Node:
+    """
+    The symbol's header, units and pin numbers, read with regexes. The token reader
+    takes over if its parentheses do not balance with the units one level in, or a
+    string in the units could hide a '(pin' or '(number'.
+    """
+    buffer, start, end, units = source
+    text = buffer[start:end + 1]
+    units = [unit - start for unit in units]
+    depth, prev = 0, 0
+    for stop in units + [len(text)]:
+        depth += text.count(b'(', prev, stop) - text.count(b')', prev, stop)
+        prev = stop
+        if depth != (1 if stop < len(text) else 0):
+            return _exact(text)
+    awkward = _awkward(text, units[0] if units else len(text), len(text))
+    if awkward is None or any(b'(pin' in text[a:b] or b'(number' in text[a:b] for a, b in awkward):
+        return _exact(text)
+    node: Node = ["symbol", name]
+    for head, *tokens in _read_header(text[:units[0] if units else -1].decode('utf-8', errors='replace'), _HEADER_ITEM):
+        node.append([head, *(_token(token) for token in tokens[:{"property": 2, "extends": 1}.get(head, 0)] if token)])
+    for begin, stop in zip(units, units[1:] + [len(text) - 1]):
+        unit = text[begin:stop].decode('utf-8', errors='replace')
+        numbers = _PIN_NUMBER.findall(unit)
+        if len(numbers) != len(_PIN.findall(unit)):
+            return _exact(text)
+        if '\\' in unit:
+            numbers = [(_unescape(number) if '\\' in number else number, atom) for number, atom in numbers]
+        unit_name = _atom(_TOKEN_AT.match(text, begin + len(_SYMBOL)).group(1))
+        node.append(["symbol", unit_name, *[["pin", ["number", number or atom]] for number, atom in numbers]])
+    return node
+
+class LibrarySymbol:
+    """A top-level symbol: name and properties, and 'node' (what symbol_shape() reads), parsed on first use."""
+
+    __slots__ = ("name", "properties", "_node", "_source")
+
+    def __init__(self, name: str, properties: Dict[str, str], node: Optional[Node] = None,
+                 source: Optional[_SymbolSource] = None):
+        self.name = name
+        self.properties = properties
+        self._node = node
+        self._source = source
+
+    @property
+    def node(self) -> Node:
+        if self._node is None:
+            self._node = _symbol_node(self.name, self._source)
+            self._source = None
+        return self._node
+
+def iter_symbols(path: Union[str, Path]) -> Iterator[LibrarySymbol]:
+    """
+    Yields the top-level symbols of a .kicad_sym library in file order. The file
+    stays mapped while a symbol whose node has not been read refers to it.
+    """
+    with open(path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file; nothing to map
+            return
+    outline = _outline(buffer)
+    if outline is None:
+        with buffer:
+            for node in iter_top_level(buffer, head="symbol", keep=SYMBOL_HEADS):
+                if len(node) >= 2 and isinstance(node[1], str):
+                    yield LibrarySymbol(node[1], properties(node), node)
+        return
+    for source in outline:
+        _, start, end, units = source
+        header = _read_header(buffer[start:units[0] if units else end].decode('utf-8', errors='replace'), _PROPERTY)
+        if header is None:
+            node = _exact(buffer[start:end + 1])
+            yield LibrarySymbol(node[1], properties(node), node)
+            continue
+        props = {(_unescape(key) if '\\' in key else key) or atom_key:
+                 (_unescape(value) if '\\' in value else value) or atom_value
+                 for key, atom_key, value, atom_value in header}
+        yield LibrarySymbol(_atom(_TOKEN_AT.match(buffer, start + len(_SYMBOL)).group(1)), props, source=source)
+
+_CRTYD_LAYERS = ("F.CrtYd", "B.CrtYd")
+_CRTYD_SHAPES = ("fp_line", "fp_rect", "fp_arc", "fp_circle", "fp_poly")
+
+class Footprint(NamedTuple):
+    name: str
+    description: str
+    tags: str
+    pad_count: int
+    attribute: Optional[str]
+    courtyard: Optional[Tuple[float, float, float, float]]  # (x_min, y_min, x_max, y_max) in mm
+
+def _points(shape: Node) -> Iterator[Tuple[float, float]]:
+    """The coordinates a graphic item passes through; a circle contributes its bounding box."""
+    coords = {item[0]: item[1:3] for item in shape if isinstance(item, list) and len(item) >= 3
+              and item[0] in ("start", "end", "mid", "center")}
+    if shape[0] == "fp_circle" and "center" in coords and "end" in coords:
+        cx, cy = map(float, coords["center"])
+        radius = math.dist((cx, cy), tuple(map(float, coords["end"])))
+        yield from ((cx - radius, cy - radius), (cx + radius, cy + radius))
+        return
+    for x, y in coords.values():
+        yield float(x), float(y)
+    for pts in children(shape, "pts"):
+        for xy in children(pts, "xy"):
+            yield float(xy[1]), float(xy[2])
+
+def read_footprint(path: Union[str, Path]) -> Footprint:
+    """
+    Reads one .kicad_mod file (KiCad 6+ 'footprint' or older 'module' format). The
+    footprint name is the file name, as KiCad requires. Pads are counted once per
+    pad number; unnumbered mechanical pads are not counted. Without an (attr ...)
+    the attribute is inferred from the pad types.
+    """
+    description = tags = ""
+    attribute = None
+    numbers = set()
+    pad_types = set()
+    xs: List[float] = []
+    ys: List[float] = []
+    for node in iter_file(path):
+        head = node[0] if node else None
+        if head == "descr" and len(node) > 1:
+            description = node[1]
+        elif head == "tags" and len(node) > 1:
+            tags = node[1]
+        elif head == "attr" and len(node) > 1:
+            attribute = node[1]
+        elif head == "pad" and len(node) > 2:
+            pad_types.add(node[2])
+            if node[1]:
+                numbers.add(node[1])
+        elif head in _CRTYD_SHAPES and any(layer[1] in _CRTYD_LAYERS for layer in children(node, "layer") if len(layer) > 1):
+            for x, y in _points(node):
+                xs.append(x)
+                ys.append(y)
+    if attribute is None and pad_types:
+        attribute = "through_hole" if "thru_hole" in pad_types else "smd" if "smd" in pad_types else None
+    courtyard = (min(xs), min(ys), max(xs), max(ys)) if xs else None
+    return Footprint(Path(path).stem, description, tags, len(numbers), attribute, courtyard)
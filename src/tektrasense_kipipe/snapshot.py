@@ -0,0 +1,239 @@
+"""
+Binary snapshots of the catalog schema.
+
+A snapshot is a directory holding one gzip-compressed binary COPY file per table
+plus a manifest.json with the column lists, row counts, SHA-256 checksums and
+sequence positions. Loading verifies every checksum first, then replaces the
+table contents in a single transaction: secondary indexes are dropped and rebuilt
+after the COPY, user triggers other than the change feed stamp are disabled
+during the COPY, and sequences are moved to where they were when the snapshot
+was taken.
+
+The change feed (change_feed.py) is local to each cluster: its stamps are this
+cluster's transaction ids. A load therefore keeps the target's tombstones
+instead of the saved ones, writes a tombstone for every part that the load
+removes, and lets the stamp trigger stamp every loaded part with the loading
+transaction as it is copied, so existing feed cursors see the whole load as
+one batch of changes.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import Any, Dict, List
+from .db_manager import DatabaseManager
+from .query_stats import query_stats
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_SCHEMA = "kicad_library"
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+_TABLES_SQL = """
+    SELECT c.relname, array_agg(a.attname ORDER BY a.attnum)
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped AND a.attgenerated = ''
+    WHERE n.nspname = %s AND c.relkind IN ('r', 'p')
+    GROUP BY c.relname
+"""
+
+_FOREIGN_KEYS_SQL = """
+    SELECT child.relname, parent.relname
+    FROM pg_constraint con
+    JOIN pg_class child ON child.oid = con.conrelid
+    JOIN pg_class parent ON parent.oid = con.confrelid
+    JOIN pg_namespace n ON n.oid = child.relnamespace
+    WHERE con.contype = 'f' AND n.nspname = %s
+"""
+
+# Change feed bookkeeping (Step 8 of create_tables.sql), kept local to the target cluster.
+FEED_TABLE = "component_deletions"
+FEED_SEQUENCE = "component_change_seq"
+FEED_TRIGGER = "components_stamp_change"
+
+_PREVIOUS_COMPONENTS_SQL = """
+    CREATE TEMP TABLE kipipe_previous_components ON COMMIT DROP AS
+    SELECT partid, internal_part_id, manufacturer_part_number FROM "{schema}".components
+"""
+
+# Change sequence values for the tombstones, reserved before the loaded rows are
+# stamped so a consumer applies the tombstones first. Returns the first one.
+_RESERVE_TOMBSTONES_SQL = """
+    SELECT setval('"{schema}".component_change_seq', nextval('"{schema}".component_change_seq') + p.count) - p.count
+    FROM (SELECT count(*) AS count FROM kipipe_previous_components) p
+"""
+
+# Tombstones for the parts the load removed or replaced under the same partid.
+_RECORD_REMOVED_SQL = """
+    INSERT INTO "{schema}".component_deletions (change_seq, partid, internal_part_id, manufacturer_part_number)
+    SELECT %s + row_number() OVER (ORDER BY p.partid) - 1, p.partid, p.internal_part_id, p.manufacturer_part_number
+    FROM kipipe_previous_components p
+    WHERE NOT EXISTS (SELECT 1 FROM "{schema}".components c
+                      WHERE c.partid = p.partid AND c.manufacturer_part_number = p.manufacturer_part_number)
+"""
+
+_SEQUENCES_SQL = "SELECT sequencename, last_value FROM pg_sequences WHERE schemaname = %s"
+
+# Indexes that back a primary key, unique or exclusion constraint stay in place;
+# dropping them would mean dropping the foreign keys that depend on them.
+_SECONDARY_INDEXES_SQL = """
+    SELECT i.indexname, i.indexdef
+    FROM pg_indexes i
+    JOIN pg_class ic ON ic.relname = i.indexname
+    JOIN pg_namespace n ON n.oid = ic.relnamespace AND n.nspname = i.schemaname
+    WHERE i.schemaname = %s AND i.tablename = ANY(%s)
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = ic.oid)
+"""
+
+def _ordered_tables(cur, schema: str) -> Dict[str, List[str]]:
+    """Returns {table: columns} with referenced tables before the tables that reference them."""
+    cur.execute(_TABLES_SQL, (schema,))
+    columns = dict(cur.fetchall())
+    cur.execute(_FOREIGN_KEYS_SQL, (schema,))
+    graph = {table: set() for table in columns}
+    for child, parent in cur.fetchall():
+        if child != parent and child in graph and parent in graph:
+            graph[child].add(parent)
+    return {table: columns[table] for table in TopologicalSorter(graph).static_order()}
+
+def _copy_sql(schema: str, table: str, columns: List[str], direction: str) -> str:
+    column_list = ", ".join(f'"{col}"' for col in columns)
+    options = "FORMAT binary, FREEZE" if direction == "FROM STDIN" else "FORMAT binary"
+    return f'COPY "{schema}"."{table}" ({column_list}) {direction} WITH ({options})'
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_snapshot(db_manager: DatabaseManager, directory: Path, schema: str = SNAPSHOT_SCHEMA,
+                  compress_level: int = 3) -> Dict[str, Any]:
+    """
+    Dumps every table of the schema from one consistent, read-only snapshot
+    (the replica is used when configured). Returns the manifest that was written.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest: Dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "schema": schema,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "tables": [],
+    }
+    with db_manager.get_connection(readonly=True) as conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                manifest["server_version"] = conn.server_version
+                for table, columns in _ordered_tables(cur, schema).items():
+                    path = directory / f"{table}.copy.gz"
+                    sql = _copy_sql(schema, table, columns, "TO STDOUT")
+                    start = time.perf_counter()
+                    with gzip.open(path, 'wb', compresslevel=compress_level) as f:
+                        cur.copy_expert(sql, f)
+                    query_stats.record(sql, time.perf_counter() - start, cur.rowcount)
+                    manifest["tables"].append({
+                        "name": table,
+                        "columns": columns,
+                        "file": path.name,
+                        "rows": cur.rowcount,
+                        "sha256": _sha256(path),
+                    })
+                    log.info(f"Saved {cur.rowcount} rows from '{table}'.")
+                cur.execute(_SEQUENCES_SQL, (schema,))
+                manifest["sequences"] = {name: value for name, value in cur.fetchall()}
+        finally:
+            conn.rollback()
+
+    with open(directory / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def read_manifest(directory: Path) -> Dict[str, Any]:
+    """Loads the manifest and checks every table file against its recorded checksum."""
+    with open(directory / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version: {manifest.get('format_version')}")
+    for table in manifest["tables"]:
+        path = directory / table["file"]
+        if not path.is_file():
+            raise ValueError(f"Snapshot file '{path}' is missing.")
+        if _sha256(path) != table["sha256"]:
+            raise ValueError(f"Checksum mismatch for '{path}'; the snapshot is corrupt.")
+    return manifest
+
+def load_snapshot(db_manager: DatabaseManager, directory: Path) -> int:
+    """
+    Replaces the contents of the snapshot's tables with the saved rows. The target
+    schema must already exist (create_tables.sql). Everything happens in one
+    transaction, so a failed load leaves the database as it was. The change feed
+    tombstones are the target's own and are not replaced (see the module docstring).
+    Returns the number of rows loaded.
+    """
+    manifest = read_manifest(directory)
+    schema = manifest["schema"]
+    saved_tables = [table for table in manifest["tables"] if table["name"] != FEED_TABLE]
+    tables = [table["name"] for table in saved_tables]
+    qualified = ", ".join(f'"{schema}"."{table}"' for table in tables)
+    feed = any(table["name"] == "components" and "change_xid" in table["columns"] for table in saved_tables)
+    loaded = 0
+    with db_manager.get_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute(_SECONDARY_INDEXES_SQL, (schema, tables))
+                indexes = cur.fetchall()
+                for index_name, _ in indexes:
+                    cur.execute(f'DROP INDEX "{schema}"."{index_name}"')
+
+                if feed:
+                    cur.execute(_PREVIOUS_COMPONENTS_SQL.format(schema=schema))
+                    cur.execute(_RESERVE_TOMBSTONES_SQL.format(schema=schema))
+                    first_tombstone = cur.fetchone()[0]
+                # Truncating in the same transaction lets COPY ... FREEZE skip later vacuum work.
+                cur.execute(f"TRUNCATE {qualified}")
+                for table in tables:
+                    cur.execute(f'ALTER TABLE "{schema}"."{table}" DISABLE TRIGGER USER')
+                if feed:
+                    # The stamp trigger stays on, so the COPY stamps the loaded parts itself.
+                    cur.execute(f'ALTER TABLE "{schema}".components ENABLE TRIGGER "{FEED_TRIGGER}"')
+
+                for table in saved_tables:
+                    sql = _copy_sql(schema, table["name"], table["columns"], "FROM STDIN")
+                    start = time.perf_counter()
+                    with gzip.open(directory / table["file"], 'rb') as f:
+                        cur.copy_expert(sql, f)
+                    query_stats.record(sql, time.perf_counter() - start, table["rows"])
+                    loaded += table["rows"]
+                    log.info(f"Loaded {table['rows']} rows into '{table['name']}'.")
+
+                if feed:
+                    cur.execute(_RECORD_REMOVED_SQL.format(schema=schema), (first_tombstone,))
+                    log.info(f"Recorded {cur.rowcount} removed parts in the change feed.")
+                for table in tables:
+                    cur.execute(f'ALTER TABLE "{schema}"."{table}" ENABLE TRIGGER USER')
+
+                cur.execute("SET LOCAL maintenance_work_mem = '512MB'")
+                for index_name, index_def in indexes:
+                    start = time.perf_counter()
+                    cur.execute(index_def)
+                    log.info(f"Rebuilt index '{index_name}' in {time.perf_counter() - start:.1f} s.")
+
+                for sequence, value in manifest.get("sequences", {}).items():
+                    if value is not None and sequence != FEED_SEQUENCE:
+                        cur.execute("SELECT setval(%s, %s)", (f'"{schema}"."{sequence}"', value))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    # Fresh planner statistics, so the first queries against the restored data use the indexes.
+    db_manager.execute_query(f"ANALYZE {qualified}")
+    return loaded
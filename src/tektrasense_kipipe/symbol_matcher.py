@@ -0,0 +1,79 @@
+"""
+Longest-common-prefix matching of part numbers against the symbol catalog,
+used by 'add-symbol'.
+
+Symbol names are normalized once ('IC_LM358_A' -> 'LM358', the 'x' wildcards
+of names like 'LM358x' dropped) and kept in one sorted list. The symbol with
+the longest common prefix with a part number is always a neighbour of the
+part number's insertion point, and every symbol sharing that prefix sits in
+one contiguous slice after it, so a lookup is two or three bisections instead
+of a pass over the whole catalog. A bulk run loads the catalog once and reuses
+the matcher (and its per-pin-count subsets) for every part.
+"""
+import re
+import sys
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MIN_PREFIX = 5
+SYMBOLS_QUERY = "SELECT library_nickname, symbol_name, pin_count FROM symbols"
+
+_CATEGORY_PREFIX = re.compile(r'^[A-Z]+_')
+_VARIANT_SUFFIX = re.compile(r'_[A-Z]$')
+
+def normalize(symbol_name: str) -> str:
+    """The part of a symbol name compared with part numbers: no category prefix, variant suffix or 'x' wildcards."""
+    name = _VARIANT_SUFFIX.sub('', _CATEGORY_PREFIX.sub('', symbol_name))
+    return name.replace('x', '').replace('X', '')
+
+def _common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+class SymbolMatcher:
+    """The symbols sorted by normalized name, with (nickname, name, pin count) alongside."""
+
+    def __init__(self, keys: List[str], symbols: List[Tuple[str, str, Optional[int]]]):
+        self._keys = keys
+        self._symbols = symbols
+        self._by_pin_count: Dict[int, "SymbolMatcher"] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "SymbolMatcher":
+        """Builds the matcher from (library_nickname, symbol_name, pin_count) rows."""
+        entries = sorted(((normalize(name), sys.intern(nickname), name, pin_count) for nickname, name, pin_count in rows),
+                         key=lambda entry: entry[:3])
+        return cls([entry[0] for entry in entries], [entry[1:] for entry in entries])
+
+    @classmethod
+    def load(cls, db_manager) -> "SymbolMatcher":
+        return cls.from_rows(db_manager.fetch_all(SYMBOLS_QUERY) or [])
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def for_pin_count(self, pin_count: int) -> "SymbolMatcher":
+        """
+        The symbols with 'pin_count' or one more pins (an exposed pad often is an
+        extra symbol pin) or an unknown pin count. Filtering keeps the order, so
+        nothing is re-sorted; each subset is built once and cached.
+        """
+        if pin_count not in self._by_pin_count:
+            keep = [i for i, (_, _, pins) in enumerate(self._symbols) if pins is None or pin_count <= pins <= pin_count + 1]
+            self._by_pin_count[pin_count] = SymbolMatcher([self._keys[i] for i in keep], [self._symbols[i] for i in keep])
+        return self._by_pin_count[pin_count]
+
+    def best_matches(self, part_number: str, min_prefix: int = MIN_PREFIX) -> Tuple[List[dict], int]:
+        """The symbols sharing the longest (at least 'min_prefix' character) prefix with the part number, and that length."""
+        keys = self._keys
+        at = bisect_left(keys, part_number)
+        best = max((_common_prefix(keys[i], part_number) for i in (at - 1, at) if 0 <= i < len(keys)), default=0)
+        if best < min_prefix:
+            return [], 0
+        prefix = part_number[:best]
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+        return [{"nickname": nickname, "symbol": name} for nickname, name, _ in self._symbols[start:end]], best
@@ -9,30 +9,30 @@ class Args:
         self.footprint = footprint
 
 @pytest.fixture
-def mock_filesystem(mocker):
-    """A fixture to create a virtual filesystem for footprint libraries."""
-    def _setup(file_content, found_files):
-        mocker.patch('tektrasense_kipipe.config.FOOTPRINT_SEARCH_PATHS', ['/fake/lib'])
-        mocker.patch('os.walk', return_value=[('/fake/lib', [], found_files)])
-        mocker.patch('builtins.open', mocker.mock_open(read_data=file_content))
-    return _setup
+def footprint_library(tmp_path, mocker):
+    """A footprint search path holding 'Resistor_SMD.pretty/R_0805.kicad_mod'."""
+    library = tmp_path / "lib" / "Resistor_SMD.pretty"
+    library.mkdir(parents=True)
+    (library / "R_0805.kicad_mod").write_text('(footprint "R_0805" (layer F.Cu))')
+    mocker.patch('tektrasense_kipipe.config.FOOTPRINT_SEARCH_PATHS', [str(tmp_path / "lib")])
+    return library
 
 @pytest.mark.parametrize(
-    "footprint_link, file_content, found_files, expected_result, expected_log",
+    "footprint_link, expected_result, expected_log",
     [
-        ("Resistor_SMD:R_0805", '(footprint "R_0805" (layer F.Cu))', ["Resistor_SMD.kicad_mod"], True, None),
-        ("Resistor_SMD:R_1206", '(footprint "R_0805")', ["Resistor_SMD.kicad_mod"], False, None),
-        ("Other_Lib:Other_FP", '', [], False, None),
-        ("InvalidFormat", '', [], False, "Invalid footprint link format: 'InvalidFormat'."),
+        ("Resistor_SMD:R_0805", True, None),
+        ("Resistor_SMD:R_1206", False, None),
+        ("Other_Lib:Other_FP", False, None),
+        ("InvalidFormat", False, "Invalid footprint link format: 'InvalidFormat'."),
     ]
 )
-def test_verify_footprint_exists(mock_filesystem, caplog, footprint_link, file_content, found_files, expected_result, expected_log):
+def test_verify_footprint_exists(footprint_library, caplog, footprint_link, expected_result, expected_log):
     """Tests _verify_footprint_exists with various scenarios."""
-    mock_filesystem(file_content, found_files)
-    
-    exists, _ = add_footprint._verify_footprint_exists(footprint_link)
+    exists, path = add_footprint._verify_footprint_exists(footprint_link)
     
     assert exists is expected_result
+    if expected_result:
+        assert path == str(footprint_library / "R_0805.kicad_mod")
     if expected_log:
         assert expected_log in caplog.text
 
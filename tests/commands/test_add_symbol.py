@@ -4,13 +4,15 @@ from tektrasense_kipipe.commands import add_symbol
 
 class Args:
     """A simple namespace for mocking argparse results."""
-    def __init__(self, part_number=None, csv=None, spreadsheet=None, txt=None, col_part="Part Number", force=False):
+    def __init__(self, part_number=None, csv=None, spreadsheet=None, txt=None, col_part="Part Number", force=False, resume=None, deadline=None):
         self.part_number = part_number
         self.csv = csv
         self.spreadsheet = spreadsheet
         self.txt = txt
         self.col_part = col_part
         self.force = force
+        self.resume = resume
+        self.deadline = deadline
 
 @pytest.fixture
 def mock_db_manager(mocker):
@@ -25,15 +27,15 @@ def test_find_and_link_symbol_single_best_match_non_interactive(mock_verify, moc
     part_number = "MCP6001T-I/OT"
     mock_db_manager.get_component_symbol_info.return_value = ("IC OPAMP SOT23-5", None)
     mock_db_manager.fetch_all.return_value = [
-        ("Device", "MCP6001"),
-        ("Device", "MCP6002"),
-        ("Connector", "CONN_01x02"),
-        ("Device", "MCP600"),
+        ("Device", "MCP6001", None),
+        ("Device", "MCP6002", None),
+        ("Connector", "CONN_01x02", None),
+        ("Device", "MCP600", None),
     ]
 
     add_symbol._find_and_link_symbol(part_number, force=False, db_manager=mock_db_manager, is_interactive=False)
 
-    mock_db_manager.execute_query.assert_called_once_with(ANY, ('Device:MCP6001', part_number))
+    mock_db_manager.update_component_link.assert_called_once_with(part_number, "kicad_symbol", 'Device:MCP6001')
 
 @patch('tektrasense_kipipe.commands.add_symbol._verify_symbol_exists', return_value=True)
 def test_find_and_link_symbol_single_unique_match_non_interactive(mock_verify, mock_db_manager, mocker):
@@ -41,18 +43,43 @@ def test_find_and_link_symbol_single_unique_match_non_interactive(mock_verify, m
     part_number = "LM358ADR"
     mock_db_manager.get_component_symbol_info.return_value = ("Dual Op-Amp", None)
     mock_db_manager.fetch_all.return_value = [
-        ("Amplifier_Operational", "LM358A"),
-        ("Amplifier_Operational", "LM358"),
-        ("Regulator_Linear", "LM1117"),
+        ("Amplifier_Operational", "LM358A", None),
+        ("Amplifier_Operational", "LM358", None),
+        ("Regulator_Linear", "LM1117", None),
     ]
     mock_log_info = mocker.patch('tektrasense_kipipe.commands.add_symbol.log.info')
 
     add_symbol._find_and_link_symbol(part_number, force=False, db_manager=mock_db_manager, is_interactive=False)
 
     expected_link = "Amplifier_Operational:LM358A"
-    mock_db_manager.execute_query.assert_called_once_with(ANY, (expected_link, part_number))
+    mock_db_manager.update_component_link.assert_called_once_with(part_number, "kicad_symbol", expected_link)
     mock_log_info.assert_any_call(f"Found exactly one match: '{expected_link}'.")
 
+@patch('tektrasense_kipipe.commands.add_symbol._verify_symbol_exists', return_value=True)
+def test_find_and_link_symbol_prefilters_by_pin_count(mock_verify, mock_db_manager):
+    """Tests that a known package pin count narrows the candidates before any prefix matching."""
+    mock_db_manager.get_component_symbol_info.return_value = ("IC OPAMP SOT23-5", None)
+    mock_db_manager.get_component_pin_count.return_value = 5
+    mock_db_manager.fetch_all.return_value = [
+        ("Amplifier_Operational", "MCP6001", 5),
+        ("Amplifier_Operational", "MCP6001x", 8),
+    ]
+
+    assert add_symbol._find_and_link_symbol("MCP6001T-I/OT", force=False, db_manager=mock_db_manager, is_interactive=False)
+
+    mock_db_manager.update_component_link.assert_called_once_with("MCP6001T-I/OT", "kicad_symbol", "Amplifier_Operational:MCP6001")
+
+@patch('tektrasense_kipipe.commands.add_symbol._verify_symbol_exists', return_value=True)
+def test_find_and_link_symbol_falls_back_to_all_symbols(mock_verify, mock_db_manager):
+    """Tests that when no symbol with the pin count matches, every symbol is searched."""
+    mock_db_manager.get_component_symbol_info.return_value = ("IC OPAMP SOT23-5", None)
+    mock_db_manager.get_component_pin_count.return_value = 5
+    mock_db_manager.fetch_all.return_value = [("Connector", "CONN_01x05", 5), ("Amplifier_Operational", "MCP6001", 8)]
+
+    assert add_symbol._find_and_link_symbol("MCP6001T-I/OT", force=False, db_manager=mock_db_manager, is_interactive=False)
+
+    mock_db_manager.update_component_link.assert_called_once_with("MCP6001T-I/OT", "kicad_symbol", "Amplifier_Operational:MCP6001")
+
 @patch('builtins.input')
 @patch('tektrasense_kipipe.commands.add_symbol._verify_symbol_exists', return_value=True)
 def test_find_and_link_symbol_interactive_choice(mock_verify, mock_input, mock_db_manager):
@@ -60,9 +87,9 @@ def test_find_and_link_symbol_interactive_choice(mock_verify, mock_input, mock_d
     part_number = "MCP6001T-I/OT"
     mock_db_manager.get_component_symbol_info.return_value = ("IC OPAMP SOT23-5", None)
     mock_db_manager.fetch_all.return_value = [
-        ("Device", "MCP6001A"),
-        ("Device", "MCP6001B"),
-        ("Device", "MCP600"),
+        ("Device", "MCP6001A", None),
+        ("Device", "MCP6001B", None),
+        ("Device", "MCP600", None),
     ]
     mock_input.side_effect = ['3', '2']
 
@@ -70,7 +97,7 @@ def test_find_and_link_symbol_interactive_choice(mock_verify, mock_input, mock_d
 
     assert mock_input.call_count == 2
     expected_link = "Device:MCP6001B"
-    mock_db_manager.execute_query.assert_called_once_with(ANY, (expected_link, part_number))
+    mock_db_manager.update_component_link.assert_called_once_with(part_number, "kicad_symbol", expected_link)
 
 def test_find_and_link_symbol_already_exists_no_force(mock_db_manager, mocker):
     """Tests that the function exits early if a symbol exists and --force is not used."""
@@ -81,7 +108,7 @@ def test_find_and_link_symbol_already_exists_no_force(mock_db_manager, mocker):
     add_symbol._find_and_link_symbol(part_number, force=False, db_manager=mock_db_manager, is_interactive=False)
 
     mock_db_manager.fetch_all.assert_not_called()
-    mock_db_manager.execute_query.assert_not_called()
+    mock_db_manager.update_component_link.assert_not_called()
     mock_log_warning.assert_called_once_with("Part 'EXISTING-PART' already has symbol 'Existing:Symbol'. Use --force to overwrite.")
 
 @patch('tektrasense_kipipe.commands.add_symbol._verify_symbol_exists', return_value=False)
@@ -89,13 +116,13 @@ def test_find_and_link_symbol_final_validation_fails(mock_verify, mock_db_manage
     """Tests that the DB is not updated if the chosen symbol fails the final filesystem check."""
     part_number = "LM358ADR"
     mock_db_manager.get_component_symbol_info.return_value = ("Dual Op-Amp", None)
-    mock_db_manager.fetch_all.return_value = [("Amplifier_Operational", "LM358A")]
+    mock_db_manager.fetch_all.return_value = [("Amplifier_Operational", "LM358A", None)]
     mock_log_error = mocker.patch('tektrasense_kipipe.commands.add_symbol.log.error')
     
     add_symbol._find_and_link_symbol(part_number, force=False, db_manager=mock_db_manager, is_interactive=False)
     
     mock_verify.assert_called_once_with("Amplifier_Operational:LM358A")
-    mock_db_manager.execute_query.assert_not_called()
+    mock_db_manager.update_component_link.assert_not_called()
     mock_log_error.assert_called_once_with("Final check failed. The selected symbol 'Amplifier_Operational:LM358A' does not seem to exist in the library files.")
 
 @patch('tektrasense_kipipe.commands.add_symbol._find_and_link_symbol')
@@ -119,5 +146,34 @@ def test_run_with_csv_file(MockDB, mock_find_link, mock_load_file):
     
     mock_load_file.assert_called_once_with("parts.csv", None, None, "Part Number")
     assert mock_find_link.call_count == 2
-    mock_find_link.assert_any_call("PN-A", False, ANY, is_interactive=False)
-    mock_find_link.assert_any_call("PN-B", False, ANY, is_interactive=False)
\ No newline at end of file
+    mock_find_link.assert_any_call("PN-A", False, ANY, is_interactive=False, matcher=ANY)
+    mock_find_link.assert_any_call("PN-B", False, ANY, is_interactive=False, matcher=ANY)
+
+@patch('tektrasense_kipipe.commands.add_symbol._load_parts_from_file', return_value=["LM358ADR", "LM358DR", "MCP6001T-I/OT"])
+@patch('tektrasense_kipipe.commands.add_symbol._verify_symbol_exists', return_value=True)
+@patch('tektrasense_kipipe.commands.add_symbol.DatabaseManager')
+def test_run_bulk_loads_the_symbols_once(MockDB, mock_verify, mock_load_file):
+    """Tests that a bulk run reads the symbols table once, not once per part."""
+    db = MockDB.return_value
+    db.get_component_symbol_info.return_value = ("Some Desc", None)
+    db.get_component_pin_count.return_value = None
+    db.fetch_all.return_value = [("Amplifier_Operational", "LM358", 8), ("Amplifier_Operational", "MCP6001", 5)]
+
+    add_symbol.run(Args(csv="parts.csv"))
+
+    db.fetch_all.assert_called_once()
+    assert db.update_component_link.call_count == 3
+@patch('tektrasense_kipipe.commands.add_symbol._find_and_link_symbol')
+@patch('tektrasense_kipipe.commands.add_symbol.DatabaseManager')
+def test_run_resume_retries_only_unlinked_parts(MockDB, mock_find_link, tmp_path):
+    """Verifies that a resumed bulk run skips the parts its journal recorded as linked."""
+    parts = tmp_path / "parts.txt"
+    parts.write_text("PN-A\nPN-B\nPN-C\n")
+    mock_find_link.side_effect = lambda pn, *args, **kwargs: pn != "PN-B"
+
+    add_symbol.run(Args(txt=str(parts)))
+    run_id = next((tmp_path / "runs").glob("add-symbol-*.jsonl")).stem
+    mock_find_link.reset_mock()
+    add_symbol.run(Args(txt=str(parts), resume=run_id))
+
+    mock_find_link.assert_called_once_with("PN-B", False, ANY, is_interactive=False, matcher=ANY)
@@ -0,0 +1,37 @@
+import pytest
+from tektrasense_kipipe.commands import bom_status
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, bom_id=None, problems_only=False):
+        self.bom_id = bom_id
+        self.problems_only = problems_only
+
+@pytest.fixture
+def mock_db(mocker):
+    db_instance = mocker.MagicMock()
+    db_instance.connection_pool = True
+    mocker.patch('tektrasense_kipipe.commands.bom_status.DatabaseManager', return_value=db_instance)
+    return db_instance
+
+def test_bom_lines_report_problems(mock_db, capsys):
+    """Tests per-line status: unfetched parts, missing links and lifecycle are all reported."""
+    mock_db.fetch_all.return_value = [
+        ("LM324N", 1, "U2", True, "Amplifier_Operational:LM324", "Package_DIP:DIP-14_W7.62mm", "Obsolete"),
+        ("NE555P", 1, "U1", True, "Timer:NE555P", "Package_DIP:DIP-8_W7.62mm", "Active"),
+        ("RC0603-10K", 4, "R1-R4", True, "Device:R", None, "Active"),
+        ("XYZ-123", 1, "J1", False, None, None, None),
+    ]
+
+    bom_status.run(Args(bom_id=12, problems_only=True))
+
+    out = capsys.readouterr().out
+    assert mock_db.fetch_all.call_args.args[1] == (12,)
+    assert "NE555P" not in out
+    assert "Obsolete" in out and "no footprint" in out and "not fetched" in out
+    assert "1/4 lines are ready" in out
+
+def test_summary_without_boms(mock_db, capsys):
+    mock_db.fetch_all.return_value = []
+    bom_status.run(Args())
+    assert "No BOMs registered yet" in capsys.readouterr().out
@@ -0,0 +1,53 @@
+import json
+import pytest
+from unittest.mock import patch
+from tektrasense_kipipe.commands import build_dbl
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, output, dsn="kicad_components", name="Test Library", plain_views=False, include_empty=False, refresh_only=False):
+        self.output = output
+        self.dsn = dsn
+        self.name = name
+        self.plain_views = plain_views
+        self.include_empty = include_empty
+        self.refresh_only = refresh_only
+
+def test_view_name_is_identifier_safe():
+    """Tests that category names become lowercase, underscore-separated view names."""
+    assert build_dbl.category_view_name(47, "Resistors") == "dbl_47_resistors"
+    assert build_dbl.category_view_name(45, "EMI / RFI Components") == "dbl_45_emi_rfi_components"
+    assert len(build_dbl.category_view_name(1, "x" * 100)) <= 63
+
+@patch('tektrasense_kipipe.commands.build_dbl.DatabaseManager')
+def test_run_builds_views_and_writes_dbl(MockDB, tmp_path):
+    """Tests that every category gets a view and non-empty ones are listed in the .kicad_dbl."""
+    # 1. Arrange
+    db_instance = MockDB.return_value
+    db_instance.connection_pool = True
+    db_instance.fetch_all.return_value = [(43, "Capacitors", 0), (47, "Resistors", 12)]
+    db_instance.create_category_view.return_value = True
+    output = tmp_path / "lib.kicad_dbl"
+
+    # 2. Act
+    build_dbl.run(Args(str(output), dsn="my_dsn"))
+
+    # 3. Assert
+    db_instance.create_category_view.assert_any_call("dbl_43_capacitors", 43, materialized=True)
+    db_instance.create_category_view.assert_any_call("dbl_47_resistors", 47, materialized=True)
+    dbl = json.loads(output.read_text())
+    assert dbl["source"]["dsn"] == "my_dsn"
+    assert [lib["table"] for lib in dbl["libraries"]] == ["dbl_47_resistors"]
+    assert dbl["libraries"][0]["key"] == "internal_part_id"
+    assert {"column": "manufacturer_part_number", "name": "MPN"}.items() <= dbl["libraries"][0]["fields"][1].items()
+
+@patch('tektrasense_kipipe.commands.build_dbl.DatabaseManager')
+def test_run_refresh_only(MockDB, tmp_path):
+    """Tests that --refresh-only refreshes the views without rebuilding them."""
+    db_instance = MockDB.return_value
+    db_instance.connection_pool = True
+
+    build_dbl.run(Args(str(tmp_path / "unused.kicad_dbl"), refresh_only=True))
+
+    db_instance.refresh_category_views.assert_called_once()
+    db_instance.create_category_view.assert_not_called()
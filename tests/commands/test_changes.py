@@ -0,0 +1,52 @@
+import json
+import pytest
+from tektrasense_kipipe.commands import changes
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, since=None, token_file=None, output="-", batch_size=1000):
+        self.since = since
+        self.token_file = token_file
+        self.output = output
+        self.batch_size = batch_size
+
+@pytest.fixture
+def mock_feed(mocker):
+    """Mocks the DatabaseManager and the change feed it is read through."""
+    db_instance = mocker.MagicMock()
+    db_instance.connection_pool = True
+    mocker.patch('tektrasense_kipipe.commands.changes.DatabaseManager', return_value=db_instance)
+    events = [
+        {"seq": 7, "op": "insert", "partid": 3, "manufacturer_part_number": "LM358DR", "row": {"partid": 3}},
+        {"seq": 9, "op": "delete", "partid": 1, "manufacturer_part_number": "NE555P", "row": None},
+    ]
+    return mocker.patch('tektrasense_kipipe.commands.changes.read_changes', return_value=(iter(events), "kc1-1200"))
+
+def test_writes_ndjson_and_stores_token(mock_feed, tmp_path):
+    """Tests that changes are written one per line and the token file is resumed from and updated."""
+    token_file = tmp_path / "erp.token"
+    token_file.write_text("kc1-1000\n")
+    output = tmp_path / "changes.ndjson"
+
+    changes.run(Args(token_file=str(token_file), output=str(output)))
+
+    assert mock_feed.call_args.args[1] == "kc1-1000"
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["seq"] for line in lines] == [7, 9]
+    assert token_file.read_text().strip() == "kc1-1200"
+
+def test_since_overrides_token_file(mock_feed, tmp_path, capsys):
+    """Tests that an explicit --since wins over a stored token."""
+    token_file = tmp_path / "erp.token"
+    token_file.write_text("kc1-1000\n")
+
+    changes.run(Args(since="kc1-5", token_file=str(token_file)))
+
+    assert mock_feed.call_args.args[1] == "kc1-5"
+    assert len(capsys.readouterr().out.splitlines()) == 2
+
+def test_invalid_token_exits(mock_feed):
+    """Tests that a malformed token stops the command."""
+    mock_feed.side_effect = ValueError("Invalid change feed token: 'abc'")
+    with pytest.raises(SystemExit):
+        changes.run(Args(since="abc"))
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+from tektrasense_kipipe.commands import cost
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, bom, qty=1, column="MPN", qty_column="Qty", supplier=None, output=None):
+        self.bom = bom
+        self.qty = qty
+        self.column = column
+        self.qty_column = qty_column
+        self.supplier = supplier
+        self.output = output
+
+TIERS = [
+    ("RC0603-10K", "DigiKey", 1, 0.10, 5000),
+    ("RC0603-10K", "DigiKey", 100, 0.02, 5000),
+    ("RC0603-10K", "Mouser", 1, 0.09, 5000),
+    ("LM358DR", "DigiKey", 1, 0.50, 10),
+    ("LM358DR", "Mouser", 10, 0.30, 0),
+]
+
+def _lines(*rows):
+    return pd.DataFrame(rows, columns=["manufacturer_part_number", "quantity", "references"])
+
+def test_compute_costs_picks_cheapest_tier_across_suppliers():
+    """Tests tier selection, buying up to a cheaper price break and stock flags."""
+    lines = _lines(("RC0603-10K", 9, ""), ("LM358DR", 1, ""), ("NOPRICE-1", 2, ""))
+    tiers = pd.DataFrame(TIERS, columns=cost.TIER_COLUMNS)
+
+    costed = cost.compute_costs(lines, tiers, boards=10).set_index("manufacturer_part_number")
+
+    # 90 resistors cost 8.10 at Mouser, but 100 at the DigiKey break cost only 2.00.
+    assert costed.loc["RC0603-10K", "supplier"] == "DigiKey"
+    assert costed.loc["RC0603-10K", "buy_quantity"] == 100
+    assert costed.loc["RC0603-10K", "extended_cost"] == pytest.approx(2.0)
+    # 10 op-amps: 5.00 at DigiKey vs 3.00 at Mouser's 10+ break, which has no stock.
+    assert costed.loc["LM358DR", "supplier"] == "Mouser"
+    assert not costed.loc["LM358DR", "in_stock"]
+    assert pd.isna(costed.loc["NOPRICE-1", "extended_cost"])
+
+def test_compute_costs_supplier_filter():
+    lines = _lines(("LM358DR", 1, ""))
+    tiers = pd.DataFrame(TIERS, columns=cost.TIER_COLUMNS)
+
+    costed = cost.compute_costs(lines, tiers, boards=10, suppliers=["DigiKey"])
+
+    assert costed.loc[0, "extended_cost"] == pytest.approx(5.0)
+
+def test_run_loads_tiers_in_one_query(mocker, tmp_path, capsys):
+    """Tests that the command fetches every tier of the BOM with a single call, read from the primary."""
+    db_instance = mocker.MagicMock()
+    db_instance.connection_pool = True
+    pinned = db_instance.read_your_writes.return_value.__enter__
+    db_instance.get_price_tiers.side_effect = lambda parts: TIERS if pinned.called else []
+    mocker.patch('tektrasense_kipipe.commands.cost.DatabaseManager', return_value=db_instance)
+    bom = tmp_path / "bom.csv"
+    bom.write_text("MPN,Qty\nRC0603-10K,2\nLM358DR,1\n")
+    output = tmp_path / "costing.csv"
+
+    cost.run(Args(str(bom), qty=5, output=str(output)))
+
+    db_instance.get_price_tiers.assert_called_once_with(["RC0603-10K", "LM358DR"])
+    assert "Total: 3.40 USD" in capsys.readouterr().out
+    assert len(pd.read_csv(output)) == 2
@@ -0,0 +1,27 @@
+import pytest
+from tektrasense_kipipe.commands import enqueue
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, part_number=None, bom=None, column="MPN", max_attempts=5):
+        self.part_number = part_number
+        self.bom = bom
+        self.column = column
+        self.max_attempts = max_attempts
+
+def test_enqueue_bom_registers_and_queues_parts(mocker, tmp_path):
+    """Tests that a BOM is registered and its part numbers queued under its bom_id."""
+    db_instance = mocker.MagicMock()
+    db_instance.connection_pool = True
+    mocker.patch('tektrasense_kipipe.commands.enqueue.DatabaseManager', return_value=db_instance)
+    mocker.patch('tektrasense_kipipe.commands.enqueue.register_bom_file', return_value=9)
+    queue = mocker.MagicMock()
+    queue.enqueue.return_value = 2
+    queue.counts.return_value = {"pending": 2}
+    mocker.patch('tektrasense_kipipe.commands.enqueue.JobQueue', return_value=queue)
+    bom = tmp_path / "bom.csv"
+    bom.write_text("MPN,Qty\nNE555P,1\nLM358DR,2\n")
+
+    enqueue.run(Args(bom=str(bom)))
+
+    queue.enqueue.assert_called_once_with(["NE555P", "LM358DR"], bom_id=9, max_attempts=5)
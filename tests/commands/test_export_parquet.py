@@ -0,0 +1,94 @@
+import json
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+from datetime import datetime, timezone
+from tektrasense_kipipe.commands import export_parquet, import_parquet
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, output_dir, tables=("components",), batch_size=2):
+        self.output_dir = output_dir
+        self.input_dir = output_dir
+        self.tables = list(tables)
+        self.batch_size = batch_size
+
+COLUMNS = [
+    ("partid", "integer"),
+    ("category_id", "integer"),
+    ("manufacturer_part_number", "character varying"),
+    ("parameters", "jsonb"),
+    ("lastupdated", "timestamp with time zone"),
+]
+
+CATALOG = [
+    (1, 47, "RC0603-10K", {"availability": 120, "Tolerance": "1%"}, datetime(2026, 10, 1, tzinfo=timezone.utc)),
+    (2, 47, "RC0603-1K", {"availability": 0}, datetime(2026, 10, 2, tzinfo=timezone.utc)),
+    (3, 43, "GRM188R71H104", {"Tolerance": "10%", "rohs": True}, datetime(2026, 10, 3, tzinfo=timezone.utc)),
+]
+
+@pytest.fixture
+def mock_db(mocker):
+    """Provides a mocked DatabaseManager serving a small components table."""
+    db_instance = mocker.MagicMock()
+    db_instance.connection_pool = True
+    db_instance.get_table_columns.return_value = COLUMNS
+    db_instance.fetch_all.return_value = [
+        ("Tolerance", ["string"], True),
+        ("availability", ["number"], True),
+        ("rohs", ["boolean"], True),
+    ]
+
+    def stream_query(query, params=None, batch_size=5000):
+        for i in range(0, len(CATALOG), batch_size):
+            yield CATALOG[i:i + batch_size]
+
+    db_instance.stream_query.side_effect = stream_query
+    db_instance.upsert_many.return_value = True
+    mocker.patch('tektrasense_kipipe.commands.export_parquet.DatabaseManager', return_value=db_instance)
+    mocker.patch('tektrasense_kipipe.commands.import_parquet.DatabaseManager', return_value=db_instance)
+    return db_instance
+
+def test_export_flattens_parameters_and_partitions_by_category(mock_db, tmp_path):
+    """Tests that parameters become typed columns and components are written per category_id."""
+    export_parquet.run(Args(str(tmp_path)))
+
+    assert sorted(p.name for p in (tmp_path / "components").iterdir()) == ["category_id=43", "category_id=47"]
+    table = ds.dataset(str(tmp_path / "components"), format="parquet", partitioning="hive").to_table()
+    assert table.schema.field("param_availability").type == pa.int64()
+    assert table.schema.field("param_rohs").type == pa.bool_()
+    assert "parameters" not in table.column_names
+    rows = {row["manufacturer_part_number"]: row for row in table.to_pylist()}
+    assert rows["RC0603-10K"]["param_tolerance"] == "1%"
+    assert rows["RC0603-1K"]["param_tolerance"] is None
+
+def test_import_round_trips_parameters(mock_db, tmp_path):
+    """Tests that import-parquet upserts on the natural key and rebuilds the parameters JSON."""
+    export_parquet.run(Args(str(tmp_path)))
+
+    import_parquet.run(Args(str(tmp_path), batch_size=10))
+
+    imported = [row for call in mock_db.upsert_many.call_args_list for row in call.args[1]]
+    assert {call.args[2] for call in mock_db.upsert_many.call_args_list} == {("manufacturer_part_number",)}
+    by_mpn = {row["manufacturer_part_number"]: row for row in imported}
+    assert len(by_mpn) == 3
+    assert "partid" not in by_mpn["RC0603-10K"]
+    assert by_mpn["RC0603-10K"]["parameters"] == '{"Tolerance": "1%", "availability": 120}'
+    assert by_mpn["GRM188R71H104"]["category_id"] == 43
+    mock_db.refresh_category_views.assert_called_once()
+
+def test_colliding_parameter_keys_get_distinct_columns_and_round_trip(mock_db, tmp_path, mocker):
+    """Tests that two keys normalizing to the same column are both exported and restored under their own keys."""
+    catalog = [(1, 47, "C0603-100N", {"Voltage - Rated": "50V", "Voltage Rated": "25V"}, datetime(2026, 10, 1, tzinfo=timezone.utc))]
+    mock_db.stream_query.side_effect = lambda query, params=None, batch_size=5000: iter([catalog])
+    mock_db.fetch_all.return_value = [("Voltage - Rated", ["string"], True), ("Voltage Rated", ["string"], True)]
+
+    export_parquet.run(Args(str(tmp_path)))
+    import_parquet.run(Args(str(tmp_path)))
+
+    table = ds.dataset(str(tmp_path / "components"), format="parquet", partitioning="hive").to_table()
+    param_columns = sorted(name for name in table.column_names if name.startswith("param_"))
+    assert len(param_columns) == 2 and param_columns[0] == "param_voltage_rated"
+    assert param_columns == sorted(export_parquet._param_columns(["Voltage Rated", "Voltage - Rated"]).values())
+    imported = mock_db.upsert_many.call_args.args[1][0]
+    assert json.loads(imported["parameters"]) == {"Voltage - Rated": "50V", "Voltage Rated": "25V"}
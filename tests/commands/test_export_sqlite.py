@@ -0,0 +1,92 @@
+import sqlite3
+import pytest
+from tektrasense_kipipe.commands import export_sqlite
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, output, full=False, batch_size=2):
+        self.output = output
+        self.full = full
+        self.batch_size = batch_size
+
+COLUMNS = [
+    ("partid", "integer"),
+    ("internal_part_id", "character varying"),
+    ("category_id", "integer"),
+    ("manufacturer_part_number", "character varying"),
+    ("parameters", "jsonb"),
+    ("lastupdated", "timestamp with time zone"),
+    ("change_seq", "bigint"),
+    ("change_xid", "xid8"),
+]
+
+def _row(partid, mpn, day):
+    return {"partid": partid, "internal_part_id": f"PCP-RES-{partid:04d}", "category_id": 47, "manufacturer_part_number": mpn,
+            "parameters": {"availability": 10}, "lastupdated": f"2026-10-{day:02d}T00:00:00+00:00"}
+
+def _change(op, row, partid=None):
+    return {"seq": 0, "op": op, "partid": partid or row["partid"], "manufacturer_part_number": None, "row": row}
+
+@pytest.fixture
+def mock_db(mocker):
+    """Provides a mocked DatabaseManager serving a small catalog, and a fake change feed."""
+    db_instance = mocker.MagicMock()
+    db_instance.connection_pool = True
+    db_instance.get_table_columns.return_value = COLUMNS
+    db_instance.fetch_all.return_value = [(47, "Resistors")]
+    db_instance.catalog = [_row(1, "RC0603-10K", 1), _row(2, "RC0603-1K", 2), _row(3, "RC0603-100R", 3)]
+    db_instance.changes = []
+
+    def stream_query(query, params=None, batch_size=5000, use_primary=False):
+        yield [(row["partid"],) for row in db_instance.catalog]
+
+    def read_changes(db_manager, since=None, batch_size=1000):
+        feed = db_instance.changes if since else [_change("insert", row) for row in db_instance.catalog]
+        return iter(feed), f"kc1-{100 + len(db_instance.read_changes.call_args_list)}"
+
+    db_instance.stream_query.side_effect = stream_query
+    db_instance.read_changes = mocker.patch('tektrasense_kipipe.commands.export_sqlite.read_changes', side_effect=read_changes)
+    mocker.patch('tektrasense_kipipe.commands.export_sqlite.DatabaseManager', return_value=db_instance)
+    return db_instance
+
+def test_first_run_copies_everything_with_views(mock_db, tmp_path):
+    """Tests the initial full copy, column layout, category views and stored token."""
+    output = tmp_path / "catalog.sqlite"
+
+    export_sqlite.run(Args(str(output)))
+
+    conn = sqlite3.connect(output)
+    assert conn.execute("SELECT COUNT(*) FROM components").fetchone()[0] == 3
+    assert [r[1] for r in conn.execute("PRAGMA table_info(components)")] == [name for name, _ in COLUMNS[:-2]]
+    assert conn.execute("SELECT manufacturer_part_number FROM dbl_47_resistors WHERE partid = 2").fetchone()[0] == "RC0603-1K"
+    assert conn.execute("SELECT parameters FROM components WHERE partid = 1").fetchone()[0] == '{"availability": 10}'
+    assert export_sqlite._get_token(conn) == "kc1-101"
+    assert mock_db.read_changes.call_args.args[1] is None
+    mock_db.fetch_all.assert_called_once_with("SELECT category_id, category_name FROM categories", use_primary=True)
+
+def test_second_run_applies_the_change_feed(mock_db, tmp_path):
+    """Tests that later runs resume from the stored token and apply updates and deletions from the feed."""
+    output = tmp_path / "catalog.sqlite"
+    export_sqlite.run(Args(str(output)))
+
+    # An update whose lastupdated is older than rows already exported (a late commit) is still applied.
+    mock_db.changes = [_change("update", _row(3, "RC0603-100R-X", 1)), _change("delete", None, partid=2)]
+    mock_db.stream_query.reset_mock()
+    export_sqlite.run(Args(str(output)))
+
+    assert mock_db.read_changes.call_args.args[1] == "kc1-101"
+    mock_db.stream_query.assert_not_called()  # deletions come from the feed's tombstones
+    conn = sqlite3.connect(output)
+    rows = conn.execute("SELECT partid, manufacturer_part_number FROM components ORDER BY partid").fetchall()
+    assert rows == [(1, "RC0603-10K"), (3, "RC0603-100R-X")]
+    assert export_sqlite._get_token(conn) == "kc1-102"
+
+def test_full_run_prunes_parts_deleted_upstream(mock_db, tmp_path):
+    output = tmp_path / "catalog.sqlite"
+    export_sqlite.run(Args(str(output)))
+    mock_db.catalog = mock_db.catalog[:1]
+
+    export_sqlite.run(Args(str(output), full=True))
+
+    conn = sqlite3.connect(output)
+    assert conn.execute("SELECT partid FROM components").fetchall() == [(1,)]
@@ -5,21 +5,27 @@ from tektrasense_kipipe.commands import fetch
 
 class Args:
     """A simple namespace for mocking argparse results."""
-    def __init__(self, part_number=None, csv=None, spreadsheet=None, txt=None, column="part_number"):
+    def __init__(self, part_number=None, csv=None, spreadsheet=None, txt=None, column="part_number", no_refresh_views=False, use_async=False, concurrency=50,
+                 resume=None, deadline=None):
         self.part_number = part_number
         self.csv = csv
         self.spreadsheet = spreadsheet
         self.txt = txt
         self.column = column
+        self.no_refresh_views = no_refresh_views
+        self.use_async = use_async
+        self.concurrency = concurrency
+        self.resume = resume
+        self.deadline = deadline
 
 @patch('tektrasense_kipipe.commands.fetch.ComponentProcessor')
 @patch('tektrasense_kipipe.commands.fetch.DatabaseManager')
 @patch('tektrasense_kipipe.commands.fetch._process_part')
-def test_run_fetch_from_csv(mock_process, mock_db, mock_proc_class, mocker):
+def test_run_fetch_from_csv(mock_process, mock_db, mock_proc_class, tmp_path):
     """Verifies that `run` correctly processes part numbers from a CSV file."""
-    args = Args(csv="fake.csv", column="PartNo")
-    mock_csv_content = "PartNo,OtherCol\nPN-1,abc\nPN-2,xyz"
-    mocker.patch('builtins.open', mock_open(read_data=mock_csv_content))
+    bom = tmp_path / "bom.csv"
+    bom.write_text("PartNo,OtherCol\nPN-1,abc\nPN-2,xyz")
+    args = Args(csv=str(bom), column="PartNo")
     
     fetch.run(args)
 
@@ -51,4 +57,83 @@ def test_run_fetch_single_part_number(mock_process, mock_db, mock_proc_class):
     
     fetch.run(args)
     
-    mock_process.assert_called_once_with("SINGLE-PN-123", ANY, ANY)
\ No newline at end of file
+    mock_process.assert_called_once_with("SINGLE-PN-123", ANY, ANY)
+
+@patch('tektrasense_kipipe.commands.fetch.ComponentProcessor')
+@patch('tektrasense_kipipe.commands.fetch.DatabaseManager')
+@patch('tektrasense_kipipe.commands.fetch._process_part')
+def test_run_bulk_fetch_refreshes_category_views(mock_process, mock_db, mock_proc_class, tmp_path):
+    """Verifies that bulk runs refresh the materialized category views, single parts do not."""
+    parts = tmp_path / "parts.txt"
+    parts.write_text("PN-1\nPN-2")
+
+    fetch.run(Args(txt=str(parts)))
+    mock_db.return_value.refresh_category_views.assert_called_once()
+
+    mock_db.return_value.refresh_category_views.reset_mock()
+    fetch.run(Args(part_number="PN-3"))
+    fetch.run(Args(txt=str(parts), no_refresh_views=True))
+    mock_db.return_value.refresh_category_views.assert_not_called()
+
+def test_process_part_stores_supplier_offers_separately(mocker):
+    """Verifies that supplier offers are kept out of the component row and stored after it."""
+    db_manager = mocker.MagicMock()
+    processor = mocker.MagicMock()
+    offers = [{"supplier": "DigiKey", "price_breaks": [(1, 0.1)], "quantity_available": 10, "supplier_part_number": "X-ND"}]
+    processor.fetch_part_data.return_value = [{"manufacturer_part_number": "PN-1", "supplier_offers": offers}]
+
+    fetch._process_part("PN-1", processor, db_manager)
+
+    db_manager.upsert_component.assert_called_once_with({"manufacturer_part_number": "PN-1"})
+    db_manager.replace_supplier_offers.assert_called_once_with("PN-1", offers)
+
+@patch('tektrasense_kipipe.async_pipeline.run_async_fetch', return_value=(2, 0))
+@patch('tektrasense_kipipe.commands.fetch.ComponentProcessor')
+@patch('tektrasense_kipipe.commands.fetch.DatabaseManager')
+@patch('tektrasense_kipipe.commands.fetch._process_part')
+def test_run_async_hands_deduplicated_part_numbers_to_the_async_engine(mock_process, mock_db, mock_proc_class, mock_async, tmp_path):
+    """Verifies that --async reads the BOM once and bypasses the synchronous per-part loop."""
+    bom = tmp_path / "bom.csv"
+    bom.write_text("part_number\nPN-1\nPN-2\nPN-1\n")
+
+    fetch.run(Args(csv=str(bom), use_async=True, concurrency=8))
+
+    mock_async.assert_called_once_with(["PN-1", "PN-2"], 8)
+    mock_process.assert_not_called()
+    mock_db.return_value.refresh_category_views.assert_called_once()
+
+@patch('tektrasense_kipipe.commands.fetch.ComponentProcessor')
+@patch('tektrasense_kipipe.commands.fetch.DatabaseManager')
+@patch('tektrasense_kipipe.commands.fetch._process_part')
+def test_run_resume_skips_completed_parts_and_retries_failed(mock_process, mock_db, mock_proc_class, tmp_path):
+    """Verifies that --resume re-runs only the parts that did not complete in the journaled run."""
+    parts = tmp_path / "parts.txt"
+    parts.write_text("PN-1\nPN-2\nPN-3\n")
+    mock_process.side_effect = lambda pn, *args: pn != "PN-2"
+
+    fetch.run(Args(txt=str(parts)))
+    run_id = next((tmp_path / "runs").glob("fetch-*.jsonl")).stem
+    mock_process.reset_mock()
+    fetch.run(Args(txt=str(parts), resume=run_id))
+
+    mock_process.assert_called_once_with("PN-2", ANY, ANY)
+
+@patch('tektrasense_kipipe.commands.fetch.ComponentProcessor')
+@patch('tektrasense_kipipe.commands.fetch.DatabaseManager')
+@patch('tektrasense_kipipe.commands.fetch._process_part', return_value=True)
+def test_run_stops_at_deadline_and_resumes_where_it_stopped(mock_process, mock_db, mock_proc_class, tmp_path, mocker):
+    """Verifies that an expired --deadline stops before the next part and the rest runs on resume."""
+    parts = tmp_path / "parts.txt"
+    parts.write_text("PN-1\nPN-2\n")
+    clock = mocker.patch('tektrasense_kipipe.run_journal.time').time
+    clock.side_effect = [0.0, 0.0, 120.0]
+
+    fetch.run(Args(txt=str(parts), deadline="1m"))
+    mock_process.assert_called_once_with("PN-1", ANY, ANY)
+
+    clock.side_effect = None
+    clock.return_value = 0.0
+    run_id = next((tmp_path / "runs").glob("fetch-*.jsonl")).stem
+    fetch.run(Args(txt=str(parts), resume=run_id))
+    mock_process.assert_called_with("PN-2", ANY, ANY)
+    assert mock_process.call_count == 2
@@ -0,0 +1,101 @@
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+from tektrasense_kipipe.commands import import_footprints
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, directory=None, force=False, jobs=1):
+        self.directory = directory
+        self.force = force
+        self.jobs = jobs
+
+def footprint(name, attr="smd", pads=("1", "2")):
+    pad_type = "smd" if attr == "smd" else "thru_hole"
+    pad_lines = "\n".join(f'  (pad "{number}" {pad_type} rect (at {i} 0) (size 1 1) (layers "F.Cu"))' for i, number in enumerate(pads))
+    return f'''(footprint "{name}" (version 20240108) (generator "test")
+  (layer "F.Cu")
+  (descr "{name} footprint")
+  (tags "test {attr}")
+  (attr {attr})
+  (fp_rect (start -2 -1) (end 2 1) (stroke (width 0.05)) (fill none) (layer "F.CrtYd"))
+{pad_lines}
+)
+'''
+
+@pytest.fixture
+def libraries(tmp_path):
+    resistors = tmp_path / "official" / "Resistor_SMD.pretty"
+    connectors = tmp_path / "Connector_PinHeader.pretty"
+    resistors.mkdir(parents=True)
+    connectors.mkdir()
+    (resistors / "R_0603.kicad_mod").write_text(footprint("R_0603"))
+    (resistors / "R_0805.kicad_mod").write_text(footprint("R_0805"))
+    (connectors / "PinHeader_1x03.kicad_mod").write_text(footprint("PinHeader_1x03", "through_hole", ("1", "2", "3")))
+    (tmp_path / "official" / "README.kicad_mod").write_text("(footprint \"stray\")")
+    return tmp_path
+
+@pytest.fixture
+def mock_db_manager():
+    db_manager = MagicMock()
+    db_manager.fetch_all.return_value = []
+    db_manager.upsert_footprints.return_value = True
+    db_manager.execute_returning.return_value = []
+    return db_manager
+
+def test_find_pretty_dirs_only_returns_pretty_libraries(libraries):
+    """Tests that only <Lib>.pretty directories are libraries."""
+    found = import_footprints._find_pretty_dirs([str(libraries)])
+    assert sorted(path.name for path in found) == ["Connector_PinHeader.pretty", "Resistor_SMD.pretty"]
+
+def test_import_libraries_extracts_footprint_structure(libraries, mock_db_manager):
+    """Tests that every footprint is upserted with its pads, attribute and courtyard."""
+    found = import_footprints._find_pretty_dirs([str(libraries)])
+
+    summary = import_footprints._import_libraries(found, mock_db_manager, jobs=2)
+
+    assert summary == {'updated': 3, 'skipped': 0, 'removed': 0, 'failed': 0}
+    rows = {row["footprint_name"]: row for row in mock_db_manager.upsert_footprints.call_args.args[0]}
+    header = rows["PinHeader_1x03"]
+    assert (header["library_nickname"], header["pad_count"], header["attribute"]) == ("Connector_PinHeader", 3, "through_hole")
+    assert (header["courtyard_x_min"], header["courtyard_y_max"]) == (-2.0, 1.0)
+    assert rows["R_0603"]["keywords"] == "test smd"
+
+def test_import_libraries_skips_unchanged_files_and_deletes_removed(libraries, mock_db_manager):
+    """Tests that only files with a new mtime are parsed, and a library's vanished footprints are deleted."""
+    found = import_footprints._find_pretty_dirs([str(libraries)])
+    unchanged = libraries / "official" / "Resistor_SMD.pretty" / "R_0603.kicad_mod"
+    changed = libraries / "official" / "Resistor_SMD.pretty" / "R_0805.kicad_mod"
+    mock_db_manager.fetch_all.return_value = [(str(unchanged), unchanged.stat().st_mtime_ns), (str(changed), 1)]
+    mock_db_manager.execute_returning.side_effect = lambda sql, params: [("R_0402",)] if params[0] == "Resistor_SMD" else []
+
+    summary = import_footprints._import_libraries(found, mock_db_manager)
+
+    written = sorted(row["footprint_name"] for row in mock_db_manager.upsert_footprints.call_args.args[0])
+    assert written == ["PinHeader_1x03", "R_0805"]
+    assert summary == {'updated': 2, 'skipped': 1, 'removed': 1, 'failed': 0}
+    deletes = {call.args[1][0]: sorted(call.args[1][1]) for call in mock_db_manager.execute_returning.call_args_list}
+    assert deletes == {"Resistor_SMD": ["R_0603", "R_0805"], "Connector_PinHeader": ["PinHeader_1x03"]}
+
+def test_import_libraries_counts_unreadable_files(libraries, mock_db_manager):
+    """Tests that a broken file is reported and does not stop the import."""
+    (libraries / "Connector_PinHeader.pretty" / "Broken.kicad_mod").write_text('(footprint "Broken" (pad "1"')
+    found = import_footprints._find_pretty_dirs([str(libraries)])
+
+    summary = import_footprints._import_libraries(found, mock_db_manager)
+
+    assert (summary['updated'], summary['failed']) == (3, 1)
+
+@patch('tektrasense_kipipe.commands.import_footprints._import_libraries')
+@patch('tektrasense_kipipe.commands.import_footprints.DatabaseManager')
+def test_run_defaults_to_configured_footprint_paths(MockDB, mock_import, libraries, mocker):
+    """Tests that without --directory the configured footprint paths are scanned."""
+    mocker.patch('tektrasense_kipipe.config.FOOTPRINT_SEARCH_PATHS', [str(libraries / "official")])
+    mock_import.return_value = {'updated': 2, 'skipped': 0, 'removed': 0, 'failed': 0}
+
+    import_footprints.run(Args(force=True))
+
+    found, db, jobs = mock_import.call_args.args
+    assert [path.name for path in found] == ["Resistor_SMD.pretty"]
+    assert mock_import.call_args.kwargs == {'force': True}
+    MockDB.return_value.close_all_connections.assert_called_once()
@@ -1,3 +1,4 @@
+import os
 import pytest
 from unittest.mock import MagicMock, patch
 from pathlib import Path
@@ -5,9 +6,11 @@ from tektrasense_kipipe.commands import import_symbols
 
 # A simple namespace for mocking argparse results
 class Args:
-    def __init__(self, file=None, directory=None):
+    def __init__(self, file=None, directory=None, jobs=1, force=False):
         self.file = file
         self.directory = directory
+        self.jobs = jobs
+        self.force = force
 
 @pytest.fixture
 def mock_db_manager(mocker):
@@ -42,7 +45,7 @@ def test_find_all_sym_files_in_directory(mock_filesystem):
     assert len(result) == 2
     assert Path('/fake/symbols/sub/Connector.kicad_sym') in result
 
-def test_parse_and_update_db_success(mocker, mock_db_manager):
+def test_parse_and_update_db_success(mock_db_manager, tmp_path):
     """Tests the core parsing and database upsert logic."""
     mock_sym_content = """
     (kicad_symbol_lib
@@ -54,23 +57,33 @@ def test_parse_and_update_db_success(mocker, mock_db_manager):
       (symbol "SYMBOL_B"
         (property "Description" "Second test symbol" (id 0))
         (property "Datasheet" "~" (id 2))
+        (symbol "SYMBOL_B_0_1"
+          (rectangle (start -1 1) (end 1 -1))
+        )
+        (symbol "SYMBOL_B_1_1"
+          (pin passive line (at 0 2 270) (length 1) (name "~" (effects (font (size 1 1)))) (number "1"))
+        )
       )
     )
     """
-    mocker.patch('builtins.open', mocker.mock_open(read_data=mock_sym_content))
-    mock_db_manager.upsert_symbol.return_value = True
+    library = tmp_path / "Device.kicad_sym"
+    library.write_text(mock_sym_content)
+    mock_db_manager.sync_library_symbols.return_value = {'inserted': 2, 'updated': 0, 'unchanged': 0, 'removed': 0}
 
-    summary = import_symbols._parse_and_update_db(Path("/fake/lib/Device.kicad_sym"), mock_db_manager)
+    summary = import_symbols._parse_and_update_db(library, mock_db_manager)
 
     assert summary['symbols'] == 2
-    assert summary['updated'] == 2
+    assert summary['inserted'] == 2
     assert summary['failed'] == 0
     
     # Verify the data passed to the database
-    first_call_args = mock_db_manager.upsert_symbol.call_args_list[0].args[0]
+    nickname, rows = mock_db_manager.sync_library_symbols.call_args.args
+    assert nickname == 'Device' and len(rows) == 2
+    first_call_args = rows[0]
     assert first_call_args['symbol_name'] == 'SYMBOL_A'
     assert first_call_args['library_nickname'] == 'Device'
     assert "diode generic" in first_call_args['keywords']
+    assert (rows[1]['pin_count'], rows[1]['unit_count'], rows[1]['is_power']) == (1, 1, False)
 
 def test_run_with_file_argument(mocker, mock_db_manager):
     """Tests the main run function when called with a single file."""
@@ -81,17 +94,109 @@ def test_run_with_file_argument(mocker, mock_db_manager):
     import_symbols.run(args)
     
     mock_find.assert_called_once_with("Device.kicad_sym")
-    mock_parse.assert_called_once_with(Path("found_file"), mock_db_manager)
+    mock_parse.assert_called_once_with(Path("found_file"), mock_db_manager, force=False)
 
-def test_run_with_directory_argument(mocker, mock_db_manager):
-    """Tests the main run function when called with a directory."""
-    args = Args(directory="/fake/symbols")
-    found_files = [Path("file1.kicad_sym"), Path("file2.kicad_sym")]
-    
-    mock_parse = mocker.patch('tektrasense_kipipe.commands.import_symbols._parse_and_update_db')
-    mock_find = mocker.patch('tektrasense_kipipe.commands.import_symbols._find_all_sym_files', return_value=found_files)
-    
-    import_symbols.run(args)
+def test_run_with_directory_argument(mock_db_manager, tmp_path, mocker):
+    """Tests that a directory is parsed by a process pool and each file is synced in its own transaction."""
+    for i in range(3):
+        (tmp_path / f"Lib{i}.kicad_sym").write_text(
+            f'(kicad_symbol_lib (symbol "SYM_{i}_A" (property "Description" "A{i}")) (symbol "SYM_{i}_B"))')
+    (tmp_path / "Broken.kicad_sym").write_text('(kicad_symbol_lib (symbol "X"')
+    mock_db_manager.sync_library_symbols.return_value = {'inserted': 2, 'updated': 0, 'unchanged': 0, 'removed': 0}
+
+    import_symbols.run(Args(directory=str(tmp_path), jobs=2))
+
+    calls = mock_db_manager.sync_library_symbols.call_args_list
+    assert sorted(call.args[0] for call in calls) == ["Lib0", "Lib1", "Lib2"]
+    written = [row["symbol_name"] for call in calls for row in call.args[1]]
+    assert sorted(written) == ["SYM_0_A", "SYM_0_B", "SYM_1_A", "SYM_1_B", "SYM_2_A", "SYM_2_B"]
+    mock_db_manager.upsert_symbol.assert_not_called()
+
+def test_parse_and_update_db_keeps_properties_with_parentheses(mock_db_manager, tmp_path):
+    """Tests that quoted parentheses and escaped quotes do not cut a property short."""
+    library = tmp_path / "Regulator.kicad_sym"
+    library.write_text('''(kicad_symbol_lib (version 20231120)
+      (symbol "LDO_3V3" (in_bom yes)
+        (property "Description" "LDO (3.3V, \\"low noise\\")\\nSOT-23" (at 0 0 0))
+      )
+    )''')
+    mock_db_manager.sync_library_symbols.return_value = {'inserted': 1, 'updated': 0, 'unchanged': 0, 'removed': 0}
+
+    summary = import_symbols._parse_and_update_db(library, mock_db_manager)
+
+    assert summary == {'symbols': 1, 'inserted': 1, 'updated': 0, 'unchanged': 0, 'removed': 0, 'failed': 0, 'skipped_files': 0}
+    symbol_data = mock_db_manager.sync_library_symbols.call_args.args[1][0]
+    assert symbol_data['description'] == 'LDO (3.3V, "low noise") SOT-23'
+    assert symbol_data['datasheet'] == '~'
+
+class FakeCatalog:
+    """Keeps the manifest and the symbols table in memory, with the semantics of the real calls."""
+    def __init__(self, db):
+        self.manifest = {}
+        self.symbols = {}
+        self.written = []
+        db.fetch_all.side_effect = self.fetch_all
+        db.sync_library_symbols.side_effect = self.sync_library_symbols
+        db.upsert_many.side_effect = self.upsert_many
+
+    def fetch_all(self, sql, params, use_primary=False):
+        return [(path, *entry) for path, entry in self.manifest.items() if path in params[0]]
+
+    def sync_library_symbols(self, nickname, rows):
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        for row in rows:
+            old = self.symbols.get(row["symbol_name"])
+            key = 'inserted' if old is None else 'unchanged' if old["content_hash"] == row["content_hash"] else 'updated'
+            counts[key] += 1
+            if key != 'unchanged':
+                self.written.append(row["symbol_name"])
+                self.symbols[row["symbol_name"]] = row
+        names = {row["symbol_name"] for row in rows}
+        for name in [n for n, row in self.symbols.items() if row["library_nickname"] == nickname and n not in names]:
+            del self.symbols[name]
+            counts['removed'] += 1
+        return counts
+
+    def upsert_many(self, table, rows, conflict):
+        for row in rows:
+            self.manifest[row["path"]] = (row["size_bytes"], row["mtime_ns"], row["content_sha256"], row["symbol_count"])
+        return True
+
+def test_import_is_incremental_at_file_and_symbol_level(mock_db_manager, tmp_path):
+    """Tests that unchanged files are skipped and changed files only write their symbol-level diff."""
+    catalog = FakeCatalog(mock_db_manager)
+    library = tmp_path / "Device.kicad_sym"
+    other = tmp_path / "Other.kicad_sym"
+    library.write_text('(kicad_symbol_lib (symbol "R" (property "Description" "Resistor")) (symbol "C") (symbol "L"))')
+    other.write_text('(kicad_symbol_lib (symbol "X"))')
+
+    first = import_symbols._import_files([library, other], mock_db_manager)
+    assert (first['inserted'], first['skipped_files']) == (4, 0)
+
+    second = import_symbols._import_files([library, other], mock_db_manager)
+    assert (second['inserted'], second['updated'], second['skipped_files']) == (0, 0, 2)
+
+    library.write_text('(kicad_symbol_lib (symbol "R" (property "Description" "Resistor, 1%")) (symbol "C") (symbol "D"))')
+    catalog.written.clear()
+    third = import_symbols._import_files([library, other], mock_db_manager)
+
+    assert catalog.written == ["R", "D"]
+    assert {k: third[k] for k in ('inserted', 'updated', 'unchanged', 'removed', 'skipped_files')} == \
+        {'inserted': 1, 'updated': 1, 'unchanged': 1, 'removed': 1, 'skipped_files': 1}
+    assert sorted(catalog.symbols) == ["C", "D", "R", "X"]
+
+def test_touched_but_identical_file_is_not_parsed(mock_db_manager, tmp_path, mocker):
+    """Tests that a new mtime with the same content only refreshes the manifest entry."""
+    catalog = FakeCatalog(mock_db_manager)
+    library = tmp_path / "Device.kicad_sym"
+    library.write_text('(kicad_symbol_lib (symbol "R"))')
+    import_symbols._import_files([library], mock_db_manager)
+    stat = library.stat()
+    os.utime(library, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    parse = mocker.spy(import_symbols, '_symbol_rows')
+
+    summary = import_symbols._import_files([library], mock_db_manager)
 
-    mock_find.assert_called_once_with("/fake/symbols")
-    assert mock_parse.call_count == 2
\ No newline at end of file
+    parse.assert_not_called()
+    mock_db_manager.sync_library_symbols.assert_called_once()  # from the first import only
+    assert catalog.manifest[str(library.resolve())][1] == stat.st_mtime_ns + 10**9
@@ -0,0 +1,50 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from tektrasense_kipipe.commands import mirror_datasheets
+from tektrasense_kipipe.datasheet_mirror import KnownDatasheet, MirrorResult
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, dir=None, workers=8, per_host=2, max_age=30, limit=None):
+        self.dir = dir
+        self.workers = workers
+        self.per_host = per_host
+        self.max_age = max_age
+        self.limit = limit
+
+@patch('tektrasense_kipipe.commands.mirror_datasheets.DatasheetMirror')
+@patch('tektrasense_kipipe.commands.mirror_datasheets.DatabaseManager')
+def test_run_mirrors_candidates_and_records_results(MockDB, MockMirror, tmp_path):
+    """Verifies that previously mirrored URLs are revalidated and every outcome is upserted."""
+    db = MockDB.return_value
+    fetched_at = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    db.fetch_all.return_value = [
+        ("http://x/new.pdf", None, None, None, None, None, None, None),
+        ("http://x/old.pdf", '"e"', None, "a" * 64, "/m/a.pdf", "application/pdf", 2048, fetched_at),
+    ]
+    MockMirror.return_value.mirror.return_value = iter([
+        MirrorResult("http://x/new.pdf", "downloaded", "b" * 64, "/m/b.pdf", size_bytes=10, http_status=200),
+        MirrorResult("http://x/old.pdf", "not_modified", "a" * 64, "/m/a.pdf", '"e"', None, "application/pdf", 2048, 304,
+                     fetched_at=fetched_at),
+    ])
+
+    mirror_datasheets.run(Args(dir=str(tmp_path), max_age=7))
+
+    assert db.fetch_all.call_args.args[1] == (7,)
+    urls, known = MockMirror.return_value.mirror.call_args.args
+    assert urls == ["http://x/new.pdf", "http://x/old.pdf"]
+    assert known == {"http://x/old.pdf": KnownDatasheet('"e"', None, "a" * 64, "/m/a.pdf", "application/pdf", 2048, fetched_at)}
+    table, rows, conflict = db.upsert_many.call_args.args
+    assert (table, conflict) == ("datasheet_mirror", ("url",))
+    assert [(row["url"], row["status"]) for row in rows] == [("http://x/new.pdf", "ok"), ("http://x/old.pdf", "ok")]
+    assert (rows[1]["content_type"], rows[1]["size_bytes"], rows[1]["fetched_at"]) == ("application/pdf", 2048, fetched_at)
+
+@patch('tektrasense_kipipe.commands.mirror_datasheets.DatasheetMirror')
+@patch('tektrasense_kipipe.commands.mirror_datasheets.DatabaseManager')
+def test_run_with_nothing_to_do(MockDB, MockMirror):
+    MockDB.return_value.fetch_all.return_value = []
+
+    mirror_datasheets.run(Args())
+
+    MockMirror.assert_not_called()
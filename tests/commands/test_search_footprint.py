@@ -0,0 +1,24 @@
+import pytest
+from unittest.mock import patch
+from tektrasense_kipipe.commands import search_footprint
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, terms, limit=20, any=False):
+        self.terms = terms
+        self.limit = limit
+        self.any = any
+
+@patch('tektrasense_kipipe.commands.search_footprint.DatabaseManager')
+def test_run_prints_ranked_results(MockDB, capsys):
+    """Tests that run() queries the ranked footprint search and prints each link."""
+    db_instance = MockDB.return_value
+    db_instance.connection_pool = True
+    db_instance.search_footprints.return_value = [
+        ("Package_SO", "SOIC-8_3.9x4.9mm_P1.27mm", "SOIC, 8 Pin", 0.6),
+    ]
+
+    search_footprint.run(Args(["soic", "8"]))
+
+    db_instance.search_footprints.assert_called_once_with(["soic", "8"], limit=20, match_all=True)
+    assert "Package_SO:SOIC-8_3.9x4.9mm_P1.27mm" in capsys.readouterr().out
@@ -0,0 +1,39 @@
+import pytest
+from unittest.mock import patch
+from tektrasense_kipipe.commands import search_symbol
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, terms, limit=20, any=False):
+        self.terms = terms
+        self.limit = limit
+        self.any = any
+
+@patch('tektrasense_kipipe.commands.search_symbol.DatabaseManager')
+def test_run_prints_ranked_results(MockDB, capsys):
+    """Tests that run() queries the ranked search and prints each link."""
+    db_instance = MockDB.return_value
+    db_instance.connection_pool = True
+    db_instance.search_symbols.return_value = [
+        ("Amplifier_Operational", "LM358", "Low-Power, Dual Operational Amplifiers", 0.8),
+        ("Amplifier_Operational", "LM358A", None, 0.4),
+    ]
+
+    search_symbol.run(Args(["lm358", "dual"], limit=5))
+
+    db_instance.search_symbols.assert_called_once_with(["lm358", "dual"], limit=5, match_all=True)
+    output = capsys.readouterr().out
+    assert "Amplifier_Operational:LM358 " in output
+    assert "Amplifier_Operational:LM358A" in output
+
+@patch('tektrasense_kipipe.commands.search_symbol.DatabaseManager')
+def test_run_with_no_results(MockDB, capsys):
+    """Tests the message printed when nothing matches."""
+    db_instance = MockDB.return_value
+    db_instance.connection_pool = True
+    db_instance.search_symbols.return_value = []
+
+    search_symbol.run(Args(["nothing"], any=True))
+
+    db_instance.search_symbols.assert_called_once_with(["nothing"], limit=20, match_all=False)
+    assert "No symbols found matching 'nothing'." in capsys.readouterr().out
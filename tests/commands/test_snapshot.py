@@ -0,0 +1,34 @@
+import pytest
+from tektrasense_kipipe.commands import snapshot
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, action, directory, schema="kicad_library", compress_level=3):
+        self.action = action
+        self.directory = directory
+        self.schema = schema
+        self.compress_level = compress_level
+
+@pytest.fixture
+def mock_db(mocker):
+    db_instance = mocker.MagicMock()
+    db_instance.connection_pool = True
+    mocker.patch('tektrasense_kipipe.commands.snapshot.DatabaseManager', return_value=db_instance)
+    return db_instance
+
+def test_load_refreshes_category_views(mock_db, mocker, tmp_path):
+    """Tests that a successful load refreshes the per-category views."""
+    mock_load = mocker.patch('tektrasense_kipipe.commands.snapshot.load_snapshot', return_value=12)
+
+    snapshot.run(Args("load", str(tmp_path)))
+
+    mock_load.assert_called_once_with(mock_db, tmp_path)
+    mock_db.refresh_category_views.assert_called_once()
+
+def test_failed_load_exits_without_refresh(mock_db, mocker, tmp_path):
+    """Tests that a corrupt snapshot stops the command."""
+    mocker.patch('tektrasense_kipipe.commands.snapshot.load_snapshot', side_effect=ValueError("Checksum mismatch"))
+
+    with pytest.raises(SystemExit):
+        snapshot.run(Args("load", str(tmp_path)))
+    mock_db.refresh_category_views.assert_not_called()
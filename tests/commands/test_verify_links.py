@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import patch
+from tektrasense_kipipe import library_index
+from tektrasense_kipipe.commands import verify_links
+from tektrasense_kipipe.commands.verify_links import DanglingLink
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, symbol=False, footprint=False, fix=False, jobs=1):
+        self.symbol = symbol
+        self.footprint = footprint
+        self.fix = fix
+        self.jobs = jobs
+
+@pytest.fixture
+def libraries(tmp_path, mocker):
+    symbols = tmp_path / "symbols"
+    symbols.mkdir()
+    (symbols / "Device.kicad_sym").write_text('(kicad_symbol_lib (symbol "R") (symbol "C"))')
+    (symbols / "Amplifier_Operational.kicad_sym").write_text('(kicad_symbol_lib (symbol "LM358"))')
+    footprints = tmp_path / "footprints" / "Resistor_SMD.pretty"
+    footprints.mkdir(parents=True)
+    (footprints / "R_0603.kicad_mod").write_text('(footprint "R_0603")')
+    mocker.patch('tektrasense_kipipe.config.SYMBOL_SEARCH_PATHS', [str(symbols)])
+    mocker.patch('tektrasense_kipipe.config.FOOTPRINT_SEARCH_PATHS', [str(tmp_path / "footprints")])
+    mocker.patch.dict(library_index._open_indexes, clear=True)
+    return tmp_path
+
+LINKS = [
+    ("symbol", "Device:R", 120),
+    ("symbol", "Device:R_Old", 3),
+    ("symbol", "Amplifier_Operational:LM358", 7),
+    ("symbol", "Pruned_Lib:X1", 2),
+    ("symbol", "Pruned_Lib:X2", 5),
+    ("symbol", "NoColon", 1),
+    ("footprint", "Resistor_SMD:R_0603", 120),
+    ("footprint", "Resistor_SMD:R_0402", 4),
+]
+
+def test_find_dangling_classifies_each_broken_link(libraries):
+    dangling = verify_links.find_dangling(LINKS, jobs=2)
+
+    assert sorted(dangling) == sorted([
+        DanglingLink("symbol", "Device:R_Old", 3, "missing name"),
+        DanglingLink("symbol", "Pruned_Lib:X1", 2, "missing library"),
+        DanglingLink("symbol", "Pruned_Lib:X2", 5, "missing library"),
+        DanglingLink("symbol", "NoColon", 1, "malformed"),
+        DanglingLink("footprint", "Resistor_SMD:R_0402", 4, "missing name"),
+    ])
+
+def test_find_dangling_reads_each_library_once(libraries, mocker):
+    """Tests that links are checked against names read once per library, not once per link."""
+    read = mocker.MagicMock(side_effect=library_index._symbol_offsets)
+    suffix, is_dir, _, paths_attr = library_index.KINDS["symbol"]
+    mocker.patch.dict(library_index.KINDS, {"symbol": (suffix, is_dir, read, paths_attr)})
+    many = [("symbol", f"Device:R{i}", 1) for i in range(500)]
+
+    assert len(verify_links.find_dangling(many)) == 500
+    assert read.call_count == 1
+
+@patch('tektrasense_kipipe.commands.verify_links.DatabaseManager')
+def test_run_reports_grouped_by_library_and_fails(MockDB, libraries, capsys):
+    MockDB.return_value.fetch_all.return_value = LINKS
+
+    with pytest.raises(SystemExit) as exit_info:
+        verify_links.run(Args())
+
+    assert exit_info.value.code == 1
+    out = capsys.readouterr().out
+    assert "Found 5 dangling links used by 15 components" in out
+    assert "symbol library 'Pruned_Lib': 2 link(s), 7 component(s) (library not found)" in out
+    assert out.index("Pruned_Lib") < out.index("'Device'")  # most affected library first
+    MockDB.return_value.execute_returning.assert_not_called()
+
+@patch('tektrasense_kipipe.commands.verify_links.DatabaseManager')
+def test_run_fix_nulls_dangling_links_in_one_statement_per_column(MockDB, libraries):
+    db = MockDB.return_value
+    db.fetch_all.return_value = LINKS
+    db.execute_returning.return_value = [(1,)]
+
+    verify_links.run(Args(fix=True))
+
+    calls = {call.args[0].split()[1 + 2]: sorted(call.args[1][0]) for call in db.execute_returning.call_args_list}
+    assert calls == {"kicad_symbol": ["Device:R_Old", "NoColon", "Pruned_Lib:X1", "Pruned_Lib:X2"],
+                     "kicad_footprint": ["Resistor_SMD:R_0402"]}
+
+@patch('tektrasense_kipipe.commands.verify_links.DatabaseManager')
+def test_run_only_footprints(MockDB, libraries, capsys):
+    MockDB.return_value.fetch_all.return_value = [row for row in LINKS if row[0] == "footprint"][:1] + LINKS[:1]
+
+    verify_links.run(Args(footprint=True))
+
+    assert "Every symbol and footprint link resolves" in capsys.readouterr().out
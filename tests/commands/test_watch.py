@@ -0,0 +1,119 @@
+import re
+import pytest
+from unittest.mock import MagicMock, patch
+from tektrasense_kipipe.commands import watch
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, poll=True, interval=5.0, debounce=2.0, no_initial_sync=False, jobs=1):
+        self.poll = poll
+        self.interval = interval
+        self.debounce = debounce
+        self.no_initial_sync = no_initial_sync
+        self.jobs = jobs
+
+@pytest.fixture
+def tree(tmp_path, mocker):
+    symbols = tmp_path / "symbols"
+    symbols.mkdir()
+    (symbols / "Device.kicad_sym").write_text("(kicad_symbol_lib)")
+    library = tmp_path / "footprints" / "Resistor_SMD.pretty"
+    library.mkdir(parents=True)
+    (library / "R_0603.kicad_mod").write_text('(footprint "R_0603")')
+    mocker.patch('tektrasense_kipipe.config.SYMBOL_SEARCH_PATHS', [str(symbols)])
+    mocker.patch('tektrasense_kipipe.config.FOOTPRINT_SEARCH_PATHS', [str(tmp_path / "footprints")])
+    return tmp_path
+
+@pytest.fixture
+def imports(mocker):
+    symbols = mocker.patch('tektrasense_kipipe.commands.watch._import_files',
+                           return_value={'inserted': 0, 'updated': 1, 'removed': 0})
+    footprints = mocker.patch('tektrasense_kipipe.commands.watch._import_libraries',
+                              return_value={'updated': 1, 'removed': 0})
+    return symbols, footprints
+
+def test_sync_changes_reimports_only_the_affected_libraries(tree, imports):
+    """Tests that a changed symbol file and a changed footprint re-import just their own libraries."""
+    db = MagicMock()
+    device = tree / "symbols" / "Device.kicad_sym"
+    footprint = tree / "footprints" / "Resistor_SMD.pretty" / "R_0603.kicad_mod"
+
+    watch._sync_changes({device, footprint}, db)
+
+    assert imports[0].call_args.args[0] == [device]
+    assert imports[1].call_args.args[0] == [footprint.parent]
+    db.sync_library_symbols.assert_not_called()
+
+def test_sync_changes_deletes_removed_libraries(tree, imports):
+    """Tests that a deleted symbol file and a deleted .pretty directory are removed from the catalog."""
+    db = MagicMock()
+    db.sync_library_symbols.return_value = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'removed': 12}
+    gone_symbols = tree / "symbols" / "Old.kicad_sym"
+    gone_library = tree / "footprints" / "Old_Lib.pretty"
+
+    watch._sync_changes({gone_symbols, gone_library}, db)
+
+    db.sync_library_symbols.assert_called_once_with("Old", [])
+    sqls = [call.args for call in db.execute_query.call_args_list]
+    assert ("DELETE FROM footprints WHERE library_nickname = %s", ("Old_Lib",)) in sqls
+    assert ("DELETE FROM symbol_library_files WHERE path = %s", (str(gone_symbols.resolve()),)) in sqls
+    imports[0].assert_not_called()
+    imports[1].assert_not_called()
+
+def test_sync_changes_searches_a_new_directory_for_libraries(tree, imports):
+    db = MagicMock()
+    vendor = tree / "symbols" / "vendor"
+    (vendor / "Vendor.pretty").mkdir(parents=True)
+    (vendor / "Vendor.kicad_sym").write_text("(kicad_symbol_lib)")
+
+    watch._sync_changes({vendor}, db)
+
+    assert imports[0].call_args.args[0] == [vendor / "Vendor.kicad_sym"]
+    assert imports[1].call_args.args[0] == [vendor / "Vendor.pretty"]
+
+def _like(value, pattern):
+    """SQL LIKE with ESCAPE '\\', for checking the patterns sent to the database."""
+    regex = re.sub(r"\\(.)|(%)|(_)|(.)", lambda m: re.escape(m.group(1)) if m.group(1) is not None else
+                   ".*" if m.group(2) else "." if m.group(3) else re.escape(m.group(4)), pattern)
+    return re.fullmatch(regex, value, re.DOTALL) is not None
+
+def test_forget_directory_leaves_a_sibling_that_differs_at_an_underscore(tmp_path):
+    """Tests that a '_' in a removed directory's name is matched literally, not as a wildcard."""
+    gone = tmp_path / "libs" / "3rd_party"
+    sibling = tmp_path / "libs" / "3rdXparty"
+    db = MagicMock()
+    db.fetch_all.return_value = None
+    footprints = [str(gone / "Old.pretty" / "R.kicad_mod"), str(sibling / "Keep.pretty" / "R.kicad_mod")]
+    symbol_files = [str(gone.resolve() / "Old.kicad_sym"), str(sibling.resolve() / "Keep.kicad_sym")]
+
+    watch._forget_directory(gone, db)
+
+    (delete_sql, (delete_pattern,)), (select_sql, (select_pattern,)) = db.execute_query.call_args.args, db.fetch_all.call_args.args
+    assert delete_sql.endswith("LIKE %s ESCAPE '\\'") and select_sql.endswith("LIKE %s ESCAPE '\\'")
+    assert [path for path in footprints if _like(path, delete_pattern)] == footprints[:1]
+    assert [path for path in symbol_files if _like(path, select_pattern)] == symbol_files[:1]
+
+@patch('tektrasense_kipipe.commands.watch.DatabaseManager')
+def test_run_syncs_at_startup_then_each_batch_until_stopped(MockDB, tree, imports, mocker):
+    """Tests the service loop: an initial catch-up import, one sync per debounced batch, a clean stop."""
+    device = tree / "symbols" / "Device.kicad_sym"
+    watcher = mocker.patch('tektrasense_kipipe.commands.watch.open_watcher').return_value
+    mocker.patch('tektrasense_kipipe.commands.watch.signal.signal')
+    mocker.patch('tektrasense_kipipe.commands.watch.collect_changes', side_effect=[{device}, set(), KeyboardInterrupt])
+
+    watch.run(Args())
+
+    assert imports[0].call_args_list[0].args[0] == [device]  # initial sync
+    assert imports[0].call_args_list[1].args[0] == [device]  # the watched change
+    assert imports[1].call_count == 1
+    watcher.close.assert_called_once()
+    MockDB.return_value.close_all_connections.assert_called_once()
+
+def test_shutdown_waits_for_a_running_import():
+    shutdown = watch._Shutdown()
+    shutdown.busy = True
+    shutdown(15, None)
+    assert shutdown.requested
+    shutdown.busy = False
+    with pytest.raises(KeyboardInterrupt):
+        shutdown(15, None)
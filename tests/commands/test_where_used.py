@@ -0,0 +1,37 @@
+import pytest
+from datetime import datetime, timezone
+from tektrasense_kipipe.commands import where_used
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, part_numbers=None, not_active=False):
+        self.part_numbers = part_numbers or []
+        self.not_active = not_active
+
+@pytest.fixture
+def mock_db(mocker):
+    db_instance = mocker.MagicMock()
+    db_instance.connection_pool = True
+    mocker.patch('tektrasense_kipipe.commands.where_used.DatabaseManager', return_value=db_instance)
+    return db_instance
+
+def test_where_used_groups_boms_by_part(mock_db, capsys):
+    """Tests that the lookup is one indexed query and the output is grouped per part."""
+    used = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    mock_db.fetch_all.return_value = [("NE555P", 3, "timer_board", 2, "U1, U4", used), ("NE555P", 1, "blinky", 1, "U1", used)]
+
+    where_used.run(Args(part_numbers=[" NE555P "]))
+
+    query, params = mock_db.fetch_all.call_args.args
+    assert "bom_lines" in query and params == (["NE555P"],)
+    out = capsys.readouterr().out
+    assert out.count("NE555P") == 1
+    assert "2 BOM line(s) in 2 BOM(s)" in out
+
+def test_not_active_lists_affected_boms(mock_db, capsys):
+    mock_db.fetch_all.return_value = [("LM324N", 5, "old_amp", 1, "U2", None, "Obsolete")]
+
+    where_used.run(Args(not_active=True))
+
+    assert mock_db.fetch_all.call_args.args[1] == (list(where_used.ACTIVE_STATUSES),)
+    assert "LM324N  [Obsolete]" in capsys.readouterr().out
@@ -0,0 +1,99 @@
+import pytest
+from tektrasense_kipipe.commands import worker
+from tektrasense_kipipe.job_queue import Job
+
+class Args:
+    """A simple namespace for mocking argparse results."""
+    def __init__(self, max_jobs=None, exit_when_empty=True):
+        self.worker_id = "test-worker"
+        self.batch_size = 2
+        self.lease_seconds = 60
+        self.poll_interval = 0
+        self.exit_when_empty = exit_when_empty
+        self.max_jobs = max_jobs
+        self.no_refresh_views = False
+
+@pytest.fixture
+def mocks(mocker):
+    db_instance = mocker.MagicMock()
+    db_instance.connection_pool = True
+    mocker.patch('tektrasense_kipipe.commands.worker.DatabaseManager', return_value=db_instance)
+    mocker.patch('tektrasense_kipipe.commands.worker.ComponentProcessor')
+    queue = mocker.MagicMock()
+    queue.worker_id = "test-worker"
+    queue.heartbeat.return_value = []
+    mocker.patch('tektrasense_kipipe.commands.worker.JobQueue', return_value=queue)
+    process = mocker.patch('tektrasense_kipipe.commands.worker._process_part')
+    return db_instance, queue, process
+
+def test_worker_drains_queue_and_settles_jobs(mocks):
+    """Tests that successes are completed, failures and errors are retried, and the worker exits when empty."""
+    db_instance, queue, process = mocks
+    jobs = [Job(1, "NE555P", 1, 5), Job(2, "BOGUS-1", 1, 5), Job(3, "LM358DR", 1, 5)]
+    queue.claim.side_effect = [jobs[:2], jobs[2:], []]
+    process.side_effect = [True, False, RuntimeError("API down")]
+
+    worker.run(Args())
+
+    assert [c.args[0] for c in process.call_args_list] == ["NE555P", "BOGUS-1", "LM358DR"]
+    queue.complete.assert_called_once_with(jobs[0])
+    assert [c.args[0] for c in queue.fail.call_args_list] == [jobs[1], jobs[2]]
+    assert "RuntimeError" in queue.fail.call_args.args[1]
+    db_instance.refresh_category_views.assert_called_once()
+
+def test_worker_stops_at_max_jobs(mocks):
+    _, queue, process = mocks
+    queue.claim.return_value = [Job(1, "NE555P", 1, 5)]
+    process.return_value = True
+
+    worker.run(Args(max_jobs=1, exit_when_empty=False))
+
+    queue.claim.assert_called_once_with(1)
+    assert process.call_count == 1
+
+def test_heartbeat_and_job_share_the_pool_safely(mocker, caplog):
+    """Runs lease heartbeats while the job thread uses the same DatabaseManager; no connection may be handed out twice."""
+    import threading
+    import time
+    from tektrasense_kipipe.db_manager import DatabaseManager
+    from tektrasense_kipipe.job_queue import JobQueue
+    overlaps = []
+
+    def connect(*args, **kwargs):
+        conn = mocker.MagicMock(closed=0)
+        in_use = threading.Lock()
+        def execute(sql, params=None):
+            if not in_use.acquire(blocking=False):
+                overlaps.append(sql)
+                return
+            time.sleep(0.002)
+            in_use.release()
+        conn.cursor.return_value.__enter__.return_value.execute.side_effect = execute
+        conn.cursor.return_value.__enter__.return_value.fetchall.return_value = [(1,), (2,)]
+        conn.info.transaction_status = 0
+        return conn
+
+    mocker.patch('psycopg2.pool.psycopg2.connect', side_effect=connect)
+    db_manager = DatabaseManager()
+
+    class SlowList(list):
+        """Widens the pool's check-then-pop window so an unlocked pool races reliably."""
+        def __bool__(self):
+            available = len(self) > 0
+            time.sleep(0.0005)
+            return available
+    db_manager.connection_pool._pool = SlowList(db_manager.connection_pool._pool)
+    heartbeat = worker._Heartbeat(JobQueue(db_manager, worker_id="test-worker"), interval=0.0001)
+    heartbeat.held.update({1, 2})
+    heartbeat.start()
+    try:
+        for _ in range(100):
+            db_manager.fetch_all("SELECT 1")
+            db_manager.execute_query("UPDATE components SET lastupdated = NOW() WHERE partid = 1")
+    finally:
+        heartbeat.stopped.set()
+        heartbeat.join()
+
+    assert overlaps == []
+    assert "Error" not in caplog.text
+    assert db_manager.connection_pool._used == {}
@@ -0,0 +1,7 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def isolated_run_journals(tmp_path, monkeypatch):
+    """Keeps the run journals and library indexes written by commands out of the user's home directory."""
+    monkeypatch.setenv("KIPIPE_RUN_DIR", str(tmp_path / "runs"))
+    monkeypatch.setenv("KIPIPE_INDEX_DIR", str(tmp_path / "index"))
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("asyncpg")
+
+from tektrasense_kipipe import async_pipeline
+from tektrasense_kipipe.async_pipeline import AsyncFetchPipeline, AsyncSupplierClient
+
+DIGIKEY_PART = {
+    "ManufacturerProductNumber": "PN-1",
+    "ChildCategories": {"Name": "Chip Resistor"},
+    "Description": {"ProductDescription": "RES 10K"},
+    "QuantityAvailable": 500,
+}
+
+class FakeStore:
+    """In-memory stand-in for AsyncCatalogStore that records what would be stored."""
+    def __init__(self, category_id=101):
+        self.category_id = category_id
+        self.stored = []
+        self.unmapped = []
+        self.next_ids = {}
+        self.locks = {}
+
+    async def get_category_id(self, supplier, category):
+        return self.category_id
+
+    async def get_category_details(self, category_id):
+        return {"parent_id": None, "name": "Resistors", "prefix": "RES"}
+
+    async def add_unmapped_category(self, supplier, category):
+        self.unmapped.append((supplier, category))
+
+    def prefix_lock(self, prefix):
+        return self.locks.setdefault(prefix, asyncio.Lock())
+
+    async def get_next_internal_part_id(self, prefix):
+        await asyncio.sleep(0)  # yield so unlocked callers would interleave
+        self.next_ids[prefix] = self.next_ids.get(prefix, 0) + 1
+        return f"{prefix}-{self.next_ids[prefix]:04d}"
+
+    async def store_part(self, part_data, offers):
+        await asyncio.sleep(0)
+        self.stored.append((part_data, offers))
+        return True
+
+class FakeSuppliers:
+    def __init__(self, digikey=None, mouser=None):
+        self.digikey_parts = digikey or {}
+        self.mouser_parts = mouser or {}
+
+    async def digikey(self, part_number):
+        return self.digikey_parts.get(part_number)
+
+    async def mouser(self, part_number):
+        return self.mouser_parts.get(part_number)
+
+def test_pipeline_stores_parts_with_unique_internal_ids():
+    """Verifies that concurrent parts in one category never receive the same internal id."""
+    parts = {f"PN-{i}": dict(DIGIKEY_PART, ManufacturerProductNumber=f"PN-{i}") for i in range(20)}
+    store = FakeStore()
+    pipeline = AsyncFetchPipeline(FakeSuppliers(digikey=parts), store, concurrency=8)
+
+    succeeded, failed = asyncio.run(pipeline.run(list(parts) + ["", "Part Number"]))
+
+    assert (succeeded, failed) == (22, 0)
+    internal_ids = [part["internal_part_id"] for part, _ in store.stored]
+    assert len(internal_ids) == 20 and len(set(internal_ids)) == 20
+    assert all("supplier_offers" not in part for part, _ in store.stored)
+    assert store.stored[0][1][0]["supplier"] == "DigiKey"
+
+def test_pipeline_logs_unmapped_categories_and_counts_failures():
+    """Verifies that unmapped and unknown parts fail without aborting the run."""
+    store = FakeStore(category_id=None)
+    pipeline = AsyncFetchPipeline(FakeSuppliers(digikey={"PN-1": DIGIKEY_PART}), store, concurrency=2)
+
+    succeeded, failed = asyncio.run(pipeline.run(["PN-1", "MISSING"]))
+
+    assert (succeeded, failed) == (0, 2)
+    assert store.unmapped == [("DigiKey", "Chip Resistor")]
+    assert store.stored == []
+
+def test_pipeline_fails_only_the_part_with_a_malformed_payload(monkeypatch):
+    """Verifies that a ValueError while formatting one part counts it as failed and the run goes on."""
+    parts = {f"PN-{i}": dict(DIGIKEY_PART, ManufacturerProductNumber=f"PN-{i}") for i in range(4)}
+    store = FakeStore()
+    pipeline = AsyncFetchPipeline(FakeSuppliers(digikey=parts), store, concurrency=2)
+    format_part = pipeline.processor.format_part
+    def malformed(raw, *args):
+        if raw["ManufacturerProductNumber"] == "PN-2":
+            raise ValueError("could not convert string to float: 'N/A'")
+        return format_part(raw, *args)
+    monkeypatch.setattr(pipeline.processor, "format_part", malformed)
+
+    assert asyncio.run(pipeline.run(list(parts))) == (3, 1)
+    assert sorted(part["manufacturer_part_number"] for part, _ in store.stored) == ["PN-0", "PN-1", "PN-3"]
+
+@pytest.mark.parametrize("error", [async_pipeline.asyncpg.InterfaceError("connection is closed"),
+                                   async_pipeline.asyncpg.DataError("invalid input for query argument $3"),
+                                   ValueError("bad value")])
+def test_store_part_reports_client_side_errors_as_a_failed_part(error):
+    """Verifies that asyncpg client errors and bad values fail the part instead of escaping the pipeline."""
+    class Pool:
+        def acquire(self):
+            raise error
+    store = async_pipeline.AsyncCatalogStore(Pool())
+
+    assert asyncio.run(store.store_part({"manufacturer_part_number": "PN-1"}, None)) is False
+
+def test_supplier_client_reuses_one_digikey_token(monkeypatch):
+    """Verifies that the token is requested once for many concurrent searches."""
+    monkeypatch.setenv("DIGIKEY_CLIENT_ID", "id")
+    monkeypatch.setenv("DIGIKEY_CLIENT_SECRET", "secret")
+    calls = {"token": 0, "search": 0}
+
+    def handler(request):
+        if request.url.path.endswith("/token"):
+            calls["token"] += 1
+            return httpx.Response(200, json={"access_token": "tok", "expires_in": 600})
+        calls["search"] += 1
+        assert request.headers["Authorization"] == "Bearer tok"
+        keywords = json.loads(request.content)["Keywords"]
+        if keywords == "MISSING":
+            return httpx.Response(404)
+        return httpx.Response(200, json={"Products": [dict(DIGIKEY_PART, ManufacturerProductNumber=keywords)]})
+
+    monkeypatch.setattr(async_pipeline.config, "DIGIKEY_TOKEN_URL", "http://suppliers.test/token")
+    monkeypatch.setattr(async_pipeline.config, "DIGIKEY_SEARCH_URL", "http://suppliers.test/search")
+
+    async def search_all():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            suppliers = AsyncSupplierClient(client)
+            return await asyncio.gather(*(suppliers.digikey(pn) for pn in ["PN-1", "PN-2", "MISSING"]))
+
+    results = asyncio.run(search_all())
+
+    assert [r and r["ManufacturerProductNumber"] for r in results] == ["PN-1", "PN-2", None]
+    assert calls == {"token": 1, "search": 3}
+
+def test_supplier_client_requires_exact_mouser_match(monkeypatch):
+    """Verifies that a Mouser result for a different part number is discarded, as in the sync client."""
+    monkeypatch.setenv("MOUSER_API_KEY", "key")
+    monkeypatch.setattr(async_pipeline.config, "MOUSER_API_URL", "http://suppliers.test/mouser")
+
+    def handler(request):
+        return httpx.Response(200, json={"SearchResults": {"Parts": [{"ManufacturerPartNumber": "PN-1"}]}})
+
+    async def search(part_number):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await AsyncSupplierClient(client).mouser(part_number)
+
+    assert asyncio.run(search("pn-1")) == {"ManufacturerPartNumber": "PN-1"}
+    assert asyncio.run(search("PN-2")) is None
@@ -0,0 +1,68 @@
+import pytest
+from tektrasense_kipipe.bom import load_bom
+
+def test_load_bom_merges_repeated_parts(tmp_path):
+    """Tests that repeated part numbers are summed and their references joined."""
+    path = tmp_path / "bom.csv"
+    path.write_text("MPN,Qty,Ref\nRC0603-10K,2,\"R1, R2\"\nLM358DR,1,U1\nRC0603-10K,1,R7\n,3,\n")
+
+    bom = load_bom(str(path), "MPN", "Qty", "Ref")
+
+    assert bom.to_dict("records") == [
+        {"manufacturer_part_number": "RC0603-10K", "quantity": 3, "references": "R1, R2, R7"},
+        {"manufacturer_part_number": "LM358DR", "quantity": 1, "references": "U1"},
+    ]
+
+def test_load_bom_txt_counts_each_line(tmp_path):
+    """Tests that a plain part list counts one unit per line."""
+    path = tmp_path / "parts.txt"
+    path.write_text("NE555P\nNE555P\nLM358DR\n\n")
+
+    bom = load_bom(str(path))
+
+    assert dict(zip(bom["manufacturer_part_number"], bom["quantity"])) == {"NE555P": 2, "LM358DR": 1}
+
+def test_load_bom_missing_column(tmp_path):
+    path = tmp_path / "bom.csv"
+    path.write_text("MPN\nNE555P\n")
+    with pytest.raises(ValueError):
+        load_bom(str(path), "MPN", "Qty")
+
+def test_load_bom_detects_quantity_and_reference_headers(tmp_path):
+    """Tests that common KiCad BOM headers are picked up without naming them."""
+    path = tmp_path / "kicad_bom.csv"
+    path.write_text("Reference,Value,MPN,Qty\n\"C1,C2\",100n,GRM188R71H104,2\n")
+
+    bom = load_bom(str(path), "MPN")
+
+    assert bom.to_dict("records") == [{"manufacturer_part_number": "GRM188R71H104", "quantity": 2, "references": "C1,C2"}]
+
+def test_register_bom_file_is_a_no_op_for_known_content(tmp_path):
+    """Tests that a BOM already registered by content hash is not parsed or inserted again."""
+    from unittest.mock import MagicMock
+    from tektrasense_kipipe.bom import register_bom_file, file_sha256
+    path = tmp_path / "bom.csv"
+    path.write_text("MPN,Qty,Ref\nNE555P,1,U1\n")
+    db_manager = MagicMock()
+    db_manager.touch_bom.return_value = 7
+
+    assert register_bom_file(db_manager, str(path), "MPN") == 7
+    db_manager.touch_bom.assert_called_once_with(file_sha256(str(path)))
+    db_manager.insert_bom.assert_not_called()
+
+def test_register_bom_file_inserts_new_content(tmp_path):
+    """Tests that new BOM content is registered with plain Python line values."""
+    from unittest.mock import MagicMock
+    from tektrasense_kipipe.bom import register_bom_file
+    path = tmp_path / "amp_rev_b.csv"
+    path.write_text("MPN,Qty,Ref\nNE555P,1,U1\nRC0603-10K,3,\n")
+    db_manager = MagicMock()
+    db_manager.touch_bom.return_value = None
+    db_manager.insert_bom.return_value = 8
+
+    assert register_bom_file(db_manager, str(path), "MPN", source="fetch") == 8
+
+    name, _, _, source, lines = db_manager.insert_bom.call_args.args
+    assert (name, source) == ("amp_rev_b", "fetch")
+    assert lines == [("NE555P", 1, "U1"), ("RC0603-10K", 3, None)]
+    assert type(lines[0][1]) is int
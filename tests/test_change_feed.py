@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import MagicMock
+from tektrasense_kipipe import change_feed
+
+def test_token_round_trip_and_validation():
+    """Tests that tokens encode a transaction id and malformed tokens are rejected."""
+    assert change_feed.decode_token(change_feed.encode_token(48213)) == 48213
+    assert change_feed.decode_token(None) == 0
+    with pytest.raises(ValueError):
+        change_feed.decode_token("48213")
+
+def test_read_changes_is_bounded_by_running_transactions():
+    """Tests that the feed reads between the token and the snapshot xmin, and returns the bound as the next token."""
+    db_manager = MagicMock()
+    db_manager.fetch_all.return_value = [("900",)]
+    db_manager.stream_query.return_value = iter([[
+        (11, "update", 1, "RC0603-10K", {"partid": 1}),
+        (12, "delete", 2, "RC0603-1K", None),
+    ]])
+
+    changes, token = change_feed.read_changes(db_manager, "kc1-500")
+    events = list(changes)
+
+    query, params = db_manager.stream_query.call_args.args
+    assert params == {"since": "500", "until": "900"}
+    assert "component_deletions" in query
+    assert db_manager.stream_query.call_args.kwargs["use_primary"] is True
+    assert [event["op"] for event in events] == ["update", "delete"]
+    assert events[1] == {"seq": 12, "op": "delete", "partid": 2, "manufacturer_part_number": "RC0603-1K", "row": None}
+    assert token == "kc1-900"
+
+def test_first_read_skips_tombstones():
+    """Tests that a read without a token is a plain snapshot of the catalog."""
+    db_manager = MagicMock()
+    db_manager.fetch_all.return_value = [("900",)]
+    db_manager.stream_query.return_value = iter([])
+
+    changes, token = change_feed.read_changes(db_manager)
+    list(changes)
+
+    assert "component_deletions" not in db_manager.stream_query.call_args.args[0]
+    assert token == "kc1-900"
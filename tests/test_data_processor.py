@@ -70,4 +70,28 @@ def test_fetch_part_data_category_not_mapped(mock_apis, processor, mock_db):
     # Verify that an attempt was made to log the unmapped category.
     mock_db.add_unmapped_category.assert_called_once_with("DigiKey", "Unmapped Resistors")
     # Verify that the function returns None because the category could not be found.
-    assert result is None
\ No newline at end of file
+    assert result is None
+def test_supplier_offers_parse_prices_and_stock(processor):
+    """Tests that DigiKey and Mouser pricing/stock are normalized into offers."""
+    from tektrasense_kipipe import config
+    mouser_raw = {
+        "MouserPartNumber": "595-LM358DR",
+        "Availability": "12,345 In Stock",
+        "PriceBreaks": [{"Quantity": 1, "Price": "$0.48"}, {"Quantity": 10, "Price": "$0.39"}, {"Quantity": None, "Price": "$0.1"}],
+    }
+
+    offer = processor._build_supplier_offer("Mouser", mouser_raw, config.MOUSER_MAPPER)
+
+    assert offer == {"supplier": "Mouser", "supplier_part_number": "595-LM358DR",
+                     "quantity_available": 12345, "price_breaks": [(1, 0.48), (10, 0.39)]}
+
+@pytest.mark.parametrize("parameters, package_case, expected", [
+    ([], '8-SOIC (0.154", 3.90mm Width)', 8),
+    ([], "TO-236-3, SC-59, SOT-23-3", 3),
+    ([], "SOT-23", None),
+    ([], "0603 (1608 Metric)", None),
+    ([{"AttributeName": "Number of Pins", "AttributeValue": "14 Pin"}], "SOIC-Narrow", 14),
+])
+def test_parse_pin_count(processor, parameters, package_case, expected):
+    """Tests that the package pin count is read from 'Number of Pins' or the package name."""
+    assert processor._parse_pin_count(parameters, package_case) == expected
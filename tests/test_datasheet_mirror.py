@@ -0,0 +1,105 @@
+import hashlib
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from tektrasense_kipipe.datasheet_mirror import DatasheetMirror, KnownDatasheet, interleave_by_host, normalize_url
+
+PDF = b"%PDF-1.7 shared family datasheet"
+
+class Handler(BaseHTTPRequestHandler):
+    requests_seen = []
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with self.lock:
+            Handler.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+            self.active["now"] += 1
+            self.active["max"] = max(self.active["max"], self.active["now"])
+        try:
+            if self.path == "/missing.pdf":
+                self.send_response(404)
+                self.end_headers()
+            elif self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+            else:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(PDF)))
+                self.end_headers()
+                self.wfile.write(PDF)
+        finally:
+            with self.lock:
+                self.active["now"] -= 1
+
+@pytest.fixture
+def server():
+    Handler.requests_seen = []
+    Handler.active = {"now": 0, "max": 0}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+def test_mirror_stores_shared_content_once(server, tmp_path):
+    """Verifies that identical datasheets behind different URLs end up as one content-addressed file."""
+    mirror = DatasheetMirror(tmp_path, workers=4, per_host=1)
+    urls = [f"{server}/a.pdf", f"{server}/b.pdf", f"{server}/missing.pdf"]
+
+    results = {r.url: r for r in mirror.mirror(urls)}
+
+    sha256 = hashlib.sha256(PDF).hexdigest()
+    assert results[urls[0]].status == results[urls[1]].status == "downloaded"
+    assert results[urls[0]].local_path == results[urls[1]].local_path == str(tmp_path / sha256[:2] / sha256[2:4] / f"{sha256}.pdf")
+    assert results[urls[0]].etag == '"v1"'
+    assert results[urls[2]].status == "failed" and results[urls[2]].http_status == 404
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == [tmp_path / sha256[:2] / sha256[2:4] / f"{sha256}.pdf"]
+    assert Handler.active["max"] == 1  # per-host limit
+
+def test_mirror_revalidates_with_etag(server, tmp_path):
+    """Verifies that a re-run sends If-None-Match and keeps the existing copy, and its recorded details, on 304."""
+    mirror = DatasheetMirror(tmp_path)
+    first = next(mirror.mirror([f"{server}/a.pdf"])).as_row()
+    known = {first["url"]: KnownDatasheet(first["etag"], first["last_modified"], first["sha256"], first["local_path"],
+                                          first["content_type"], first["size_bytes"], first["fetched_at"])}
+
+    second = next(mirror.mirror([first["url"]], known))
+
+    assert second.status == "not_modified"
+    assert second.local_path == first["local_path"]
+    assert Handler.requests_seen[-1] == ("/a.pdf", '"v1"')
+    row = second.as_row()
+    assert (row["content_type"], row["size_bytes"], row["fetched_at"]) == (first["content_type"], len(PDF), first["fetched_at"])
+    assert row["checked_at"] >= first["checked_at"]
+
+def test_failed_refresh_keeps_the_recorded_copy(server, tmp_path):
+    """Verifies that a refresh that fails still reports the known copy's content type, size and fetch time."""
+    copy = tmp_path / "kept.pdf"
+    copy.write_bytes(PDF)
+    fetched_at = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    known = {f"{server}/missing.pdf": KnownDatasheet('"v0"', None, "0" * 64, str(copy), "application/pdf", len(PDF), fetched_at)}
+
+    row = next(DatasheetMirror(tmp_path).mirror(list(known), known)).as_row()
+
+    assert (row["status"], row["http_status"], row["local_path"]) == ("failed", 404, str(copy))
+    assert (row["content_type"], row["size_bytes"], row["fetched_at"]) == ("application/pdf", len(PDF), fetched_at)
+
+def test_mirror_downloads_again_when_local_copy_is_gone(server, tmp_path):
+    """Verifies that no conditional request is sent for a copy that was deleted from disk."""
+    known = {f"{server}/a.pdf": KnownDatasheet('"v1"', None, "0" * 64, str(tmp_path / "gone.pdf"))}
+
+    result = next(DatasheetMirror(tmp_path).mirror(list(known), known))
+
+    assert result.status == "downloaded"
+    assert Handler.requests_seen[-1] == ("/a.pdf", None)
+
+def test_interleave_by_host_and_normalize_url():
+    urls = ["http://a/1", "http://a/2", "http://b/1", "//c/1"]
+    assert interleave_by_host(urls) == ["http://a/1", "http://b/1", "//c/1", "http://a/2"]
+    assert normalize_url(" //www.ti.com/lit/ds/x.pdf") == "https://www.ti.com/lit/ds/x.pdf"
@@ -1,3 +1,4 @@
+import threading
 import pytest
 from unittest.mock import MagicMock, ANY
 from tektrasense_kipipe.db_manager import DatabaseManager
@@ -96,4 +97,270 @@ def test_upsert_data_db_error_triggers_rollback(mock_db_manager):
     # 3. Assert
     # Verify that the failed transaction was rolled back and not committed.
     mock_db_manager.mock_connection.rollback.assert_called_once()
-    mock_db_manager.mock_connection.commit.assert_not_called()
\ No newline at end of file
+    mock_db_manager.mock_connection.commit.assert_not_called()
+
+def test_build_prefix_tsquery_splits_punctuation():
+    """Tests that search terms become prefix-matching tsquery clauses."""
+    tsquery = DatabaseManager._build_prefix_tsquery(["LM358", "SOT-23"])
+    assert tsquery == "(lm358:*) & (sot:* & 23:*)"
+
+    assert DatabaseManager._build_prefix_tsquery(["opamp", "dual"], match_all=False) == "(opamp:*) | (dual:*)"
+    assert DatabaseManager._build_prefix_tsquery(["--", " "]) is None
+
+def test_search_symbols_is_ranked_and_limited(mock_db_manager):
+    """Tests that search_symbols runs a single ranked, limited full-text query."""
+    # 1. Arrange
+    expected = [("Amplifier_Operational", "LM358", "Dual opamp", 0.5)]
+    mock_db_manager.mock_cursor.fetchall.return_value = expected
+
+    # 2. Act
+    results = mock_db_manager.search_symbols(["lm358"], limit=5)
+
+    # 3. Assert
+    sql, params = mock_db_manager.mock_cursor.execute.call_args.args
+    assert "ts_rank_cd" in sql and "ORDER BY rank DESC" in sql
+    assert params == ("(lm358:*)", 5)
+    assert results == expected
+
+def test_search_generic_footprints_returns_links(mock_db_manager):
+    """Tests that the legacy keyword search is served by the full-text index."""
+    mock_db_manager.mock_cursor.fetchall.return_value = [("Package_SO", "SOIC-8", "SOIC, 8 Pin", 0.3)]
+
+    results = mock_db_manager.search_generic_footprints({"soic"})
+
+    assert results == [("Package_SO", "SOIC-8")]
+    assert "search_vector @@ q" in mock_db_manager.mock_cursor.execute.call_args.args[0]
+
+def test_execute_records_query_stats(mock_db_manager, mocker):
+    """Tests that queries run through the instrumented execution path."""
+    mock_record = mocker.patch('tektrasense_kipipe.db_manager.query_stats.record')
+    mock_db_manager.mock_cursor.rowcount = 3
+    mock_db_manager.mock_cursor.fetchall.return_value = [(1,), (2,), (3,)]
+
+    mock_db_manager.fetch_all("SELECT partid FROM components")
+
+    mock_record.assert_called_once_with("SELECT partid FROM components", ANY, 3)
+
+def test_constructing_a_manager_keeps_the_slow_query_threshold(mocker, monkeypatch):
+    """Tests that a command's own DatabaseManager does not overwrite the --slow-query-ms value set by main."""
+    from tektrasense_kipipe.query_stats import query_stats
+    mocker.patch('tektrasense_kipipe.db_manager.pool')
+    monkeypatch.setenv('DB_SLOW_QUERY_MS', '500')
+    monkeypatch.setattr(query_stats, 'slow_query_ms', 5.0)
+
+    DatabaseManager()
+
+    assert query_stats.slow_query_ms == 5.0
+
+@pytest.fixture
+def replica_db_manager(mocker):
+    """Provides a DatabaseManager with mocked primary and replica pools behind the real get_connection()."""
+    mocker.patch.object(DatabaseManager, '__init__', return_value=None)
+    db_manager = DatabaseManager()
+    db_manager.connection_pool = MagicMock()
+    db_manager.replica_pool = MagicMock()
+    db_manager._thread_state = threading.local()
+    db_manager.primary_conn = db_manager.connection_pool.getconn.return_value
+    db_manager.replica_conn = db_manager.replica_pool.getconn.return_value
+    for conn in (db_manager.primary_conn, db_manager.replica_conn):
+        conn.closed = 0
+    return db_manager
+
+def test_fetch_all_is_routed_to_replica(replica_db_manager):
+    """Tests that read-only calls use the replica pool and return the connection to it."""
+    replica_db_manager.fetch_all("SELECT 1")
+
+    replica_db_manager.replica_pool.getconn.assert_called_once()
+    replica_db_manager.replica_pool.putconn.assert_called_once_with(replica_db_manager.replica_conn, close=False)
+    replica_db_manager.connection_pool.getconn.assert_not_called()
+
+def test_fetch_all_falls_back_to_primary_on_replica_failure(replica_db_manager):
+    """Tests that a connection failure on the replica is retried on the primary."""
+    import psycopg2
+    replica_cursor = replica_db_manager.replica_conn.cursor.return_value.__enter__.return_value
+    replica_cursor.execute.side_effect = psycopg2.OperationalError("replica went away")
+    primary_cursor = replica_db_manager.primary_conn.cursor.return_value.__enter__.return_value
+    primary_cursor.fetchall.return_value = [("row",)]
+
+    assert replica_db_manager.fetch_all("SELECT 1") == [("row",)]
+    replica_db_manager.connection_pool.getconn.assert_called_once()
+
+def test_read_your_writes_pins_reads_to_primary(replica_db_manager):
+    """Tests that reads inside read_your_writes() and use_primary reads skip the replica."""
+    with replica_db_manager.read_your_writes():
+        replica_db_manager.fetch_all("SELECT 1")
+    replica_db_manager.fetch_all("SELECT 1", use_primary=True)
+
+    replica_db_manager.replica_pool.getconn.assert_not_called()
+    assert replica_db_manager.connection_pool.getconn.call_count == 2
+    assert replica_db_manager._primary_pinned is False
+
+def test_read_your_writes_pins_only_the_calling_thread(replica_db_manager):
+    """Tests that a pin taken by one thread does not send another thread's reads to the primary."""
+    with replica_db_manager.read_your_writes():
+        heartbeat = threading.Thread(target=replica_db_manager.fetch_all, args=("SELECT 1",))
+        heartbeat.start()
+        heartbeat.join()
+        replica_db_manager.fetch_all("SELECT 1")
+
+    replica_db_manager.replica_pool.getconn.assert_called_once()
+    replica_db_manager.connection_pool.getconn.assert_called_once()
+
+def test_get_category_id_prepares_once_per_connection(mock_db_manager):
+    """Tests that a fixed query is PREPAREd on first use and then only EXECUTEd."""
+    # 1. Arrange
+    mock_db_manager.mock_cursor.connection.prepared_statements = set()
+    mock_db_manager.mock_cursor.fetchone.side_effect = [None, (47,), (47,)]
+
+    # 2. Act
+    first = mock_db_manager.get_category_id("DigiKey", "Chip Resistor - Surface Mount")
+    second = mock_db_manager.get_category_id("DigiKey", "Chip Resistor - Surface Mount")
+
+    # 3. Assert
+    statements = [c.args[0] for c in mock_db_manager.mock_cursor.execute.call_args_list]
+    assert sum(s.startswith("PREPARE kipipe_get_category_id AS") for s in statements) == 1
+    assert statements.count("EXECUTE kipipe_get_category_id (%s, %s)") == 2
+    assert first == second == 47
+
+def test_upsert_component_uses_cached_positional_statement(mock_db_manager):
+    """Tests the prepared component upsert and its per-column-set statement cache."""
+    mock_db_manager.mock_cursor.connection.prepared_statements = set()
+    mock_db_manager.mock_cursor.fetchone.return_value = None
+    data = {"manufacturer_part_number": "PN-1", "description": "10k"}
+
+    assert mock_db_manager.upsert_component(data) is True
+
+    prepare_sql = mock_db_manager.mock_cursor.execute.call_args_list[1].args[0]
+    assert "VALUES ($1, $2)" in prepare_sql
+    mock_db_manager.mock_cursor.execute.assert_called_with(ANY, ("PN-1", "10k"))
+    mock_db_manager.mock_connection.commit.assert_called_once()
+    assert mock_db_manager._build_upsert_query("components", data, "manufacturer_part_number") is \
+        mock_db_manager._build_upsert_query("components", {"manufacturer_part_number": "PN-2", "description": "1k"}, "manufacturer_part_number")
+
+def test_update_component_link_rejects_unknown_columns(mock_db_manager):
+    """Tests that only the symbol and footprint link columns can be updated."""
+    with pytest.raises(ValueError):
+        mock_db_manager.update_component_link("PN-1", "description", "x")
+
+def test_create_category_view_materialized_with_indexes(mock_db_manager):
+    """Tests that a materialized category view is created with the index concurrent refresh needs."""
+    mock_db_manager.mock_cursor.fetchone.return_value = ('v',)
+
+    assert mock_db_manager.create_category_view("dbl_47_resistors", 47) is True
+
+    statements = [c.args[0] for c in mock_db_manager.mock_cursor.execute.call_args_list]
+    assert "DROP VIEW dbl_47_resistors" in statements
+    assert any(s.startswith("CREATE MATERIALIZED VIEW dbl_47_resistors") for s in statements)
+    assert "CREATE UNIQUE INDEX dbl_47_resistors_partid_idx ON dbl_47_resistors (partid)" in statements
+    mock_db_manager.mock_connection.commit.assert_called_once()
+
+def test_create_category_view_rejects_unsafe_names(mock_db_manager):
+    """Tests that only generated view names can be interpolated into DDL."""
+    with pytest.raises(ValueError):
+        mock_db_manager.create_category_view("dbl_1; DROP TABLE components", 1)
+
+def test_refresh_category_views_concurrently(mock_db_manager):
+    """Tests that every dbl_* materialized view is refreshed concurrently."""
+    mock_db_manager.mock_cursor.fetchall.return_value = [("dbl_43_capacitors",), ("dbl_47_resistors",)]
+
+    assert mock_db_manager.refresh_category_views() == 2
+
+    mock_db_manager.mock_cursor.execute.assert_called_with('REFRESH MATERIALIZED VIEW CONCURRENTLY "dbl_47_resistors"', None)
+
+def test_stream_query_uses_server_side_cursor(mock_db_manager):
+    """Tests that stream_query yields fetchmany batches from a named cursor, then ends the transaction."""
+    mock_db_manager.mock_cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+    batches = list(mock_db_manager.stream_query("SELECT partid FROM components", batch_size=2))
+
+    assert batches == [[(1,), (2,)], [(3,)]]
+    assert "name" in mock_db_manager.mock_connection.cursor.call_args.kwargs
+    mock_db_manager.mock_connection.rollback.assert_called_once()
+
+def test_upsert_many_builds_one_multi_row_statement(mock_db_manager, mocker):
+    """Tests that upsert_many sends all rows through execute_values and updates non-key columns."""
+    execute_values = mocker.patch('tektrasense_kipipe.db_manager.execute_values')
+    rows = [{"symbol_name": "Device:R", "description": "Resistor"}, {"symbol_name": "Device:C", "description": None}]
+
+    assert mock_db_manager.upsert_many("symbols", rows, ("symbol_name",)) is True
+
+    _, sql, values = execute_values.call_args.args
+    assert 'ON CONFLICT (symbol_name) DO UPDATE SET "description" = EXCLUDED."description"' in sql
+    assert values == [("Device:R", "Resistor"), ("Device:C", None)]
+    mock_db_manager.mock_connection.commit.assert_called_once()
+
+def test_upsert_symbols_keeps_the_last_row_per_symbol_name(mock_db_manager, mocker):
+    """Tests that a batch never upserts the same symbol twice, which Postgres rejects."""
+    execute_values = mocker.patch('tektrasense_kipipe.db_manager.execute_values')
+    row = {"library_nickname": "Device", "symbol_name": "R", "description": "old", "datasheet": "~", "keywords": "R"}
+
+    assert mock_db_manager.upsert_symbols([row, dict(row, library_nickname="Device_Small", description="new")]) is True
+
+    assert execute_values.call_args.args[2] == [("Device_Small", "R", "new", "~", "R")]
+
+def test_upsert_footprints_keys_on_library_and_footprint_name(mock_db_manager, mocker):
+    """Tests that footprints of the same name in two libraries are both kept."""
+    execute_values = mocker.patch('tektrasense_kipipe.db_manager.execute_values')
+    row = {"library_nickname": "Resistor_SMD", "footprint_name": "R_0603", "description": "old"}
+    rows = [row, dict(row, library_nickname="Custom"), dict(row, description="new")]
+
+    assert mock_db_manager.upsert_footprints(rows) is True
+
+    _, sql, values = execute_values.call_args.args
+    assert "ON CONFLICT (library_nickname, footprint_name)" in sql
+    assert values == [("Resistor_SMD", "R_0603", "new"), ("Custom", "R_0603", "old")]
+
+def test_sync_library_symbols_runs_one_statement_per_library(mock_db_manager):
+    """Tests that a library is synced by one upsert-and-delete statement whose counts are returned."""
+    row = {"library_nickname": "Device", "symbol_name": "R", "description": "Resistor", "datasheet": "~",
+           "keywords": "R Resistor", "pin_count": 2, "unit_count": 1, "is_power": False, "extends": None,
+           "content_hash": "a" * 40}
+    mock_db_manager.mock_cursor.fetchone.return_value = (1, 0, 3)
+
+    counts = mock_db_manager.sync_library_symbols("Device", [dict(row, description="old"), row, dict(row, symbol_name="C")])
+
+    assert counts == {"inserted": 1, "updated": 0, "unchanged": 1, "removed": 3}
+    sql, params = mock_db_manager.mock_cursor.execute.call_args.args
+    assert "ON CONFLICT (symbol_name)" in sql and "DELETE FROM symbols" in sql
+    assert params["nickname"] == "Device"
+    assert params["names"] == ["R", "C"] and params["descriptions"] == ["Resistor", "Resistor"]
+    assert params["pin_counts"] == [2, 2] and params["extends"] == [None, None]
+    mock_db_manager.mock_connection.commit.assert_called_once()
+
+def test_sync_library_symbols_rolls_back_on_error(mock_db_manager):
+    """Tests that a failed sync leaves the library untouched and returns None."""
+    mock_db_manager.mock_cursor.execute.side_effect = Exception("deadlock detected")
+
+    assert mock_db_manager.sync_library_symbols("Device", []) is None
+    mock_db_manager.mock_connection.rollback.assert_called_once()
+
+def test_replace_supplier_offers_rewrites_tiers_in_one_transaction(mock_db_manager, mocker):
+    """Tests that a supplier's tiers are replaced and its stock upserted, then committed once."""
+    execute_values = mocker.patch('tektrasense_kipipe.db_manager.execute_values')
+    offers = [{"supplier": "DigiKey", "supplier_part_number": "296-1395-1-ND", "quantity_available": 800,
+               "price_breaks": [(1, 0.5), (10, 0.42)]}]
+
+    assert mock_db_manager.replace_supplier_offers("LM358DR", offers) is True
+
+    first_sql, first_params = mock_db_manager.mock_cursor.execute.call_args_list[0].args
+    assert first_sql.startswith("DELETE FROM price_breaks") and first_params == ("LM358DR", "DigiKey")
+    assert execute_values.call_args.args[2] == [("LM358DR", "DigiKey", 1, 0.5), ("LM358DR", "DigiKey", 10, 0.42)]
+    assert mock_db_manager.mock_cursor.execute.call_args.args[1] == ("LM358DR", "DigiKey", "296-1395-1-ND", 800)
+    mock_db_manager.mock_connection.commit.assert_called_once()
+
+def test_insert_bom_writes_lines_with_new_id(mock_db_manager, mocker):
+    """Tests that a new BOM and its lines are inserted in one transaction."""
+    execute_values = mocker.patch('tektrasense_kipipe.db_manager.execute_values')
+    mock_db_manager.mock_cursor.fetchone.return_value = (5,)
+
+    bom_id = mock_db_manager.insert_bom("amp", "/boms/amp.csv", "ab" * 32, "fetch", [("NE555P", 1, "U1")])
+
+    assert bom_id == 5
+    assert execute_values.call_args.args[2] == [(5, "NE555P", 1, "U1")]
+    mock_db_manager.mock_connection.commit.assert_called_once()
+
+def test_execute_returning_commits_and_returns_rows(mock_db_manager):
+    mock_db_manager.mock_cursor.fetchall.return_value = [(1,), (2,)]
+
+    assert mock_db_manager.execute_returning("UPDATE jobs SET status = 'done' RETURNING job_id") == [(1,), (2,)]
+    mock_db_manager.mock_connection.commit.assert_called_once()
@@ -0,0 +1,49 @@
+import pytest
+from unittest.mock import MagicMock
+from tektrasense_kipipe.job_queue import JobQueue, Job, RETRY_BASE_SECONDS
+
+@pytest.fixture
+def queue():
+    db_manager = MagicMock()
+    return JobQueue(db_manager, worker_id="host-a:1", lease_seconds=60)
+
+def test_enqueue_deduplicates_and_skips_open_jobs(queue):
+    """Tests that duplicate and blank payloads are dropped and ON CONFLICT skips open jobs."""
+    queue.db_manager.execute_returning.return_value = [(1,), (2,)]
+
+    added = queue.enqueue(["NE555P", " NE555P", "", "LM358DR", "RC0603-10K"], bom_id=4)
+
+    sql, params = queue.db_manager.execute_returning.call_args.args
+    assert "ON CONFLICT (kind, payload) WHERE status IN ('pending', 'running') DO NOTHING" in sql
+    assert params[1::4] == ["NE555P", "LM358DR", "RC0603-10K"]
+    assert added == 2
+
+def test_claim_uses_skip_locked_and_fails_exhausted_jobs(queue):
+    """Tests that claims skip locked rows and a job past max_attempts is not handed out."""
+    queue.db_manager.execute_returning.side_effect = [
+        [(10, "NE555P", 1, 5), (11, "LM358DR", 6, 5)],
+        [(11,)],
+    ]
+
+    jobs = queue.claim(limit=2)
+
+    claim_sql, claim_params = queue.db_manager.execute_returning.call_args_list[0].args
+    assert "FOR UPDATE SKIP LOCKED" in claim_sql
+    assert claim_params["owner"] == "host-a:1" and claim_params["limit"] == 2
+    assert jobs == [Job(10, "NE555P", 1, 5)]
+    settle_sql, settle_params = queue.db_manager.execute_returning.call_args_list[1].args
+    assert settle_params[0] == "failed" and settle_params[2:] == (11, "host-a:1")
+
+def test_fail_backs_off_exponentially_until_last_attempt(queue):
+    """Tests retry scheduling and the final failure."""
+    queue.db_manager.execute_returning.return_value = [(10,)]
+
+    queue.fail(Job(10, "NE555P", 3, 5), "timeout")
+    assert queue.db_manager.execute_returning.call_args.args[1][0] == RETRY_BASE_SECONDS * 4
+
+    queue.fail(Job(10, "NE555P", 5, 5), "timeout")
+    assert queue.db_manager.execute_returning.call_args.args[1][:2] == ("failed", "timeout")
+
+def test_heartbeat_reports_lost_leases(queue):
+    queue.db_manager.execute_returning.return_value = [(10,)]
+    assert queue.heartbeat([10, 11]) == [11]
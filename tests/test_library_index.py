@@ -0,0 +1,117 @@
+import json
+import os
+import pytest
+from tektrasense_kipipe import library_index
+from tektrasense_kipipe.library_index import LibraryIndex, find_footprint, find_symbol, split_link
+
+DEVICE = '''(kicad_symbol_lib (version 20231120)
+  (symbol "R" (property "Value" "R")
+    (symbol "R_1_1" (pin passive line (number "1")))
+  )
+  (symbol "C" (property "Value" "C"))
+)
+'''
+
+@pytest.fixture
+def libraries(tmp_path, mocker):
+    symbols = tmp_path / "symbols"
+    (symbols / "official").mkdir(parents=True)
+    (symbols / "official" / "Device.kicad_sym").write_text(DEVICE)
+    footprints = tmp_path / "footprints" / "Resistor_SMD.pretty"
+    footprints.mkdir(parents=True)
+    (footprints / "R_0805.kicad_mod").write_text('(footprint "R_0805")')
+    mocker.patch('tektrasense_kipipe.config.SYMBOL_SEARCH_PATHS', [str(symbols)])
+    mocker.patch('tektrasense_kipipe.config.FOOTPRINT_SEARCH_PATHS', [str(tmp_path / "footprints")])
+    mocker.patch.dict(library_index._open_indexes, clear=True)
+    return tmp_path
+
+def test_find_symbol_returns_file_and_offset(libraries):
+    """Tests that a top-level symbol is found at its byte offset, and a sub-unit is not a symbol."""
+    path = libraries / "symbols" / "official" / "Device.kicad_sym"
+
+    entry = find_symbol("Device", "C")
+
+    assert entry.path == str(path)
+    assert path.read_bytes()[entry.offset:].startswith(b'(symbol "C"')
+    assert find_symbol("Device", "R_1_1") is None
+    assert find_symbol("Nope", "R") is None
+
+def test_find_footprint_uses_the_pretty_layout(libraries):
+    entry = find_footprint("Resistor_SMD", "R_0805")
+    assert entry.path == str(libraries / "footprints" / "Resistor_SMD.pretty" / "R_0805.kicad_mod")
+    assert find_footprint("Resistor_SMD", "R_1206") is None
+
+def test_lookups_do_not_walk_or_reparse_unchanged_libraries(libraries, mocker):
+    """Tests that a saved index answers a new process's lookups with a stat, without walking or parsing."""
+    find_symbol("Device", "R")
+    library_index._open_indexes.clear()
+    walk = mocker.spy(library_index.os, 'walk')
+    parse = mocker.spy(library_index, 'iter_symbols')
+
+    assert find_symbol("Device", "C")
+
+    walk.assert_not_called()
+    parse.assert_not_called()
+
+def test_changed_library_is_reindexed_by_mtime(libraries):
+    path = libraries / "symbols" / "official" / "Device.kicad_sym"
+    assert find_symbol("Device", "L") is None
+    path.write_text(DEVICE.replace('(symbol "C"', '(symbol "L"'))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert find_symbol("Device", "L")
+    assert find_symbol("Device", "C") is None
+
+def test_new_library_triggers_one_rescan(libraries, mocker):
+    """Tests that an unknown nickname re-scans the search paths once, not on every miss."""
+    find_symbol("Device", "R")
+    library_index._open_indexes.clear()  # a later run
+    (libraries / "symbols" / "Custom.kicad_sym").write_text('(kicad_symbol_lib (symbol "MY_PART"))')
+    walk = mocker.spy(library_index.os, 'walk')
+
+    assert find_symbol("Custom", "MY_PART")
+    assert find_symbol("Missing", "X") is None
+    assert find_symbol("Missing2", "X") is None
+
+    assert walk.call_count == 1
+
+def test_index_is_rebuilt_when_search_paths_change(libraries, mocker):
+    find_symbol("Device", "R")
+    saved = json.loads((libraries / "index" / "symbols.json").read_text())
+    assert saved["roots"] == [str(libraries / "symbols")]
+    mocker.patch('tektrasense_kipipe.config.SYMBOL_SEARCH_PATHS', [str(libraries / "elsewhere")])
+
+    assert LibraryIndex.open("symbol").libraries == {}
+
+def test_refresh_reindexes_stale_libraries_and_forgets_removed_ones(libraries):
+    """Tests that after refresh() names() answers from memory, in parallel for several stale libraries."""
+    (libraries / "symbols" / "Custom.kicad_sym").write_text('(kicad_symbol_lib (symbol "MY_PART"))')
+    index = LibraryIndex.open("symbol")
+
+    index.refresh(["Device", "Custom", "Missing"], jobs=2)
+
+    assert set(index.names("Device")) == {"R", "C"}
+    assert set(index.names("Custom")) == {"MY_PART"}
+    assert index.names("Missing") is None
+    (libraries / "symbols" / "Custom.kicad_sym").unlink()
+    index.refresh(["Custom"])
+    assert index.names("Custom") is None
+
+def test_failed_save_keeps_the_previous_index_and_no_temporary_file(libraries, mocker):
+    """Tests that the index is replaced whole or not at all, through a temporary file of its own."""
+    find_symbol("Device", "R")
+    index = LibraryIndex.open("symbol")
+    saved = index.path.read_text()
+    index._dirty = True
+    mocker.patch.object(library_index.json, 'dump', side_effect=OSError("disk full"))
+
+    with pytest.raises(OSError):
+        index.save()
+
+    assert index.path.read_text() == saved
+    assert sorted(p.name for p in index.path.parent.iterdir()) == [index.path.name]
+
+@pytest.mark.parametrize("link, expected", [("Device:R", ("Device", "R")), ("Lib:A:B", ("Lib", "A:B")), ("NoColon", None), (":R", None)])
+def test_split_link(link, expected):
+    assert split_link(link) == expected
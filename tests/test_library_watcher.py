@@ -0,0 +1,71 @@
+import os
+import sys
+import pytest
+from pathlib import Path
+from tektrasense_kipipe.library_watcher import InotifyWatcher, PollingWatcher, collect_changes, open_watcher
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "symbols").mkdir()
+    (tmp_path / "symbols" / "Device.kicad_sym").write_text("(kicad_symbol_lib)")
+    (tmp_path / "footprints" / "Resistor_SMD.pretty").mkdir(parents=True)
+    (tmp_path / "footprints" / "Resistor_SMD.pretty" / "R_0603.kicad_mod").write_text('(footprint "R_0603")')
+    return tmp_path
+
+def test_polling_watcher_reports_added_changed_and_removed_library_files(tree):
+    watcher = PollingWatcher([str(tree)], interval=0)
+    device = tree / "symbols" / "Device.kicad_sym"
+    device.write_text("(kicad_symbol_lib (symbol \"R\"))")
+    (tree / "symbols" / "New.kicad_sym").write_text("(kicad_symbol_lib)")
+    (tree / "footprints" / "Resistor_SMD.pretty" / "R_0603.kicad_mod").unlink()
+    (tree / "symbols" / "notes.txt").write_text("ignored")
+
+    assert watcher.changes(1.0) == {device, tree / "symbols" / "New.kicad_sym",
+                                    tree / "footprints" / "Resistor_SMD.pretty" / "R_0603.kicad_mod"}
+    assert watcher.changes(0) == set()
+
+def test_polling_watcher_waits_for_the_next_pass(tree):
+    watcher = PollingWatcher([str(tree)], interval=60)
+    (tree / "symbols" / "New.kicad_sym").write_text("(kicad_symbol_lib)")
+    assert watcher.changes(0.01) == set()
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher_sees_writes_and_new_directories(tree):
+    watcher = InotifyWatcher([str(tree)])
+    try:
+        (tree / "symbols" / "Device.kicad_sym").write_text("(kicad_symbol_lib (symbol \"R\"))")
+        assert watcher.changes(2.0) == {tree / "symbols" / "Device.kicad_sym"}
+
+        new_library = tree / "footprints" / "Capacitor_SMD.pretty"
+        new_library.mkdir()
+        assert watcher.changes(2.0) == {new_library}
+        (new_library / "C_0603.kicad_mod").write_text('(footprint "C_0603")')
+        (new_library / "C_0603.kicad_mod~").write_text("editor backup")
+        assert watcher.changes(2.0) == {new_library / "C_0603.kicad_mod"}
+    finally:
+        watcher.close()
+
+def test_open_watcher_falls_back_to_polling(tree, mocker):
+    mocker.patch('tektrasense_kipipe.library_watcher.InotifyWatcher', side_effect=OSError(28, "inotify watch limit reached"))
+    assert isinstance(open_watcher([str(tree)], interval=1), PollingWatcher)
+    assert isinstance(open_watcher([str(tree)], poll=True), PollingWatcher)
+
+class ScriptedWatcher:
+    """Returns one scripted batch of changes per call, then nothing."""
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.timeouts = []
+    def changes(self, timeout):
+        self.timeouts.append(timeout)
+        return set(self.batches.pop(0)) if self.batches else set()
+
+def test_collect_changes_merges_a_burst_until_it_goes_quiet():
+    watcher = ScriptedWatcher([], {Path("a.kicad_sym")}, {Path("b.kicad_sym")}, {Path("a.kicad_sym")}, [], {Path("c.kicad_sym")})
+
+    changed = collect_changes(watcher, debounce=0.5)
+
+    assert changed == {Path("a.kicad_sym"), Path("b.kicad_sym")}
+    assert watcher.timeouts == [1.0, 1.0, 0.5, 0.5, 0.5]
+
+def test_collect_changes_returns_when_stopped():
+    assert collect_changes(ScriptedWatcher(), stopped=lambda: True) == set()
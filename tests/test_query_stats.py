@@ -0,0 +1,46 @@
+import json
+import pytest
+from tektrasense_kipipe.query_stats import QueryStats, normalize_statement
+
+def test_normalize_statement_groups_by_shape():
+    """Tests that literals, whitespace and batch sizes do not split statement groups."""
+    assert normalize_statement("SELECT *\n  FROM components\n WHERE partid = 42;") == "SELECT * FROM components WHERE partid = ?"
+    assert normalize_statement("UPDATE components SET kicad_symbol = 'Device:R' WHERE supplier_1 = 'x'") == \
+        "UPDATE components SET kicad_symbol = ? WHERE supplier_1 = ?"
+    two_rows = normalize_statement("INSERT INTO symbols (a, b) VALUES ('x', 1), ('y', NULL)")
+    three_rows = normalize_statement("INSERT INTO symbols (a, b) VALUES ('x', 1), ('y', 2), ('z', 3)")
+    assert two_rows == three_rows == "INSERT INTO symbols (a, b) VALUES (...), ..."
+
+def test_record_aggregates_and_logs_slow_queries(caplog):
+    """Tests count/total/max/rows aggregation and the slow-query warning."""
+    # 1. Arrange
+    stats = QueryStats(slow_query_ms=100)
+
+    # 2. Act
+    stats.record("SELECT 1 FROM symbols WHERE symbol_id = 1", 0.010, rows=1)
+    stats.record("SELECT 1 FROM symbols WHERE symbol_id = 2", 0.250, rows=1)
+    stats.record("DELETE FROM jobs", 0.001, rows=0)
+
+    # 3. Assert
+    heaviest = stats.snapshot()[0]
+    assert heaviest["statement"] == "SELECT ? FROM symbols WHERE symbol_id = ?"
+    assert heaviest["count"] == 2
+    assert heaviest["rows"] == 2
+    assert heaviest["max_ms"] == pytest.approx(250)
+    assert heaviest["mean_ms"] == pytest.approx(130)
+    assert caplog.text.count("Slow query") == 1
+
+def test_format_summary_and_json_dump(tmp_path):
+    """Tests the printed summary table and the JSON export."""
+    stats = QueryStats(slow_query_ms=None)
+    assert stats.format_summary() == "No queries were executed."
+
+    stats.record("SELECT category_id FROM category_mappings", 0.002, rows=1)
+    summary = stats.format_summary()
+    assert "1 queries" in summary
+    assert "SELECT category_id FROM category_mappings" in summary
+
+    out_file = tmp_path / "stats.json"
+    stats.dump_json(str(out_file))
+    data = json.loads(out_file.read_text())
+    assert data["statements"][0]["count"] == 1
@@ -0,0 +1,79 @@
+import json
+import pytest
+from tektrasense_kipipe.run_journal import RunJournal, parse_deadline, run_parts
+
+@pytest.fixture
+def bom(tmp_path):
+    path = tmp_path / "bom.txt"
+    path.write_text("PN-1\nPN-2\n")
+    return path
+
+def test_resume_ignores_a_record_torn_by_a_crash(tmp_path, bom):
+    """Verifies that a half-written last line is skipped and that part simply runs again."""
+    journal = RunJournal.create("fetch", str(bom), directory=tmp_path)
+    journal.record("PN-1", True)
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "part", "part_numb')
+
+    resumed = RunJournal.resume(journal.run_id, "fetch", str(bom), directory=tmp_path)
+
+    assert resumed.is_done("PN-1")
+    assert not resumed.is_done("PN-2")
+
+def test_resume_rejects_changed_input_and_other_commands(tmp_path, bom):
+    """Verifies that a journal is only resumed by the same command over the same input file."""
+    journal = RunJournal.create("fetch", str(bom), directory=tmp_path)
+
+    with pytest.raises(ValueError, match="not a 'add-symbol' run"):
+        RunJournal.resume(journal.run_id, "add-symbol", str(bom), directory=tmp_path)
+    bom.write_text("PN-9\n")
+    with pytest.raises(ValueError, match="differs"):
+        RunJournal.resume(journal.run_id, "fetch", str(bom), directory=tmp_path)
+
+def test_run_parts_records_outcomes_and_skips_header_and_duplicates(tmp_path, bom):
+    """Verifies that each distinct part is handled once and its outcome journaled."""
+    journal = RunJournal.create("fetch", str(bom), directory=tmp_path)
+    handled = []
+
+    status = run_parts(["Part Number", "PN-1", " PN-1 ", "", "PN-2"], lambda pn: handled.append(pn) or pn == "PN-1", journal)
+
+    assert status == "completed"
+    assert handled == ["PN-1", "PN-2"]
+    assert journal.counts() == {"done": 1, "failed": 1}
+
+def test_run_parts_records_a_raising_handler_as_failed_and_continues(tmp_path, bom):
+    """Verifies that an exception fails only its part, with the error kept in the journal."""
+    journal = RunJournal.create("fetch", str(bom), directory=tmp_path)
+    def handle(part_number):
+        if part_number == "PN-1":
+            raise KeyError("Parameters")
+        return True
+
+    status = run_parts(["PN-1", "PN-2"], handle, journal)
+
+    assert status == "completed"
+    assert journal.outcomes == {"PN-1": "failed", "PN-2": "done"}
+    records = [json.loads(line) for line in journal.path.read_text().splitlines()]
+    assert records[1]["detail"] == "KeyError: 'Parameters'"
+    assert records[-1]["type"] == "end" and records[-1]["status"] == "completed"
+
+def test_run_parts_closes_the_journal_when_the_run_dies(tmp_path, bom):
+    """Verifies that the end record is written with 'failed' when something escapes the loop."""
+    journal = RunJournal.create("fetch", str(bom), directory=tmp_path)
+    def handle(part_number):
+        raise SystemExit(1)
+
+    with pytest.raises(SystemExit):
+        run_parts(["PN-1"], handle, journal)
+
+    end = json.loads(journal.path.read_text().splitlines()[-1])
+    assert end["type"] == "end" and end["status"] == "failed"
+
+@pytest.mark.parametrize("value, seconds", [("90s", 90), ("45m", 2700), ("2h", 7200), ("30", 1800)])
+def test_parse_deadline_accepts_durations(value, seconds, mocker):
+    mocker.patch('tektrasense_kipipe.run_journal.time').time.return_value = 1000.0
+    assert parse_deadline(value) == 1000.0 + seconds
+
+def test_parse_deadline_rejects_other_formats():
+    with pytest.raises(ValueError):
+        parse_deadline("tomorrow")
@@ -0,0 +1,137 @@
+import pytest
+from tektrasense_kipipe.sexpr import (SExprError, children, iter_file, iter_symbols, iter_top_level, properties, read_footprint,
+                                      symbol_shape)
+
+LIBRARY = b'''(kicad_symbol_lib (version 20231120) (generator "kicad_symbol_editor")
+  (symbol "R" (pin_numbers hide)
+    (property "Reference" "R" (at 2 0 90))
+    (property "Value" "R" (at 0 0 90))
+    (symbol "R_0_1" (rectangle (start -1 -2.5) (end 1 2.5)))
+    (symbol "R_1_1"
+      (pin passive line (at 0 3.81 270) (length 1.27) (name "~") (number "1"))
+      (pin passive line (at 0 -3.81 90) (length 1.27) (name "~") (number "2"))
+    )
+  )
+  (symbol "R_Small" (extends "R")
+    (property "Value" "R_Small" (at 0 0 0))
+  )
+)
+'''
+
+def test_iter_top_level_yields_only_root_children():
+    nodes = list(iter_top_level(LIBRARY))
+
+    assert [node[0] for node in nodes] == ["version", "generator", "symbol", "symbol"]
+    node = nodes[2]
+    assert node[:3] == ["symbol", "R", ["pin_numbers", "hide"]]
+    units = list(children(node, "symbol"))
+    assert [unit[1] for unit in units] == ["R_0_1", "R_1_1"]
+    assert len(list(children(units[1], "pin"))) == 2
+
+def test_iter_top_level_filters_by_head():
+    nodes = list(iter_top_level(LIBRARY, head="symbol"))
+    assert [node[1] for node in nodes] == ["R", "R_Small"]
+
+def test_iter_symbols_reads_properties_from_a_file(tmp_path):
+    path = tmp_path / "Device.kicad_sym"
+    path.write_bytes(LIBRARY)
+
+    symbols = list(iter_symbols(path))
+
+    assert [s.name for s in symbols] == ["R", "R_Small"]
+    assert symbols[0].properties == {"Reference": "R", "Value": "R"}
+    assert symbols[1].node[2] == ["extends", "R"]
+
+def test_symbol_nodes_can_be_read_after_iterating(tmp_path):
+    path = tmp_path / "Device.kicad_sym"
+    path.write_bytes(LIBRARY)
+
+    symbols = list(iter_symbols(path))
+
+    assert [symbol_shape(s.node) for s in symbols] == [(2, 1, False, None), (None, 1, False, "R")]
+
+AWKWARD = rb'''(kicad_symbol_lib (version 20231120)
+  (symbol "U" (property "Description" "Op-amp (see (symbol V) \"below\")") (property "Note" "(property x y)")
+    (symbol "U_1_1" (pin input line (name "IN(") (number "1")) (pin output line (name "OUT") (number "2"))))
+  (symbol "V" (extends "U") (property "Value" "V (\\)"))
+)
+'''
+
+def test_iter_symbols_agrees_with_the_token_reader_on_awkward_strings(tmp_path):
+    """Verifies that parentheses, escapes and list heads inside strings do not mislead the byte-level scan."""
+    path = tmp_path / "Awkward.kicad_sym"
+    path.write_bytes(AWKWARD)
+
+    symbols = list(iter_symbols(path))
+    nodes = list(iter_top_level(AWKWARD, head="symbol"))
+
+    assert [s.name for s in symbols] == ["U", "V"]
+    assert symbols[0].properties["Description"] == 'Op-amp (see (symbol V) "below")'
+    assert [s.properties for s in symbols] == [properties(node) for node in nodes]
+    assert [symbol_shape(s.node) for s in symbols] == [symbol_shape(node) for node in nodes] == [
+        (2, 1, False, None), (None, 1, False, "U")]
+
+def test_iter_top_level_builds_only_kept_lists():
+    node = next(iter_top_level(LIBRARY, head="symbol", keep=frozenset({"symbol", "property", "pin", "number"})))
+
+    assert node[:3] == ["symbol", "R", ["property", "Reference", "R"]]
+    assert list(children(node, "symbol"))[1][2] == ["pin", "passive", "line", ["number", "1"]]
+
+def test_quoted_strings_keep_parentheses_and_unescape():
+    node = next(iter_top_level(rb'(lib (property "Description" "A (\"B\")\\ C\nD"))'))
+    assert node == ["property", "Description", 'A ("B")\\ C\nD']
+
+@pytest.mark.parametrize("text", [b'(lib (symbol "A")', b'(lib))', b'atom (lib)', b'(lib (symbol "A))'])
+def test_malformed_input_raises(text):
+    with pytest.raises(SExprError):
+        list(iter_top_level(text))
+
+def test_empty_file_yields_nothing(tmp_path):
+    path = tmp_path / "empty.kicad_sym"
+    path.write_bytes(b"")
+    assert list(iter_file(path)) == []
+
+def test_windows_never_split_a_multi_line_string(monkeypatch):
+    """Verifies that a window boundary inside a string with raw line breaks is retried with a larger window."""
+    text = b'(lib\n (a "x\ny\nz")\n (b "\xc3\xa9")\n)\n'
+    monkeypatch.setattr("tektrasense_kipipe.sexpr.WINDOW", 1)
+    windowed = list(iter_top_level(text))
+    assert windowed == [["a", "x\ny\nz"], ["b", "\u00e9"]]
+
+def test_symbol_shape_counts_distinct_pins_and_units():
+    """Tests pin and unit counts of a dual op-amp with a power unit and a De Morgan body."""
+    node = next(iter_top_level(b'''(lib (symbol "LM358" (in_bom yes)
+      (symbol "LM358_0_1" (polyline (pts (xy 0 0))))
+      (symbol "LM358_1_1" (pin output line (number "1")) (pin input line (number "2")) (pin input line (number "3")))
+      (symbol "LM358_1_2" (pin output line (number "1")) (pin input line (number "2")) (pin input line (number "3")))
+      (symbol "LM358_2_1" (pin output line (number "7")) (pin input line (number "6")) (pin input line (number "5")))
+      (symbol "LM358_3_1" (pin power_in line (number "8")) (pin power_in line (number "4")))))''', head="symbol"))
+
+    assert symbol_shape(node) == (8, 3, False, None)
+
+def test_symbol_shape_of_power_and_derived_symbols():
+    """Tests the power flag, and that a derived symbol's pins are left unknown."""
+    power = next(iter_top_level(b'(lib (symbol "GND" (power) (symbol "GND_1_1" (pin power_in line (number "1")))))'))
+    derived = list(iter_symbols_from(LIBRARY))[1]
+
+    assert symbol_shape(power) == (1, 1, True, None)
+    assert symbol_shape(derived) == (None, 1, False, "R")
+
+def iter_symbols_from(text):
+    return iter_top_level(text, head="symbol")
+
+def test_read_footprint_of_legacy_module_infers_attribute(tmp_path):
+    """Tests the pre-KiCad 6 'module' format: unquoted atoms, no (attr), a courtyard circle and an unnumbered pad."""
+    path = tmp_path / "MountingHole_3.2mm.kicad_mod"
+    path.write_text('''(module MountingHole_3.2mm (layer F.Cu) (tedit 5A0F7A2B)
+  (descr "Mounting Hole 3.2mm")
+  (tags "mounting hole")
+  (fp_circle (center 0 0) (end 3.45 0) (layer F.CrtYd) (width 0.05))
+  (pad 1 thru_hole circle (at 0 0) (size 6.4 6.4) (drill 3.2) (layers *.Cu *.Mask))
+  (pad "" np_thru_hole circle (at 2 0) (size 1 1) (drill 1) (layers *.Cu))
+)''')
+
+    fp = read_footprint(path)
+
+    assert (fp.name, fp.tags, fp.pad_count, fp.attribute) == ("MountingHole_3.2mm", "mounting hole", 1, "through_hole")
+    assert fp.courtyard == (-3.45, -3.45, 3.45, 3.45)
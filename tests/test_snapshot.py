@@ -0,0 +1,96 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+from tektrasense_kipipe import snapshot
+
+TABLES = [("footprint_mappings", ["mapping_id", "manufacturer_part_number"]),
+          ("components", ["partid", "category_id"]),
+          ("categories", ["category_id", "category_name"])]
+FOREIGN_KEYS = [("components", "categories"), ("categories", "categories")]
+
+@pytest.fixture
+def mock_db(mocker):
+    """Provides a DatabaseManager mock whose cursor serves catalog metadata and fakes COPY."""
+    db_manager = MagicMock()
+    cursor = MagicMock()
+    connection = db_manager.get_connection.return_value.__enter__.return_value
+    connection.cursor.return_value.__enter__.return_value = cursor
+    connection.server_version = 160004
+
+    results = {"pg_attribute": TABLES, "contype = 'f'": FOREIGN_KEYS,
+               "pg_sequences": [("components_partid_seq", 420), ("component_change_seq", 9000)],
+               "pg_indexes": [("components_category_id_idx", "CREATE INDEX components_category_id_idx ON kicad_library.components USING btree (category_id)")]}
+
+    def execute(sql, params=None):
+        cursor.fetchall.return_value = next((rows for key, rows in results.items() if key in sql), [])
+
+    def copy_expert(sql, f):
+        if "TO STDOUT" in sql:
+            f.write(f"PGCOPY {sql}".encode())
+            cursor.rowcount = 2
+        else:
+            f.read()
+
+    cursor.execute.side_effect = execute
+    cursor.copy_expert.side_effect = copy_expert
+    db_manager.cursor = cursor
+    return db_manager
+
+def test_save_writes_tables_in_dependency_order(mock_db, tmp_path):
+    """Tests that referenced tables come first and every file is checksummed in the manifest."""
+    manifest = snapshot.save_snapshot(mock_db, tmp_path)
+
+    names = [table["name"] for table in manifest["tables"]]
+    assert names.index("categories") < names.index("components")
+    assert manifest["sequences"] == {"components_partid_seq": 420, "component_change_seq": 9000}
+    saved = json.loads((tmp_path / "manifest.json").read_text())
+    assert saved["tables"][0]["sha256"] == snapshot._sha256(tmp_path / saved["tables"][0]["file"])
+    assert all("FORMAT binary" in call.args[0] for call in mock_db.cursor.copy_expert.call_args_list)
+
+def test_load_rebuilds_indexes_after_copy_and_restores_sequences(mock_db, tmp_path):
+    """Tests the load order: drop indexes, truncate, copy, recreate indexes, setval, commit."""
+    snapshot.save_snapshot(mock_db, tmp_path)
+    mock_db.cursor.execute.reset_mock()
+
+    assert snapshot.load_snapshot(mock_db, tmp_path) == 6
+
+    statements = [call.args[0] for call in mock_db.cursor.execute.call_args_list]
+    drop = statements.index('DROP INDEX "kicad_library"."components_category_id_idx"')
+    truncate = next(i for i, sql in enumerate(statements) if sql.startswith("TRUNCATE"))
+    create = next(i for i, sql in enumerate(statements) if sql.startswith("CREATE INDEX"))
+    assert drop < truncate < create
+    assert "FREEZE" in mock_db.cursor.copy_expert.call_args.args[0]
+    assert mock_db.cursor.execute.call_args.args == ("SELECT setval(%s, %s)", ('"kicad_library"."components_partid_seq"', 420))
+    mock_db.get_connection.return_value.__enter__.return_value.commit.assert_called_once()
+
+def test_load_rejects_corrupt_snapshot_before_touching_the_database(mock_db, tmp_path):
+    """Tests that a checksum mismatch stops the load before any statement runs."""
+    manifest = snapshot.save_snapshot(mock_db, tmp_path)
+    (tmp_path / manifest["tables"][0]["file"]).write_bytes(b"garbage")
+    mock_db.cursor.execute.reset_mock()
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        snapshot.load_snapshot(mock_db, tmp_path)
+    mock_db.cursor.execute.assert_not_called()
+
+def test_load_restamps_the_change_feed_and_records_removed_parts(mock_db, tmp_path, mocker):
+    """Tests that the COPY stamps loaded parts and removed parts get tombstones numbered before them."""
+    tables = [("components", ["partid", "manufacturer_part_number", "change_seq", "change_xid", "created_xid"]),
+              ("component_deletions", ["change_seq", "change_xid", "partid"])]
+    mocker.patch.object(snapshot, "_ordered_tables", return_value=dict(tables))
+    snapshot.save_snapshot(mock_db, tmp_path)
+    mock_db.cursor.execute.reset_mock()
+    mock_db.cursor.copy_expert.reset_mock()
+
+    assert snapshot.load_snapshot(mock_db, tmp_path) == 2
+
+    statements = [" ".join(call.args[0].split()) for call in mock_db.cursor.execute.call_args_list]
+    position = lambda text: next(i for i, sql in enumerate(statements) if text in sql)
+    assert position("CREATE TEMP TABLE kipipe_previous_components") < position("TRUNCATE")
+    assert "component_deletions" not in statements[position("TRUNCATE")]
+    assert [call.args[0].split()[1] for call in mock_db.cursor.copy_expert.call_args_list] == ['"kicad_library"."components"']
+    assert position("CREATE TEMP TABLE kipipe_previous_components") < position("setval('\"kicad_library\".component_change_seq'") \
+        < position("DISABLE TRIGGER USER") < position('ENABLE TRIGGER "components_stamp_change"') \
+        < position("INSERT INTO \"kicad_library\".component_deletions") < position("ENABLE TRIGGER USER")
+    assert not any(sql.startswith("UPDATE") for sql in statements)
+    assert not any("component_change_seq" in str(call.args[1:]) for call in mock_db.cursor.execute.call_args_list if "setval" in call.args[0])
@@ -0,0 +1,50 @@
+import random
+import pytest
+from tektrasense_kipipe.symbol_matcher import SymbolMatcher, normalize
+
+def brute_force(part_number, rows, min_prefix=5):
+    """The linear scan add-symbol used before the matcher, as the reference."""
+    best, found = 0, []
+    for nickname, name, _ in rows:
+        key = normalize(name)
+        length = 0
+        while length < min(len(key), len(part_number)) and key[length] == part_number[length]:
+            length += 1
+        if length < min_prefix:
+            continue
+        if length > best:
+            best, found = length, [{"nickname": nickname, "symbol": name}]
+        elif length == best:
+            found.append({"nickname": nickname, "symbol": name})
+    return found, best
+
+@pytest.mark.parametrize("name, expected", [("IC_LM358_A", "LM358"), ("LM358x", "LM358"), ("STM32F4xxRx", "STM32F4R"), ("R_Small", "Small")])
+def test_normalize(name, expected):
+    assert normalize(name) == expected
+
+def test_best_matches_agrees_with_a_linear_scan():
+    alphabet = "ABCLM0123456x_-"
+    rng = random.Random(7)
+    rows = [(rng.choice(["Device", "Amplifier_Operational", "MCU_ST"]), "".join(rng.choice(alphabet) for _ in range(rng.randint(4, 12))), None)
+            for _ in range(2000)]
+    matcher = SymbolMatcher.from_rows(rows)
+    for _ in range(500):
+        part_number = rows[rng.randrange(len(rows))][1][:rng.randint(3, 12)] + "".join(rng.choice(alphabet) for _ in range(3))
+        found, length = matcher.best_matches(part_number)
+        expected, expected_length = brute_force(part_number, rows)
+        key = lambda s: (s["nickname"], s["symbol"])
+        assert (sorted(found, key=key), length) == (sorted(expected, key=key), expected_length)
+
+def test_for_pin_count_keeps_unknown_and_one_extra_pin():
+    matcher = SymbolMatcher.from_rows([("Lib", "OPAMP1", 8), ("Lib", "OPAMP2", 9), ("Lib", "OPAMP3", 10), ("Lib", "OPAMP4", None)])
+
+    subset = matcher.for_pin_count(8)
+
+    assert [s["symbol"] for s in subset.best_matches("OPAMP")[0]] == ["OPAMP1", "OPAMP2", "OPAMP4"]
+    assert matcher.for_pin_count(8) is subset
+
+def test_no_match_below_the_minimum_prefix():
+    matcher = SymbolMatcher.from_rows([("Device", "LM358", None)])
+
+    assert matcher.best_matches("LM35") == ([], 0)
+    assert SymbolMatcher.from_rows([]).best_matches("LM358DR") == ([], 0)